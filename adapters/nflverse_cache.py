@@ -0,0 +1,156 @@
+"""Per-season Parquet cache in front of nflverse downloads.
+
+Each dataset (schedules, weekly, pbp) is stored as one Parquet file per
+season under a versioned directory. Completed seasons never change upstream,
+so a file written after its season ended is reused indefinitely; any other
+file (the in-progress season, or a past season cached mid-season) is
+re-downloaded once it is older than ``NFLVERSE_TTL_HOURS``. Reads pass
+the caller's column list straight to Parquet, so wide frames such as
+play-by-play only materialise the columns a job uses.
+
+When a download fails (or ``NFLVERSE_OFFLINE=1``) stale files are served
+instead, which lets the edge pipeline run without network access.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pq = None  # type: ignore
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path("storage/cache/nflverse")
+
+Fetcher = Callable[[List[int]], pd.DataFrame]
+
+
+def cache_dir() -> Path:
+    return Path(os.getenv("NFLVERSE_CACHE_DIR", str(DEFAULT_CACHE_DIR))) / f"v{CACHE_VERSION}"
+
+
+def current_season(now: Optional[datetime.datetime] = None) -> int:
+    """The season still receiving games: it rolls over in August."""
+    now = now or datetime.datetime.now()
+    return now.year if now.month >= 8 else now.year - 1
+
+
+def season_end(season: int) -> datetime.datetime:
+    """After this, ``season`` (playoffs included) gets no more games."""
+    return datetime.datetime(int(season) + 1, 2, 15)
+
+
+def season_path(dataset: str, season: int) -> Path:
+    return cache_dir() / dataset / f"{int(season)}.parquet"
+
+
+def _ttl_seconds() -> float:
+    return float(os.getenv("NFLVERSE_TTL_HOURS", "6")) * 3600
+
+
+def _offline() -> bool:
+    return os.getenv("NFLVERSE_OFFLINE", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def is_fresh(dataset: str, season: int, now: Optional[float] = None) -> bool:
+    """Whether the cached file can be used without trying the network."""
+    path = season_path(dataset, season)
+    if not path.exists():
+        return False
+    written = path.stat().st_mtime
+    if written >= season_end(season).timestamp():
+        return True  # Cached after the season was complete
+    age = (now if now is not None else time.time()) - written
+    return age < _ttl_seconds()
+
+
+def read_season(
+    dataset: str, season: int, columns: Optional[Sequence[str]] = None
+) -> Optional[pd.DataFrame]:
+    """Load one cached season, reading only ``columns`` that the file has."""
+    path = season_path(dataset, season)
+    if pq is None or not path.exists():
+        return None
+    try:
+        if columns is not None:
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in available]
+        return pq.read_table(path, columns=columns).to_pandas()
+    except Exception as exc:
+        print(f"Warning: unreadable nflverse cache {path} ({exc})")
+        return None
+
+
+def write_season(dataset: str, season: int, df: pd.DataFrame) -> None:
+    if pq is None or df.empty:
+        return
+    path = season_path(dataset, season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    try:
+        df.reset_index(drop=True).to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    except Exception as exc:
+        tmp.unlink(missing_ok=True)
+        print(f"Warning: failed to cache nflverse {dataset} {season} ({exc})")
+
+
+def load_seasons(
+    dataset: str,
+    seasons: Iterable[int],
+    fetch: Fetcher,
+    columns: Optional[Sequence[str]] = None,
+    refresh: bool = False,
+) -> pd.DataFrame:
+    """Return ``dataset`` for ``seasons``, downloading only stale or missing ones.
+
+    ``fetch`` receives the seasons to download in one call and must return a
+    frame with a ``season`` column; each season in it is written back to the
+    cache. Seasons absent from both the download and the cache are skipped.
+    """
+    seasons = sorted({int(s) for s in seasons})
+    frames: Dict[int, pd.DataFrame] = {}
+    stale = [s for s in seasons if refresh or not is_fresh(dataset, s)]
+    for season in seasons:
+        if season not in stale:
+            cached = read_season(dataset, season, columns)
+            if cached is not None:
+                frames[season] = cached
+            else:
+                stale.append(season)
+
+    if stale and not _offline():
+        try:
+            remote = fetch(sorted(stale))
+        except Exception as exc:
+            print(f"Failed to download nflverse {dataset} for {sorted(stale)}: {exc}")
+            remote = pd.DataFrame()
+        if not remote.empty and "season" in remote.columns:
+            season_col = pd.to_numeric(remote["season"], errors="coerce")
+            for season in stale:
+                part = remote.loc[season_col == season]
+                if part.empty:
+                    continue
+                write_season(dataset, season, part)
+                if columns is not None:
+                    part = part[[c for c in columns if c in part.columns]]
+                frames[season] = part.reset_index(drop=True)
+
+    for season in stale:
+        if season not in frames:
+            # Download failed or skipped: fall back to whatever is on disk
+            cached = read_season(dataset, season, columns)
+            if cached is not None:
+                frames[season] = cached
+
+    if not frames:
+        return pd.DataFrame(columns=list(columns) if columns is not None else None)
+    return pd.concat([frames[s] for s in sorted(frames)], ignore_index=True, sort=False)
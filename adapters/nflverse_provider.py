@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import time
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Union
 
 import pandas as pd
 
@@ -13,7 +13,9 @@ try:
 except ImportError:  # pragma: no cover - handled gracefully
     nfl = None  # type: ignore
 
+from adapters.nflverse_cache import is_fresh, load_seasons, read_season, season_path, write_season
 from adapters.stats_provider import import_weekly_stats
+from engine.week_populator import ScheduleIndex
 
 SCHEDULE_COLUMNS = [
     "game_id",
@@ -41,8 +43,36 @@ PLAYER_LOG_COLUMNS = [
     "attempts",
     "completions",
     "game_id",
+    "carries",
+    "rushing_yards",
+    "receptions",
+    "receiving_yards",
 ]
 
+# nflverse/PlayerProfiler column -> PLAYER_LOG_COLUMNS name
+PLAYER_LOG_RENAMES = {
+    "player_display_name": "player_name",
+    "name": "player_name",
+    "player": "player_id",
+    "team": "recent_team",
+    "opponent": "opponent_team",
+    "opponent_team": "opponent_team",
+    "recent_team": "recent_team",
+    "pass_attempts": "attempts",
+    "attempts": "attempts",
+    "completions": "completions",
+    "cmp": "completions",
+    "passing_yards": "passing_yards",
+    "pass_yds": "passing_yards",
+    "rush_att": "carries",
+    "rush_yds": "rushing_yards",
+    "rec": "receptions",
+    "rec_yds": "receiving_yards",
+}
+
+# Source columns worth reading from the weekly cache
+WEEKLY_SOURCE_COLUMNS = list(dict.fromkeys([*PLAYER_LOG_RENAMES, *PLAYER_LOG_COLUMNS]))
+
 
 def _empty_schedule() -> pd.DataFrame:
     return pd.DataFrame(columns=SCHEDULE_COLUMNS)
@@ -80,106 +110,68 @@ def _load_cached_schedule(seasons: Iterable[int]) -> pd.DataFrame:
     return cached[cols].copy()
 
 
-def _update_schedule_cache(df: pd.DataFrame) -> None:
-    """Persist the provided schedule frame into the local cache."""
-
-    if df.empty:
-        return
-    cols = [c for c in SCHEDULE_COLUMNS if c in df.columns]
-    if not cols:
-        return
-    SCHEDULE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    to_store = df[cols].copy()
-    if SCHEDULE_CACHE_PATH.exists():
-        try:
-            existing = pd.read_csv(SCHEDULE_CACHE_PATH, low_memory=False)
-        except Exception:
-            existing = pd.DataFrame(columns=SCHEDULE_COLUMNS)
-        if not existing.empty:
-            for col in cols:
-                if col not in existing.columns:
-                    existing[col] = pd.NA
-            to_store = pd.concat([existing[cols], to_store], ignore_index=True, sort=False)
-    subset = [c for c in ("game_id", "gameday", "home_team", "away_team") if c in to_store.columns]
-    if subset:
-        to_store = to_store.drop_duplicates(subset=subset, keep="last")
-    to_store = to_store.sort_values(by=[c for c in ("season", "week") if c in to_store.columns])
-    to_store.to_csv(SCHEDULE_CACHE_PATH, index=False)
-
-
-def get_schedules(seasons: Iterable[int]) -> pd.DataFrame:
-    """Download schedules for the requested seasons."""
-    seasons = sorted({int(s) for s in seasons})
-    if not seasons:
-        return _empty_schedule()
-
-    cached = _load_cached_schedule(seasons)
-
-    if not nfl:
-        if cached.empty:
-            print("nfl_data_py is not installed; returning empty schedule DataFrame")
-        return cached
-
+def _download_schedules(seasons: List[int]) -> pd.DataFrame:
     attempts = 3
     wait_seconds = 1.0
-    last_exc: Exception | None = None
-    df_remote = pd.DataFrame()
     for attempt in range(1, attempts + 1):
         try:
-            df_remote = nfl.import_schedules(seasons)
-            break
+            return nfl.import_schedules(seasons)
         except Exception as exc:  # pragma: no cover - network failure
-            last_exc = exc
             print(f"Failed to download schedules (attempt {attempt}/{attempts}): {exc}")
-            if attempt < attempts:
-                time.sleep(wait_seconds)
-                wait_seconds *= 2
-    else:
-        df_remote = pd.DataFrame()
+            if attempt == attempts:
+                raise
+            time.sleep(wait_seconds)
+            wait_seconds *= 2
+    return pd.DataFrame()
 
-    if df_remote.empty:
-        if last_exc:
-            print("Falling back to cached schedules snapshot.")
-        return cached
 
-    cols = [c for c in SCHEDULE_COLUMNS if c in df_remote.columns]
-    df_remote = df_remote[cols].copy()
+def get_schedules(seasons: Iterable[int], refresh: bool = False) -> pd.DataFrame:
+    """Schedules for the requested seasons, served from the per-season cache.
 
-    if cached.empty:
-        combined = df_remote
-    else:
-        remote_seasons = set(df_remote.get("season", pd.Series(dtype=int)).dropna().astype(int))
-        missing = set(seasons) - remote_seasons
-        if missing:
-            cached_missing = (
-                cached[cached["season"].isin(missing)] if "season" in cached.columns else cached
-            )
-            if not cached_missing.empty:
-                combined = pd.concat([df_remote, cached_missing], ignore_index=True, sort=False)
-            else:
-                combined = df_remote
-        else:
-            combined = df_remote
+    Only stale seasons (see :mod:`adapters.nflverse_cache`) are downloaded.
+    Seasons neither cache nor nflverse can supply fall back to the legacy
+    CSV snapshot.
+    """
+    seasons = sorted({int(s) for s in seasons})
+    if not seasons:
+        return _empty_schedule()
+
+    fetch = _download_schedules if nfl else (lambda _: pd.DataFrame())
+    combined = load_seasons(
+        "schedules", seasons, fetch, columns=SCHEDULE_COLUMNS, refresh=refresh
+    )
+    have = set(pd.to_numeric(combined.get("season"), errors="coerce").dropna().astype(int))
+    missing = [s for s in seasons if s not in have]
+    if missing:
+        snapshot = _load_cached_schedule(missing)
+        if not snapshot.empty:
+            print(f"Using cached schedules snapshot for seasons {missing}.")
+            combined = pd.concat([combined, snapshot], ignore_index=True, sort=False)
+        elif combined.empty and not nfl:
+            print("nfl_data_py is not installed; returning empty schedule DataFrame")
+            return _empty_schedule()
 
     subset = [c for c in ("game_id", "gameday", "home_team", "away_team") if c in combined.columns]
     if subset:
         combined = combined.drop_duplicates(subset=subset, keep="last")
-    combined = combined.reset_index(drop=True)
-    _update_schedule_cache(combined)
-    return combined
+    return combined.reset_index(drop=True)
 
 
-def get_player_game_logs(seasons: Iterable[int]) -> pd.DataFrame:
-    """Download player game logs for the requested seasons.
+def _download_weekly(seasons: List[int]) -> pd.DataFrame:
+    try:
+        return nfl.import_weekly_data(seasons)
+    except Exception:
+        return import_weekly_stats(seasons)
+
+
+def get_player_game_logs(seasons: Iterable[int], refresh: bool = False) -> pd.DataFrame:
+    """Player game logs for the requested seasons.
 
     Order of preference:
-    1) Local 2025 (or other configured) CSVs if present
-    2) nfl_data_py.import_weekly_data
-    3) nfl_data_py.import_player_stats (legacy)
+    1) nfl_data_py.import_weekly_data, cached per season as Parquet
+    2) nfl_data_py.import_player_stats (legacy)
+    3) Local 2025 (or other configured) CSVs to fill gaps
     """
-    if not nfl:
-        print("nfl_data_py is not installed; returning empty logs DataFrame")
-        return _empty_logs()
 
     DATA_DIR = Path("storage/imports/PlayerProfiler/Game Log")
     LOCAL_LOGS = {
@@ -187,22 +179,7 @@ def get_player_game_logs(seasons: Iterable[int]) -> pd.DataFrame:
     }
 
     def _normalize(df: pd.DataFrame) -> pd.DataFrame:
-        rename_map = {
-            "player_display_name": "player_name",
-            "name": "player_name",
-            "player": "player_id",
-            "team": "recent_team",
-            "opponent": "opponent_team",
-            "opponent_team": "opponent_team",
-            "recent_team": "recent_team",
-            "pass_attempts": "attempts",
-            "attempts": "attempts",
-            "completions": "completions",
-            "cmp": "completions",
-            "passing_yards": "passing_yards",
-            "pass_yds": "passing_yards",
-        }
-        for old, new in rename_map.items():
+        for old, new in PLAYER_LOG_RENAMES.items():
             if old in df.columns:
                 df[new] = df[old]
         # Ensure all required columns exist
@@ -211,7 +188,17 @@ def get_player_game_logs(seasons: Iterable[int]) -> pd.DataFrame:
             if col not in out.columns:
                 out[col] = pd.NA
         # Coerce numerics
-        for col in ("week", "season", "passing_yards", "attempts", "completions"):
+        for col in (
+            "week",
+            "season",
+            "passing_yards",
+            "attempts",
+            "completions",
+            "carries",
+            "rushing_yards",
+            "receptions",
+            "receiving_yards",
+        ):
             if col in out.columns:
                 out[col] = pd.to_numeric(out[col], errors="coerce")
         return out[PLAYER_LOG_COLUMNS].copy()
@@ -219,18 +206,11 @@ def get_player_game_logs(seasons: Iterable[int]) -> pd.DataFrame:
     frames: List[pd.DataFrame] = []
     seasons = [int(s) for s in seasons]
 
-    # Remote first: attempt to load all requested seasons from nflverse
-    df_remote = pd.DataFrame()
-    if nfl:
-        try:
-            weekly = nfl.import_weekly_data(seasons)
-            df_remote = weekly.copy()
-        except Exception:
-            try:
-                df_remote = import_weekly_stats(seasons)
-            except Exception as exc:
-                print(f"Failed to download player logs: {exc}")
-                df_remote = pd.DataFrame()
+    # Remote (via the per-season cache) first
+    fetch = _download_weekly if nfl else (lambda _: pd.DataFrame())
+    df_remote = load_seasons(
+        "weekly", seasons, fetch, columns=WEEKLY_SOURCE_COLUMNS, refresh=refresh
+    )
     if not df_remote.empty:
         frames.append(_normalize(df_remote))
 
@@ -247,6 +227,8 @@ def get_player_game_logs(seasons: Iterable[int]) -> pd.DataFrame:
             print(f"Warning: failed to load local weekly logs for {season} ({exc})")
 
     if not frames:
+        if not nfl:
+            print("nfl_data_py is not installed; returning empty logs DataFrame")
         return _empty_logs()
 
     combined = pd.concat(frames, ignore_index=True, sort=False)
@@ -255,26 +237,52 @@ def get_player_game_logs(seasons: Iterable[int]) -> pd.DataFrame:
     return combined.reset_index(drop=True)
 
 
-def build_event_lookup(schedule_df: pd.DataFrame) -> Dict[str, Dict[str, Optional[str]]]:
-    """Create a mapping from game_id to useful metadata fields."""
-    lookup: Dict[str, Dict[str, Optional[str]]] = {}
-    for _, row in schedule_df.iterrows():
-        info = {
-            "season": row.get("season"),
-            "week": row.get("week"),
-            "venue": row.get("venue"),
-            "game_date": row.get("gameday"),
-        }
-        game_id = row.get("game_id")
-        if pd.notna(game_id):
-            lookup[str(game_id)] = info
-        gameday = row.get("gameday")
-        away = row.get("away_team")
-        home = row.get("home_team")
-        if pd.notna(gameday) and pd.notna(away) and pd.notna(home):
-            date_str = pd.to_datetime(gameday).strftime("%Y-%m-%d")
-            alt_key_away_home = f"{date_str}-{away}-{home}"
-            alt_key_home_away = f"{date_str}-{home}-{away}"
-            lookup[alt_key_away_home] = info
-            lookup[alt_key_home_away] = info
-    return lookup
+def get_pbp(
+    seasons: Iterable[int], columns: Optional[List[str]] = None, refresh: bool = False
+) -> pd.DataFrame:
+    """Play-by-play for ``seasons``, reading only ``columns`` from the cache."""
+    fetch = nfl.import_pbp_data if nfl else (lambda _: pd.DataFrame())
+    return load_seasons("pbp", seasons, fetch, columns=columns, refresh=refresh)
+
+
+def get_schedule_index(seasons: Iterable[int], refresh: bool = False) -> ScheduleIndex:
+    """Per-season :class:`ScheduleIndex`, persisted next to the schedule cache.
+
+    A season's index is rebuilt only when its cached schedule is newer (or
+    the schedule itself had to be refreshed).
+    """
+    seasons = sorted({int(s) for s in seasons})
+    indexes: List[ScheduleIndex] = []
+    stale: List[int] = []
+    for season in seasons:
+        index_path = season_path("schedule_index", season)
+        schedule_path = season_path("schedules", season)
+        if (
+            not refresh
+            and index_path.exists()
+            and is_fresh("schedules", season)
+            and index_path.stat().st_mtime >= schedule_path.stat().st_mtime
+        ):
+            frame = read_season("schedule_index", season)
+            if frame is not None:
+                indexes.append(ScheduleIndex(frame))
+                continue
+        stale.append(season)
+
+    if stale:
+        built = ScheduleIndex.from_schedule(get_schedules(stale, refresh=refresh))
+        for season in stale:
+            write_season(
+                "schedule_index", season, built.frame.loc[built.frame["season"] == season]
+            )
+        indexes.append(built)
+    return ScheduleIndex.concat(indexes)
+
+
+def build_event_lookup(
+    schedule: Union[pd.DataFrame, ScheduleIndex],
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """Create a mapping from game_id (and date-team event ids) to game metadata."""
+    if not isinstance(schedule, ScheduleIndex):
+        schedule = ScheduleIndex.from_schedule(schedule)
+    return schedule.event_lookup()
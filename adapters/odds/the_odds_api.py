@@ -2,18 +2,21 @@
 
 from __future__ import annotations
 
+import io
 import json
 import logging
+import math
 import os
-import random
 import sqlite3
 import tempfile
 import time
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import requests
 from dotenv import load_dotenv
@@ -26,6 +29,15 @@ from tenacity import (
 )
 
 from adapters.odds.base import OddsAdapter
+from utils.data_version import bump_data_version
+from utils.odds_archive import PayloadArchive, create_payload_archive
+from utils.odds_quota import (
+    OddsQuotaManager,
+    QuotaExhaustedError,
+    QuotaLease,
+    create_quota_manager,
+    request_cost,
+)
 
 # Import validation schemas (optional - graceful fallback if not available)
 try:
@@ -37,9 +49,32 @@ except ImportError:
     validate_odds_snapshots = lambda df: df
     validate_current_best_lines = lambda df: df
 
+# Optional: incremental JSON parsing for normalize_odds_stream
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 DEFAULT_SPORT_KEY = "americanfootball_nfl"
 API_BASE_URL = "https://api.the-odds-api.com/v4"
 
+SNAPSHOT_COLUMNS = [
+    "fetched_at",
+    "sport_key",
+    "event_id",
+    "commence_time",
+    "home_team",
+    "away_team",
+    "bookmaker_key",
+    "market_key",
+    "outcome",
+    "points",
+    "price",
+    "iso_time",
+    "line",
+    "odds_raw_json",
+]
+
 
 class TheOddsAPIError(RuntimeError):
     """Raised when The Odds API returns an error response."""
@@ -57,37 +92,6 @@ class TheOddsAPIKeyPoolExhaustedError(TheOddsAPIError):
     """Raised when all API keys are exhausted or rate-limited."""
 
 
-@dataclass
-class APIKeyInfo:
-    """Information about an API key's usage and status."""
-
-    key: str
-    requests_used: int = 0
-    requests_remaining: Optional[int] = None
-    requests_reset: Optional[str] = None
-    last_used_at: Optional[datetime] = None
-    consecutive_failures: int = 0
-    is_rate_limited: bool = False
-    rate_limit_reset_at: Optional[datetime] = None
-
-    @property
-    def is_available(self) -> bool:
-        """Check if this key is available for use."""
-        if self.is_rate_limited:
-            if self.rate_limit_reset_at and datetime.now(timezone.utc) > self.rate_limit_reset_at:
-                self.is_rate_limited = False
-                self.rate_limit_reset_at = None
-            else:
-                return False
-
-        # Consider key unavailable if quota is exhausted (remaining = 0)
-        if self.requests_remaining is not None and self.requests_remaining <= 0:
-            return False
-
-        # Consider key temporarily unavailable after consecutive failures
-        return self.consecutive_failures < 3
-
-
 @dataclass
 class TheOddsAPIConfig:
     """Configuration for The Odds API requests with key pool management."""
@@ -103,6 +107,8 @@ class TheOddsAPIConfig:
     max_timeout: float = 60.0
     bookmakers: Optional[str] = None
     enable_props: bool = True
+    # Parse responses incrementally (normalize_odds_stream) for large prop slates
+    stream_responses: bool = False
 
     # Key rotation and circuit breaker settings
     key_failure_threshold: int = 3
@@ -140,6 +146,8 @@ class TheOddsAPIConfig:
             max_retries=int(os.getenv("ODDS_MAX_RETRIES", "3")),
             base_timeout=float(os.getenv("ODDS_BASE_TIMEOUT", "15.0")),
             max_timeout=float(os.getenv("ODDS_MAX_TIMEOUT", "60.0")),
+            stream_responses=os.getenv("ODDS_STREAM_RESPONSES", "false").lower()
+            in ("true", "1", "yes"),
         )
 
 
@@ -155,21 +163,25 @@ class TheOddsAPIClient(OddsAdapter):
     """Production-grade client for fetching odds from The Odds API.
 
     Features:
-    - Key pool management with automatic rotation
-    - Circuit breaker pattern for failed keys
+    - Key pool management with automatic rotation, shared with every other
+      poller through ``OddsQuotaManager`` (quota reserved before each request);
+      all per-key state, including cooldowns for failed keys, lives there
     - Atomic snapshot operations (all-or-nothing)
     - Comprehensive error handling and monitoring
     - Rate limit and quota tracking
     - Exponential backoff with jitter
     """
 
-    def __init__(self, config: Optional[TheOddsAPIConfig] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[TheOddsAPIConfig] = None,
+        quota: Optional[OddsQuotaManager] = None,
+        archive: Optional[PayloadArchive] = None,
+    ) -> None:
         self.config = config or TheOddsAPIConfig.from_env()
-
-        # Initialize key pool
-        self.key_pool: Dict[str, APIKeyInfo] = {
-            key: APIKeyInfo(key=key) for key in self.config.api_keys
-        }
+        self.quota = quota or create_quota_manager(self.config.api_keys)
+        # Raw response archive (ODDS_ARCHIVE_DIR) for jobs/replay_archive.py
+        self.archive = archive or create_payload_archive()
 
         # Track overall client state
         self.last_successful_fetch: Optional[datetime] = None
@@ -186,164 +198,118 @@ class TheOddsAPIClient(OddsAdapter):
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
 
-    def _get_available_key(self) -> Optional[APIKeyInfo]:
-        """Get the next available API key from the pool."""
-        available_keys = [info for info in self.key_pool.values() if info.is_available]
-
-        if not available_keys:
-            # Check if pool exhaustion cooldown has expired
-            if self.pool_exhausted_at:
-                cooldown_duration = timezone.utc.now() - self.pool_exhausted_at
-                if cooldown_duration.total_seconds() < (
-                    self.config.pool_exhaustion_cooldown_minutes * 60
-                ):
-                    return None
-                else:
-                    # Reset pool exhaustion state
-                    self.pool_exhausted_at = None
-                    self.consecutive_pool_failures = 0
-                    # Reset all keys' failure counts for a fresh start
-                    for key_info in self.key_pool.values():
-                        key_info.consecutive_failures = 0
-                        key_info.is_rate_limited = False
-                        key_info.rate_limit_reset_at = None
-                    return self._get_available_key()
-            return None
-
-        # Choose key with least recent usage (or random if tied)
-        available_keys.sort(
-            key=lambda k: k.last_used_at or datetime.min.replace(tzinfo=timezone.utc)
-        )
-        return available_keys[0]
-
-    def _update_key_usage(self, key_info: APIKeyInfo, response: requests.Response) -> None:
-        """Update key usage statistics from API response headers."""
-        key_info.last_used_at = datetime.now(timezone.utc)
-        key_info.requests_used = int(
-            response.headers.get("X-Requests-Used", key_info.requests_used)
-        )
-
-        if "X-Requests-Remaining" in response.headers:
-            key_info.requests_remaining = int(response.headers["X-Requests-Remaining"])
-
-        if "X-Requests-Reset" in response.headers:
-            key_info.requests_reset = response.headers["X-Requests-Reset"]
-
-        # Reset failure count on successful request
-        key_info.consecutive_failures = 0
-
-        # Log usage information
+    def _log_key_usage(self, key: str, response: requests.Response) -> None:
+        """Log the usage headers; the quota manager keeps the authoritative counts."""
         self.logger.info(
-            f"API usage for key {key_info.key[:8]}**: "
-            f"used={key_info.requests_used}, remaining={key_info.requests_remaining}, "
-            f"reset={key_info.requests_reset}"
-        )
-
-    def _handle_key_failure(
-        self, key_info: APIKeyInfo, exc: Exception, response: Optional[requests.Response] = None
-    ) -> None:
-        """Handle API key failure and potentially mark it as rate-limited."""
-        key_info.consecutive_failures += 1
-
-        if response and response.status_code == 429:
-            key_info.is_rate_limited = True
-            # Set rate limit reset time (default to 15 minutes if not provided)
-            reset_time = datetime.now(timezone.utc).replace(
-                minute=(datetime.now().minute + self.config.key_cooldown_minutes) % 60
-            )
-            key_info.rate_limit_reset_at = reset_time
-
-            self.logger.warning(
-                f"Key {key_info.key[:8]}** rate-limited, cooldown until {reset_time}"
-            )
-
-        self.logger.error(
-            f"Key {key_info.key[:8]}** failed (attempt {key_info.consecutive_failures}): {exc}"
+            f"API usage for key {key[:8]}**: "
+            f"used={response.headers.get('X-Requests-Used')}, "
+            f"remaining={response.headers.get('X-Requests-Remaining')}, "
+            f"reset={response.headers.get('X-Requests-Reset')}"
         )
 
     @retry(
         reraise=True,
-        retry=retry_if_exception_type((requests.RequestException, TheOddsAPIRateLimitError)),
+        # 429s rotate to another key via the quota manager instead of retrying this one
+        retry=retry_if_exception_type(requests.RequestException),
         stop=stop_after_attempt(3),
         wait=wait_exponential_jitter(initial=1, max=30, jitter=5),
         after=_log_retry,
     )
     def _request_with_key(
-        self, key_info: APIKeyInfo, endpoint: str, params: Optional[Dict[str, Any]] = None
+        self,
+        key: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        failures: int = 0,
     ) -> Tuple[Any, requests.Response]:
-        """Make a request with a specific API key."""
+        """Make a request with a specific API key.
+
+        The timeout doubles with each key that already failed this request.
+        With ``stream`` the undecoded body stream is returned in place of the
+        parsed JSON; the caller must consume and close it.
+        """
         url = f"{API_BASE_URL}/{endpoint}"
-        query = {"apiKey": key_info.key, **(params or {})}
+        query = {"apiKey": key, **(params or {})}
 
         timeout = min(
-            self.config.base_timeout * (2**key_info.consecutive_failures), self.config.max_timeout
+            self.config.base_timeout * (2**failures), self.config.max_timeout
         )
 
         try:
-            response = requests.get(url, params=query, timeout=timeout)
+            response = requests.get(
+                url, params=query, timeout=timeout, **({"stream": True} if stream else {})
+            )
 
             # Handle different error conditions
             if response.status_code == 401:
-                raise TheOddsAPIError(f"Invalid API key {key_info.key[:8]}**")
+                raise TheOddsAPIError(f"Invalid API key {key[:8]}**")
             elif response.status_code == 429:
-                raise TheOddsAPIRateLimitError(f"Rate limit exceeded for key {key_info.key[:8]}**")
+                raise TheOddsAPIRateLimitError(f"Rate limit exceeded for key {key[:8]}**")
             elif response.status_code == 403:
                 # Check if this is a quota exceeded error
                 error_text = response.text.lower()
                 if "quota" in error_text or "limit" in error_text:
                     raise TheOddsAPIQuotaExceededError(
-                        f"API quota exceeded for key {key_info.key[:8]}**"
+                        f"API quota exceeded for key {key[:8]}**"
                     )
                 else:
                     raise TheOddsAPIError(
-                        f"Access forbidden for key {key_info.key[:8]}**: {response.text}"
+                        f"Access forbidden for key {key[:8]}**: {response.text}"
                     )
             elif not response.ok:
                 raise TheOddsAPIError(
-                    f"API request failed for key {key_info.key[:8]}**: "
+                    f"API request failed for key {key[:8]}**: "
                     f"{response.status_code} {response.text}"
                 )
 
+            if stream:
+                response.raw.decode_content = True
+                return response.raw, response
             return response.json(), response
 
         except requests.RequestException as e:
-            self.logger.error(f"Network error with key {key_info.key[:8]}**: {e}")
+            self.logger.error(f"Network error with key {key[:8]}**: {e}")
             raise
 
-    def _request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    def _request(
+        self, endpoint: str, params: Optional[Dict[str, Any]] = None, stream: bool = False
+    ) -> Any:
         """Make a request using the key pool with automatic rotation and failure handling."""
         last_exception = None
+        params = params or {}
+        cost = 1
+        if "markets" in params:
+            cost = request_cost(params.get("markets"), params.get("regions"))
 
         # Try each available key once
         for attempt in range(len(self.config.api_keys)):
-            key_info = self._get_available_key()
-
-            if not key_info:
+            try:
+                lease = self.quota.reserve(cost)
+            except QuotaExhaustedError as e:
                 if not self.pool_exhausted_at:
                     self.pool_exhausted_at = datetime.now(timezone.utc)
-                    self.logger.error(
-                        f"All API keys exhausted or rate-limited. Pool will reset in "
-                        f"{self.config.pool_exhaustion_cooldown_minutes} minutes."
-                    )
+                    self.logger.error(f"All API keys exhausted or rate-limited: {e}")
                 raise TheOddsAPIKeyPoolExhaustedError(
-                    "All API keys are exhausted or rate-limited. "
-                    f"Pool will reset in {self.config.pool_exhaustion_cooldown_minutes} minutes."
-                )
+                    f"All API keys are exhausted or rate-limited: {e}"
+                ) from e
 
             try:
-                data, response = self._request_with_key(key_info, endpoint, params)
-                self._update_key_usage(key_info, response)
+                data, response = self._request_with_key(
+                    lease.key, endpoint, params, stream, failures=attempt
+                )
+                self._log_key_usage(lease.key, response)
+                self.quota.record(lease, response.headers)
+                if self.archive is not None:
+                    data = self._archive_response(endpoint, params, data, response, stream)
                 self.last_successful_fetch = datetime.now(timezone.utc)
+                self.pool_exhausted_at = None
                 self.consecutive_pool_failures = 0
                 return data
 
-            except (TheOddsAPIRateLimitError, TheOddsAPIQuotaExceededError) as e:
-                self._handle_key_failure(key_info, e, getattr(e, "response", None))
-                last_exception = e
-                continue  # Try next key
-
             except (TheOddsAPIError, requests.RequestException) as e:
-                self._handle_key_failure(key_info, e)
+                self._settle_failed_lease(lease, e)
+                self.logger.error(f"Key {lease.key[:8]}** failed (attempt {attempt + 1}): {e}")
                 last_exception = e
                 continue  # Try next key
 
@@ -354,6 +320,38 @@ class TheOddsAPIClient(OddsAdapter):
         else:
             raise TheOddsAPIError("All API keys failed with unknown errors")
 
+    def _archive_response(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        data: Any,
+        response: requests.Response,
+        stream: bool,
+    ) -> Any:
+        """Archive the raw body; streamed bodies are archived as they are read."""
+        try:
+            if stream:
+                return self.archive.tee(
+                    data, source="the_odds_api", endpoint=endpoint, params=params
+                )
+            self.archive.put(
+                response.content, source="the_odds_api", endpoint=endpoint, params=params
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to archive {endpoint} response: {e}")
+        return data
+
+    def _settle_failed_lease(self, lease: QuotaLease, exc: Exception) -> None:
+        """Refund the reservation and cool the key down for auth/quota errors."""
+        if isinstance(exc, TheOddsAPIRateLimitError):
+            self.quota.fail(lease, 429, self.config.key_cooldown_minutes * 60)
+        elif isinstance(exc, TheOddsAPIQuotaExceededError):
+            self.quota.fail(lease, 403)
+        elif isinstance(exc, TheOddsAPIError) and "Invalid API key" in str(exc):
+            self.quota.fail(lease, 401)
+        else:
+            self.quota.release(lease)
+
     def fetch(self, **params: Any) -> pd.DataFrame:
         """Fetch odds for the configured sport and normalize to a DataFrame.
 
@@ -382,10 +380,20 @@ class TheOddsAPIClient(OddsAdapter):
 
         self.logger.info(f"Fetching odds for {self.config.sport_key} with params: {request_params}")
 
+        stream = params.get("stream", self.config.stream_responses)
+
         try:
-            payload = self._request(f"sports/{self.config.sport_key}/odds", request_params)
+            payload = self._request(
+                f"sports/{self.config.sport_key}/odds", request_params, stream=stream
+            )
 
-            df = normalize_odds_response(payload, fetched_at=fetched_at)
+            if stream:
+                try:
+                    df = normalize_odds_stream(payload, fetched_at=fetched_at)
+                finally:
+                    payload.close()
+            else:
+                df = normalize_odds_response(payload, fetched_at=fetched_at)
 
             fetch_duration = time.time() - fetch_start_time
             self.logger.info(f"Successfully fetched {len(df)} odds rows in {fetch_duration:.2f}s")
@@ -436,33 +444,7 @@ class TheOddsAPIClient(OddsAdapter):
                 conn.execute("BEGIN IMMEDIATE")
 
                 try:
-                    cursor = conn.cursor()
-                    rows = df.to_dict("records")
-
-                    for row in rows:
-                        cursor.execute(
-                            """
-                            INSERT OR IGNORE INTO odds_snapshots (
-                                fetched_at, sport_key, event_id, market_key, bookmaker_key,
-                                line, price, outcome, points, iso_time, odds_raw_json
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                row["fetched_at"],
-                                row["sport_key"],
-                                row["event_id"],
-                                row["market_key"],
-                                row["bookmaker_key"],
-                                row.get("line"),
-                                row.get("price"),
-                                row.get("outcome"),
-                                row.get("points"),
-                                row.get("iso_time"),
-                                row.get("odds_raw_json"),
-                            ),
-                        )
-                        if cursor.rowcount > 0:
-                            rows_inserted += cursor.rowcount
+                    rows_inserted = insert_snapshot_rows(conn, df)
 
                     conn.commit()
 
@@ -495,39 +477,14 @@ class TheOddsAPIClient(OddsAdapter):
 
     def _initialize_database_schema(self, database_path: Path) -> None:
         """Initialize database schema if creating a new database."""
-        schema_path = Path(__file__).parent.parent.parent / "db" / "schema.sql"
-
         with sqlite3.connect(database_path) as conn:
-            if schema_path.exists():
-                with open(schema_path, "r", encoding="utf-8") as f:
-                    conn.executescript(f.read())
-            else:
-                # Fallback minimal schema
-                conn.executescript(
-                    """
-                    PRAGMA journal_mode=WAL;
-                    CREATE TABLE IF NOT EXISTS odds_snapshots (
-                        snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        fetched_at TEXT,
-                        sport_key TEXT,
-                        event_id TEXT,
-                        market_key TEXT,
-                        bookmaker_key TEXT,
-                        line FLOAT,
-                        price INT,
-                        outcome TEXT,
-                        points FLOAT,
-                        iso_time TEXT,
-                        odds_raw_json TEXT,
-                        UNIQUE (fetched_at, event_id, market_key, bookmaker_key, outcome, points)
-                    );
-                """
-                )
+            ensure_snapshot_schema(conn)
 
     def get_key_pool_status(self) -> Dict[str, Any]:
         """Get comprehensive status of the API key pool."""
-        available_keys = sum(1 for info in self.key_pool.values() if info.is_available)
-        total_keys = len(self.key_pool)
+        quota = self.quota.status()
+        available_keys = quota["available_keys"]
+        total_keys = len(self.config.api_keys)
 
         return {
             "total_keys": total_keys,
@@ -540,20 +497,74 @@ class TheOddsAPIClient(OddsAdapter):
                 self.last_successful_fetch.isoformat() if self.last_successful_fetch else None
             ),
             "consecutive_pool_failures": self.consecutive_pool_failures,
-            "keys": {
-                f"{info.key[:8]}**": {
-                    "available": info.is_available,
-                    "requests_used": info.requests_used,
-                    "requests_remaining": info.requests_remaining,
-                    "consecutive_failures": info.consecutive_failures,
-                    "is_rate_limited": info.is_rate_limited,
-                    "last_used_at": info.last_used_at.isoformat() if info.last_used_at else None,
-                }
-                for info in self.key_pool.values()
-            },
+            "quota": quota,
         }
 
 
+def ensure_snapshot_schema(conn: sqlite3.Connection) -> None:
+    """Create the odds_snapshots schema (db/schema.sql, or a minimal fallback)."""
+    schema_path = Path(__file__).parent.parent.parent / "db" / "schema.sql"
+
+    if schema_path.exists():
+        with open(schema_path, "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+    else:
+        # Fallback minimal schema
+        conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS odds_snapshots (
+                snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fetched_at TEXT,
+                sport_key TEXT,
+                event_id TEXT,
+                market_key TEXT,
+                bookmaker_key TEXT,
+                line FLOAT,
+                price INT,
+                outcome TEXT,
+                points FLOAT,
+                iso_time TEXT,
+                odds_raw_json TEXT,
+                UNIQUE (fetched_at, event_id, market_key, bookmaker_key, outcome, points)
+            );
+        """
+        )
+
+
+def insert_snapshot_rows(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """INSERT OR IGNORE normalized rows into odds_snapshots; returns rows inserted."""
+    cursor = conn.cursor()
+    rows_inserted = 0
+    rows = df.to_dict("records")
+
+    for row, raw_json in zip(rows, outcome_raw_json(df)):
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO odds_snapshots (
+                fetched_at, sport_key, event_id, market_key, bookmaker_key,
+                line, price, outcome, points, iso_time, odds_raw_json
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                row["fetched_at"],
+                row["sport_key"],
+                row["event_id"],
+                row["market_key"],
+                row["bookmaker_key"],
+                row.get("line"),
+                row.get("price"),
+                row.get("outcome"),
+                row.get("points"),
+                row.get("iso_time"),
+                raw_json,
+            ),
+        )
+        if cursor.rowcount > 0:
+            rows_inserted += cursor.rowcount
+    return rows_inserted
+
+
 def normalize_odds_response(
     payload: Iterable[Dict[str, Any]], *, fetched_at: datetime
 ) -> pd.DataFrame:
@@ -658,23 +669,13 @@ def normalize_odds_response(
     if df.empty:
         logger.warning("No valid odds data found in API response")
         # Return empty DataFrame with expected schema
-        expected_cols = [
-            "fetched_at",
-            "sport_key",
-            "event_id",
-            "commence_time",
-            "home_team",
-            "away_team",
-            "bookmaker_key",
-            "market_key",
-            "outcome",
-            "points",
-            "price",
-            "iso_time",
-            "line",
-            "odds_raw_json",
-        ]
-        return pd.DataFrame(columns=expected_cols)
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+
+    return _finalize_snapshot_frame(df, logger)
+
+
+def _finalize_snapshot_frame(df: pd.DataFrame, logger: logging.Logger) -> pd.DataFrame:
+    """Coerce numeric columns, fill the expected schema and run validation."""
 
     # Normalize numeric columns with error handling
     numeric_cols = ["price", "points", "line"]
@@ -690,24 +691,7 @@ def normalize_odds_response(
                 )
 
     # Ensure all expected columns exist
-    expected_cols = [
-        "fetched_at",
-        "sport_key",
-        "event_id",
-        "commence_time",
-        "home_team",
-        "away_team",
-        "bookmaker_key",
-        "market_key",
-        "outcome",
-        "points",
-        "price",
-        "iso_time",
-        "line",
-        "odds_raw_json",
-    ]
-
-    for col in expected_cols:
+    for col in SNAPSHOT_COLUMNS:
         if col not in df.columns:
             df[col] = pd.NA
 
@@ -734,7 +718,217 @@ def normalize_odds_response(
     else:
         logger.debug("Data validation not available (pandera not installed)")
 
-    return df[expected_cols]
+    return df[SNAPSHOT_COLUMNS]
+
+
+def iter_odds_events(source: Any) -> Iterator[Dict[str, Any]]:
+    """Yield the events of an /odds response one at a time.
+
+    ``source`` is a binary file-like object (``response.raw``, an open file),
+    bytes, or a path. With ijson installed only one event is decoded at a
+    time; without it the whole array is loaded first.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fh:
+            yield from iter_odds_events(fh)
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    if ijson is not None:
+        yield from ijson.items(source, "item", use_float=True)
+    else:
+        yield from json.load(source)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _point_key(value: Any) -> Optional[float]:
+    point = _to_float(value)
+    return None if math.isnan(point) else point
+
+
+class _SnapshotColumns:
+    """Column-wise accumulator for streamed snapshot rows.
+
+    Event fields and each bookmaker block's raw JSON are stored once and
+    referenced by index; only the per-outcome columns grow with the rows.
+    """
+
+    EVENT_FIELDS = ("sport_key", "event_id", "commence_time", "home_team", "away_team")
+
+    def __init__(self) -> None:
+        self.events: List[Tuple[Any, ...]] = []
+        self.blocks: Dict[str, int] = {}
+        self.block_books: List[str] = []
+        self.event_idx = array("q")
+        self.block_idx = array("q")
+        self.market_key: List[str] = []
+        self.outcome: List[str] = []
+        self.iso_time: List[Any] = []
+        self.price = array("d")
+        self.points = array("d")
+
+    def add_event(self, event: Dict[str, Any], event_id: str) -> int:
+        values = [event.get(name) for name in self.EVENT_FIELDS]
+        values[1] = event_id
+        self.events.append(tuple(values))
+        return len(self.events) - 1
+
+    def add_block(self, event_id: str, bookmaker: Dict[str, Any]) -> int:
+        raw = json.dumps({"event_id": event_id, "bookmaker": bookmaker}, separators=(",", ":"))
+        code = self.blocks.setdefault(raw, len(self.blocks))
+        if code == len(self.block_books):
+            self.block_books.append(bookmaker.get("key"))
+        return code
+
+    def append(
+        self, event: int, block: int, market_key: str, outcome: Dict[str, Any], iso_time: Any
+    ) -> None:
+        self.event_idx.append(event)
+        self.block_idx.append(block)
+        self.market_key.append(market_key)
+        self.outcome.append(outcome.get("name"))
+        self.iso_time.append(iso_time)
+        self.price.append(_to_float(outcome.get("price")))
+        self.points.append(_to_float(outcome.get("point")))
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def to_frame(self, fetched_at_iso: str) -> pd.DataFrame:
+        event_idx = np.frombuffer(self.event_idx, dtype=np.int64)
+        block_idx = np.frombuffer(self.block_idx, dtype=np.int64)
+        columns: Dict[str, Any] = {"fetched_at": np.full(len(self), fetched_at_iso, dtype=object)}
+        for pos, name in enumerate(self.EVENT_FIELDS):
+            values = np.empty(len(self.events), dtype=object)
+            values[:] = [event[pos] for event in self.events]
+            columns[name] = values[event_idx]
+        books = np.empty(len(self.block_books), dtype=object)
+        books[:] = self.block_books
+        price = np.frombuffer(self.price, dtype=np.float64).copy()
+        if not np.isnan(price).any() and np.array_equal(price, np.round(price)):
+            price = price.astype(np.int64)  # American odds, as the eager path yields
+        points = np.frombuffer(self.points, dtype=np.float64).copy()
+        columns.update(
+            bookmaker_key=books[block_idx],
+            market_key=self.market_key,
+            outcome=self.outcome,
+            points=points,
+            price=price,
+            iso_time=self.iso_time,
+            line=points.copy(),
+            odds_raw_json=pd.Categorical.from_codes(block_idx, categories=list(self.blocks)),
+        )
+        return pd.DataFrame(columns, columns=SNAPSHOT_COLUMNS)
+
+
+def normalize_odds_stream(source: Any, *, fetched_at: datetime) -> pd.DataFrame:
+    """Streaming counterpart of ``normalize_odds_response`` for large payloads.
+
+    Events are parsed incrementally (see ``iter_odds_events``) and appended
+    straight into column arrays instead of one dict per outcome. Raw JSON is
+    kept once per bookmaker block: ``odds_raw_json`` is a categorical whose
+    categories are the blocks, and ``outcome_raw_json`` recovers the
+    per-outcome form when snapshots are persisted.
+
+    Args:
+        source: Response body as a binary stream, bytes or file path
+        fetched_at: UTC timestamp when data was fetched
+
+    Returns:
+        pd.DataFrame: Same columns and row order as ``normalize_odds_response``
+    """
+    fetched_at_iso = fetched_at.astimezone(timezone.utc).isoformat()
+    logger = logging.getLogger(f"{__name__}.normalize_odds_stream")
+    columns = _SnapshotColumns()
+    events_processed = 0
+
+    for event in iter_odds_events(source):
+        event_id = event.get("id") or event.get("event_id")
+        if not event_id:
+            logger.warning(f"Skipping event with missing ID: {event}")
+            continue
+        events_processed += 1
+        event_code = None
+
+        for bookmaker in event.get("bookmakers", []):
+            bookmaker_key = bookmaker.get("key")
+            if not bookmaker_key:
+                logger.warning(f"Skipping bookmaker with missing key in event {event_id}")
+                continue
+            block_code = None
+            last_update = bookmaker.get("last_update")
+
+            for market in bookmaker.get("markets", []):
+                market_key = market.get("key")
+                if not market_key:
+                    logger.warning(
+                        f"Skipping market with missing key for {bookmaker_key} in event {event_id}"
+                    )
+                    continue
+                market_last_update = market.get("last_update") or last_update
+
+                for outcome in market.get("outcomes", []):
+                    if not outcome.get("name") or outcome.get("price") is None:
+                        continue
+                    if event_code is None:
+                        event_code = columns.add_event(event, event_id)
+                    if block_code is None:
+                        block_code = columns.add_block(event_id, bookmaker)
+                    columns.append(event_code, block_code, market_key, outcome, market_last_update)
+
+    logger.info(f"Processed {events_processed} events, created {len(columns)} odds rows")
+
+    if not len(columns):
+        logger.warning("No valid odds data found in API response")
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+
+    return _finalize_snapshot_frame(columns.to_frame(fetched_at_iso), logger)
+
+
+def outcome_raw_json(df: pd.DataFrame) -> Iterator[Optional[str]]:
+    """Yield each row's ``odds_raw_json`` in the per-outcome shape odds_snapshots stores.
+
+    Rows from ``normalize_odds_response`` already carry it. For block-level
+    frames from ``normalize_odds_stream`` the outcome is looked up in its
+    bookmaker block, parsing one block at a time.
+    """
+    raw = df["odds_raw_json"]
+    if not isinstance(raw.dtype, pd.CategoricalDtype):
+        yield from raw
+        return
+
+    current_code, block, outcomes = None, None, {}
+    for code, market_key, name, point in zip(
+        raw.cat.codes, df["market_key"], df["outcome"], df["points"]
+    ):
+        if code < 0:
+            yield None
+            continue
+        if code != current_code:
+            current_code, block, outcomes = code, json.loads(raw.cat.categories[code]), {}
+            for market in block["bookmaker"].get("markets", []):
+                for outcome in market.get("outcomes", []):
+                    key = (market.get("key"), outcome.get("name"), _point_key(outcome.get("point")))
+                    outcomes.setdefault(key, []).append(outcome)
+        matches = outcomes.get((market_key, name, _point_key(point)))
+        if not matches:
+            yield None
+            continue
+        yield json.dumps(
+            {
+                "event_id": block["event_id"],
+                "bookmaker_key": block["bookmaker"].get("key"),
+                "market_key": market_key,
+                "outcome": matches.pop(0),
+            },
+            separators=(",", ":"),
+        )
 
 
 def compute_current_best_lines(df: pd.DataFrame) -> pd.DataFrame:
@@ -887,6 +1081,7 @@ def update_current_best_lines(database_path: Path) -> pd.DataFrame:
                     )
                     rows_inserted += cursor.rowcount
 
+                bump_data_version(conn, "current_best_lines")
                 conn.commit()
 
                 update_duration = time.time() - update_start_time
@@ -0,0 +1,65 @@
+"""Normalize peer bet tags and index the public feed for keyset pagination
+
+Revision ID: 5b8e2f1c9a34
+Revises: 11edb756c09a
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+import json
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b8e2f1c9a34"
+down_revision = "11edb756c09a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "peer_bet_tags",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("bet_id", sa.Integer(), nullable=False),
+        sa.Column("tag", sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(
+            ["bet_id"],
+            ["peer_bets.id"],
+        ),
+        sa.UniqueConstraint("bet_id", "tag", name="unique_peer_bet_tag"),
+    )
+    op.create_index("idx_peer_bet_tags_tag_bet", "peer_bet_tags", ["tag", "bet_id"])
+    op.create_index("ix_peer_bet_tags_bet_id", "peer_bet_tags", ["bet_id"])
+    op.create_index(
+        "idx_peer_bets_public_feed", "peer_bets", ["is_public", "created_at", "id"]
+    )
+
+    # Backfill from the JSON column, normalized the same way as new bets
+    bind = op.get_bind()
+    rows = []
+    for bet_id, raw in bind.execute(
+        sa.text("SELECT id, tags FROM peer_bets WHERE tags IS NOT NULL")
+    ):
+        try:
+            tags = json.loads(raw) or []
+        except (TypeError, ValueError):
+            continue
+        seen = []
+        for tag in tags:
+            value = str(tag).strip().lower()[:50]
+            if value and value not in seen:
+                seen.append(value)
+        rows.extend({"bet_id": bet_id, "tag": tag} for tag in seen)
+    if rows:
+        bind.execute(
+            sa.text("INSERT INTO peer_bet_tags (bet_id, tag) VALUES (:bet_id, :tag)"), rows
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_peer_bets_public_feed", table_name="peer_bets")
+    op.drop_table("peer_bet_tags")
@@ -0,0 +1,212 @@
+"""Per-worker caches that keep database queries off the authenticated request path
+
+``RevocationCache`` holds a snapshot of ``jwt_token_blacklist``: the set of
+revoked JTIs plus, per user, a "tokens valid after" cutoff written by
+logout-all and password resets. Each worker re-checks the table at most every
+``auth_revocation_refresh_seconds`` with one cheap probe of the
+``data_versions`` counter (bumped by every blacklist write) and the table's
+row count, and reloads only when that token moved, so a revocation on any
+worker is honoured everywhere within seconds.
+
+``PrincipalCache`` keeps recently loaded ``User`` rows for a short TTL so a
+valid token resolves its user without a ``SELECT``. Cached rows are detached
+and merged into the request's session without loading, which means
+attribute changes made elsewhere are only seen once the entry expires;
+endpoints that change a user's credentials or status invalidate it.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from utils.data_version import bump_data_version, read_data_versions
+
+from ..models import JWTTokenBlacklist, User
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_VERSION_NAME = "jwt_token_blacklist"
+USER_REVOKE_PREFIX = "user_revoke_"
+
+
+
+def _epoch(value: datetime) -> float:
+    """Seconds since the epoch; naive datetimes from SQLite are UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _dbapi_connection(db: Session) -> sqlite3.Connection:
+    """The session's SQLite connection, so shared helpers join its transaction"""
+    return db.connection().connection.dbapi_connection
+
+
+def bump_revocation_version(db: Session) -> None:
+    """Increment the blacklist's ``data_versions`` row inside the caller's transaction
+
+    Workers compare this counter (with the table's row count) to decide when
+    their revocation snapshot is stale.
+    """
+    bump_data_version(_dbapi_connection(db), REVOCATION_VERSION_NAME)
+
+
+class RevocationCache:
+    """Revoked JTIs and per-user cutoffs, refreshed from the database on a version change"""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = (
+            settings.auth_revocation_refresh_seconds if refresh_seconds is None else refresh_seconds
+        )
+        self._lock = threading.Lock()
+        self._jtis: FrozenSet[str] = frozenset()
+        self._valid_after: Dict[int, float] = {}
+        self._local_valid_after: Dict[int, float] = {}
+        self._token: Optional[Tuple[Any, ...]] = None
+        self._checked_at = float("-inf")
+
+    def _probe(self, db: Session) -> Tuple[Any, ...]:
+        # Databases written before data_versions existed read as version 0
+        versions = read_data_versions(_dbapi_connection(db), [REVOCATION_VERSION_NAME])
+        count, max_id = db.execute(
+            text("SELECT COUNT(*), MAX(id) FROM jwt_token_blacklist")
+        ).one()
+        return (versions[REVOCATION_VERSION_NAME], count, max_id)
+
+    def _load(self, db: Session) -> Tuple[FrozenSet[str], Dict[int, float]]:
+        now = datetime.now(timezone.utc)
+        rows = db.query(
+            JWTTokenBlacklist.jti, JWTTokenBlacklist.user_id, JWTTokenBlacklist.revoked_at
+        ).filter(JWTTokenBlacklist.expires_at > now.replace(tzinfo=None))
+        jtis = set()
+        valid_after: Dict[int, float] = {}
+        for jti, user_id, revoked_at in rows:
+            if jti.startswith(USER_REVOKE_PREFIX):
+                cutoff = _epoch(revoked_at)
+                valid_after[user_id] = max(cutoff, valid_after.get(user_id, cutoff))
+            else:
+                jtis.add(jti)
+        return frozenset(jtis), valid_after
+
+    def refresh(self, db: Session, force: bool = False) -> bool:
+        """Reload the snapshot if the probe interval elapsed and the table changed
+
+        Returns True when a reload happened. Errors keep the previous snapshot.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._checked_at < self.refresh_seconds:
+                return False
+            # Claim this check so concurrent requests keep using the current snapshot
+            self._checked_at = now
+        try:
+            token = self._probe(db)
+            if not force and token == self._token:
+                return False
+            jtis, valid_after = self._load(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to refresh token revocations: {e}")
+            return False
+        with self._lock:
+            self._jtis, self._valid_after, self._token = jtis, valid_after, token
+        logger.debug(f"Revocation snapshot reloaded: {len(jtis)} tokens, {len(valid_after)} users")
+        return True
+
+    def revoke_user(self, user_id: int, cutoff: Optional[float] = None) -> None:
+        """Reject this user's tokens issued before ``cutoff`` on this worker right away"""
+        cutoff = time.time() if cutoff is None else cutoff
+        # Once every refresh token issued before a cutoff has expired it is moot
+        horizon = time.time() - settings.jwt_refresh_token_expire_days * 86400
+        with self._lock:
+            self._local_valid_after[user_id] = max(
+                cutoff, self._local_valid_after.get(user_id, cutoff)
+            )
+            self._local_valid_after = {
+                uid: at for uid, at in self._local_valid_after.items() if at > horizon
+            }
+
+    def valid_after(self, user_id: int) -> Optional[float]:
+        shared = self._valid_after.get(user_id)
+        local = self._local_valid_after.get(user_id)
+        if shared is None or local is None:
+            return shared if local is None else local
+        return max(shared, local)
+
+    def is_revoked(self, jti: Optional[str], user_id: int, issued_at: Optional[float]) -> bool:
+        """Check a token against the snapshot without touching the database
+
+        ``iat`` has one-second resolution, so a token issued in the same second
+        as a logout-all is treated as issued before it.
+        """
+        if jti and jti in self._jtis:
+            return True
+        cutoff = self.valid_after(user_id)
+        return cutoff is not None and (issued_at is None or issued_at < cutoff)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jtis = frozenset()
+            self._valid_after = {}
+            self._local_valid_after = {}
+            self._token = None
+            self._checked_at = float("-inf")
+
+
+class PrincipalCache:
+    """Short-lived, size-bounded cache of detached ``User`` rows keyed by user id"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = (
+            settings.auth_principal_cache_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self.max_entries = (
+            settings.auth_principal_cache_max_entries if max_entries is None else max_entries
+        )
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, User]]" = OrderedDict()
+
+    def get(self, db: Session, user_id: int) -> Optional[User]:
+        """Cached user attached to ``db`` without a query, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        return db.merge(user, load=False)
+
+    def put(self, user: User) -> None:
+        """Cache a detached copy of a loaded ``user``; the instance itself stays in its session"""
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        columns = inspect(User).column_attrs
+        detached = User(**{column.key: getattr(user, column.key) for column in columns})
+        make_transient_to_detached(detached)
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, detached)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+revocation_cache = RevocationCache()
+principal_cache = PrincipalCache()
@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import User, UserStatus
 from ..settings import settings
+from .auth_cache import principal_cache, revocation_cache
 from .exceptions import (
     AuthenticationError,
     EmailNotVerifiedError,
@@ -54,13 +55,20 @@ def get_client_ip(request: Request) -> str:
 
 
 def verify_jwt_token(
-    request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
 ) -> dict:
     """Verify JWT token from Authorization header
 
+    The signature and claims are checked locally; revocations come from the
+    worker's snapshot, which only queries the database when its refresh
+    interval has elapsed.
+
     Args:
         request: FastAPI request object
         credentials: Bearer token credentials
+        db: Database session, used to refresh the revocation snapshot
 
     Returns:
         Decoded token payload
@@ -80,6 +88,8 @@ def verify_jwt_token(
     # Check rate limiting for invalid token attempts
     client_ip = get_client_ip(request)
 
+    revocation_cache.refresh(db)
+
     try:
         # Verify the token
         payload = verify_token(credentials.credentials, token_type="access")
@@ -109,6 +119,10 @@ def get_current_user_from_token(
 ) -> User:
     """Get current user from JWT token payload
 
+    Users are served from the per-worker principal cache when possible; a miss
+    loads the row, records ``last_activity_at`` and caches it, so activity is
+    written at most once per cache TTL instead of on every request.
+
     Args:
         token_payload: Decoded JWT token payload
         db: Database session
@@ -123,7 +137,10 @@ def get_current_user_from_token(
     """
     try:
         user_id = int(token_payload["sub"])
-        user = db.query(User).filter(User.id == user_id).first()
+        user = principal_cache.get(db, user_id)
+        cached = user is not None
+        if not cached:
+            user = db.query(User).filter(User.id == user_id).first()
 
         if not user:
             logger.warning(f"User not found for token: {user_id}")
@@ -139,11 +156,11 @@ def get_current_user_from_token(
             logger.warning(f"Unverified user attempted access: {user_id}")
             raise EmailNotVerifiedError()
 
-        # Update last activity
-        db.query(User).filter(User.id == user_id).update({
-            "last_activity_at": datetime.now(timezone.utc)
-        })
-        db.commit()
+        if not cached:
+            user.last_activity_at = datetime.now(timezone.utc)
+            db.commit()
+            db.refresh(user)
+            principal_cache.put(user)
 
         logger.debug(f"Current user retrieved: {user_id}")
         return user
@@ -170,9 +187,12 @@ def get_current_user_optional(
         return None
 
     try:
+        revocation_cache.refresh(db)
         payload = verify_token(credentials.credentials, token_type="access")
         user_id = int(payload["sub"])
-        user = db.query(User).filter(User.id == user_id).first()
+        user = principal_cache.get(db, user_id)
+        if user is None:
+            user = db.query(User).filter(User.id == user_id).first()
 
         if user and user.is_active:
             return user
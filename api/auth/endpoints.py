@@ -20,15 +20,18 @@ from ..auth_schemas import (
     UserRegistrationRequest,
     UserResponse,
 )
+from .. import database
 from ..database import get_db
 from ..models import User, UserStatus
 from ..services.auth_service import AuthService
 from ..settings import settings
+from .auth_cache import principal_cache
 from .dependencies import CurrentUser, get_client_ip, verify_jwt_token
 from .exceptions import (
     EmailAlreadyExistsError,
     EmailNotVerifiedError,
     InvalidCredentialsError,
+    PasswordHasherBusyError,
     PasswordTooWeakError,
     RateLimitExceededError,
     RefreshTokenError,
@@ -45,7 +48,8 @@ from .jwt_auth import (
     verify_password_reset_token,
     verify_token,
 )
-from .password_manager import hash_password, password_manager, verify_password
+from .password_hasher import password_hasher
+from .password_manager import password_manager
 from .schemas import (
     EmailVerificationRequest,
     LoginResponse,
@@ -83,6 +87,14 @@ def get_model_value(model: User, field: str) -> Any:
     return getattr(model, field)
 
 
+def save_upgraded_password_hash(user_id: int, password_hash: str) -> None:
+    """Store a re-hashed password; runs on the hashing pool with its own session"""
+    with database.get_db_session() as db:
+        db.query(User).filter(User.id == user_id).update({"password_hash": password_hash})
+        db.commit()
+    principal_cache.invalidate(user_id)
+
+
 # Enhanced registration endpoint with username support
 @router.post("/register", response_model=RegistrationResponse, status_code=status.HTTP_201_CREATED)
 async def register_user_enhanced(
@@ -104,8 +116,8 @@ async def register_user_enhanced(
         # Create auth service
         auth_service = AuthService(db)
 
-        # Register user
-        result = auth_service.register_user(registration_data)
+        # Register user (hashes the password, so it runs on the hashing pool)
+        result = await password_hasher.run(auth_service.register_user, registration_data)
 
         # Record successful registration
         security_manager.record_successful_auth(client_ip, registration_data.email)
@@ -118,7 +130,7 @@ async def register_user_enhanced(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except PasswordTooWeakError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except RateLimitExceededError:
+    except (RateLimitExceededError, PasswordHasherBusyError):
         raise
     except Exception as e:
         logger.error(f"Registration failed: {e}")
@@ -148,8 +160,10 @@ async def login_user_enhanced(
         # Create auth service
         auth_service = AuthService(db)
 
-        # Authenticate user
-        result = auth_service.login_user(login_data)
+        # Authenticate user (verifies the password, so it runs on the hashing pool)
+        result = await password_hasher.run(
+            auth_service.login_user, login_data, save_upgraded_password_hash
+        )
 
         # Record successful login
         security_manager.record_successful_auth(client_ip, login_data.email_or_username)
@@ -162,7 +176,7 @@ async def login_user_enhanced(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     except (UserInactiveError, EmailNotVerifiedError) as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
-    except RateLimitExceededError:
+    except (RateLimitExceededError, PasswordHasherBusyError):
         raise
     except Exception as e:
         logger.error(f"Login failed: {e}")
@@ -232,7 +246,7 @@ async def register_user(
             raise PasswordTooWeakError("; ".join(password_validation["errors"]))
 
         # Hash password
-        password_hash = hash_password(request.password.get_secret_value())
+        password_hash = await password_hasher.hash(request.password.get_secret_value())
 
         # Create user
         user = User(
@@ -313,8 +327,14 @@ async def login_user_form(
             security_manager.rate_limiter.record_attempt(f"user:{form_data.username}")
             raise InvalidCredentialsError()
 
-        # Verify password
-        if not get_model_value(user, "password_hash") or not verify_password(form_data.password, get_model_value(user, "password_hash")):
+        # Verify password; outdated hashes are upgraded in the background
+        password_hash = get_model_value(user, "password_hash")
+        user_id = get_model_value(user, "id")
+        if not password_hash or not await password_hasher.verify_and_upgrade(
+            form_data.password,
+            password_hash,
+            lambda new_hash: save_upgraded_password_hash(user_id, new_hash),
+        ):
             security_manager.rate_limiter.record_attempt(f"user:{form_data.username}")
             raise InvalidCredentialsError()
 
@@ -371,6 +391,7 @@ async def login_user_form(
         UserInactiveError,
         EmailNotVerifiedError,
         RateLimitExceededError,
+        PasswordHasherBusyError,
     ):
         raise
     except Exception as e:
@@ -446,6 +467,7 @@ async def refresh_access_token(
 async def logout_user(
     current_user: CurrentUser,
     token_payload: Annotated[dict, Depends(verify_jwt_token)],
+    db: Annotated[Session, Depends(get_db)],
     request_data: Optional[dict] = None,
 ) -> LogoutResponse:
     """Logout user by revoking current tokens
@@ -460,7 +482,7 @@ async def logout_user(
         # Revoke current session
         user_id = get_user_value(current_user, "id")
         if request_data and request_data.get("logout_all_sessions"):
-            jwt_auth.logout_all_user_sessions(user_id)
+            jwt_auth.logout_all_user_sessions(user_id, db)
             logger.info(f"User logged out from all sessions: {user_id}")
             message = "Logged out from all sessions"
         else:
@@ -554,21 +576,23 @@ async def confirm_password_reset(
             raise PasswordTooWeakError("; ".join(password_validation["errors"]))
 
         # Update password
+        new_hash = await password_hasher.hash(request.new_password.get_secret_value())
         db.query(User).filter(User.id == user_id).update({
-            "password_hash": hash_password(request.new_password.get_secret_value()),
+            "password_hash": new_hash,
             "updated_at": datetime.now(timezone.utc)
         })
 
         # Revoke all existing tokens for security
-        jwt_auth.logout_all_user_sessions(user_id)
+        jwt_auth.logout_all_user_sessions(user_id, db)
 
         db.commit()
+        principal_cache.invalidate(user_id)
 
         logger.info(f"Password reset completed for user: {user.id}")
 
         return {"message": "Password reset successful"}
 
-    except (TokenInvalidError, UserNotFoundError, PasswordTooWeakError):
+    except (TokenInvalidError, UserNotFoundError, PasswordTooWeakError, PasswordHasherBusyError):
         raise
     except Exception as e:
         logger.error(f"Password reset confirmation failed: {e}")
@@ -594,7 +618,7 @@ async def change_password(
         email = get_user_value(current_user, "email")
         
         # Verify current password
-        if not password_hash or not verify_password(
+        if not password_hash or not await password_hasher.verify(
             request.current_password.get_secret_value(), password_hash
         ):
             raise InvalidCredentialsError("Current password is incorrect")
@@ -607,22 +631,24 @@ async def change_password(
             raise PasswordTooWeakError("; ".join(password_validation["errors"]))
 
         # Update password
+        new_hash = await password_hasher.hash(request.new_password.get_secret_value())
         db.query(User).filter(User.id == user_id).update({
-            "password_hash": hash_password(request.new_password.get_secret_value()),
+            "password_hash": new_hash,
             "updated_at": datetime.now(timezone.utc)
         })
 
         # Optionally revoke all other sessions
         if request.logout_other_sessions:
-            jwt_auth.logout_all_user_sessions(user_id)
+            jwt_auth.logout_all_user_sessions(user_id, db)
 
         db.commit()
+        principal_cache.invalidate(user_id)
 
         logger.info(f"Password changed for user: {user_id}")
 
         return {"message": "Password changed successfully"}
 
-    except (InvalidCredentialsError, PasswordTooWeakError):
+    except (InvalidCredentialsError, PasswordTooWeakError, PasswordHasherBusyError):
         raise
     except Exception as e:
         logger.error(f"Password change failed: {e}")
@@ -669,6 +695,7 @@ async def verify_email(
         })
 
         db.commit()
+        principal_cache.invalidate(request.user_id)
 
         logger.info(f"Email verified for user: {user.id}")
 
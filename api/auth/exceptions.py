@@ -55,6 +55,17 @@ class RateLimitExceededError(HTTPException):
         )
 
 
+class PasswordHasherBusyError(HTTPException):
+    """Raised when the password hashing pool's queue is full"""
+
+    def __init__(self, detail: str = "Authentication is busy, please retry", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 class UserNotFoundError(HTTPException):
     """Raised when user is not found"""
 
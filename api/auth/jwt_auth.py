@@ -6,14 +6,18 @@ algorithms, expiration handling, and blacklisting capabilities.
 
 import logging
 import secrets
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from jose import jwt
 from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
 
 from ..settings import settings
+from .auth_cache import revocation_cache
 from .exceptions import AuthenticationError, TokenExpiredError, TokenInvalidError, TokenRevokedError
+from .token_manager import DatabaseTokenBlacklist
 
 logger = logging.getLogger(__name__)
 
@@ -95,22 +99,26 @@ class JWTConfig:
 class TokenBlacklist:
     """In-memory token blacklist for revoked tokens
 
-    In production, this should be backed by Redis or database
+    Takes effect on this worker only; revocations persisted through
+    ``DatabaseTokenBlacklist`` reach every worker via ``revocation_cache``.
     """
 
     _blacklisted_tokens: set[str] = set()
     _blacklisted_users: set[int] = set()
+    _lock = threading.Lock()
 
     @classmethod
     def add_token(cls, jti: str) -> None:
         """Add token JTI to blacklist"""
-        cls._blacklisted_tokens.add(jti)
+        with cls._lock:
+            cls._blacklisted_tokens = cls._blacklisted_tokens | {jti}
         logger.info(f"Token blacklisted: {jti}")
 
     @classmethod
     def add_user_tokens(cls, user_id: int) -> None:
-        """Blacklist all tokens for a user (logout all sessions)"""
-        cls._blacklisted_users.add(user_id)
+        """Blacklist all tokens for a user, including ones issued later"""
+        with cls._lock:
+            cls._blacklisted_users = cls._blacklisted_users | {user_id}
         logger.info(f"All tokens blacklisted for user: {user_id}")
 
     @classmethod
@@ -121,7 +129,8 @@ class TokenBlacklist:
     @classmethod
     def remove_user_from_blacklist(cls, user_id: int) -> None:
         """Remove user from global blacklist (re-enable login)"""
-        cls._blacklisted_users.discard(user_id)
+        with cls._lock:
+            cls._blacklisted_users = cls._blacklisted_users - {user_id}
         logger.info(f"User removed from blacklist: {user_id}")
 
     @classmethod
@@ -281,6 +290,8 @@ def verify_token(token: str, token_type: Optional[str] = None) -> Dict[str, Any]
 
         if jti and TokenBlacklist.is_token_revoked(jti, user_id):
             raise TokenRevokedError()
+        if revocation_cache.is_revoked(jti, user_id, payload.get("iat")):
+            raise TokenRevokedError()
 
         # Verify required claims
         required_claims = ["sub", "email", "exp", "iat", "jti"]
@@ -376,13 +387,19 @@ def revoke_token(token: str) -> None:
         pass
 
 
-def revoke_all_user_tokens(user_id: int) -> None:
-    """Revoke all tokens for a specific user
+def revoke_all_user_tokens(user_id: int, db: Optional[Session] = None) -> None:
+    """Revoke all tokens issued to a user so far
+
+    Tokens issued afterwards (a fresh login) stay valid. Without ``db`` the
+    revocation only applies to this worker until it restarts.
 
     Args:
         user_id: User database ID
+        db: Database session used to persist the revocation for all workers
     """
-    TokenBlacklist.add_user_tokens(user_id)
+    revocation_cache.revoke_user(user_id)
+    if db is not None:
+        DatabaseTokenBlacklist.revoke_user_tokens(db, user_id)
 
 
 def generate_password_reset_token(user_id: int, email: str) -> str:
@@ -498,13 +515,14 @@ class JWTAuthenticator:
             # Invalid/expired tokens don't need explicit revocation
             pass
 
-    def logout_all_user_sessions(self, user_id: int) -> None:
-        """Logout user from all sessions by blacklisting all their tokens
+    def logout_all_user_sessions(self, user_id: int, db: Optional[Session] = None) -> None:
+        """Logout user from all sessions by revoking every token issued so far
 
         Args:
             user_id: User database ID
+            db: Database session used to persist the revocation for all workers
         """
-        revoke_all_user_tokens(user_id)
+        revoke_all_user_tokens(user_id, db)
 
     def validate_token_claims(self, payload: Dict[str, Any]) -> bool:
         """Validate token payload has required claims and format
@@ -0,0 +1,139 @@
+"""Bounded worker pool for password hashing
+
+bcrypt and PBKDF2 are deliberately slow (hundreds of milliseconds per call)
+and would otherwise run inside async login and registration handlers,
+stalling the event loop and every other request on it. ``PasswordHasher``
+runs them on a small thread pool instead; both hash implementations release
+the GIL, so the loop keeps serving while hashes compute.
+
+The pool admits at most ``password_hash_max_pending`` calls (queued plus
+running). Beyond that, calls fail fast with ``PasswordHasherBusyError`` (503),
+so a login storm sheds load instead of queueing requests until they time out.
+Hashes that use outdated parameters are re-hashed after a successful login
+as a background job, off the request path, and only when the pool has
+spare capacity.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from ..settings import settings
+from . import password_manager
+from .exceptions import PasswordHasherBusyError
+from .simple_password import verify_password_pbkdf2
+
+logger = logging.getLogger(__name__)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify against either stored format: passlib/bcrypt (``$2b$...``) or PBKDF2 (``salt$hash``)"""
+    if hashed_password.startswith("$") and password_manager.pwd_context is not None:
+        return password_manager.verify_password(plain_password, hashed_password)
+    return verify_password_pbkdf2(plain_password, hashed_password)
+
+
+def should_upgrade(hashed_password: str) -> bool:
+    """Whether a verified bcrypt hash uses parameters below the current policy"""
+    if password_manager.pwd_context is None or not hashed_password.startswith("$"):
+        return False
+    return password_manager.needs_rehash(hashed_password)
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded thread pool"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.max_workers = max(1, max_workers or settings.password_hash_workers)
+        self.max_pending = max(1, max_pending or settings.password_hash_max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Calls queued or running"""
+        return self._pending
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """Queue ``func`` on the pool, or raise PasswordHasherBusyError if it is full"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusyError()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="password-hash"
+                )
+            self._pending += 1
+            executor = self._executor
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Await ``func(*args)`` on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    async def hash(self, password: str, salt: Optional[str] = None) -> str:
+        return await self.run(password_manager.hash_password, password, salt)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(check_password, plain_password, hashed_password)
+
+    async def verify_and_upgrade(
+        self, plain_password: str, hashed_password: str, save: Callable[[str], None]
+    ) -> bool:
+        """Verify, then re-hash an outdated hash in the background and pass it to ``save``
+
+        ``save`` runs on a pool thread after the response may already have
+        been sent, so it must open its own database session.
+        """
+        return await self.run(self.check_and_upgrade, plain_password, hashed_password, save)
+
+    def check_and_upgrade(
+        self, plain_password: str, hashed_password: str, save: Callable[[str], None]
+    ) -> bool:
+        """Blocking ``verify_and_upgrade`` for code that already runs on the pool"""
+        is_valid = check_password(plain_password, hashed_password)
+        if is_valid and should_upgrade(hashed_password):
+            self.upgrade_in_background(plain_password, save)
+        return is_valid
+
+    def upgrade_in_background(
+        self, plain_password: str, save: Callable[[str], None]
+    ) -> Optional[Future]:
+        """Schedule a re-hash if the pool has room; upgrades are skipped under load"""
+        try:
+            return self.submit(self._rehash, plain_password, save)
+        except PasswordHasherBusyError:
+            logger.debug("Password hash upgrade skipped: hashing pool is busy")
+            return None
+
+    @staticmethod
+    def _rehash(plain_password: str, save: Callable[[str], None]) -> None:
+        try:
+            save(password_manager.hash_password(plain_password))
+            logger.info("Password hash upgraded")
+        except Exception as e:
+            logger.error(f"Password hash upgrade failed: {e}")
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# Global hasher instance
+password_hasher = PasswordHasher()
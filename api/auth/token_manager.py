@@ -5,6 +5,7 @@ using SQLAlchemy models for production-ready token management.
 """
 
 import logging
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
@@ -13,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from ..models import AuthLog, JWTTokenBlacklist, User, UserSession
 from ..settings import settings
+from .auth_cache import USER_REVOKE_PREFIX, bump_revocation_version
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +51,7 @@ class DatabaseTokenBlacklist:
             )
 
             db.add(blacklist_entry)
+            bump_revocation_version(db)
             db.commit()
 
             logger.info(f"Token blacklisted: {jti} for user {user_id}")
@@ -98,29 +101,27 @@ class DatabaseTokenBlacklist:
         Args:
             db: Database session
             user_id: User ID
-            token_type: Optional token type filter
+            token_type: Token type recorded on the marker row (the cutoff covers all types)
             reason: Revocation reason
 
         Returns:
             Number of tokens revoked
         """
         try:
-            # This is a simplified approach - in production you'd need to track
-            # all active tokens for a user, possibly through sessions table
-
-            # For now, we'll add a special blacklist entry that revokes all future tokens
-            # until a certain timestamp
-            revoke_until = datetime.now(timezone.utc) + timedelta(days=365)  # Far future
-
+            # A marker row whose revoked_at is the user's "tokens valid after" cutoff.
+            # It only matters until the last token issued before it has expired.
+            now = datetime.now(timezone.utc)
             blacklist_entry = JWTTokenBlacklist(
-                jti=f"user_revoke_{user_id}_{int(datetime.now(timezone.utc).timestamp())}",
+                jti=f"{USER_REVOKE_PREFIX}{user_id}_{int(now.timestamp())}_{secrets.token_hex(4)}",
                 user_id=user_id,
-                token_type=token_type or "all",
-                expires_at=revoke_until,
+                token_type=token_type or "refresh",
+                expires_at=now + timedelta(days=settings.jwt_refresh_token_expire_days),
+                revoked_at=now,
                 reason=reason or "User logout all sessions",
             )
 
             db.add(blacklist_entry)
+            bump_revocation_version(db)
             db.commit()
 
             logger.info(f"All tokens revoked for user {user_id}")
@@ -5,7 +5,9 @@ from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import Select, func, inspect, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..database import Base
@@ -83,6 +85,49 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         return query.count()
 
+    def _select(self, filters: Optional[Dict[str, Any]] = None) -> Select:
+        """SELECT for live (not soft-deleted) rows matching equality filters"""
+        stmt = select(self.model)
+        if hasattr(self.model, "deleted_at"):
+            stmt = stmt.where(self.model.deleted_at.is_(None))
+        if filters:
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    stmt = stmt.where(getattr(self.model, field) == value)
+        return stmt
+
+    async def get_async(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """Get a single record by primary key without blocking the event loop"""
+        pk = inspect(self.model).primary_key[0]
+        result = await db.scalars(self._select().where(pk == id).limit(1))
+        return result.first()
+
+    async def get_multi_async(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+    ) -> List[ModelType]:
+        """Async counterpart of ``get_multi``"""
+        stmt = self._select(filters)
+        if order_by and hasattr(self.model, order_by):
+            stmt = stmt.order_by(getattr(self.model, order_by).desc())
+        elif hasattr(self.model, "created_at"):
+            stmt = stmt.order_by(self.model.created_at.desc())
+
+        result = await db.scalars(stmt.offset(skip).limit(limit))
+        return list(result.all())
+
+    async def count_async(
+        self, db: AsyncSession, filters: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Async counterpart of ``count``"""
+        stmt = select(func.count()).select_from(self._select(filters).subquery())
+        return (await db.scalar(stmt)) or 0
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """Create a new record"""
         obj_in_data = jsonable_encoder(obj_in)
@@ -3,7 +3,8 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, desc, func, or_
+from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 from ..models import Edge, EdgeStatus
@@ -13,26 +14,54 @@ from .base import CRUDBase
 
 class CRUDEdge(CRUDBase[Edge, EdgeCreateRequest, EdgeUpdateRequest]):
 
+    def _live_conditions(self) -> List[Any]:
+        """Active, non-stale, not deleted and not yet expired"""
+        return [
+            self.model.status == EdgeStatus.ACTIVE,
+            self.model.is_stale.is_(False),
+            self.model.deleted_at.is_(None),
+            or_(self.model.expires_at.is_(None), self.model.expires_at > datetime.utcnow()),
+        ]
+
+    def _active_edges_conditions(self, min_edge_percentage: float) -> List[Any]:
+        return self._live_conditions() + [self.model.edge_percentage >= min_edge_percentage]
+
+    def _top_edges_conditions(self, min_kelly: float, sport_key: Optional[str]) -> List[Any]:
+        conditions = self._live_conditions() + [self.model.kelly_fraction >= min_kelly]
+        if sport_key:
+            conditions.append(self.model.sport_key == sport_key)
+        return conditions
+
     def get_active_edges(
         self, db: Session, *, skip: int = 0, limit: int = 100, min_edge_percentage: float = 0.0
     ) -> List[Edge]:
         """Get active, non-stale edges with minimum edge percentage"""
         query = (
             db.query(self.model)
-            .filter(
-                and_(
-                    self.model.status == EdgeStatus.ACTIVE,
-                    self.model.is_stale.is_(False),
-                    self.model.deleted_at.is_(None),
-                    self.model.edge_percentage >= min_edge_percentage,
-                    or_(self.model.expires_at.is_(None), self.model.expires_at > datetime.utcnow()),
-                )
-            )
+            .filter(and_(*self._active_edges_conditions(min_edge_percentage)))
             .order_by(desc(self.model.edge_percentage))
         )
 
         return query.offset(skip).limit(limit).all()
 
+    async def get_active_edges_async(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        min_edge_percentage: float = 0.0,
+    ) -> List[Edge]:
+        """Async counterpart of ``get_active_edges``"""
+        stmt = (
+            select(self.model)
+            .where(*self._active_edges_conditions(min_edge_percentage))
+            .order_by(desc(self.model.edge_percentage))
+            .offset(skip)
+            .limit(limit)
+        )
+        return list((await db.scalars(stmt)).all())
+
     def get_by_event(
         self,
         db: Session,
@@ -51,6 +80,24 @@ class CRUDEdge(CRUDBase[Edge, EdgeCreateRequest, EdgeUpdateRequest]):
             db=db, skip=skip, limit=limit, filters=filters, order_by="edge_percentage"
         )
 
+    async def get_by_event_async(
+        self,
+        db: AsyncSession,
+        *,
+        event_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True,
+    ) -> List[Edge]:
+        """Async counterpart of ``get_by_event``"""
+        filters = {"event_id": event_id}
+        if active_only:
+            filters.update({"status": EdgeStatus.ACTIVE, "is_stale": False})
+
+        return await self.get_multi_async(
+            db=db, skip=skip, limit=limit, filters=filters, order_by="edge_percentage"
+        )
+
     def get_by_player(
         self, db: Session, *, player: str, skip: int = 0, limit: int = 100, active_only: bool = True
     ) -> List[Edge]:
@@ -63,6 +110,24 @@ class CRUDEdge(CRUDBase[Edge, EdgeCreateRequest, EdgeUpdateRequest]):
             db=db, skip=skip, limit=limit, filters=filters, order_by="edge_percentage"
         )
 
+    async def get_by_player_async(
+        self,
+        db: AsyncSession,
+        *,
+        player: str,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True,
+    ) -> List[Edge]:
+        """Async counterpart of ``get_by_player``"""
+        filters = {"player": player}
+        if active_only:
+            filters.update({"status": EdgeStatus.ACTIVE, "is_stale": False})
+
+        return await self.get_multi_async(
+            db=db, skip=skip, limit=limit, filters=filters, order_by="edge_percentage"
+        )
+
     def get_by_sport_and_week(
         self,
         db: Session,
@@ -88,6 +153,31 @@ class CRUDEdge(CRUDBase[Edge, EdgeCreateRequest, EdgeUpdateRequest]):
             order_by="edge_percentage",
         )
 
+    async def get_by_sport_and_week_async(
+        self,
+        db: AsyncSession,
+        *,
+        sport_key: str,
+        season: int,
+        week: int,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Edge]:
+        """Async counterpart of ``get_by_sport_and_week``"""
+        return await self.get_multi_async(
+            db=db,
+            skip=skip,
+            limit=limit,
+            filters={
+                "sport_key": sport_key,
+                "season": season,
+                "week": week,
+                "status": EdgeStatus.ACTIVE,
+                "is_stale": False,
+            },
+            order_by="edge_percentage",
+        )
+
     def get_by_sportsbook(
         self, db: Session, *, sportsbook: str, skip: int = 0, limit: int = 100
     ) -> List[Edge]:
@@ -110,65 +200,91 @@ class CRUDEdge(CRUDBase[Edge, EdgeCreateRequest, EdgeUpdateRequest]):
     ) -> List[Edge]:
         """Get top edges by expected value"""
         query = db.query(self.model).filter(
-            and_(
-                self.model.status == EdgeStatus.ACTIVE,
-                self.model.is_stale.is_(False),
-                self.model.deleted_at.is_(None),
-                self.model.kelly_fraction >= min_kelly,
-                or_(self.model.expires_at.is_(None), self.model.expires_at > datetime.utcnow()),
-            )
+            and_(*self._top_edges_conditions(min_kelly, sport_key))
         )
 
-        if sport_key:
-            query = query.filter(self.model.sport_key == sport_key)
-
         return query.order_by(desc(self.model.expected_value_per_dollar)).limit(limit).all()
 
-    def search_edges(
-        self, db: Session, *, search_filters: Dict[str, Any], skip: int = 0, limit: int = 100
+    async def get_top_edges_async(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 50,
+        min_kelly: float = 0.01,
+        sport_key: Optional[str] = None,
     ) -> List[Edge]:
-        """Search edges with multiple filters"""
-        query = db.query(self.model).filter(self.model.deleted_at.is_(None))
+        """Async counterpart of ``get_top_edges``"""
+        stmt = (
+            select(self.model)
+            .where(*self._top_edges_conditions(min_kelly, sport_key))
+            .order_by(desc(self.model.expected_value_per_dollar))
+            .limit(limit)
+        )
+        return list((await db.scalars(stmt)).all())
+
+    def _search_conditions(self, search_filters: Dict[str, Any]) -> List[Any]:
+        conditions = [self.model.deleted_at.is_(None)]
 
-        # Apply search filters
         if "sport_key" in search_filters:
-            query = query.filter(self.model.sport_key == search_filters["sport_key"])
+            conditions.append(self.model.sport_key == search_filters["sport_key"])
 
         if "market_type" in search_filters:
-            query = query.filter(self.model.market_type == search_filters["market_type"])
+            conditions.append(self.model.market_type == search_filters["market_type"])
 
         if "player" in search_filters:
-            query = query.filter(self.model.player.ilike(f"%{search_filters['player']}%"))
+            conditions.append(self.model.player.ilike(f"%{search_filters['player']}%"))
 
         if "position" in search_filters:
-            query = query.filter(self.model.position == search_filters["position"])
+            conditions.append(self.model.position == search_filters["position"])
 
         if "min_edge_percentage" in search_filters:
-            query = query.filter(
-                self.model.edge_percentage >= search_filters["min_edge_percentage"]
-            )
+            conditions.append(self.model.edge_percentage >= search_filters["min_edge_percentage"])
 
         if "max_edge_percentage" in search_filters:
-            query = query.filter(
-                self.model.edge_percentage <= search_filters["max_edge_percentage"]
-            )
+            conditions.append(self.model.edge_percentage <= search_filters["max_edge_percentage"])
 
         if "min_kelly" in search_filters:
-            query = query.filter(self.model.kelly_fraction >= search_filters["min_kelly"])
+            conditions.append(self.model.kelly_fraction >= search_filters["min_kelly"])
 
         if "sportsbook" in search_filters:
-            query = query.filter(self.model.best_sportsbook == search_filters["sportsbook"])
+            conditions.append(self.model.best_sportsbook == search_filters["sportsbook"])
 
         if "strategy_tag" in search_filters:
-            query = query.filter(self.model.strategy_tag == search_filters["strategy_tag"])
+            conditions.append(self.model.strategy_tag == search_filters["strategy_tag"])
 
         if "active_only" in search_filters and search_filters["active_only"]:
-            query = query.filter(
+            conditions.append(
                 and_(self.model.status == EdgeStatus.ACTIVE, self.model.is_stale.is_(False))
             )
 
+        return conditions
+
+    def search_edges(
+        self, db: Session, *, search_filters: Dict[str, Any], skip: int = 0, limit: int = 100
+    ) -> List[Edge]:
+        """Search edges with multiple filters"""
+        query = db.query(self.model).filter(*self._search_conditions(search_filters))
+
         return query.order_by(desc(self.model.edge_percentage)).offset(skip).limit(limit).all()
 
+    async def search_edges_async(
+        self,
+        db: AsyncSession,
+        *,
+        search_filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Edge]:
+        """Async counterpart of ``search_edges``"""
+        stmt = (
+            select(self.model)
+            .where(*self._search_conditions(search_filters))
+            .order_by(desc(self.model.edge_percentage))
+            .offset(skip)
+            .limit(limit)
+        )
+        return list((await db.scalars(stmt)).all())
+
     def mark_stale(self, db: Session, *, edge_id: int) -> Optional[Edge]:
         """Mark an edge as stale"""
         edge = self.get(db=db, id=edge_id)
@@ -253,6 +369,40 @@ class CRUDEdge(CRUDBase[Edge, EdgeCreateRequest, EdgeUpdateRequest]):
             "unique_players": avg_stats.unique_players or 0,
         }
 
+    async def get_edge_statistics_async(self, db: AsyncSession) -> Dict[str, Any]:
+        """Async counterpart of ``get_edge_statistics``"""
+        live = [
+            self.model.status == EdgeStatus.ACTIVE,
+            self.model.is_stale.is_(False),
+            self.model.deleted_at.is_(None),
+        ]
+        total_edges = await self.count_async(db)
+        active_edges = await db.scalar(select(func.count()).select_from(self.model).where(*live))
+
+        avg_stats = (
+            await db.execute(
+                select(
+                    func.avg(self.model.edge_percentage).label("avg_edge"),
+                    func.avg(self.model.expected_value_per_dollar).label("avg_ev"),
+                    func.avg(self.model.kelly_fraction).label("avg_kelly"),
+                    func.max(self.model.edge_percentage).label("max_edge"),
+                    func.count(func.distinct(self.model.event_id)).label("unique_events"),
+                    func.count(func.distinct(self.model.player)).label("unique_players"),
+                ).where(*live)
+            )
+        ).one()
+
+        return {
+            "total_edges": total_edges,
+            "active_edges": active_edges or 0,
+            "avg_edge_percentage": round(avg_stats.avg_edge or 0, 4),
+            "avg_expected_value": round(avg_stats.avg_ev or 0, 4),
+            "avg_kelly_fraction": round(avg_stats.avg_kelly or 0, 4),
+            "max_edge_percentage": round(avg_stats.max_edge or 0, 4),
+            "unique_events": avg_stats.unique_events or 0,
+            "unique_players": avg_stats.unique_players or 0,
+        }
+
     def get_edges_with_event_data(
         self,
         db: Session,
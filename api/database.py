@@ -4,21 +4,55 @@ import logging
 from contextlib import contextmanager
 from pathlib import Path
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
 
-from .settings import get_database_url, settings, validate_database_path
+from .settings import get_async_database_url, get_database_url, settings, validate_database_path
 
 logger = logging.getLogger(__name__)
 
 engine = None
 SessionLocal = None
+async_engine = None
+AsyncSessionLocal = None
 Base = declarative_base()
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning, applied to sync and async pools alike
+
+    WAL lets readers run alongside the odds jobs' writes, synchronous=NORMAL
+    is durable under WAL without an fsync per commit, and mmap serves hot
+    pages straight from the page cache.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.db_pool_timeout * 1000)}")
+    finally:
+        cursor.close()
+
+
+def _pool_options(database_url: str) -> dict:
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    if not database_url.startswith("sqlite"):
+        # Local SQLite files don't drop connections; networked servers do
+        options["pool_pre_ping"] = True
+    return options
+
+
 def init_database():
-    global engine, SessionLocal
+    global engine, SessionLocal, async_engine, AsyncSessionLocal
 
     if not validate_database_path():
         logger.warning(f"Database file not found at {settings.db_path}")
@@ -30,16 +64,28 @@ def init_database():
         database_url,
         connect_args={"check_same_thread": False, "timeout": 30},
         echo=False,
-        # Enable foreign key constraints for SQLite
-        pool_pre_ping=True,
+        **_pool_options(database_url),
     )
 
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+    async_url = get_async_database_url(database_url)
+    async_engine = create_async_engine(
+        async_url,
+        connect_args={"timeout": 30} if async_url.startswith("sqlite") else {},
+        echo=False,
+        **_pool_options(async_url),
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    if database_url.startswith("sqlite"):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
     try:
         with engine.connect() as conn:
-            # Enable foreign key constraints for SQLite
-            conn.execute(text("PRAGMA foreign_keys=ON"))
             conn.execute(text("SELECT 1")).scalar()
             logger.info("Database connection successful")
     except Exception as e:
@@ -88,6 +134,22 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Non-blocking session for read-heavy endpoints; queries don't stall the event loop"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Database not initialized")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_database():
+    """Close pooled connections on shutdown"""
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
+
 @contextmanager
 def get_db_session():
     if SessionLocal is None:
@@ -50,10 +50,12 @@ async def get_current_user_jwt(
         return None
 
     try:
+        from .auth.auth_cache import revocation_cache
         from .auth.exceptions import TokenExpiredError, TokenInvalidError, TokenRevokedError
         from .auth.jwt_auth import verify_token
 
         # Verify JWT token
+        revocation_cache.refresh(db)
         payload = verify_token(credentials.credentials, token_type="access")
         user_id = int(payload["sub"])
 
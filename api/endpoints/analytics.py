@@ -5,10 +5,10 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
 from ..deps import get_current_user
 from ..models import Bet, User, BetResolutionHistory
 from ..schemas.bet_schemas import (
@@ -21,10 +21,68 @@ from ..schemas.bet_schemas import (
 router = APIRouter()
 
 
+async def _get_db_user(db: AsyncSession, user: dict) -> User:
+    if not user or not user.get("external_id"):
+        raise HTTPException(status_code=401, detail="User not authenticated")
+
+    db_user = (
+        await db.scalars(select(User).where(User.external_id == user["external_id"]).limit(1))
+    ).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+
+def _resolution_conditions(
+    external_id: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    result: Optional[str],
+    resolver_id: Optional[int],
+    has_dispute: Optional[bool],
+) -> list:
+    """WHERE clauses shared by resolution history and export"""
+    conditions = [Bet.resolved_at.isnot(None), Bet.external_user_id == external_id]
+
+    if start_date:
+        try:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+            conditions.append(Bet.resolved_at >= start_dt)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid start_date format. Use YYYY-MM-DD")
+
+    if end_date:
+        try:
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+            conditions.append(Bet.resolved_at < end_dt)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD")
+
+    if result:
+        conditions.append(Bet.result == result)
+
+    if resolver_id:
+        conditions.append(Bet.resolved_by == resolver_id)
+
+    if has_dispute is not None:
+        conditions.append(Bet.is_disputed == has_dispute)
+
+    return conditions
+
+
+async def _resolver_names(db: AsyncSession, bets) -> dict:
+    """Look up every resolver on the page in one query instead of one per bet"""
+    resolver_ids = {bet.resolved_by for bet in bets if bet.resolved_by}
+    if not resolver_ids:
+        return {}
+    rows = await db.execute(select(User.id, User.name).where(User.id.in_(resolver_ids)))
+    return {user_id: name or "Unknown" for user_id, name in rows.all()}
+
+
 @router.get("/resolution", response_model=ResolutionAnalytics, tags=["analytics"])
 async def get_resolution_analytics(
     user: Annotated[dict, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> ResolutionAnalytics:
     """
     Get comprehensive resolution analytics
@@ -36,21 +94,16 @@ async def get_resolution_analytics(
     - Resolution trends over time
     """
     try:
-        if not user or not user.get("external_id"):
-            raise HTTPException(status_code=401, detail="User not authenticated")
-
         # Get user ID
-        db_user = db.query(User).filter(User.external_id == user["external_id"]).first()
-        if not db_user:
-            raise HTTPException(status_code=404, detail="User not found")
+        db_user = await _get_db_user(db, user)
+
+        resolved = and_(
+            Bet.resolved_at.isnot(None),
+            Bet.external_user_id == user["external_id"]
+        )
 
         # Calculate total resolutions
-        total_resolutions = db.query(Bet).filter(
-            and_(
-                Bet.resolved_at.isnot(None),
-                Bet.external_user_id == user["external_id"]
-            )
-        ).count()
+        total_resolutions = await db.scalar(select(func.count(Bet.id)).where(resolved)) or 0
 
         if total_resolutions == 0:
             return ResolutionAnalytics(
@@ -65,27 +118,16 @@ async def get_resolution_analytics(
             )
 
         # Calculate average resolution time
-        resolution_times = db.query(
-            func.extract('epoch', Bet.resolved_at - Bet.created_at) / 3600
-        ).filter(
-            and_(
-                Bet.resolved_at.isnot(None),
-                Bet.external_user_id == user["external_id"]
-            )
-        ).all()
+        resolution_times = (await db.execute(
+            select(func.extract('epoch', Bet.resolved_at - Bet.created_at) / 3600).where(resolved)
+        )).all()
 
         avg_resolution_time = sum([t[0] for t in resolution_times]) / len(resolution_times) if resolution_times else 0.0
 
         # Calculate outcome distribution
-        outcome_counts = db.query(
-            Bet.result,
-            func.count(Bet.id)
-        ).filter(
-            and_(
-                Bet.resolved_at.isnot(None),
-                Bet.external_user_id == user["external_id"]
-            )
-        ).group_by(Bet.result).all()
+        outcome_counts = (await db.execute(
+            select(Bet.result, func.count(Bet.id)).where(resolved).group_by(Bet.result)
+        )).all()
 
         outcome_distribution = {"win": 0, "loss": 0, "push": 0, "void": 0}
         for result, count in outcome_counts:
@@ -93,24 +135,28 @@ async def get_resolution_analytics(
                 outcome_distribution[result] = count
 
         # Calculate dispute rate
-        disputed_count = db.query(Bet).filter(
-            and_(
-                Bet.is_disputed == True,
-                Bet.external_user_id == user["external_id"]
+        disputed_count = await db.scalar(
+            select(func.count(Bet.id)).where(
+                and_(
+                    Bet.is_disputed == True,
+                    Bet.external_user_id == user["external_id"]
+                )
             )
-        ).count()
+        ) or 0
 
         dispute_rate = (disputed_count / total_resolutions) * 100 if total_resolutions > 0 else 0.0
 
         # Calculate average dispute resolution time
-        dispute_resolution_times = db.query(
-            func.extract('epoch', Bet.dispute_resolved_at - Bet.dispute_created_at) / 3600
-        ).filter(
-            and_(
-                Bet.dispute_resolved_at.isnot(None),
-                Bet.external_user_id == user["external_id"]
+        dispute_resolution_times = (await db.execute(
+            select(
+                func.extract('epoch', Bet.dispute_resolved_at - Bet.dispute_created_at) / 3600
+            ).where(
+                and_(
+                    Bet.dispute_resolved_at.isnot(None),
+                    Bet.external_user_id == user["external_id"]
+                )
             )
-        ).all()
+        )).all()
 
         avg_dispute_resolution_time = sum([t[0] for t in dispute_resolution_times]) / len(dispute_resolution_times) if dispute_resolution_times else 0.0
 
@@ -123,17 +169,15 @@ async def get_resolution_analytics(
 
         # Calculate resolution trends (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        trends_data = db.query(
-            func.date(Bet.resolved_at).label('date'),
-            func.count(Bet.id).label('count'),
-            func.avg(func.extract('epoch', Bet.resolved_at - Bet.created_at) / 3600).label('avg_time')
-        ).filter(
-            and_(
-                Bet.resolved_at.isnot(None),
-                Bet.resolved_at >= thirty_days_ago,
-                Bet.external_user_id == user["external_id"]
-            )
-        ).group_by(func.date(Bet.resolved_at)).order_by('date').all()
+        trends_data = (await db.execute(
+            select(
+                func.date(Bet.resolved_at).label('date'),
+                func.count(Bet.id).label('count'),
+                func.avg(func.extract('epoch', Bet.resolved_at - Bet.created_at) / 3600).label('avg_time')
+            ).where(
+                and_(resolved, Bet.resolved_at >= thirty_days_ago)
+            ).group_by(func.date(Bet.resolved_at)).order_by('date')
+        )).all()
 
         resolution_trends = [
             {
@@ -165,7 +209,7 @@ async def get_resolution_analytics(
 @router.get("/resolution-history", response_model=ResolutionHistoryResponse, tags=["analytics"])
 async def get_resolution_history(
     user: Annotated[dict, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
     result: Optional[str] = Query(None, description="Result filter (win, loss, push, void)"),
@@ -180,52 +224,21 @@ async def get_resolution_history(
     Returns paginated list of resolved bets with comprehensive filtering options.
     """
     try:
-        if not user or not user.get("external_id"):
-            raise HTTPException(status_code=401, detail="User not authenticated")
+        await _get_db_user(db, user)
 
-        # Get user ID
-        db_user = db.query(User).filter(User.external_id == user["external_id"]).first()
-        if not db_user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Build query
-        query = db.query(Bet).filter(
-            and_(
-                Bet.resolved_at.isnot(None),
-                Bet.external_user_id == user["external_id"]
-            )
+        conditions = _resolution_conditions(
+            user["external_id"], start_date, end_date, result, resolver_id, has_dispute
         )
 
-        # Apply filters
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                query = query.filter(Bet.resolved_at >= start_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid start_date format. Use YYYY-MM-DD")
-
-        if end_date:
-            try:
-                end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-                query = query.filter(Bet.resolved_at < end_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD")
-
-        if result:
-            query = query.filter(Bet.result == result)
-
-        if resolver_id:
-            query = query.filter(Bet.resolved_by == resolver_id)
-
-        if has_dispute is not None:
-            query = query.filter(Bet.is_disputed == has_dispute)
-
         # Get total count
-        total = query.count()
+        total = await db.scalar(select(func.count(Bet.id)).where(*conditions)) or 0
 
         # Apply pagination
         offset = (page - 1) * per_page
-        bets = query.order_by(Bet.resolved_at.desc()).offset(offset).limit(per_page).all()
+        bets = (await db.scalars(
+            select(Bet).where(*conditions).order_by(Bet.resolved_at.desc()).offset(offset).limit(per_page)
+        )).all()
+        resolver_names = await _resolver_names(db, bets)
 
         # Convert to response format
         history_items = []
@@ -236,13 +249,6 @@ async def get_resolution_history(
                 delta = bet.resolved_at - bet.created_at
                 resolution_time_hours = delta.total_seconds() / 3600
 
-            # Get resolver name
-            resolver_name = "Unknown"
-            if bet.resolved_by:
-                resolver = db.query(User).filter(User.id == bet.resolved_by).first()
-                if resolver:
-                    resolver_name = resolver.name or "Unknown"
-
             history_items.append(ResolutionHistoryItem(
                 id=bet.id,
                 bet_id=bet.id,
@@ -252,7 +258,7 @@ async def get_resolution_history(
                 result=bet.result or "Unknown",
                 resolved_at=bet.resolved_at.isoformat() if bet.resolved_at else "",
                 resolved_by=bet.resolved_by or 0,
-                resolver_name=resolver_name,
+                resolver_name=resolver_names.get(bet.resolved_by, "Unknown"),
                 resolution_notes=bet.resolution_notes,
                 is_disputed=bet.is_disputed or False,
                 dispute_reason=bet.dispute_reason,
@@ -276,7 +282,7 @@ async def get_resolution_history(
 @router.get("/export-resolution-data", tags=["analytics"])
 async def export_resolution_data(
     user: Annotated[dict, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
     result: Optional[str] = Query(None, description="Result filter (win, loss, push, void)"),
@@ -290,48 +296,18 @@ async def export_resolution_data(
     Returns downloadable file with filtered resolution data.
     """
     try:
-        if not user or not user.get("external_id"):
-            raise HTTPException(status_code=401, detail="User not authenticated")
+        await _get_db_user(db, user)
 
-        # Get user ID
-        db_user = db.query(User).filter(User.external_id == user["external_id"]).first()
-        if not db_user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Build query (same as resolution history)
-        query = db.query(Bet).filter(
-            and_(
-                Bet.resolved_at.isnot(None),
-                Bet.external_user_id == user["external_id"]
-            )
+        # Same filters as resolution history
+        conditions = _resolution_conditions(
+            user["external_id"], start_date, end_date, result, resolver_id, has_dispute
         )
 
-        # Apply filters (same logic as resolution history)
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                query = query.filter(Bet.resolved_at >= start_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid start_date format. Use YYYY-MM-DD")
-
-        if end_date:
-            try:
-                end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-                query = query.filter(Bet.resolved_at < end_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD")
-
-        if result:
-            query = query.filter(Bet.result == result)
-
-        if resolver_id:
-            query = query.filter(Bet.resolved_by == resolver_id)
-
-        if has_dispute is not None:
-            query = query.filter(Bet.is_disputed == has_dispute)
-
         # Get all matching bets
-        bets = query.order_by(Bet.resolved_at.desc()).all()
+        bets = (await db.scalars(
+            select(Bet).where(*conditions).order_by(Bet.resolved_at.desc())
+        )).all()
+        resolver_names = await _resolver_names(db, bets)
 
         # Convert to export format
         export_data = []
@@ -342,13 +318,6 @@ async def export_resolution_data(
                 delta = bet.resolved_at - bet.created_at
                 resolution_time_hours = delta.total_seconds() / 3600
 
-            # Get resolver name
-            resolver_name = "Unknown"
-            if bet.resolved_by:
-                resolver = db.query(User).filter(User.id == bet.resolved_by).first()
-                if resolver:
-                    resolver_name = resolver.name or "Unknown"
-
             export_data.append({
                 "id": bet.id,
                 "bet_id": bet.id,
@@ -358,7 +327,7 @@ async def export_resolution_data(
                 "result": bet.result or "Unknown",
                 "resolved_at": bet.resolved_at.isoformat() if bet.resolved_at else "",
                 "resolved_by": bet.resolved_by or 0,
-                "resolver_name": resolver_name,
+                "resolver_name": resolver_names.get(bet.resolved_by, "Unknown"),
                 "resolution_notes": bet.resolution_notes,
                 "is_disputed": bet.is_disputed or False,
                 "dispute_reason": bet.dispute_reason,
@@ -398,4 +367,3 @@ async def export_resolution_data(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to export resolution data: {str(e)}")
-
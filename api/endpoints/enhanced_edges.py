@@ -3,10 +3,11 @@
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..crud import edge_crud
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..models import EdgeStatus
 from ..schemas import EdgeCreateRequest, EdgeListResponse, EdgeResponse, EdgeUpdateRequest
 
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/enhanced-edges", tags=["Enhanced Edges"])
 
 
 @router.get("/", response_model=EdgeListResponse)
-def get_edges(
+async def get_edges(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     sport_key: Optional[str] = Query(None, description="Filter by sport"),
@@ -27,7 +28,7 @@ def get_edges(
     sportsbook: Optional[str] = Query(None, description="Filter by sportsbook"),
     strategy_tag: Optional[str] = Query(None, description="Filter by strategy"),
     active_only: bool = Query(True, description="Only return active edges"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get arbitrage edges with comprehensive filtering and pagination"""
 
@@ -56,73 +57,79 @@ def get_edges(
 
     # Get edges
     if search_filters:
-        edges = edge_crud.search_edges(db=db, search_filters=search_filters, skip=skip, limit=limit)
-        total = edge_crud.count(db=db, filters=search_filters)
+        edges = await edge_crud.search_edges_async(
+            db=db, search_filters=search_filters, skip=skip, limit=limit
+        )
+        total = await edge_crud.count_async(db=db, filters=search_filters)
     else:
-        edges = edge_crud.get_active_edges(
+        edges = await edge_crud.get_active_edges_async(
             db=db, skip=skip, limit=limit, min_edge_percentage=min_edge or 0.0
         )
-        total = edge_crud.count(db=db, filters={"status": EdgeStatus.ACTIVE, "is_stale": False})
+        total = await edge_crud.count_async(
+            db=db, filters={"status": EdgeStatus.ACTIVE, "is_stale": False}
+        )
 
     return EdgeListResponse(edges=edges, total=total, page=skip // limit + 1, per_page=limit)
 
 
 @router.get("/top", response_model=List[EdgeResponse])
-def get_top_edges(
+async def get_top_edges(
     limit: int = Query(20, ge=1, le=100, description="Number of top edges to return"),
     min_kelly: float = Query(0.01, ge=0, description="Minimum Kelly fraction"),
     sport_key: Optional[str] = Query(None, description="Filter by sport"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get top arbitrage edges by expected value"""
-    edges = edge_crud.get_top_edges(db=db, limit=limit, min_kelly=min_kelly, sport_key=sport_key)
+    edges = await edge_crud.get_top_edges_async(
+        db=db, limit=limit, min_kelly=min_kelly, sport_key=sport_key
+    )
     return edges
 
 
 @router.get("/statistics")
-def get_edge_statistics(db: Session = Depends(get_db)):
+async def get_edge_statistics(db: AsyncSession = Depends(get_async_db)):
     """Get overall edge statistics"""
-    stats = edge_crud.get_edge_statistics(db=db)
+    stats = await edge_crud.get_edge_statistics_async(db=db)
     return stats
 
 
 @router.get("/by-event/{event_id}", response_model=List[EdgeResponse])
-def get_edges_by_event(
+async def get_edges_by_event(
     event_id: str,
     active_only: bool = Query(True, description="Only return active edges"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all edges for a specific event"""
-    edges = edge_crud.get_by_event(db=db, event_id=event_id, active_only=active_only)
+    edges = await edge_crud.get_by_event_async(db=db, event_id=event_id, active_only=active_only)
     return edges
 
 
 @router.get("/by-player/{player}", response_model=List[EdgeResponse])
-def get_edges_by_player(
+async def get_edges_by_player(
     player: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True, description="Only return active edges"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get edges for a specific player"""
-    edges = edge_crud.get_by_player(
+    edges = await edge_crud.get_by_player_async(
         db=db, player=player, skip=skip, limit=limit, active_only=active_only
     )
     return edges
 
 
 @router.get("/by-sport/{sport_key}/{season}/{week}", response_model=List[EdgeResponse])
-def get_edges_by_sport_week(
+async def get_edges_by_sport_week(
     sport_key: str,
     season: int,
     week: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get edges for a specific sport, season, and week"""
-    edges = edge_crud.get_by_sport_and_week(
+    edges = await edge_crud.get_by_sport_and_week_async(
         db=db, sport_key=sport_key, season=season, week=week, skip=skip, limit=limit
     )
     return edges
@@ -172,9 +179,9 @@ def cleanup_expired_edges(db: Session = Depends(get_db)):
 
 
 @router.get("/{edge_id}", response_model=EdgeResponse)
-def get_edge(edge_id: int, db: Session = Depends(get_db)):
+async def get_edge(edge_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get edge by ID"""
-    edge = edge_crud.get(db=db, id=edge_id)
+    edge = await edge_crud.get_async(db=db, id=edge_id)
     if not edge:
         raise HTTPException(status_code=404, detail="Edge not found")
     return edge
@@ -0,0 +1,92 @@
+"""
+Push stream of best-line and edge deltas
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+
+from ..services.market_stream import STREAMS, MarketStream
+from ..settings import settings
+from ..utils.broadcast import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Deltas are computed per worker, so this manager fans out locally only
+manager = ConnectionManager(channel="market-updates", queue_size=settings.websocket_queue_size)
+stream = MarketStream(manager, poll_interval=settings.market_stream_poll_seconds)
+
+
+@router.websocket("/ws/market-updates")
+async def market_updates_endpoint(websocket: WebSocket):
+    """
+    WebSocket stream of ``current_best_lines`` and edge changes
+
+    On connect the client receives an ``odds_snapshot`` and an ``edges_snapshot``.
+    After that only ``odds_delta`` / ``edges_delta`` messages arrive, each with
+    ``upserts`` (changed keys → full row), ``removed`` keys and a per-stream
+    ``seq``. If a delta's ``seq`` is not the previous one plus one, send
+    ``{"type": "resync", "streams": ["odds"]}`` to get a fresh snapshot.
+    """
+    await manager.connect(websocket, "anonymous")
+
+    try:
+        for snapshot in stream.snapshots():
+            await manager.send_json(websocket, snapshot)
+
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                message_type = message.get("type")
+
+                if message_type == "ping":
+                    await manager.send_json(websocket, {
+                        "type": "pong",
+                        "timestamp": datetime.now(timezone.utc).isoformat()
+                    })
+                elif message_type == "resync":
+                    for snapshot in stream.snapshots(message.get("streams")):
+                        await manager.send_json(websocket, snapshot)
+                elif message_type == "subscribe":
+                    subscription = manager.subscribe(websocket, message.get("subscription", {}))
+                    await manager.send_json(websocket, {
+                        "type": "subscription_confirmed",
+                        "subscription": subscription.to_dict(),
+                        "timestamp": datetime.now(timezone.utc).isoformat()
+                    })
+
+            except WebSocketDisconnect:
+                break
+            except json.JSONDecodeError:
+                await manager.send_json(websocket, {
+                    "type": "error",
+                    "message": "Invalid JSON format",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                })
+            except Exception as e:
+                if not manager.is_connected(websocket):
+                    break
+                logger.error(f"Market stream WebSocket error: {e}")
+                await manager.send_json(websocket, {
+                    "type": "error",
+                    "message": "Internal server error",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                })
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
+
+
+@router.get("/market/snapshot")
+async def market_snapshot(
+    streams: Optional[List[str]] = Query(None, description=f"Streams to include: {', '.join(STREAMS)}")
+):
+    """Current snapshot and sequence number per stream (HTTP resync fallback)"""
+    return {"snapshots": stream.snapshots(streams)}
@@ -2,21 +2,38 @@
 
 from typing import Annotated, List, Optional, cast
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import CurrentBestLine, Event
 from ..schemas import OddsBestLinesResponse, OddsResponse
+from ..services.market_stream import read_market_versions
+from ..settings import settings
 from ..utils.odds_conversion import american_to_decimal
+from ..utils.response_cache import cached_response, create_response_cache
 
 router = APIRouter()
 
+response_cache = create_response_cache(
+    max_entries=settings.response_cache_max_entries,
+    redis_url=settings.response_cache_redis_url,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+)
+
+
+async def best_lines_version(arguments) -> str:
+    """Token that changes whenever the poller rewrites current_best_lines"""
+    versions = await arguments["db"].run_sync(read_market_versions)
+    return ",".join(f"{name}={version}" for name, version in sorted(versions.items()))
+
 
 @router.get("/best", response_model=OddsBestLinesResponse, tags=["odds"])
+@cached_response(response_cache, version=best_lines_version)
 async def get_best_odds(
-    db: Annotated[Session, Depends(get_db)],
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     market: Annotated[Optional[str], Query(description="Market type filter")] = "player_props",
     limit: Annotated[int, Query(ge=1, le=1000, description="Maximum results to return")] = 100,
 ) -> OddsBestLinesResponse:
@@ -28,14 +45,14 @@ async def get_best_odds(
     """
     try:
         # Build query with optional market filter
-        query = db.query(CurrentBestLine)
+        query = select(CurrentBestLine)
 
         if market:
             if market != "player_props":
-                query = query.filter(CurrentBestLine.market == market)
+                query = query.where(CurrentBestLine.market == market)
 
         # Get limited results
-        odds_lines = query.limit(limit).all()
+        odds_lines = (await db.scalars(query.limit(limit))).all()
 
         # Convert to response format
         lines = []
@@ -63,9 +80,11 @@ async def get_best_odds(
 
 
 @router.get("/event/{event_id}", response_model=List[OddsResponse], tags=["odds"])
+@cached_response(response_cache, version=best_lines_version)
 async def get_event_odds(
+    request: Request,
     event_id: str, 
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_async_db)]
 ) -> List[OddsResponse]:
     """
     Get all best odds for a specific event
@@ -73,7 +92,9 @@ async def get_event_odds(
     Returns all current best lines for the specified event.
     """
     try:
-        odds_lines = db.query(CurrentBestLine).filter(CurrentBestLine.event_id == event_id).all()
+        odds_lines = (
+            await db.scalars(select(CurrentBestLine).where(CurrentBestLine.event_id == event_id))
+        ).all()
 
         lines = []
         for line in odds_lines:
@@ -96,3 +117,9 @@ async def get_event_odds(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch event odds: {str(e)}")
+
+
+@router.get("/cache-stats", tags=["odds"])
+async def get_cache_stats():
+    """Hit rate of the odds response cache, overall and per route"""
+    return response_cache.get_stats()
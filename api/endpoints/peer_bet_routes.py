@@ -1,7 +1,7 @@
 import logging
 from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from api.auth.dependencies import get_current_user_from_token, get_current_user_optional, CurrentUser, OptionalUser
@@ -10,10 +10,17 @@ from api.enums.betting_enums import BetCategory, BetStatus
 from api.exceptions.betting_exceptions import (
     BetCreationError,
     BetNotFoundError,
+    BetParticipationError,
     BetValidationError,
     UnauthorizedBetActionError,
 )
-from api.schemas.bet_schemas import PeerBetCreateRequest, PeerBetResponse, PeerBetSummaryResponse
+from api.schemas.bet_schemas import (
+    PeerBetCreateRequest,
+    PeerBetParticipantResponse,
+    PeerBetParticipateRequest,
+    PeerBetResponse,
+    PeerBetSummaryResponse,
+)
 from api.services.peer_bet_service import PeerBetService
 
 logger = logging.getLogger(__name__)
@@ -62,15 +69,27 @@ async def get_peer_bet(
 @router.get("/", response_model=List[PeerBetSummaryResponse])
 async def get_public_peer_bets(
     db: Annotated[Session, Depends(get_db)],
+    response: Response,
     category: Annotated[Optional[BetCategory], Query(description="Filter by category")] = None,
     bet_status: Annotated[Optional[BetStatus], Query(description="Filter by status")] = None,
+    tag: Annotated[Optional[str], Query(max_length=50, description="Filter by tag")] = None,
     limit: Annotated[int, Query(ge=1, le=100, description="Number of bets to return")] = 50,
     offset: Annotated[int, Query(ge=0, description="Number of bets to skip")] = 0,
+    cursor: Annotated[
+        Optional[str], Query(description="X-Next-Cursor of the previous page; replaces offset")
+    ] = None,
 ) -> List[PeerBetSummaryResponse]:
     """Get public peer bets with optional filtering"""
     try:
         service = PeerBetService(db)
-        return service.get_public_bets(category, bet_status, limit, offset)
+        bets, next_cursor = service.get_public_bets(
+            category, bet_status, limit, offset, tag=tag, cursor=cursor
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return bets
+    except BetValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching public bets: {str(e)}")
         raise HTTPException(
@@ -118,3 +137,33 @@ async def publish_peer_bet(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to publish bet"
         )
+
+
+@router.post(
+    "/{bet_id}/join",
+    response_model=PeerBetParticipantResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def join_peer_bet(
+    bet_id: int,
+    request: PeerBetParticipateRequest,
+    current_user: CurrentUser,
+    db: Annotated[Session, Depends(get_db)],
+) -> PeerBetParticipantResponse:
+    """Join a peer bet on one of its outcomes"""
+    try:
+        service = PeerBetService(db)
+        return service.join_bet(bet_id, int(current_user.id), request)
+    except BetNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bet not found")
+    except UnauthorizedBetActionError:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    except BetParticipationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except BetValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error joining bet: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to join bet"
+        )
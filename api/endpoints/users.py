@@ -5,6 +5,7 @@ from typing import Annotated, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from ..auth.auth_cache import principal_cache
 from ..crud import bet_crud, transaction_crud, user_crud
 from ..database import get_db
 from ..models import UserStatus
@@ -76,6 +77,7 @@ def update_user(
         raise HTTPException(status_code=404, detail="User not found")
 
     updated_user = user_crud.update(db=db, db_obj=user, obj_in=user_update)
+    principal_cache.invalidate(user_id)
     return updated_user
 
 
@@ -88,6 +90,7 @@ def delete_user(
     user = user_crud.remove(db=db, id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    principal_cache.invalidate(user_id)
     return {"message": "User deleted successfully"}
 
 
@@ -101,6 +104,7 @@ def verify_user(
     user = user_crud.verify_user(db=db, user_id=user_id, verification_level=verification_level)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    principal_cache.invalidate(user_id)
     return user
 
 
@@ -113,6 +117,8 @@ def suspend_user(
     user = user_crud.suspend_user(db=db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    # Status changes must reach authentication now, not when the cached principal expires
+    principal_cache.invalidate(user_id)
     return user
 
 
@@ -125,6 +131,7 @@ def reactivate_user(
     user = user_crud.reactivate_user(db=db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    principal_cache.invalidate(user_id)
     return user
 
 
@@ -4,7 +4,7 @@ WebSocket endpoints for real-time bet updates
 
 import json
 import logging
-from typing import Dict, List, Optional, Set
+from typing import Optional
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends
@@ -13,72 +13,17 @@ from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models import Bet, BetStatus
-from ..services.bet_service import BetService
 from ..repositories.bet_repository import BetRepository
+from ..settings import settings
+from ..utils.broadcast import ConnectionManager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 security = HTTPBearer(auto_error=False)
 
-# Store active WebSocket connections
-class ConnectionManager:
-    def __init__(self):
-        # Dictionary to store connections by user_id
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        # Dictionary to store connections by connection_id for cleanup
-        self.connection_ids: Dict[WebSocket, str] = {}
-
-    async def connect(self, websocket: WebSocket, user_id: str):
-        await websocket.accept()
-        
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        
-        self.active_connections[user_id].append(websocket)
-        self.connection_ids[websocket] = user_id
-        
-        logger.info(f"WebSocket connected for user {user_id}. Total connections: {len(self.active_connections[user_id])}")
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.connection_ids:
-            user_id = self.connection_ids[websocket]
-            
-            if user_id in self.active_connections:
-                self.active_connections[user_id].remove(websocket)
-                
-                # Remove user entry if no more connections
-                if not self.active_connections[user_id]:
-                    del self.active_connections[user_id]
-            
-            del self.connection_ids[websocket]
-            
-            logger.info(f"WebSocket disconnected for user {user_id}")
-
-    async def send_personal_message(self, message: dict, user_id: str):
-        if user_id in self.active_connections:
-            # Send to all connections for this user
-            for connection in self.active_connections[user_id][:]:  # Copy list to avoid modification during iteration
-                try:
-                    await connection.send_text(json.dumps(message))
-                except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {e}")
-                    # Remove broken connection
-                    self.disconnect(connection)
-
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected users"""
-        for user_id, connections in self.active_connections.items():
-            await self.send_personal_message(message, user_id)
-
-    def get_connection_count(self) -> int:
-        return sum(len(connections) for connections in self.active_connections.values())
-
-    def get_user_connection_count(self, user_id: str) -> int:
-        return len(self.active_connections.get(user_id, []))
-
 # Global connection manager
-manager = ConnectionManager()
+manager = ConnectionManager(channel="bet-updates", queue_size=settings.websocket_queue_size)
 
 @router.websocket("/ws/bet-updates")
 async def websocket_endpoint(
@@ -95,12 +40,12 @@ async def websocket_endpoint(
     
     try:
         # Send initial connection confirmation
-        await websocket.send_text(json.dumps({
+        await manager.send_json(websocket, {
             "type": "connection_established",
             "message": "Connected to bet updates",
             "user_id": user_id,
             "timestamp": datetime.now(timezone.utc).isoformat()
-        }))
+        })
         
         # Keep connection alive and handle incoming messages
         while True:
@@ -111,33 +56,37 @@ async def websocket_endpoint(
                 
                 # Handle different message types
                 if message.get("type") == "ping":
-                    await websocket.send_text(json.dumps({
+                    await manager.send_json(websocket, {
                         "type": "pong",
                         "timestamp": datetime.now(timezone.utc).isoformat()
-                    }))
+                    })
                 elif message.get("type") == "subscribe":
-                    # Handle subscription to specific bet types or events
-                    await websocket.send_text(json.dumps({
+                    # Filter future updates to specific events, users or update types
+                    subscription = manager.subscribe(websocket, message.get("subscription", {}))
+                    await manager.send_json(websocket, {
                         "type": "subscription_confirmed",
-                        "subscription": message.get("subscription", {}),
+                        "subscription": subscription.to_dict(),
                         "timestamp": datetime.now(timezone.utc).isoformat()
-                    }))
+                    })
                     
             except WebSocketDisconnect:
                 break
             except json.JSONDecodeError:
-                await websocket.send_text(json.dumps({
+                await manager.send_json(websocket, {
                     "type": "error",
                     "message": "Invalid JSON format",
                     "timestamp": datetime.now(timezone.utc).isoformat()
-                }))
+                })
             except Exception as e:
+                if not manager.is_connected(websocket):
+                    # Dropped as a slow consumer; the socket is already closing
+                    break
                 logger.error(f"WebSocket error: {e}")
-                await websocket.send_text(json.dumps({
+                await manager.send_json(websocket, {
                     "type": "error",
                     "message": "Internal server error",
                     "timestamp": datetime.now(timezone.utc).isoformat()
-                }))
+                })
                 
     except WebSocketDisconnect:
         pass
@@ -153,7 +102,8 @@ async def websocket_status():
         "connections_by_user": {
             user_id: manager.get_user_connection_count(user_id)
             for user_id in manager.active_connections.keys()
-        }
+        },
+        "broadcast": manager.get_stats(),
     }
 
 @router.get("/api/v1/bets/updates")
@@ -242,13 +192,15 @@ async def send_bet_resolution_update(
     bet_id: str,
     user_id: str,
     update_type: str,
-    data: dict
+    data: dict,
+    event_id: Optional[str] = None
 ):
     """Send bet resolution update to connected clients"""
     message = {
         "type": update_type,
         "bet_id": bet_id,
         "user_id": user_id,
+        "event_id": event_id,
         "data": data,
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
@@ -295,7 +247,8 @@ async def send_bet_status_update(
         bet_id=str(bet.id),
         user_id=user_id,
         update_type=update_type,
-        data=update_data
+        data=update_data,
+        event_id=getattr(bet, "event_id", None)
     )
 
 # Function to send dispute resolution updates
@@ -319,7 +272,8 @@ async def send_dispute_resolution_update(
         bet_id=str(bet.id),
         user_id=user_id,
         update_type="dispute_resolved",
-        data=update_data
+        data=update_data,
+        event_id=getattr(bet, "event_id", None)
     )
 
 # Export the manager for use in other modules
@@ -4,6 +4,7 @@ Sprint 1 MVP: User layer extension for existing betting analytics system
 """
 
 import logging
+import math
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -11,12 +12,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from .auth import endpoints as auth_endpoints
-from .database import init_database
-from .endpoints import bets, digest, edges, enhanced_edges, health, odds, peer_bet_routes, users, websocket, analytics
+from .auth.password_hasher import password_hasher
+from .database import dispose_database, init_database
+from .endpoints import bets, digest, edges, enhanced_edges, health, market_stream, odds, peer_bet_routes, users, websocket, analytics
 from .errors import add_error_handlers
+from .services.email_queue import email_queue
 from .settings import settings
+from .utils.broadcast import create_pubsub_backend
 from .utils.logging_middleware import LoggingMiddleware
-from .utils.ratelimit import RateLimiter
+from .utils.ratelimit import RedisRateLimiter, RouteTemplateResolver, create_rate_limiter
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
@@ -27,8 +31,22 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Bet-That API v0.2")
     init_database()
     logger.info(f"Database initialized at {settings.db_path}")
+    pubsub = create_pubsub_backend(settings.pubsub_url)
+    await websocket.manager.start(pubsub)
+    logger.info(f"WebSocket relay using {type(pubsub).__name__}")
+    market_stream.stream.start()
+    email_queue.start()
     yield
     logger.info("Shutting down Bet-That API")
+    await market_stream.stream.stop()
+    await email_queue.stop()
+    await websocket.manager.stop()
+    await pubsub.close()
+    if isinstance(rate_limiter, RedisRateLimiter):
+        await rate_limiter.close()
+    await odds.response_cache.close()
+    password_hasher.shutdown()
+    await dispose_database()
 
 
 app = FastAPI(
@@ -64,9 +82,13 @@ app.add_middleware(
 app.add_middleware(LoggingMiddleware)
 add_error_handlers(app)
 
-rate_limiter = RateLimiter(
-    requests_per_minute=settings.rate_limit_requests, window_seconds=settings.rate_limit_window
+rate_limiter = create_rate_limiter(
+    requests_per_minute=settings.rate_limit_requests,
+    window_seconds=settings.rate_limit_window,
+    backend_url=settings.rate_limit_backend_url,
+    max_keys=settings.rate_limit_max_keys,
 )
+route_resolver = RouteTemplateResolver()
 
 
 @app.middleware("http")
@@ -74,14 +96,15 @@ async def rate_limit_middleware(request: Request, call_next):
     client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip() or (
         request.client.host if request.client else "unknown"
     )
-    route_key = f"{request.method}:{request.url.path}"
+    route_key = f"{request.method}:{route_resolver.resolve(request.scope)}"
 
-    if not rate_limiter.is_allowed(client_ip, route_key):
+    decision = await rate_limiter.hit(client_ip, route_key)
+    if not decision.allowed:
         return JSONResponse(
             status_code=429,
             content={"error": "Rate limit exceeded", "detail": "Too many requests"},
             headers={
-                "Retry-After": str(settings.rate_limit_window),
+                "Retry-After": str(max(1, math.ceil(decision.retry_after))),
                 "X-RateLimit-Limit": str(settings.rate_limit_requests),
                 "X-Compliance-Disclaimer": settings.compliance_disclaimer,
                 "X-User-IP-Logged": "true",
@@ -105,6 +128,7 @@ app.include_router(enhanced_edges.router)
 app.include_router(users.router)
 app.include_router(peer_bet_routes.router)
 app.include_router(websocket.router, tags=["WebSocket"])
+app.include_router(market_stream.router, tags=["WebSocket"])
 
 
 @app.get("/")
@@ -72,6 +72,13 @@ class UserStatus(str, Enum):
     BANNED = "banned"
 
 
+class EmailStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 # EXISTING TABLES (Read-only)
 class CurrentBestLine(Base):
     __tablename__ = "current_best_lines"
@@ -712,6 +719,9 @@ class PeerBet(Base):
         "PeerBetParticipant", back_populates="peer_bet", cascade="all, delete-orphan"
     )
     outcomes: Mapped[List["PeerBetOutcome"]] = relationship("PeerBetOutcome", back_populates="peer_bet", cascade="all, delete-orphan")
+    tag_rows: Mapped[List["PeerBetTag"]] = relationship(
+        "PeerBetTag", back_populates="peer_bet", cascade="all, delete-orphan"
+    )
 
     # Table constraints
     __table_args__ = (
@@ -742,6 +752,8 @@ class PeerBet(Base):
         Index("idx_peer_bets_locks_at", "locks_at"),
         Index("idx_peer_bets_resolves_at", "resolves_at"),
         Index("idx_peer_bets_deleted", "deleted_at"),
+        # Keyset pagination of the public feed: (created_at, id) descending
+        Index("idx_peer_bets_public_feed", "is_public", "created_at", "id"),
     )
 
     @property
@@ -826,6 +838,25 @@ class PeerBetOutcome(Base):
     )
 
 
+class PeerBetTag(Base):
+    """Normalized tag of a peer bet, indexed for feed filtering"""
+
+    __tablename__ = "peer_bet_tags"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bet_id = Column(Integer, ForeignKey("peer_bets.id"), nullable=False, index=True)
+    tag = Column(String(50), nullable=False)
+
+    # Relationships
+    peer_bet: Mapped["PeerBet"] = relationship("PeerBet", back_populates="tag_rows")
+
+    # Table constraints
+    __table_args__ = (
+        UniqueConstraint("bet_id", "tag", name="unique_peer_bet_tag"),
+        Index("idx_peer_bet_tags_tag_bet", "tag", "bet_id"),
+    )
+
+
 class PeerBetParticipant(Base):
     """User participation in a specific peer bet"""
 
@@ -1060,3 +1091,24 @@ class UserSession(Base):
         Index("idx_user_sessions_user_active", "user_id", "is_active"),
         Index("idx_user_sessions_expires_active", "expires_at", "is_active"),
     )
+
+
+class OutboundEmail(Base):
+    """Outbound email job, rendered at enqueue time and delivered by the mail queue worker"""
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    to_address = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_body = Column(Text, nullable=False)
+    status = Column(String(20), default=EmailStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    # Due time while pending; lease expiry while a worker holds the job
+    next_attempt_at = Column(DateTime, default=func.now(), nullable=False)
+    claim_token = Column(String(32), nullable=True, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("idx_email_outbox_status_due", "status", "next_attempt_at"),)
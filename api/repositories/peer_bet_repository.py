@@ -1,17 +1,33 @@
 import json
 import logging
 from datetime import datetime
-from typing import List, Optional, Tuple, cast
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple, cast
 
-from sqlalchemy import and_, asc, desc, or_
+from sqlalchemy import and_, asc, desc, insert, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from api.enums.betting_enums import BetStatus, BetType, OutcomeStatus
-from api.models import PeerBet, PeerBetOutcome, PeerBetParticipant, User
+from api.enums.betting_enums import BetStatus, BetType, OutcomeStatus, ParticipantStatus
+from api.exceptions.betting_exceptions import BetParticipationError
+from api.models import PeerBet, PeerBetOutcome, PeerBetParticipant, PeerBetTag, User
 from api.schemas.bet_schemas import PeerBetCreateRequest
 
 logger = logging.getLogger(__name__)
 
+# (created_at, id) of the last row of the previous page
+FeedCursor = Tuple[datetime, int]
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """Lowercase, trim and de-duplicate tags, preserving their order"""
+    seen: List[str] = []
+    for tag in tags or []:
+        value = tag.strip().lower()[:50]
+        if value and value not in seen:
+            seen.append(value)
+    return seen
+
 
 class PeerBetRepository:
     def __init__(self, db: Session) -> None:
@@ -21,7 +37,9 @@ class PeerBetRepository:
         """Create a new peer bet with outcomes"""
         try:
             # Prepare possible outcomes as JSON
-            possible_outcomes = [outcome.dict() for outcome in bet_data.possible_outcomes]
+            possible_outcomes = [
+                outcome.model_dump(mode="json") for outcome in bet_data.possible_outcomes
+            ]
 
             # Create the peer bet
             peer_bet = PeerBet(
@@ -47,18 +65,28 @@ class PeerBetRepository:
             self.db.add(peer_bet)
             self.db.flush()  # Get the ID
 
-            # Create bet outcomes
-            for i, outcome_data in enumerate(bet_data.possible_outcomes):
-                outcome = PeerBetOutcome(
-                    bet_id=peer_bet.id,
-                    name=outcome_data.name,
-                    description=outcome_data.description,
-                    odds=outcome_data.odds,
-                    order_index=i,
-                    status=OutcomeStatus.PENDING,
-                    created_at=datetime.utcnow(),
+            # Outcomes and tags go in as one executemany each
+            now = datetime.utcnow()
+            self.db.execute(
+                insert(PeerBetOutcome),
+                [
+                    {
+                        "bet_id": peer_bet.id,
+                        "name": outcome_data.name,
+                        "description": outcome_data.description,
+                        "odds": outcome_data.odds,
+                        "order_index": i,
+                        "status": OutcomeStatus.PENDING,
+                        "created_at": now,
+                    }
+                    for i, outcome_data in enumerate(bet_data.possible_outcomes)
+                ],
+            )
+            tags = normalize_tags(bet_data.tags)
+            if tags:
+                self.db.execute(
+                    insert(PeerBetTag), [{"bet_id": peer_bet.id, "tag": tag} for tag in tags]
                 )
-                self.db.add(outcome)
 
             self.db.commit()
             self.db.refresh(peer_bet)
@@ -91,8 +119,16 @@ class PeerBetRepository:
         status: Optional[BetStatus] = None,
         limit: int = 50,
         offset: int = 0,
+        tag: Optional[str] = None,
+        after: Optional[FeedCursor] = None,
     ) -> List[PeerBet]:
-        """Get public peer bets with optional filtering"""
+        """Get public peer bets, newest first, with optional filtering
+
+        Pass ``after`` (the (created_at, id) of the last row already seen)
+        for keyset pagination; its cost does not grow with depth the way
+        ``offset`` does. Participant counts and stake totals come from the
+        denormalized columns, so no participant rows are loaded.
+        """
         query = self.db.query(PeerBet).filter(PeerBet.is_public.is_(True))
 
         if category:
@@ -101,7 +137,23 @@ class PeerBetRepository:
         if status:
             query = query.filter(PeerBet.status == status)
 
-        return query.order_by(desc(PeerBet.created_at)).offset(offset).limit(limit).all()
+        if tag:
+            query = query.join(PeerBetTag, PeerBetTag.bet_id == PeerBet.id).filter(
+                PeerBetTag.tag == tag.strip().lower()
+            )
+
+        if after is not None:
+            created_at, bet_id = after
+            query = query.filter(
+                or_(
+                    PeerBet.created_at < created_at,
+                    and_(PeerBet.created_at == created_at, PeerBet.id < bet_id),
+                )
+            )
+        elif offset:
+            query = query.offset(offset)
+
+        return query.order_by(desc(PeerBet.created_at), desc(PeerBet.id)).limit(limit).all()
 
     def update_peer_bet_status(self, bet_id: int, status: BetStatus) -> bool:
         """Update peer bet status"""
@@ -127,6 +179,89 @@ class PeerBetRepository:
             .all()
         )
 
+    def add_participant(
+        self,
+        bet_id: int,
+        user_id: int,
+        chosen_outcome: str,
+        stake_amount: Decimal,
+        potential_payout: Decimal,
+    ) -> PeerBetParticipant:
+        """Join a bet, keeping its participant count and stake pool in step
+
+        The counters are bumped with conditional ``UPDATE`` statements in
+        the same transaction as the insert, so concurrent joins cannot
+        overshoot ``participant_limit``; the same guard applies the
+        ``starts_at``/``locks_at`` window of ``PeerBet.is_active``.
+        """
+        try:
+            now = datetime.utcnow()
+            joined = (
+                self.db.query(PeerBet)
+                .filter(
+                    PeerBet.id == bet_id,
+                    PeerBet.status == BetStatus.ACTIVE,
+                    or_(PeerBet.starts_at.is_(None), PeerBet.starts_at <= now),
+                    or_(PeerBet.locks_at.is_(None), PeerBet.locks_at > now),
+                    or_(
+                        PeerBet.participant_limit.is_(None),
+                        PeerBet.current_participants < PeerBet.participant_limit,
+                    ),
+                )
+                .update(
+                    {
+                        "current_participants": PeerBet.current_participants + 1,
+                        "total_stake_pool": PeerBet.total_stake_pool + stake_amount,
+                        "updated_at": now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if not joined:
+                raise BetParticipationError("Bet is not accepting participants")
+
+            matched = (
+                self.db.query(PeerBetOutcome)
+                .filter(
+                    PeerBetOutcome.bet_id == bet_id,
+                    PeerBetOutcome.name == chosen_outcome,
+                    PeerBetOutcome.is_active.is_(True),
+                )
+                .update(
+                    {
+                        "participant_count": PeerBetOutcome.participant_count + 1,
+                        "total_stakes": PeerBetOutcome.total_stakes + stake_amount,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if not matched:
+                raise BetParticipationError(f"Unknown outcome: {chosen_outcome}")
+
+            participant = PeerBetParticipant(
+                bet_id=bet_id,
+                user_id=user_id,
+                chosen_outcome=chosen_outcome,
+                stake_amount=stake_amount,
+                potential_payout=potential_payout,
+                status=ParticipantStatus.ACTIVE,
+                joined_at=now,
+            )
+            self.db.add(participant)
+            self.db.commit()
+            self.db.refresh(participant)
+
+            logger.info(f"User {user_id} joined peer bet {bet_id}")
+            return participant
+
+        except IntegrityError:
+            self.db.rollback()
+            raise BetParticipationError("User has already joined this bet")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to join peer bet: {str(e)}")
+            raise
+
     def can_user_create_bet(self, user_id: int) -> Tuple[bool, str]:
         """Check if user can create a new bet (rate limiting, etc.)"""
         # Check if user exists and is active
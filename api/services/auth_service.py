@@ -6,7 +6,7 @@ with comprehensive validation and error handling.
 
 import logging
 from datetime import datetime
-from typing import Optional, cast
+from typing import Callable, Optional, cast
 
 from sqlalchemy.orm import Session
 
@@ -19,7 +19,7 @@ from ..auth.exceptions import (
     UserNotFoundError,
 )
 from ..auth.jwt_auth import jwt_auth
-from ..auth.simple_password import verify_password_pbkdf2
+from ..auth.password_hasher import check_password, password_hasher
 from ..auth_schemas import (
     AuthResponse,
     RegistrationResponse,
@@ -87,11 +87,17 @@ class AuthService:
             self.db.rollback()
             raise
 
-    def login_user(self, login_data: UserLoginRequest) -> AuthResponse:
+    def login_user(
+        self,
+        login_data: UserLoginRequest,
+        save_password_hash: Optional[Callable[[int, str], None]] = None,
+    ) -> AuthResponse:
         """Authenticate user and return tokens
 
         Args:
             login_data: User login information
+            save_password_hash: Stores ``(user_id, new_hash)`` when an outdated
+                hash is upgraded in the background; without it nothing is upgraded
 
         Returns:
             Authentication response with tokens and user data
@@ -111,10 +117,20 @@ class AuthService:
                 )
                 raise InvalidCredentialsError("Invalid email/username or password")
 
-            # Verify password
-            if not user.password_hash or not verify_password_pbkdf2(
-                login_data.password, cast(str, user.password_hash)
-            ):
+            # Verify password (either stored format); outdated hashes are upgraded
+            password_hash = cast(str, user.password_hash)
+            user_id = cast(int, user.id)
+            if save_password_hash is None:
+                is_valid = bool(password_hash) and check_password(
+                    login_data.password, password_hash
+                )
+            else:
+                is_valid = bool(password_hash) and password_hasher.check_and_upgrade(
+                    login_data.password,
+                    password_hash,
+                    lambda new_hash: save_password_hash(user_id, new_hash),
+                )
+            if not is_valid:
                 logger.warning(f"Invalid password for user: {user.email}")
                 raise InvalidCredentialsError("Invalid email/username or password")
 
@@ -0,0 +1,310 @@
+"""Persistent outbound mail queue with a batching SMTP worker
+
+Request handlers only insert rendered messages into ``email_outbox``. A
+background worker claims due jobs in batches, sends each batch over one
+authenticated SMTP session (kept open between batches while it stays
+healthy), and records the outcome per message. Transient failures are
+retried with exponential backoff; permanent rejections (5xx replies) and
+jobs that exhaust ``max_attempts`` are marked failed.
+
+Claiming stamps a random token and a lease on the rows in one ``UPDATE``, so
+several API workers can share the table. A job whose worker died mid-send
+becomes due again when its lease expires.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import smtplib
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .. import database
+from ..models import EmailStatus, OutboundEmail
+
+if TYPE_CHECKING:
+    from .email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], ContextManager[Session]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_email(db: Session, to_address: str, subject: str, html_body: str) -> OutboundEmail:
+    """Persist a rendered email for the queue worker and commit it"""
+    job = OutboundEmail(
+        to_address=to_address,
+        subject=subject,
+        html_body=html_body,
+        status=EmailStatus.PENDING,
+        next_attempt_at=_utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    email_queue.notify()
+    return job
+
+
+def _is_permanent(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class _Connection:
+    """One SMTP session reused across batches until it goes idle or breaks"""
+
+    def __init__(self, idle_seconds: float):
+        self.idle_seconds = idle_seconds
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._used_at = 0.0
+
+    def get(self, service: "EmailService") -> smtplib.SMTP:
+        if self._smtp is not None:
+            fresh = time.monotonic() - self._used_at < self.idle_seconds
+            try:
+                if fresh and self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        self._smtp = service.open_connection()
+        return self._smtp
+
+    def touch(self) -> None:
+        self._used_at = time.monotonic()
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+
+class EmailQueue:
+    """Claims due outbox rows and delivers them over a shared SMTP session"""
+
+    def __init__(
+        self,
+        session_factory: Optional[SessionFactory] = None,
+        service: Optional["EmailService"] = None,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 3600.0,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 2.0,
+        idle_seconds: float = 60.0,
+    ):
+        self._session_factory = session_factory
+        self._service = service
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.connection = _Connection(idle_seconds)
+        self._table_ready = False
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def service(self) -> "EmailService":
+        if self._service is None:
+            from .email_service import email_service
+
+            self._service = email_service
+        return self._service
+
+    def _session(self) -> ContextManager[Session]:
+        if self._session_factory is not None:
+            return self._session_factory()
+        return database.get_db_session()
+
+    def backoff(self, attempts: int) -> timedelta:
+        seconds = self.backoff_seconds * 2 ** max(attempts - 1, 0)
+        return timedelta(seconds=min(seconds, self.max_backoff_seconds))
+
+    def claim(self, db: Session) -> List[OutboundEmail]:
+        """Lease up to ``batch_size`` due jobs to this worker"""
+        now = _utcnow()
+        due = (
+            db.query(OutboundEmail.id)
+            .filter(
+                OutboundEmail.status.in_([EmailStatus.PENDING, EmailStatus.SENDING]),
+                OutboundEmail.next_attempt_at <= now,
+            )
+            .order_by(OutboundEmail.next_attempt_at, OutboundEmail.id)
+            .limit(self.batch_size)
+        )
+        ids = [job_id for (job_id,) in due]
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        # Re-check the due condition so rows another worker just leased are skipped
+        db.query(OutboundEmail).filter(
+            OutboundEmail.id.in_(ids),
+            OutboundEmail.status.in_([EmailStatus.PENDING, EmailStatus.SENDING]),
+            OutboundEmail.next_attempt_at <= now,
+        ).update(
+            {
+                "status": EmailStatus.SENDING,
+                "claim_token": token,
+                "next_attempt_at": now + timedelta(seconds=self.lease_seconds),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return (
+            db.query(OutboundEmail)
+            .filter(OutboundEmail.claim_token == token)
+            .order_by(OutboundEmail.id)
+            .all()
+        )
+
+    def _deliver(self, jobs: List[OutboundEmail]) -> Dict[int, Optional[Exception]]:
+        """Send ``jobs`` in order; a broken session fails the rest of the batch"""
+        outcomes: Dict[int, Optional[Exception]] = {}
+        service = self.service
+        try:
+            smtp = self.connection.get(service)
+        except Exception as e:
+            logger.error(f"SMTP connection failed: {e}")
+            return {job.id: e for job in jobs}
+        for index, job in enumerate(jobs):
+            message = service.build_message(job.to_address, job.subject, job.html_body)
+            try:
+                smtp.send_message(message)
+                outcomes[job.id] = None
+            except smtplib.SMTPServerDisconnected as e:
+                return self._drop_session(jobs[index:], index, e, outcomes)
+            except smtplib.SMTPException as e:
+                # Rejected by the relay; the session itself is still usable
+                outcomes[job.id] = e
+            except OSError as e:
+                return self._drop_session(jobs[index:], index, e, outcomes)
+        self.connection.touch()
+        return outcomes
+
+    def _drop_session(self, rest: List[OutboundEmail], sent: int, error: Exception, outcomes):
+        logger.warning(f"SMTP session dropped after {sent} messages: {error}")
+        self.connection.close()
+        for job in rest:
+            outcomes[job.id] = error
+        return outcomes
+
+    def _record(self, db: Session, jobs: List[OutboundEmail], outcomes) -> Dict[str, int]:
+        now = _utcnow()
+        counts = {"sent": 0, "retry": 0, "failed": 0}
+        for job in jobs:
+            error = outcomes.get(job.id)
+            job.claim_token = None
+            if error is None:
+                job.status = EmailStatus.SENT
+                job.sent_at = now
+                job.last_error = None
+                counts["sent"] += 1
+                continue
+            job.attempts = (job.attempts or 0) + 1
+            job.last_error = str(error)[:1000]
+            if _is_permanent(error) or job.attempts >= self.max_attempts:
+                job.status = EmailStatus.FAILED
+                counts["failed"] += 1
+                logger.error(f"Email {job.id} to {job.to_address} failed: {error}")
+            else:
+                job.status = EmailStatus.PENDING
+                job.next_attempt_at = now + self.backoff(job.attempts)
+                counts["retry"] += 1
+        db.commit()
+        return counts
+
+    def process_batch(self) -> Dict[str, int]:
+        """Claim, send and record one batch; returns counts per outcome"""
+        with self._session() as db:
+            if not self._table_ready:
+                # Databases created before the outbox existed
+                OutboundEmail.__table__.create(bind=db.get_bind(), checkfirst=True)
+                self._table_ready = True
+            jobs = self.claim(db)
+            if not jobs:
+                return {"sent": 0, "retry": 0, "failed": 0}
+            outcomes = self._deliver(jobs)
+            counts = self._record(db, jobs, outcomes)
+        logger.info(
+            f"Email batch: sent={counts['sent']} retry={counts['retry']} failed={counts['failed']}"
+        )
+        return counts
+
+    def drain(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Process batches until nothing is due (or ``max_batches`` ran)"""
+        totals = {"sent": 0, "retry": 0, "failed": 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            counts = self.process_batch()
+            batches += 1
+            for key, value in counts.items():
+                totals[key] += value
+            if sum(counts.values()) < self.batch_size:
+                break
+        return totals
+
+    def notify(self) -> None:
+        """Wake the worker early; safe to call from any thread"""
+        if self._loop is not None and self._wake is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass
+
+    async def run(self) -> None:
+        while True:
+            try:
+                counts = await asyncio.to_thread(self.process_batch)
+                if sum(counts.values()) >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email queue batch failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        await asyncio.to_thread(self.connection.close)
+
+
+# Global queue instance; the API lifespan starts its worker
+email_queue = EmailQueue()
@@ -1,5 +1,9 @@
 """
 Email notification service for bet resolution updates
+
+Notifications are rendered when the triggering event happens and queued in
+the ``email_outbox`` table; the mail queue worker (``email_queue``) delivers
+them in batches over one authenticated SMTP connection.
 """
 
 import logging
@@ -10,10 +14,15 @@ from email.mime.multipart import MIMEMultipart
 import smtplib
 import os
 
+from sqlalchemy.orm import object_session
+
+from .. import database
 from ..models import Bet, User
+from .email_queue import enqueue_email
 
 logger = logging.getLogger(__name__)
 
+
 class EmailService:
     """Service for sending email notifications"""
     
@@ -22,6 +31,8 @@ class EmailService:
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
         self.smtp_username = os.getenv("SMTP_USERNAME")
         self.smtp_password = os.getenv("SMTP_PASSWORD")
+        self.smtp_starttls = os.getenv("SMTP_STARTTLS", "true").lower() not in ("0", "false", "no")
+        self.smtp_timeout = float(os.getenv("SMTP_TIMEOUT", "30"))
         self.from_email = os.getenv("FROM_EMAIL", "noreply@betthat.com")
         self.from_name = os.getenv("FROM_NAME", "Bet That")
         
@@ -30,6 +41,34 @@ class EmailService:
         
         if not self.is_configured:
             logger.warning("Email service not configured. Set SMTP_USERNAME and SMTP_PASSWORD environment variables.")
+
+    def open_connection(self) -> smtplib.SMTP:
+        """Connect, upgrade to TLS and log in; callers reuse the session for many messages"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.smtp_timeout)
+        try:
+            if self.smtp_starttls:
+                server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def build_message(self, to_address: str, subject: str, html_body: str) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg['From'] = f"{self.from_name} <{self.from_email}>"
+        msg['To'] = to_address
+        msg['Subject'] = subject
+        msg.attach(MIMEText(html_body, 'html'))
+        return msg
+
+    def _enqueue(self, bet: Bet, to_address: str, subject: str, html_body: str) -> None:
+        db = object_session(bet)
+        if db is not None:
+            enqueue_email(db, to_address, subject, html_body)
+            return
+        with database.get_db_session() as db:
+            enqueue_email(db, to_address, subject, html_body)
     
     def send_bet_resolution_email(
         self,
@@ -38,33 +77,19 @@ class EmailService:
         result: str,
         resolution_notes: Optional[str] = None
     ) -> bool:
-        """Send email notification for bet resolution"""
+        """Queue email notification for bet resolution"""
         if not self.is_configured:
             logger.info("Email service not configured, skipping email notification")
             return False
         
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = user.email
-            msg['Subject'] = f"Bet Resolution Update - {result.upper()}"
-            
-            # Create email body
             body = self._create_resolution_email_body(bet, result, resolution_notes)
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-            
-            logger.info(f"Resolution email sent to {user.email} for bet {bet.id}")
+            self._enqueue(bet, user.email, f"Bet Resolution Update - {result.upper()}", body)
+            logger.info(f"Resolution email queued for {user.email} for bet {bet.id}")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send resolution email to {user.email}: {e}")
+            logger.error(f"Failed to queue resolution email to {user.email}: {e}")
             return False
     
     def send_bet_dispute_email(
@@ -73,33 +98,19 @@ class EmailService:
         user: User,
         dispute_reason: str
     ) -> bool:
-        """Send email notification for bet dispute"""
+        """Queue email notification for bet dispute"""
         if not self.is_configured:
             logger.info("Email service not configured, skipping email notification")
             return False
         
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = user.email
-            msg['Subject'] = "Bet Dispute Notification"
-            
-            # Create email body
             body = self._create_dispute_email_body(bet, dispute_reason)
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-            
-            logger.info(f"Dispute email sent to {user.email} for bet {bet.id}")
+            self._enqueue(bet, user.email, "Bet Dispute Notification", body)
+            logger.info(f"Dispute email queued for {user.email} for bet {bet.id}")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send dispute email to {user.email}: {e}")
+            logger.error(f"Failed to queue dispute email to {user.email}: {e}")
             return False
     
     def _create_resolution_email_body(
@@ -166,11 +177,11 @@ class EmailService:
                     
                     <div class="bet-details">
                         <h3>Bet Details</h3>
-                        <p><strong>Game:</strong> {bet.game_name or 'N/A'}</p>
-                        <p><strong>Market:</strong> {bet.market}</p>
+                        <p><strong>Game:</strong> {bet.event_id or 'N/A'}</p>
+                        <p><strong>Market:</strong> {bet.market_description}</p>
                         <p><strong>Selection:</strong> {bet.selection}</p>
                         <p><strong>Stake:</strong> ${bet.stake}</p>
-                        <p><strong>Odds:</strong> {bet.odds}</p>
+                        <p><strong>Odds:</strong> {bet.odds_american}</p>
                         <p><strong>Result:</strong> <span class="result-badge">{result.upper()}</span></p>
                         
                         {f'<p><strong>Resolution Notes:</strong> {resolution_notes}</p>' if resolution_notes else ''}
@@ -232,11 +243,11 @@ class EmailService:
                     
                     <div class="bet-details">
                         <h3>Bet Details</h3>
-                        <p><strong>Game:</strong> {bet.game_name or 'N/A'}</p>
-                        <p><strong>Market:</strong> {bet.market}</p>
+                        <p><strong>Game:</strong> {bet.event_id or 'N/A'}</p>
+                        <p><strong>Market:</strong> {bet.market_description}</p>
                         <p><strong>Selection:</strong> {bet.selection}</p>
                         <p><strong>Stake:</strong> ${bet.stake}</p>
-                        <p><strong>Odds:</strong> {bet.odds}</p>
+                        <p><strong>Odds:</strong> {bet.odds_american}</p>
                     </div>
                     
                     <div class="dispute-reason">
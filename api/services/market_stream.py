@@ -0,0 +1,230 @@
+"""Delta stream of current best lines and edges for push clients
+
+Jobs that rewrite ``current_best_lines`` (or poll raw odds) bump a row in the
+``data_versions`` table when they commit. Each API worker watches those
+versions plus the edges snapshot file, and when something moved it diffs the
+new state against the last published one and pushes only the changed keys.
+Every delta carries a per-stream sequence number; a client that sees a gap
+asks for a snapshot and continues from its ``seq``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .. import database
+from ..endpoints.edges import EDGE_FILE_LOCATIONS, _normalize_edge
+from ..models import CurrentBestLine
+from ..utils.broadcast import ConnectionManager
+from ..utils.odds_conversion import american_to_decimal
+
+logger = logging.getLogger(__name__)
+
+STREAM_ODDS = "odds"
+STREAM_EDGES = "edges"
+STREAMS = (STREAM_ODDS, STREAM_EDGES)
+WATCHED_VERSIONS = ("current_best_lines", "odds_csv_raw")
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class DeltaTracker:
+    """Last published state of one stream, diffed against each new state"""
+
+    def __init__(self, stream: str):
+        self.stream = stream
+        self.seq = 0
+        self.rows: Dict[str, Dict[str, Any]] = {}
+
+    def apply(self, rows: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Adopt ``rows`` as the new state and return a delta message, or None if unchanged"""
+        upserts = {key: row for key, row in rows.items() if self.rows.get(key) != row}
+        removed = sorted(key for key in self.rows if key not in rows)
+        if not upserts and not removed:
+            return None
+        self.seq += 1
+        self.rows = rows
+        return {
+            "type": f"{self.stream}_delta",
+            "stream": self.stream,
+            "seq": self.seq,
+            "upserts": upserts,
+            "removed": removed,
+            "timestamp": _now_iso(),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": f"{self.stream}_snapshot",
+            "stream": self.stream,
+            "seq": self.seq,
+            "rows": self.rows,
+            "timestamp": _now_iso(),
+        }
+
+
+def best_line_key(player: Any, market: Any, book: Any) -> str:
+    return f"{player}|{market}|{book}"
+
+
+def load_best_line_rows(db: Session) -> Dict[str, Dict[str, Any]]:
+    """Current best lines keyed by the table's (player, market, book) primary key"""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for line in db.query(CurrentBestLine).all():
+        over_odds = line.over_odds
+        rows[best_line_key(line.player, line.market, line.book)] = {
+            "event_id": line.event_id,
+            "market": line.market,
+            "selection": line.player,
+            "book": line.book,
+            "odds_american": over_odds,
+            "under_odds": line.under_odds,
+            "odds_decimal": american_to_decimal(over_odds) if over_odds else None,
+            "points": line.line,
+            "updated_at": line.updated_at,
+            "is_stale": line.is_stale,
+        }
+    return rows
+
+
+def _edges_source() -> Tuple[Optional[Path], Optional[Tuple[str, int, int]]]:
+    for candidate in EDGE_FILE_LOCATIONS:
+        try:
+            stat = candidate.stat()
+        except OSError:
+            continue
+        return candidate, (str(candidate), stat.st_mtime_ns, stat.st_size)
+    return None, None
+
+
+def load_edge_rows(path: Optional[Path]) -> Dict[str, Dict[str, Any]]:
+    """Edges from the snapshot file keyed by type/player/team/line"""
+    if path is None:
+        return {}
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, json.JSONDecodeError) as exc:
+        logger.warning(f"Could not read edges snapshot {path}: {exc}")
+        return {}
+    edges = data.get("edges", []) if isinstance(data, dict) else []
+    rows: Dict[str, Dict[str, Any]] = {}
+    for raw in edges:
+        if not isinstance(raw, dict):
+            continue
+        edge = _normalize_edge(raw)
+        base = "|".join(str(edge.get(k)) for k in ("type", "player", "team", "line"))
+        key, n = base, 1
+        while key in rows:
+            n += 1
+            key = f"{base}#{n}"
+        rows[key] = edge
+    return rows
+
+
+def read_market_versions(db: Session) -> Dict[str, Any]:
+    """Version tokens for the watched tables; also keys the odds response cache"""
+    try:
+        result = db.execute(text("SELECT name, version FROM data_versions"))
+        versions = {name: version for name, version in result if name in WATCHED_VERSIONS}
+    except Exception:
+        db.rollback()
+        versions = {}
+    if not versions:
+        # Databases written before data_versions existed: fall back to a content token
+        try:
+            count, last = db.execute(
+                text("SELECT COUNT(*), MAX(updated_at) FROM current_best_lines")
+            ).one()
+            versions = {"current_best_lines": f"{count}:{last}"}
+        except Exception:
+            db.rollback()
+    return versions
+
+
+class MarketStream:
+    """Watches odds/edges sources and publishes deltas through a ConnectionManager
+
+    Each worker runs its own watcher against the shared database and pushes to
+    its local sockets only, so sequence numbers are per connection's worker; a
+    client that reconnects elsewhere starts from the snapshot it receives.
+    """
+
+    def __init__(self, manager: ConnectionManager, poll_interval: float = 2.0):
+        self.manager = manager
+        self.poll_interval = poll_interval
+        self.trackers = {stream: DeltaTracker(stream) for stream in STREAMS}
+        self._versions: Optional[Dict[str, Any]] = None
+        self._edges_token: Optional[Tuple[str, int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _load_changes(
+        self,
+    ) -> Tuple[Dict[str, Any], Optional[Tuple[str, int, int]], Dict[str, Dict[str, Any]]]:
+        changes: Dict[str, Dict[str, Any]] = {}
+        versions = self._versions or {}
+        if database.SessionLocal is not None:
+            with database.get_db_session() as db:
+                versions = read_market_versions(db)
+                if versions != self._versions:
+                    changes[STREAM_ODDS] = load_best_line_rows(db)
+        path, token = _edges_source()
+        if token != self._edges_token:
+            changes[STREAM_EDGES] = load_edge_rows(path)
+        return versions, token, changes
+
+    async def refresh(self) -> List[Dict[str, Any]]:
+        """Check sources once and publish a delta for every stream that changed"""
+        versions, token, changes = await asyncio.to_thread(self._load_changes)
+        self._versions = versions
+        self._edges_token = token
+        published = []
+        for stream, rows in changes.items():
+            delta = self.trackers[stream].apply(rows)
+            if delta is None:
+                continue
+            await self.manager.broadcast(delta)
+            published.append(delta)
+            logger.info(
+                f"Published {stream} delta seq={delta['seq']} "
+                f"upserts={len(delta['upserts'])} removed={len(delta['removed'])}"
+            )
+        return published
+
+    def snapshots(self, streams: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        wanted = [s for s in (streams or STREAMS) if s in self.trackers]
+        return [self.trackers[stream].snapshot() for stream in wanted]
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market stream refresh failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.manager.stop()
@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional, cast
+from decimal import Decimal
+from typing import List, Optional, Tuple, cast
 
 from sqlalchemy.orm import Session
 
@@ -8,13 +9,16 @@ from api.enums.betting_enums import BetStatus, BetType, BetCategory
 from api.exceptions.betting_exceptions import (
     BetCreationError,
     BetNotFoundError,
+    BetParticipationError,
     BetValidationError,
     UnauthorizedBetActionError,
 )
-from api.repositories.peer_bet_repository import PeerBetRepository
+from api.repositories.peer_bet_repository import FeedCursor, PeerBetRepository
 from api.schemas.bet_schemas import (
     PeerBetCreateRequest,
     PeerBetOutcomeResponse,
+    PeerBetParticipantResponse,
+    PeerBetParticipateRequest,
     PeerBetResponse,
     PeerBetSummaryResponse,
 )
@@ -22,6 +26,19 @@ from api.schemas.bet_schemas import (
 logger = logging.getLogger(__name__)
 
 
+def encode_feed_cursor(created_at: datetime, bet_id: int) -> str:
+    """Opaque cursor pointing just past a feed row"""
+    return f"{created_at.isoformat()}_{bet_id}"
+
+
+def decode_feed_cursor(cursor: str) -> FeedCursor:
+    try:
+        created_at, bet_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(bet_id)
+    except ValueError:
+        raise BetValidationError("Invalid cursor")
+
+
 class PeerBetService:
     def __init__(self, db: Session) -> None:
         self.db = db
@@ -82,10 +99,55 @@ class PeerBetService:
         status: Optional[BetStatus] = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> List[PeerBetSummaryResponse]:
-        """Get public bets with filtering"""
-        peer_bets = self.repository.get_public_peer_bets(category, status, limit, offset)
-        return [self._convert_to_summary(bet) for bet in peer_bets]
+        tag: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[PeerBetSummaryResponse], Optional[str]]:
+        """Get public bets with filtering, plus the cursor for the next page"""
+        after = decode_feed_cursor(cursor) if cursor else None
+        peer_bets = self.repository.get_public_peer_bets(
+            category, status, limit, offset, tag=tag, after=after
+        )
+        next_cursor = None
+        if len(peer_bets) == limit:
+            last = peer_bets[-1]
+            next_cursor = encode_feed_cursor(cast(datetime, last.created_at), cast(int, last.id))
+        return [self._convert_to_summary(bet) for bet in peer_bets], next_cursor
+
+    def join_bet(
+        self, bet_id: int, user_id: int, request: PeerBetParticipateRequest
+    ) -> PeerBetParticipantResponse:
+        """Join a bet on one of its outcomes"""
+        peer_bet = self.repository.get_peer_bet_by_id(bet_id)
+
+        if not peer_bet:
+            raise BetNotFoundError("Bet not found")
+
+        if not cast(bool, peer_bet.is_public) and cast(int, peer_bet.creator_id) != user_id:
+            raise UnauthorizedBetActionError("Access denied to private bet")
+
+        if request.stake_amount < peer_bet.minimum_stake:
+            raise BetValidationError(f"Minimum stake is {peer_bet.minimum_stake}")
+
+        if peer_bet.maximum_stake is not None and request.stake_amount > peer_bet.maximum_stake:
+            raise BetValidationError(f"Maximum stake is {peer_bet.maximum_stake}")
+
+        outcome = next(
+            (o for o in self.repository.get_bet_outcomes(bet_id) if o.name == request.chosen_outcome),
+            None,
+        )
+        if outcome is None:
+            raise BetParticipationError(f"Unknown outcome: {request.chosen_outcome}")
+
+        # Pool bets without fixed odds settle pari-mutuel; quote the stake back until then
+        odds = Decimal(outcome.odds) if outcome.odds is not None else Decimal("1")
+        participant = self.repository.add_participant(
+            bet_id,
+            user_id,
+            request.chosen_outcome,
+            request.stake_amount,
+            (request.stake_amount * odds).quantize(Decimal("0.01")),
+        )
+        return PeerBetParticipantResponse.model_validate(participant)
 
     def publish_bet(self, bet_id: int, creator_id: int) -> PeerBetResponse:
         """Publish a draft bet to make it active"""
@@ -9,10 +9,18 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     db_path: str = "storage/odds.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    sqlite_mmap_size: int = 256 * 1024 * 1024
     api_secret_key: str = "dev-secret-key-change-in-production"
     environment: str = "development"
     rate_limit_requests: int = 60
     rate_limit_window: int = 60
+    rate_limit_max_keys: int = 100_000
+    # Share limits across workers with redis://host:6379/0; unset keeps them in-process
+    rate_limit_backend_url: Optional[str] = None
     compliance_disclaimer: str = (
         "This platform provides sports analytics for entertainment purposes only. "
         "Not available to residents where prohibited. Users must be 21+. Gamble responsibly."
@@ -21,6 +29,16 @@ class Settings(BaseSettings):
     enable_deep_health: bool = True
     enable_request_logging: bool = True
 
+    # Real-time fan-out (memory:// for a single worker, redis://host:6379/0 across workers)
+    pubsub_url: Optional[str] = None
+    websocket_queue_size: int = 100
+    market_stream_poll_seconds: float = 2.0
+
+    # Odds response cache (local LRU, plus a shared tier with redis://host:6379/0)
+    response_cache_max_entries: int = 512
+    response_cache_redis_url: Optional[str] = None
+    response_cache_ttl_seconds: int = 300
+
     # JWT Authentication Settings
     jwt_secret_key: str = "dev-jwt-secret-key-change-in-production-use-256-bit-key"
     jwt_algorithm: str = "HS256"
@@ -37,6 +55,9 @@ class Settings(BaseSettings):
     password_bcrypt_rounds: int = 12
     password_min_length: int = 8
     password_max_length: int = 128
+    # Hashing runs on a bounded pool; requests beyond the queue limit get a 503
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
 
     # Authentication Rate Limiting
     auth_max_attempts_per_ip: int = 10
@@ -44,6 +65,11 @@ class Settings(BaseSettings):
     auth_rate_limit_window_minutes: int = 15
     auth_block_duration_minutes: int = 60
 
+    # Per-worker auth caches (user lookups, and how often the revocation list is re-checked)
+    auth_principal_cache_seconds: float = 30.0
+    auth_principal_cache_max_entries: int = 10000
+    auth_revocation_refresh_seconds: float = 2.0
+
     # Security Features
     enable_csrf_protection: bool = True
     csrf_token_expire_hours: int = 24
@@ -71,6 +97,19 @@ def get_database_url() -> str:
     return f"sqlite:///{db_path}"
 
 
+def get_async_database_url(database_url: Optional[str] = None) -> str:
+    """Swap the sync driver for its asyncio counterpart (aiosqlite / asyncpg)"""
+    url = database_url or get_database_url()
+    scheme, sep, rest = url.partition("://")
+    driver = {
+        "sqlite": "sqlite+aiosqlite",
+        "postgres": "postgresql+asyncpg",
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+    }.get(scheme, scheme)
+    return f"{driver}{sep}{rest}"
+
+
 def validate_database_path() -> bool:
     db_path = Path(settings.db_path)
     if not db_path.is_absolute():
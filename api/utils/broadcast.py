@@ -0,0 +1,366 @@
+"""Fan-out layer for WebSocket updates with pluggable cross-worker pub/sub"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+from fastapi import WebSocket
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], Awaitable[None]]
+
+DEFAULT_QUEUE_SIZE = 100
+# 1013 = "Try Again Later": the client is too slow to keep up with the stream
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class PubSubBackend:
+    """Relay for serialized messages between API worker processes"""
+
+    async def publish(self, channel: str, data: str) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryPubSub(PubSubBackend):
+    """Single-process backend; handlers run inline on publish"""
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    async def publish(self, channel: str, data: str) -> None:
+        for handler in list(self._handlers.get(channel, [])):
+            try:
+                await handler(data)
+            except Exception:
+                logger.exception("Pub/sub handler failed on channel %s", channel)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+
+class RedisPubSub(PubSubBackend):
+    """Redis PUBLISH/SUBSCRIBE backend shared by every uvicorn worker"""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", client: Any = None) -> None:
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("redis is required for the Redis pub/sub backend")
+            client = aioredis.from_url(url, decode_responses=True)
+        self._client = client
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, data: str) -> None:
+        await self._client.publish(channel, data)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        if channel not in self._handlers:
+            self._handlers[channel] = []
+            await self._pubsub.subscribe(channel)
+        self._handlers[channel].append(handler)
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis pub/sub read failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if not message:
+                continue
+            channel = message["channel"]
+            data = message["data"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            if isinstance(data, bytes):
+                data = data.decode()
+            for handler in list(self._handlers.get(channel, [])):
+                try:
+                    await handler(data)
+                except Exception:
+                    logger.exception("Pub/sub handler failed on channel %s", channel)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+def create_pubsub_backend(url: Optional[str] = None) -> PubSubBackend:
+    """Build a backend from a URL (``memory://`` or ``redis://...``)"""
+    if not url or url.startswith("memory://"):
+        return InMemoryPubSub()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisPubSub(url)
+    raise ValueError(f"Unsupported pub/sub backend URL: {url}")
+
+
+def _as_frozenset(value: Any) -> FrozenSet[str]:
+    if value is None:
+        return frozenset()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(str(v) for v in value if v is not None)
+    return frozenset([str(value)])
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Topic filter requested by a client; empty sets match everything"""
+
+    event_ids: FrozenSet[str] = frozenset()
+    user_ids: FrozenSet[str] = frozenset()
+    types: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_dict(cls, payload: Optional[Dict[str, Any]]) -> "Subscription":
+        payload = payload or {}
+        return cls(
+            event_ids=_as_frozenset(payload.get("event_ids", payload.get("event_id"))),
+            user_ids=_as_frozenset(payload.get("user_ids", payload.get("user_id"))),
+            types=_as_frozenset(payload.get("types", payload.get("type"))),
+        )
+
+    def matches(self, topic: Dict[str, Any]) -> bool:
+        if self.event_ids and str(topic.get("event_id")) not in self.event_ids:
+            return False
+        if self.user_ids and str(topic.get("user_id")) not in self.user_ids:
+            return False
+        if self.types and str(topic.get("type")) not in self.types:
+            return False
+        return True
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            "event_ids": sorted(self.event_ids),
+            "user_ids": sorted(self.user_ids),
+            "types": sorted(self.types),
+        }
+
+
+@dataclass(eq=False)
+class _Client:
+    websocket: WebSocket
+    user_id: str
+    queue: asyncio.Queue
+    subscription: Subscription = field(default_factory=Subscription)
+    sender: Optional[asyncio.Task] = None
+
+
+class ConnectionManager:
+    """Tracks local sockets and fans out messages relayed through a pub/sub backend
+
+    Each message is serialized once per publish. Every connection owns a bounded
+    queue drained by its own sender task, so sends run concurrently and a client
+    whose queue fills up is dropped instead of stalling everyone else.
+    """
+
+    def __init__(
+        self,
+        channel: str = "bet-updates",
+        backend: Optional[PubSubBackend] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.channel = channel
+        self.backend = backend or InMemoryPubSub()
+        self.queue_size = queue_size
+        # Dictionary to store connections by user_id
+        self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Dictionary to store connections by connection_id for cleanup
+        self.connection_ids: Dict[WebSocket, str] = {}
+        self._clients: Dict[WebSocket, _Client] = {}
+        self._relay_started = False
+        self.messages_published = 0
+        self.messages_dropped = 0
+        self.slow_consumers_dropped = 0
+
+    async def start(self, backend: Optional[PubSubBackend] = None) -> None:
+        """Subscribe to the relay channel so messages from other workers arrive"""
+        if backend is not None and backend is not self.backend:
+            await self.backend.close()
+            self.backend = backend
+        if not self._relay_started:
+            await self.backend.subscribe(self.channel, self._on_relay)
+            self._relay_started = True
+
+    async def stop(self) -> None:
+        """Drop local sockets; the backend is owned (and closed) by whoever created it"""
+        for websocket in list(self._clients):
+            self.disconnect(websocket)
+        self._relay_started = False
+
+    async def connect(self, websocket: WebSocket, user_id: str):
+        await websocket.accept()
+
+        client = _Client(
+            websocket=websocket, user_id=user_id, queue=asyncio.Queue(maxsize=self.queue_size)
+        )
+        client.sender = asyncio.create_task(self._pump(client))
+        self._clients[websocket] = client
+
+        self.active_connections.setdefault(user_id, []).append(websocket)
+        self.connection_ids[websocket] = user_id
+
+        logger.info(
+            f"WebSocket connected for user {user_id}. "
+            f"Total connections: {len(self.active_connections[user_id])}"
+        )
+
+    def disconnect(self, websocket: WebSocket):
+        client = self._clients.pop(websocket, None)
+        if client is not None and client.sender is not None:
+            if client.sender is not asyncio.current_task():
+                client.sender.cancel()
+
+        if websocket in self.connection_ids:
+            user_id = self.connection_ids.pop(websocket)
+
+            if user_id in self.active_connections:
+                self.active_connections[user_id].remove(websocket)
+
+                # Remove user entry if no more connections
+                if not self.active_connections[user_id]:
+                    del self.active_connections[user_id]
+
+            logger.info(f"WebSocket disconnected for user {user_id}")
+
+    def is_connected(self, websocket: WebSocket) -> bool:
+        return websocket in self._clients
+
+    def subscribe(self, websocket: WebSocket, subscription: Optional[Dict[str, Any]]) -> Subscription:
+        """Replace the topic filter for one connection"""
+        parsed = Subscription.from_dict(subscription)
+        client = self._clients.get(websocket)
+        if client is not None:
+            client.subscription = parsed
+        return parsed
+
+    async def send_json(self, websocket: WebSocket, message: dict) -> None:
+        """Queue a message for a single local socket (replies, acks)"""
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, json.dumps(message))
+
+    async def send_personal_message(self, message: dict, user_id: str):
+        await self.publish(message, target_user_id=user_id)
+
+    async def broadcast(self, message: dict):
+        """Broadcast message to all connected users"""
+        await self.publish(message)
+
+    async def publish(self, message: dict, target_user_id: Optional[str] = None) -> None:
+        """Serialize once and deliver to every matching socket on every worker"""
+        envelope = {
+            "target": target_user_id,
+            "type": message.get("type"),
+            "user_id": message.get("user_id"),
+            "event_id": message.get("event_id"),
+            "payload": json.dumps(message),
+        }
+        self.messages_published += 1
+        if self._relay_started:
+            await self.backend.publish(self.channel, json.dumps(envelope))
+        else:
+            self._fan_out(envelope)
+
+    async def _on_relay(self, raw: str) -> None:
+        try:
+            envelope = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning("Dropping malformed relay message on %s", self.channel)
+            return
+        self._fan_out(envelope)
+
+    def _fan_out(self, envelope: Dict[str, Any]) -> None:
+        target = envelope.get("target")
+        payload = envelope["payload"]
+        for client in list(self._clients.values()):
+            if target is not None and client.user_id != target:
+                continue
+            if not client.subscription.matches(envelope):
+                continue
+            self._enqueue(client, payload)
+
+    def _enqueue(self, client: _Client, text: str) -> None:
+        try:
+            client.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self.messages_dropped += 1
+            self._drop_slow_consumer(client)
+
+    def _drop_slow_consumer(self, client: _Client) -> None:
+        self.slow_consumers_dropped += 1
+        logger.warning(
+            f"Dropping slow WebSocket consumer for user {client.user_id} "
+            f"(queue full at {self.queue_size} messages)"
+        )
+        self.disconnect(client.websocket)
+        asyncio.create_task(self._close_quietly(client.websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
+
+    async def _pump(self, client: _Client) -> None:
+        try:
+            while True:
+                text = await client.queue.get()
+                await client.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to user {client.user_id}: {e}")
+            # Remove broken connection
+            self.disconnect(client.websocket)
+
+    def get_connection_count(self) -> int:
+        return sum(len(connections) for connections in self.active_connections.values())
+
+    def get_user_connection_count(self, user_id: str) -> int:
+        return len(self.active_connections.get(user_id, []))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "backend": type(self.backend).__name__,
+            "relay_started": self._relay_started,
+            "messages_published": self.messages_published,
+            "messages_dropped": self.messages_dropped,
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+            "queued_messages": sum(c.queue.qsize() for c in self._clients.values()),
+        }
@@ -2,22 +2,45 @@
 
 from __future__ import annotations
 
+import logging
 import time
-from collections import defaultdict
-from typing import Dict, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from starlette.routing import Match
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_KEYS = 100_000
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0
 
 
 class TokenBucket:
     """Token bucket rate limiter for API endpoints"""
 
+    __slots__ = ("capacity", "tokens", "refill_rate", "last_update")
+
     def __init__(self, capacity: int, refill_rate: float, last_update: float):
         self.capacity = capacity
         self.tokens = capacity
         self.refill_rate = refill_rate  # tokens per second
         self.last_update = last_update
 
-    def is_allowed(self) -> Tuple[bool, TokenBucket]:
-        now = time.time()
+    def is_allowed(self, now: Optional[float] = None) -> Tuple[bool, TokenBucket]:
+        now = time.time() if now is None else now
         time_passed = now - self.last_update
 
         # Add tokens based on time passed
@@ -34,48 +57,190 @@ class TokenBucket:
 
 
 class RateLimiter:
-    """Rate limiter with token bucket per client/route"""
-
-    def __init__(self, requests_per_minute: int, window_seconds: int = 60):
+    """Rate limiter with token bucket per client/route, bounded in memory
+
+    Buckets live in an OrderedDict kept in last-access order, so expiry only
+    looks at the oldest entries: a bucket idle for a full window has refilled
+    to capacity and can be dropped without changing any decision. ``max_keys``
+    caps memory under key floods by evicting the least recently used bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        window_seconds: int = 60,
+        max_keys: int = DEFAULT_MAX_KEYS,
+    ):
         self.requests_per_minute = requests_per_minute
         self.window_seconds = window_seconds
         self.refill_rate = requests_per_minute / window_seconds
-        self.buckets: Dict[str, TokenBucket] = {}
-        self.last_cleanup = time.time()
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
 
     def is_allowed(self, client_id: str, route_key: str) -> bool:
         """Check if request is allowed for client on specific route"""
+        return self.check(client_id, route_key).allowed
+
+    def check(self, client_id: str, route_key: str) -> RateLimitDecision:
         key = f"{client_id}:{route_key}"
         now = time.time()
+        self._expire(now)
 
-        # Cleanup old buckets periodically
-        if now - self.last_cleanup > 3600:  # Clean every hour
-            self._cleanup()
-            self.last_cleanup = now
-
-        # Get or create bucket for this client/route
-        if key in self.buckets:
-            bucket = self.buckets[key]
-        else:
+        bucket = self.buckets.get(key)
+        if bucket is None:
             bucket = TokenBucket(
                 capacity=self.requests_per_minute, refill_rate=self.refill_rate, last_update=now
             )
-
-        # Check if request is allowed
-        allowed, updated_bucket = bucket.is_allowed()
-        self.buckets[key] = updated_bucket
-
-        return allowed
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+
+        allowed, _ = bucket.is_allowed(now)
+        if allowed:
+            return RateLimitDecision(True, int(bucket.tokens))
+        return RateLimitDecision(False, 0, (1 - bucket.tokens) / self.refill_rate)
+
+    async def hit(self, client_id: str, route_key: str) -> RateLimitDecision:
+        return self.check(client_id, route_key)
+
+    def _expire(self, now: float) -> None:
+        """Drop buckets idle for a full window (they have refilled anyway)"""
+        cutoff = now - self.window_seconds
+        buckets = self.buckets
+        while buckets:
+            key = next(iter(buckets))
+            if buckets[key].last_update >= cutoff:
+                break
+            del buckets[key]
 
     def _cleanup(self):
         """Remove old/expired buckets to prevent memory leaks"""
-        now = time.time()
-        cutoff_time = now - (self.window_seconds * 2)
-
-        keys_to_remove = []
-        for key, bucket in self.buckets.items():
-            if bucket.last_update < cutoff_time:
-                keys_to_remove.append(key)
-
-        for key in keys_to_remove:
-            del self.buckets[key]
+        self._expire(time.time())
+
+
+# Sliding-window counter: weight the previous fixed window by how much of it
+# still overlaps the sliding window, add the current window, and INCR only if
+# the estimate is below the limit. Runs atomically inside Redis.
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local current_window = math.floor(now / window)
+local elapsed = (now - current_window * window) / window
+local current_key = KEYS[1] .. ':' .. current_window
+local previous_key = KEYS[1] .. ':' .. (current_window - 1)
+local previous = tonumber(redis.call('GET', previous_key) or '0')
+local current = tonumber(redis.call('GET', current_key) or '0')
+local estimate = previous * (1 - elapsed) + current
+if estimate + 1 > limit then
+  return {0, 0, tostring((1 - elapsed) * window)}
+end
+current = redis.call('INCR', current_key)
+if current == 1 then
+  redis.call('EXPIRE', current_key, window * 2)
+end
+return {1, math.floor(limit - (previous * (1 - elapsed) + current)), '0'}
+"""
+
+
+class RedisRateLimiter:
+    """Sliding-window limiter whose counters live in Redis, shared by all workers
+
+    Fails open (allows the request) if Redis is unreachable, so an outage of the
+    limiter never takes the API down with it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        window_seconds: int = 60,
+        url: str = "redis://localhost:6379/0",
+        client: Any = None,
+        prefix: str = "ratelimit",
+    ):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("redis is required for the Redis rate limiter")
+            client = aioredis.from_url(url)
+        self.requests_per_minute = requests_per_minute
+        self.window_seconds = window_seconds
+        self.prefix = prefix
+        self._client = client
+        self._script = client.register_script(SLIDING_WINDOW_LUA)
+
+    async def hit(self, client_id: str, route_key: str) -> RateLimitDecision:
+        key = f"{self.prefix}:{client_id}:{route_key}"
+        try:
+            allowed, remaining, retry_after = await self._script(
+                keys=[key], args=[self.requests_per_minute, self.window_seconds, time.time()]
+            )
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable, allowing request: {e}")
+            return RateLimitDecision(True, self.requests_per_minute)
+        if isinstance(retry_after, bytes):
+            retry_after = retry_after.decode()
+        return RateLimitDecision(bool(int(allowed)), int(remaining), float(retry_after))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_rate_limiter(
+    requests_per_minute: int,
+    window_seconds: int = 60,
+    backend_url: Optional[str] = None,
+    max_keys: int = DEFAULT_MAX_KEYS,
+):
+    """In-process limiter by default; Redis-backed when ``backend_url`` is redis://"""
+    if backend_url and backend_url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimiter(requests_per_minute, window_seconds, url=backend_url)
+    return RateLimiter(requests_per_minute, window_seconds, max_keys=max_keys)
+
+
+def _iter_routes(routes):
+    for route in routes:
+        expand = getattr(route, "effective_route_contexts", None)
+        if expand is not None:
+            # Newer FastAPI keeps an included router as one lazy route; use its prefixed routes
+            yield from expand()
+        else:
+            yield route
+
+
+class RouteTemplateResolver:
+    """Map a request to its route template (``/odds/event/{event_id}``)
+
+    Limiting on templates keeps one bucket per endpoint instead of one per ID,
+    and every unknown path shares a single ``<unmatched>`` key. Lookups are
+    memoized in a bounded LRU keyed by method and raw path.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    def resolve(self, scope: dict) -> str:
+        cache_key = (scope.get("method", ""), scope.get("path", ""))
+        template = self._cache.get(cache_key)
+        if template is not None:
+            self._cache.move_to_end(cache_key)
+            return template
+
+        template = UNMATCHED_ROUTE
+        app = scope.get("app")
+        routes = getattr(getattr(app, "router", None), "routes", []) if app else []
+        for route in _iter_routes(routes):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = getattr(route, "path", UNMATCHED_ROUTE)
+                break
+            if match == Match.PARTIAL and template == UNMATCHED_ROUTE:
+                # Path exists for another method; still one key per template
+                template = getattr(route, "path", UNMATCHED_ROUTE)
+
+        self._cache[cache_key] = template
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return template
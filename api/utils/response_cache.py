@@ -0,0 +1,234 @@
+"""Response caching for read-heavy GET endpoints
+
+Responses are stored as pre-serialized JSON bytes, keyed on the route
+template, the endpoint's validated parameters and a data-version token.
+A new token (the poller bumped ``current_best_lines``) simply produces new
+keys; stale entries age out of the LRU or expire in Redis.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .ratelimit import UNMATCHED_ROUTE, RouteTemplateResolver
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+VersionProvider = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+@dataclass
+class RouteCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCacheTier:
+    """In-process tier: bounded, least recently used entries go first"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    async def set(self, key: str, body: bytes) -> None:
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheTier:
+    """Shared tier so every worker reuses one serialization per data version
+
+    Errors are logged and treated as misses; the endpoint still answers.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        client: Any = None,
+        prefix: str = "respcache",
+        ttl_seconds: int = 300,
+    ):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("redis is required for the Redis response cache")
+            client = aioredis.from_url(url)
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self._client.get(f"{self.prefix}:{key}")
+        except Exception as e:
+            logger.warning(f"Redis response cache get failed: {e}")
+            return None
+
+    async def set(self, key: str, body: bytes) -> None:
+        try:
+            await self._client.set(f"{self.prefix}:{key}", body, ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Redis response cache set failed: {e}")
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class ResponseCache:
+    """Two-tier cache (local LRU, then optional Redis) with per-route hit metrics"""
+
+    def __init__(self, max_entries: int = 512, redis_tier: Optional[RedisCacheTier] = None):
+        self.local = LRUCacheTier(max_entries)
+        self.redis = redis_tier
+        self.routes: Dict[str, RouteCacheStats] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        body = await self.local.get(key)
+        if body is None and self.redis is not None:
+            body = await self.redis.get(key)
+            if body is not None:
+                await self.local.set(key, body)
+        return body
+
+    async def set(self, key: str, body: bytes) -> None:
+        await self.local.set(key, body)
+        if self.redis is not None:
+            await self.redis.set(key, body)
+
+    def record(self, route: str, hit: bool) -> None:
+        stats = self.routes.setdefault(route, RouteCacheStats())
+        if hit:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = sum(s.hits for s in self.routes.values())
+        misses = sum(s.misses for s in self.routes.values())
+        return {
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "redis": self.redis is not None,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "routes": {
+                route: {"hits": s.hits, "misses": s.misses, "hit_rate": round(s.hit_rate, 4)}
+                for route, s in self.routes.items()
+            },
+        }
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
+
+
+def create_response_cache(
+    max_entries: int = 512, redis_url: Optional[str] = None, ttl_seconds: int = 300
+) -> ResponseCache:
+    """Local-only by default; adds a Redis tier when ``redis_url`` is redis://"""
+    redis_tier = None
+    if redis_url and redis_url.startswith(("redis://", "rediss://", "unix://")):
+        redis_tier = RedisCacheTier(redis_url, ttl_seconds=ttl_seconds)
+    return ResponseCache(max_entries=max_entries, redis_tier=redis_tier)
+
+
+def _cache_key(route: str, params: Dict[str, Any], version: Any) -> str:
+    normalized = dumps(jsonable_encoder(dict(sorted(params.items()))))
+    digest = hashlib.blake2b(normalized, digest_size=16).hexdigest()
+    return f"{route}:{version}:{digest}"
+
+
+_route_resolver = RouteTemplateResolver()
+
+
+def cached_response(cache: ResponseCache, version: VersionProvider):
+    """Cache a GET endpoint's JSON body until ``version`` changes
+
+    ``version`` receives the endpoint's resolved arguments (so it can use the
+    injected ``db``) and returns a token. The endpoint must declare a
+    ``request: Request`` parameter; ``Request`` and dependency-injected
+    sessions are left out of the key, everything else (path and query
+    params after validation and defaults) is part of it.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        key_params = [
+            name
+            for name, param in signature.parameters.items()
+            if param.annotation is not Request and name not in ("request", "db")
+        ]
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind_partial(*args, **kwargs)
+            request: Request = bound.arguments["request"]
+            route = _route_resolver.resolve(request.scope)
+            if route == UNMATCHED_ROUTE:
+                route = func.__qualname__
+
+            token = await version(bound.arguments)
+            params = {name: bound.arguments.get(name) for name in key_params}
+            key = _cache_key(route, params, token)
+
+            body = await cache.get(key)
+            hit = body is not None
+            if not hit:
+                result = await func(*args, **kwargs)
+                body = dumps(jsonable_encoder(result))
+                await cache.set(key, body)
+            cache.record(route, hit)
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers={"X-Cache": "HIT" if hit else "MISS"},
+            )
+
+        return wrapper
+
+    return decorator
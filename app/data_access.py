@@ -0,0 +1,363 @@
+"""Lazy, projected data access for the Streamlit dashboard.
+
+One :class:`DashboardData` per database is shared by every session (see
+``load_tables`` in ``streamlit_app``). Views ask for the columns they render;
+odds history is windowed or fetched per event instead of loaded wholesale.
+Results are memoized and reloaded only when a table they read changes, per
+the ``data_versions`` rows the jobs bump (or the table's max rowid).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, TypeVar
+
+import pandas as pd
+
+from app.line_shopping import LineShoppingIndex
+from engine.portfolio_optimizer import CorrelationModel, load_correlation_model
+from utils.data_version import read_data_versions
+
+PROPS_COLUMNS = ["event_id", "player", "season", "def_team"]
+SNAPSHOT_COLUMNS = [
+    "fetched_at",
+    "event_id",
+    "market_key",
+    "bookmaker_key",
+    "outcome",
+    "line",
+    "price",
+    "points",
+]
+LINE_SHOPPING_COLUMNS = [
+    "event_id",
+    "player",
+    "market",
+    "line",
+    "book",
+    "side",
+    "odds",
+    "implied_prob",
+    "fair_prob",
+    "updated_at",
+]
+
+# Small per-team/per-game tables; the matchup cards read optional extra columns
+CONTEXT_TABLES = {
+    "scheme": ("team_week_scheme", ["team", "season", "week", "proe", "ed_pass_rate", "pace"]),
+    "weather": ("weather", ["event_id", "game_id", "temp_f", "wind_mph", "precip", "indoor"]),
+    "wr_cb": ("wr_cb_public", ["event_id", "player", "note", "summary", "source_url", "url"]),
+    "injuries": (
+        "injuries",
+        ["event_id", "player", "status", "designation", "note", "description", "name"],
+    ),
+    "context_notes": ("context_notes", ["event_id", "note", "source_url", "created_at"]),
+}
+
+T = TypeVar("T")
+
+TABLE_KEYS = ("edges", "props", "projections", "best_lines", "snapshots", "odds_raw")
+
+
+def _placeholders(values: Sequence[object]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+class DashboardData(Mapping):
+    """Shared, version-checked cache of the frames the dashboard renders.
+
+    Also behaves as the read-only ``dict`` ``load_tables`` used to return:
+    ``data["edges"]`` or ``data.get("weather")`` loads on first access.
+    """
+
+    def __init__(
+        self,
+        database_path: Path,
+        max_entries: int = 64,
+        version_check_seconds: float = 5.0,
+        max_age_seconds: float = 300.0,
+    ) -> None:
+        self.database_path = Path(database_path)
+        self.max_entries = max_entries
+        self.version_check_seconds = version_check_seconds
+        self.max_age_seconds = max_age_seconds
+        self._entries: OrderedDict[tuple, tuple[tuple, object, float]] = OrderedDict()
+        self._tokens: dict[str, tuple[object, float]] = {}
+        self._columns: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+    # Mapping interface -------------------------------------------------
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        if key in CONTEXT_TABLES:
+            return self.context(key)
+        loaders: dict[str, Callable[[], pd.DataFrame]] = {
+            "edges": self.edges,
+            "props": self.props,
+            "projections": self.projections,
+            "best_lines": self.best_lines,
+            "snapshots": self.steam_window,
+            "odds_raw": self.odds_raw,
+        }
+        if key not in loaders:
+            raise KeyError(key)
+        return loaders[key]()
+
+    def __iter__(self) -> Iterator[str]:
+        yield from TABLE_KEYS
+        yield from CONTEXT_TABLES
+
+    def __len__(self) -> int:
+        return len(TABLE_KEYS) + len(CONTEXT_TABLES)
+
+    # Plumbing ----------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.database_path)
+
+    def table_columns(self, table: str) -> list[str]:
+        cols = self._columns.get(table)
+        if cols is None:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            cols = [row[1] for row in rows]
+            if cols:
+                self._columns[table] = cols
+        return cols
+
+    def _table_tokens(self, tables: Iterable[str]) -> tuple:
+        now = time.monotonic()
+        tables = sorted(set(tables))
+        stale = [
+            t
+            for t in tables
+            if t not in self._tokens or now - self._tokens[t][1] >= self.version_check_seconds
+        ]
+        if stale:
+            with closing(self._connect()) as conn:
+                versions = read_data_versions(conn)
+                for table in stale:
+                    if table in versions:
+                        token: object = ("v", versions[table])
+                    else:
+                        try:
+                            token = conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0]
+                        except sqlite3.Error:
+                            token = None
+                    self._tokens[table] = (token, now)
+        return tuple(self._tokens[t][0] for t in tables)
+
+    def _cached(self, key: tuple, tables: Sequence[str], loader: Callable[[], T]) -> T:
+        token = self._table_tokens(tables)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == token and now - entry[2] < self.max_age_seconds:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = loader()
+        with self._lock:
+            self._entries[key] = (token, value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _select(
+        self,
+        table: str,
+        columns: Optional[Sequence[str]] = None,
+        where: str = "",
+        params: Sequence[object] = (),
+        order_by: str = "",
+    ) -> pd.DataFrame:
+        """Project ``columns`` (all when None); absent columns come back as NA."""
+        available = self.table_columns(table)
+        if not available:
+            return pd.DataFrame({col: pd.Series(dtype="object") for col in columns or []})
+        wanted = list(columns) if columns is not None else available
+        present = [col for col in wanted if col in available]
+        if not present:
+            return pd.DataFrame({col: pd.Series(dtype="object") for col in wanted})
+        sql = f"SELECT {', '.join(present)} FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        with closing(self._connect()) as conn:
+            frame = pd.read_sql_query(sql, conn, params=list(params))
+        for col in wanted:
+            if col not in frame.columns:
+                frame[col] = pd.NA
+        return frame[wanted]
+
+    def _season_clause(
+        self, table: str, seasons: Optional[Sequence[int]], include_unknown: bool
+    ) -> tuple[str, list[object]]:
+        if seasons is None or "season" not in self.table_columns(table):
+            return "", []
+        seasons = [int(s) for s in seasons]
+        clause = f"season IN ({_placeholders(seasons)})" if seasons else "0"
+        if include_unknown:
+            clause = f"({clause} OR season IS NULL)"
+        return clause, seasons
+
+    # Views -------------------------------------------------------------
+
+    def props(self) -> pd.DataFrame:
+        """Only the metadata the edges view joins on."""
+        return self._cached(
+            ("props",), ["qb_props_odds"], lambda: self._select("qb_props_odds", PROPS_COLUMNS)
+        )
+
+    def projections(self) -> pd.DataFrame:
+        return self._cached(
+            ("projections",), ["projections_qb"], lambda: self._select("projections_qb")
+        )
+
+    def edges(self) -> pd.DataFrame:
+        """Every edge with props metadata; shared, so callers must copy before mutating."""
+
+        def load() -> pd.DataFrame:
+            edges = self._select("edges")
+            if not {"event_id", "player"}.issubset(edges.columns):
+                return edges
+            meta = self.props().drop_duplicates(["event_id", "player"])
+            edges = edges.merge(meta, on=["event_id", "player"], how="left", suffixes=("", "_prop"))
+            # Edge rows win; props only fill what the edge job left blank
+            for col in ("season", "def_team"):
+                if f"{col}_prop" in edges.columns:
+                    edges[col] = edges[col].where(edges[col].notna(), edges.pop(f"{col}_prop"))
+            return edges
+
+        return self._cached(("edges",), ["edges", "qb_props_odds"], load)
+
+    def best_lines(
+        self, seasons: Optional[Sequence[int]] = None, include_unknown: bool = False
+    ) -> pd.DataFrame:
+        where, params = self._season_clause("current_best_lines", seasons, include_unknown)
+        key = ("best_lines", tuple(params), include_unknown if where else None)
+        return self._cached(
+            key,
+            ["current_best_lines"],
+            lambda: self._select("current_best_lines", where=where, params=params),
+        )
+
+    def context(self, key: str) -> pd.DataFrame:
+        table, expected = CONTEXT_TABLES[key]
+
+        def load() -> pd.DataFrame:
+            frame = self._select(table)
+            for col in expected:
+                if col not in frame.columns:
+                    frame[col] = pd.NA
+            return frame
+
+        return self._cached(("context", key), [table], load)
+
+    def correlation_model(self) -> CorrelationModel:
+        """Market correlations persisted by compute_edges (priors when absent)."""
+
+        def load() -> CorrelationModel:
+            with closing(self._connect()) as conn:
+                return load_correlation_model(conn)
+
+        return self._cached(("correlation_model",), ["market_correlations"], load)
+
+    def has_rows(self, table: str) -> bool:
+        if not self.table_columns(table):
+            return False
+        with closing(self._connect()) as conn:
+            return conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+
+    def odds_raw(self, event_ids: Optional[Sequence[object]] = None) -> pd.DataFrame:
+        """Raw per-book odds for line shopping, limited to ``event_ids`` when given."""
+        where, params = "", []
+        if event_ids is not None:
+            params = sorted({str(e) for e in event_ids if e is not None and not pd.isna(e)})
+            if not params:
+                return self._select("odds_csv_raw", LINE_SHOPPING_COLUMNS, where="0")
+            where = f"event_id IN ({_placeholders(params)})"
+        return self._cached(
+            ("odds_raw", tuple(params) if where else None),
+            ["odds_csv_raw"],
+            lambda: self._select("odds_csv_raw", LINE_SHOPPING_COLUMNS, where=where, params=params),
+        )
+
+    def line_shopping_index(
+        self, event_ids: Optional[Sequence[object]] = None
+    ) -> LineShoppingIndex:
+        """Line-shopping tables for ``event_ids``, rebuilt only when odds_csv_raw changes."""
+        params = (
+            None
+            if event_ids is None
+            else tuple(sorted({str(e) for e in event_ids if e is not None and not pd.isna(e)}))
+        )
+        return self._cached(
+            ("line_shopping_index", params),
+            ["odds_csv_raw"],
+            lambda: LineShoppingIndex(self.odds_raw(event_ids)),
+        )
+
+    def steam_window(self, event_ids: Optional[Sequence[object]] = None) -> pd.DataFrame:
+        """Latest two snapshots per event/market/book/outcome (all steam detection reads)."""
+        params: list[object] = []
+        event_filter = ""
+        if event_ids is not None:
+            params = sorted({str(e) for e in event_ids if e is not None and not pd.isna(e)})
+            event_filter = f"WHERE event_id IN ({_placeholders(params)})" if params else "WHERE 0"
+
+        def load() -> pd.DataFrame:
+            available = self.table_columns("odds_snapshots")
+            present = [col for col in SNAPSHOT_COLUMNS if col in available]
+            partition = [
+                col
+                for col in ("event_id", "market_key", "bookmaker_key", "outcome")
+                if col in available
+            ]
+            if "fetched_at" not in present or not partition:
+                return self._select("odds_snapshots", SNAPSHOT_COLUMNS, where="0")
+            cols = ", ".join(present)
+            sql = (
+                f"SELECT {cols} FROM ("
+                f" SELECT {cols}, ROW_NUMBER() OVER ("
+                f"  PARTITION BY {', '.join(partition)} ORDER BY fetched_at DESC"
+                f" ) AS rn FROM odds_snapshots {event_filter}"
+                f") WHERE rn <= 2"
+            )
+            with closing(self._connect()) as conn:
+                frame = pd.read_sql_query(sql, conn, params=params)
+            for col in SNAPSHOT_COLUMNS:
+                if col not in frame.columns:
+                    frame[col] = pd.NA
+            return frame[SNAPSHOT_COLUMNS]
+
+        return self._cached(
+            ("steam_window", tuple(params) if event_filter else None), ["odds_snapshots"], load
+        )
+
+    def event_snapshots(self, event_id: object, limit: int = 500) -> pd.DataFrame:
+        """Odds history for one game, loaded when a matchup drill-down asks for it."""
+        return self._cached(
+            ("event_snapshots", str(event_id), limit),
+            ["odds_snapshots"],
+            lambda: self._select(
+                "odds_snapshots",
+                SNAPSHOT_COLUMNS,
+                where="event_id = ?",
+                params=[str(event_id)],
+                order_by=f"fetched_at DESC LIMIT {int(limit)}",
+            ),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens.clear()
+            self._columns.clear()
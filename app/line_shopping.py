@@ -0,0 +1,112 @@
+"""Prebuilt line-shopping lookups for the dashboard.
+
+Decimal odds, per-side best-price flags and consensus fair probability are
+computed for every row in one vectorized pass per ``odds_csv_raw`` version,
+and rows are grouped by (event_id, player, market, line), so expanding a pick
+is a dictionary lookup rather than a scan of the raw odds.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+PROP_KEY = ["event_id", "player", "market"]
+VIEW_COLUMNS = ["book", "side", "odds", "implied_prob", "fair_prob", "updated_at"]
+VIEW_OUTPUT = [*VIEW_COLUMNS, "decimal_odds", "is_best", "best_flag"]
+
+LineKey = tuple[object, object, object, float]
+
+
+def _decimal_odds(odds: pd.Series) -> pd.Series:
+    """Vectorized ``american_to_decimal``; 0 and unparseable odds become NaN."""
+    american = np.trunc(pd.to_numeric(odds, errors="coerce").astype(float))
+    american = american.where(american != 0)
+    return pd.Series(
+        np.where(american < 0, 1.0 + 100.0 / american.abs(), 1.0 + american / 100.0),
+        index=odds.index,
+    ).where(american.notna())
+
+
+def _annotate(frame: pd.DataFrame, keys: list[str]) -> tuple[pd.Series, dict[tuple, dict]]:
+    """Best-price flag per row, and ``{key: {side: consensus prob}}``.
+
+    Consensus is the mean fair probability across books, falling back to
+    implied probability when no book has a fair one.
+    """
+    by_side = frame.groupby([*keys, "side"], sort=False)
+    is_best = frame["decimal_odds"].eq(by_side["decimal_odds"].transform("max"))
+    means = by_side["fair_prob"].mean().fillna(by_side["implied_prob"].mean())
+    consensus: dict[tuple, dict] = {}
+    for (*key, side), prob in means.items():
+        consensus.setdefault(tuple(key), {})[side] = None if pd.isna(prob) else float(prob)
+    return is_best, consensus
+
+
+class LineShoppingIndex:
+    """Per-prop line-shopping tables keyed by (event_id, player, market, line).
+
+    Views are shared between sessions; treat them as read-only.
+    """
+
+    def __init__(self, odds_raw: Optional[pd.DataFrame]) -> None:
+        self._frame = pd.DataFrame(columns=[*PROP_KEY, "line_numeric", *VIEW_COLUMNS])
+        self._positions: dict[LineKey, np.ndarray] = {}
+        self._consensus: dict[tuple, dict] = {}
+        self._props: dict[tuple, np.ndarray] = {}
+        self._views: dict[LineKey, pd.DataFrame] = {}
+        if odds_raw is None or odds_raw.empty:
+            return
+
+        frame = odds_raw.reindex(columns=[*PROP_KEY, "line", *VIEW_COLUMNS])
+        frame = frame.assign(
+            line_numeric=pd.to_numeric(frame["line"], errors="coerce"),
+            side=frame["side"].astype(str).str.title(),
+            decimal_odds=_decimal_odds(frame["odds"]),
+            implied_prob=pd.to_numeric(frame["implied_prob"], errors="coerce"),
+            fair_prob=pd.to_numeric(frame["fair_prob"], errors="coerce"),
+        )
+        frame = frame.sort_values(
+            ["side", "decimal_odds"], ascending=[True, False], kind="mergesort"
+        ).reset_index(drop=True)
+        self._frame = frame
+
+        line_key = [*PROP_KEY, "line_numeric"]
+        frame["is_best"], self._consensus = _annotate(frame, line_key)
+        frame["best_flag"] = np.where(frame["is_best"], "⭐", "")
+        self._positions = frame.groupby(line_key, sort=False).indices
+        self._props = frame.groupby(PROP_KEY, sort=False).indices
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def lookup(self, row: pd.Series) -> tuple[pd.DataFrame, dict[str, Optional[float]]]:
+        """Every book's price for ``row``'s prop, plus consensus fair probability by side.
+
+        Without a usable line the prop's rows across all lines are combined,
+        as the scan-based table did.
+        """
+        prop = tuple(row.get(col) for col in PROP_KEY)
+        try:
+            line = float(row.get("line"))
+        except (TypeError, ValueError):
+            line = None
+        if line is not None:
+            key = (*prop, line)
+            positions = self._positions.get(key)
+            if positions is None:
+                return pd.DataFrame(columns=VIEW_COLUMNS), {}
+            view = self._views.get(key)
+            if view is None:
+                view = self._views[key] = self._frame.iloc[positions][VIEW_OUTPUT]
+            return view, self._consensus[key]
+
+        positions = self._props.get(prop)
+        if positions is None:
+            return pd.DataFrame(columns=VIEW_COLUMNS), {}
+        subset = self._frame.iloc[positions].copy()
+        subset["is_best"], consensus = _annotate(subset, PROP_KEY)
+        subset["best_flag"] = np.where(subset["is_best"], "⭐", "")
+        return subset[VIEW_OUTPUT], consensus.get(prop, {})
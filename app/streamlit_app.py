@@ -16,6 +16,7 @@ import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 
+from app.data_access import DashboardData
 from app.debug_panel import (
     _connect,
     active_env_settings,
@@ -26,12 +27,14 @@ from app.debug_panel import (
     max_updated,
     odds_staleness,
 )
+from app.line_shopping import PROP_KEY, LineShoppingIndex
 from app.ui_badges import context_key, is_why_open, render_header_with_badge
 from app.why_empty import Filters as EmptyFilters
 from app.why_empty import explain_empty
 from engine import steam_detector
 from engine.odds_math import american_to_decimal
-from engine.portfolio import greedy_select, kelly_fraction
+from engine.portfolio import build_card, greedy_select
+from engine.portfolio_optimizer import CorrelationModel, optimize_card
 from utils.time import utc_now_iso
 
 
@@ -43,71 +46,10 @@ def get_database_path() -> Path:
     return parse_database_url(url)
 
 
-@st.cache_data(ttl=60)
-def load_tables(database_path: Path) -> dict[str, pd.DataFrame]:
-    with sqlite3.connect(database_path) as conn:
-        edges = pd.read_sql_query("SELECT * FROM edges", conn)
-        props = pd.read_sql_query("SELECT * FROM qb_props_odds", conn)
-        projections = pd.read_sql_query("SELECT * FROM projections_qb", conn)
-        best_lines = pd.read_sql_query("SELECT * FROM current_best_lines", conn)
-        snapshots = pd.read_sql_query("SELECT * FROM odds_snapshots", conn)
-        try:
-            odds_raw = pd.read_sql_query("SELECT * FROM odds_csv_raw", conn)
-        except Exception:
-            odds_raw = pd.DataFrame()
-        optional_tables = {
-            "scheme": "team_week_scheme",
-            "weather": "weather",
-            "context_notes": "context_notes",
-            "wr_cb": "wr_cb_public",
-            "injuries": "injuries",
-        }
-        extras: dict[str, pd.DataFrame] = {}
-        for key, table in optional_tables.items():
-            try:
-                extras[key] = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-            except Exception:
-                extras[key] = pd.DataFrame()
-        context_expected = {
-            "scheme": ["team", "season", "week", "proe", "ed_pass_rate", "pace"],
-            "weather": ["event_id", "game_id", "temp_f", "wind_mph", "precip", "indoor"],
-            "wr_cb": ["event_id", "player", "note", "summary", "source_url", "url"],
-            "injuries": [
-                "event_id",
-                "player",
-                "status",
-                "designation",
-                "note",
-                "description",
-                "name",
-            ],
-            "context_notes": ["event_id", "note", "source_url", "created_at"],
-        }
-        for key, expected_cols in context_expected.items():
-            df_ref = extras.get(key)
-            if df_ref is None or df_ref.empty:
-                extras[key] = pd.DataFrame(
-                    {col: pd.Series(dtype="object") for col in expected_cols}
-                )
-                continue
-            missing_cols = [col for col in expected_cols if col not in df_ref.columns]
-            for col in missing_cols:
-                df_ref[col] = pd.NA
-            extras[key] = df_ref
-    edges = edges.merge(
-        props[["event_id", "player", "season", "def_team"]].drop_duplicates(),
-        on=["event_id", "player"],
-        how="left",
-    )
-    return {
-        "edges": edges,
-        "props": props,
-        "projections": projections,
-        "best_lines": best_lines,
-        "snapshots": snapshots,
-        "odds_raw": odds_raw,
-        **extras,
-    }
+@st.cache_resource
+def load_tables(database_path: Path) -> DashboardData:
+    """One lazily loaded, version-checked store shared by every session."""
+    return DashboardData(database_path)
 
 
 def _safe_filter(df: pd.DataFrame | None, col: str, value: object) -> pd.DataFrame:
@@ -485,7 +427,7 @@ def add_context_note(database_path: Path, event_id: object, note: str, source_ur
 
 def render_matchup_expander(
     row: pd.Series,
-    data: dict[str, pd.DataFrame],
+    data: DashboardData,
     database_path: Path,
     filters: Optional[EmptyFilters] = None,
     edges_source: Optional[pd.DataFrame] = None,
@@ -679,6 +621,15 @@ def render_matchup_expander(
             if weather_caption and all(not line.startswith("Weather:") for line in info_lines):
                 inj_col.caption(weather_caption)
 
+        # Line history is only read when asked for, one game at a time
+        if event_id is not None and not pd.isna(event_id):
+            if st.checkbox("Show line history", key=f"line_history_{ctx_drawer}_{row.get('row_id')}"):
+                history = data.event_snapshots(event_id)
+                if history.empty:
+                    st.caption("No odds snapshots recorded for this game yet.")
+                else:
+                    st.dataframe(history, width="stretch")
+
         # Context notes
         st.markdown("**Context notes**")
         existing_notes = fetch_context_notes(database_path, event_id)
@@ -815,78 +766,26 @@ def compute_confidence(row: pd.Series) -> float:
 def build_line_shopping_table(
     odds_raw: pd.DataFrame, row: pd.Series
 ) -> tuple[pd.DataFrame, dict[str, float]]:
-    if odds_raw.empty:
+    """One-off lookup; the dashboard reuses a prebuilt index instead."""
+    if odds_raw.empty or not set(PROP_KEY).issubset(odds_raw.columns):
         return pd.DataFrame(), {}
-    line_val = row.get("line")
-    try:
-        line_val = float(line_val)
-    except (TypeError, ValueError):
-        line_val = None
-
-    working = odds_raw.copy()
-    working["line_numeric"] = pd.to_numeric(working.get("line"), errors="coerce")
-
-    mask = (
-        (working.get("event_id") == row.get("event_id"))
-        & (working.get("player") == row.get("player"))
-        & (working.get("market") == row.get("market"))
-    )
-    if line_val is not None:
-        mask &= working["line_numeric"] == line_val
-
-    subset = working.loc[mask, ["book", "side", "odds", "implied_prob", "fair_prob", "updated_at"]]
-    if subset.empty:
-        return subset, {}
-
-    subset = subset.copy()
-    subset["side"] = subset["side"].astype(str).str.title()
-
-    subset["decimal_odds"] = subset["odds"].apply(safe_decimal_from_american)
-    subset = subset.sort_values(["side", "decimal_odds"], ascending=[True, False])
-
-    consensus: dict[str, float] = {}
-    for side, group in subset.groupby("side"):
-        probs = group["fair_prob"].dropna()
-        if probs.empty:
-            probs = group["implied_prob"].dropna()
-        consensus[side] = float(probs.mean()) if not probs.empty else None
-        best_decimal = group["decimal_odds"].max()
-        subset.loc[group.index, "is_best"] = group["decimal_odds"] == best_decimal
-    if "is_best" not in subset.columns:
-        subset["is_best"] = False
-    else:
-        mask = subset["is_best"].isna()
-        if mask.any():
-            subset.loc[mask, "is_best"] = False
-        subset["is_best"] = subset["is_best"].astype(bool)
-    subset["best_flag"] = subset["is_best"].map(lambda x: "⭐" if x else "")
-    return subset, consensus
-
-
-def prepare_card_dataframe(df: pd.DataFrame, bankroll: float, fraction: float) -> pd.DataFrame:
-    if df.empty:
-        return df.copy()
-
-    card = df.copy()
+    mask = np.logical_and.reduce([odds_raw[col] == row.get(col) for col in PROP_KEY])
+    return LineShoppingIndex(odds_raw.loc[mask]).lookup(row)
 
-    card["decimal_odds"] = card["odds"].apply(safe_decimal_from_american)
-    card["kelly_b"] = card["decimal_odds"].apply(lambda d: None if d is None else d - 1.0)
 
-    def compute_stake(row: pd.Series) -> float:
-        b = row.get("kelly_b")
-        if b is None:
-            return 0.0
-        p_val = row.get("p_model_shrunk")
-        if pd.isna(p_val) or p_val is None:
-            p_val = row.get("model_p")
-        if pd.isna(p_val) or p_val is None:
-            return 0.0
-        return bankroll * kelly_fraction(float(p_val), float(b), fraction)
-
-    card["stake"] = card.apply(compute_stake, axis=1)
-    ev_series = pd.to_numeric(card.get("ev_per_dollar"), errors="coerce").fillna(0.0)
-    card["expected_value"] = card["stake"] * ev_series
-    return card
+def prepare_card_dataframe(
+    df: pd.DataFrame,
+    bankroll: float,
+    fraction: float,
+    max_event_exposure: Optional[float] = None,
+    correlations: Optional[CorrelationModel] = None,
+) -> pd.DataFrame:
+    """Size a card per bet, or jointly when a correlation model is given."""
+    if correlations is not None:
+        return optimize_card(
+            df, bankroll, fraction, correlations, max_event_exposure=max_event_exposure
+        )
+    return build_card(df, bankroll, fraction, max_event_exposure=max_event_exposure)
 
 
 def export_card(card_df: pd.DataFrame, prefix: str = "card") -> tuple[Path, Path]:
@@ -918,12 +817,8 @@ def render_app() -> None:
         st.stop()
 
     data = load_tables(database_path)
-    edges = data["edges"].copy()
-    props = data["props"]
-    projections = data["projections"]
-    best_lines = data["best_lines"]
-    snapshots = data["snapshots"]
-    odds_raw = data.get("odds_raw", pd.DataFrame())
+    edges = data.edges().copy()
+    props = data.props()
     base_edges_count = len(edges)
 
     # Ensure pos column exists and is normalized
@@ -989,6 +884,20 @@ def render_app() -> None:
     bankroll = st.sidebar.number_input("Bankroll ($)", min_value=0.0, value=1000.0, step=50.0)
     kelly_fraction_input = st.sidebar.slider("Kelly fraction", 0.0, 1.0, 0.25, 0.05)
     max_auto = st.sidebar.slider("Max picks (auto card)", 1, 20, 5)
+    max_game_pct = st.sidebar.slider(
+        "Max stake per game (% of bankroll)",
+        1,
+        100,
+        100,
+        help="Stakes on the same game are scaled down together to stay under this cap.",
+    )
+    max_event_exposure = None if max_game_pct >= 100 else max_game_pct / 100.0
+    correlated_sizing = st.sidebar.checkbox(
+        "Correlation-aware sizing",
+        value=False,
+        help="Size picks jointly so correlated bets (same player, same-team stacks) share one Kelly budget.",
+    )
+    card_correlations = data.correlation_model() if correlated_sizing else None
     st.sidebar.markdown("### Defense filter")
     only_generous = st.sidebar.checkbox("Only vs generous defenses", value=False)
 
@@ -1009,9 +918,12 @@ def render_app() -> None:
 
     edges_view = apply_season_filter(edges_view, selected_seasons, available_seasons)
 
-    # Also apply season filtering to best_lines for summary display
-    if not best_lines.empty and "season" in best_lines.columns:
-        best_lines = apply_season_filter(best_lines, selected_seasons, available_seasons)
+    # Season filter for the best lines summary runs in SQL
+    # (same semantics as apply_season_filter: NA seasons only when all are selected)
+    best_lines = data.best_lines(
+        seasons=[int(s) for s in selected_seasons] if selected_seasons else None,
+        include_unknown=len(selected_seasons) == len(available_seasons),
+    )
 
     # Handle empty season selection
     if not selected_seasons:
@@ -1490,7 +1402,13 @@ def render_app() -> None:
                 st.success(f"Exported {len(edges_view)} picks to {export_path}")
 
             st.subheader("My Card")
-            card_df = prepare_card_dataframe(selected_edges, bankroll, kelly_fraction_input)
+            card_df = prepare_card_dataframe(
+                selected_edges,
+                bankroll,
+                kelly_fraction_input,
+                max_event_exposure,
+                card_correlations,
+            )
             if card_df.empty:
                 st.info("Select rows in the table above to build your card.")
             else:
@@ -1518,9 +1436,23 @@ def render_app() -> None:
     if st.sidebar.button("Auto-build card") and not edges_view.empty:
         auto_source = edges_view.copy()
         auto_source["EV"] = auto_source["ev_per_dollar"]
-        auto_selected = greedy_select(auto_source, max_n=max_auto)
+        if card_correlations is not None:
+            # Let the joint sizing pick among the strongest candidates, then re-size the chosen few
+            pool = prepare_card_dataframe(
+                auto_source.nlargest(300, "EV"),
+                bankroll,
+                kelly_fraction_input,
+                max_event_exposure,
+                card_correlations,
+            )
+            auto_selected = pool.loc[pool["stake"] > 0].nlargest(max_auto, "stake")
+            auto_selected = auto_selected.drop(
+                columns=["decimal_odds", "kelly_b", "stake", "expected_value", "independent_stake"]
+            )
+        else:
+            auto_selected = greedy_select(auto_source, max_n=max_auto)
         st.session_state["auto_card"] = prepare_card_dataframe(
-            auto_selected, bankroll, kelly_fraction_input
+            auto_selected, bankroll, kelly_fraction_input, max_event_exposure, card_correlations
         )
 
     auto_card = st.session_state.get("auto_card")
@@ -1562,15 +1494,19 @@ def render_app() -> None:
             )
 
     st.subheader("Line shopping across books")
-    if odds_raw.empty:
+    if not data.has_rows("odds_csv_raw"):
         st.info("Run the odds poller/importer to populate raw odds snapshots for line shopping.")
     else:
         st.caption(
             "Expand a row to inspect every book for that player prop. ⭐ marks the best available price per side."
         )
         max_rows = min(len(edges_view), 20)
-        for _, row in edges_view.head(max_rows).iterrows():
-            view, consensus = build_line_shopping_table(odds_raw, row)
+        shop_rows = edges_view.head(max_rows)
+        shop_index = data.line_shopping_index(
+            event_ids=shop_rows["event_id"].tolist() if "event_id" in shop_rows.columns else []
+        )
+        for _, row in shop_rows.iterrows():
+            view, consensus = shop_index.lookup(row)
             if view.empty:
                 continue
             label = (
@@ -1599,6 +1535,12 @@ def render_app() -> None:
             st.dataframe(best_lines, width="stretch")
 
     st.subheader("Steam alerts")
+    # Only the latest two snapshots per book/outcome are read, for the games on screen
+    snapshots = data.steam_window(
+        event_ids=edges_view["event_id"].tolist()
+        if hide_past_games and "event_id" in edges_view.columns
+        else None
+    )
     if snapshots.empty:
         st.info("Steam alerts require at least two odds snapshots.")
     else:
@@ -3,9 +3,8 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import httpx
 import redis.asyncio as redis
@@ -13,33 +12,56 @@ import redis.asyncio as redis
 from app.core.config import get_cache_prefix, get_settings  # type: ignore
 from app.models.odds import GameOdds, MarketLine  # type: ignore
 
+# Quota accounting is shared with the project-level pollers; the project root
+# must be importable (see backend/README.md)
+from utils.odds_quota import (
+    OddsQuotaManager,
+    QuotaExhaustedError,
+    create_quota_manager,
+    request_cost,
+)
+
 logger = logging.getLogger(__name__)
 
 
 class OddsAPIError(Exception):
     """Raised when the Odds API cannot satisfy a request."""
 
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
 
 class DailyLimitReached(OddsAPIError):
     """Raised when the daily request limit has been exceeded."""
 
 
 class OddsAPIManager:
-    """Manages Odds API requests with caching, rate limiting, and key rotation."""
+    """Manages Odds API requests with caching, rate limiting, and key rotation.
+
+    Key selection and quota accounting go through the shared
+    ``OddsQuotaManager``, so usage by the pollers and this service is
+    counted against the same balances. Redis only holds the response cache
+    and this service's own daily request cap.
+    """
 
     SPORTS_KEY = "americanfootball_nfl"
     TARGET_BOOKMAKERS = ["draftkings", "fanduel", "betmgm"]
     TARGET_MARKETS = ["spreads", "totals"]
 
-    def __init__(self, redis_client: Optional[redis.Redis] = None) -> None:
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        quota: Optional[OddsQuotaManager] = None,
+    ) -> None:
         self.settings = get_settings()
         self.redis = redis_client or redis.from_url(self.settings.redis_url, decode_responses=True)
         self.cache_ttl = max(1800, self.settings.cache_ttl_seconds)
         self.daily_limit = max(1, self.settings.daily_request_limit)
         self.cache_key_odds = get_cache_prefix("odds", self.SPORTS_KEY, "current_week")
         self.usage_key = get_cache_prefix("usage", "daily_count")
-        self.key_index_key = get_cache_prefix("usage", "current_key_index")
         self._keys = self.settings.all_odds_keys
+        self.quota = quota or create_quota_manager(self._keys)
         self._lock = asyncio.Lock()
 
     async def get_cached_week_odds(self) -> List[Dict[str, Any]]:
@@ -74,31 +96,23 @@ class OddsAPIManager:
 
     async def get_usage_stats(self) -> Dict[str, Any]:
         requests_made = await self._requests_today()
-        per_key_counts: Dict[str, int] = {}
-        for key in self._keys:
-            usage = await self.redis.get(self._key_usage_key(key))
-            per_key_counts[key[-6:]] = int(usage) if usage else 0
-
-        blocked_status: Dict[str, str] = {}
-        for key in self._keys:
-            blocked_until = await self.redis.get(self._key_blocked_key(key))
-            if blocked_until:
-                try:
-                    timestamp = float(blocked_until)
-                except ValueError:
-                    continue
-                if timestamp > time.time():
-                    blocked_status[key[-6:]] = datetime.fromtimestamp(
-                        timestamp, tz=timezone.utc
-                    ).isoformat()
-
+        quota = await asyncio.to_thread(self.quota.status)
         return {
             "daily_limit": self.daily_limit,
             "requests_made": requests_made,
             "requests_remaining": max(0, self.daily_limit - requests_made),
             "keys_configured": len(self._keys),
-            "key_usage_snapshot": per_key_counts,
-            "blocked_keys": blocked_status,
+            "key_usage_snapshot": {
+                label: info["requests_today"] for label, info in quota["keys"].items()
+            },
+            "key_quota_remaining": {
+                label: info["remaining"] for label, info in quota["keys"].items()
+            },
+            "blocked_keys": {
+                label: info["blocked_until"]
+                for label, info in quota["keys"].items()
+                if not info["available"]
+            },
         }
 
     async def force_refresh(self) -> List[Dict[str, Any]]:
@@ -109,27 +123,30 @@ class OddsAPIManager:
             logger.warning("No Odds API keys configured; returning demo payload.")
             return self._demo_payload()
 
-        last_index_raw = await self.redis.get(self.key_index_key)
-        start_index = int(last_index_raw) if last_index_raw else 0
-
-        for offset in range(len(self._keys)):
-            index = (start_index + offset) % len(self._keys)
-            api_key = self._keys[index]
-
-            if await self._is_key_blocked(api_key):
-                continue
+        cost = request_cost(",".join(self.TARGET_MARKETS), "us")
+        for _ in range(len(self._keys)):
+            try:
+                lease = await asyncio.to_thread(self.quota.reserve, cost)
+            except QuotaExhaustedError as exc:
+                logger.error("No Odds API key has quota left: %s", exc)
+                break
 
-            await self._register_attempt(api_key)
+            await self._register_attempt()
 
             try:
-                events = await self._request_odds(api_key)
-                await self.redis.set(self.key_index_key, str((index + 1) % len(self._keys)))
-                return events
+                events, headers = await self._request_odds(lease.key)
             except OddsAPIError as exc:
-                await self._handle_key_failure(api_key, exc)
-                logger.error("Key ending with %s failed due to %s", api_key[-6:], exc)
+                await asyncio.to_thread(self.quota.fail, lease, exc.status_code)
+                logger.error("Key ending with %s failed due to %s", lease.key[-6:], exc)
+                continue
+            except httpx.HTTPError as exc:
+                await asyncio.to_thread(self.quota.release, lease)
+                logger.error("Key ending with %s failed due to %s", lease.key[-6:], exc)
                 continue
 
+            await asyncio.to_thread(self.quota.record, lease, headers)
+            return events
+
         logger.error("All Odds API keys failed; falling back to demo payload.")
         return self._demo_payload()
 
@@ -137,17 +154,14 @@ class OddsAPIManager:
         value = await self.redis.get(self.usage_key)
         return int(value) if value else 0
 
-    async def _register_attempt(self, api_key: str) -> None:
+    async def _register_attempt(self) -> None:
         async with self._lock:
             pipeline = self.redis.pipeline()
             pipeline.incr(self.usage_key)
             pipeline.expireat(self.usage_key, self._midnight_epoch())
-            per_key_key = self._key_usage_key(api_key)
-            pipeline.incr(per_key_key)
-            pipeline.expireat(per_key_key, self._midnight_epoch())
             await pipeline.execute()
 
-    async def _request_odds(self, api_key: str) -> List[Dict[str, Any]]:
+    async def _request_odds(self, api_key: str) -> Tuple[List[Dict[str, Any]], Mapping[str, str]]:
         params = {
             "apiKey": api_key,
             "regions": "us",
@@ -166,53 +180,22 @@ class OddsAPIManager:
                 events = response.json()
                 if not isinstance(events, list):
                     raise OddsAPIError("Unexpected Odds API payload format")
-                return events
+                return events, response.headers
             except (ValueError, json.JSONDecodeError) as exc:
                 raise OddsAPIError(f"Failed to decode Odds API response: {exc}") from exc
 
-        if response.status_code in {401, 403}:
-            raise OddsAPIError("Key unauthorized or exhausted")
-        if response.status_code == 429:
-            raise OddsAPIError("Rate limit exceeded for key")
-        if response.status_code >= 500:
-            raise OddsAPIError(f"Odds API server error ({response.status_code})")
+        status = response.status_code
+        if status in {401, 403}:
+            raise OddsAPIError("Key unauthorized or exhausted", status)
+        if status == 429:
+            raise OddsAPIError("Rate limit exceeded for key", status)
+        if status >= 500:
+            raise OddsAPIError(f"Odds API server error ({status})", status)
 
         raise OddsAPIError(
-            f"Odds API request failed with status {response.status_code}: {response.text[:200]}"
+            f"Odds API request failed with status {status}: {response.text[:200]}", status
         )
 
-    async def _handle_key_failure(self, api_key: str, exc: OddsAPIError) -> None:
-        block_duration = 0
-        message = str(exc).lower()
-
-        if "unauthorized" in message or "exhausted" in message:
-            block_duration = 24 * 3600
-        elif "rate limit" in message:
-            block_duration = 3600
-        elif "server error" in message:
-            block_duration = 300
-        else:
-            block_duration = 600
-
-        if block_duration > 0:
-            await self.redis.set(
-                self._key_blocked_key(api_key),
-                str(time.time() + block_duration),
-                ex=block_duration,
-            )
-
-    async def _is_key_blocked(self, api_key: str) -> bool:
-        blocked_until = await self.redis.get(self._key_blocked_key(api_key))
-        if blocked_until:
-            try:
-                timestamp = float(blocked_until)
-            except ValueError:
-                return False
-            if timestamp > time.time():
-                logger.debug("Key ending with %s is blocked until %s", api_key[-6:], timestamp)
-                return True
-        return False
-
     def _process_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         now = datetime.now(timezone.utc)
         week_end = now + timedelta(days=7)
@@ -309,12 +292,6 @@ class OddsAPIManager:
         )
         return [sample_game.dict(by_alias=True)]
 
-    def _key_usage_key(self, api_key: str) -> str:
-        return get_cache_prefix("usage", "key", api_key[-6:])
-
-    def _key_blocked_key(self, api_key: str) -> str:
-        return get_cache_prefix("usage", "key_blocked", api_key[-6:])
-
     @staticmethod
     def _midnight_epoch() -> int:
         now = datetime.now(timezone.utc)
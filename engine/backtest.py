@@ -0,0 +1,510 @@
+"""Event-driven backtest over historical odds snapshots.
+
+Each week is replayed independently: the odds stream is cut at a decision
+time before every kickoff, projections and edges are rebuilt from game logs
+that predate the week, and every candidate is priced against the last
+pre-kickoff snapshot (the close) and settled against the week's box score.
+Those per-week candidate frames are the expensive part, so they are built in
+a process pool and cached on disk; staking policies are applied afterwards,
+which keeps sweeping them cheap.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm  # type: ignore
+
+from engine.calibration import brier_score, bucket_calibration
+from engine.edge_engine import EdgeEngine, EdgeEngineConfig
+from engine.portfolio import build_card, decimal_odds, greedy_select, model_probability
+from engine.portfolio_optimizer import MARKET_STATS
+from engine.shrinkage import shrink_to_market
+from models.qb_projection import ProjectionConfig, QBProjectionModel
+
+QUOTE_KEY = ["event_id", "player", "market", "book", "line", "side"]
+PAIR_KEY = QUOTE_KEY[:-1]
+
+CANDIDATE_COLUMNS = [
+    "season",
+    "week",
+    "event_id",
+    "commence_time",
+    "player",
+    "market",
+    "book",
+    "side",
+    "line",
+    "odds",
+    "mu",
+    "sigma",
+    "model_p",
+    "fair_prob",
+    "close_odds",
+    "close_fair_prob",
+    "actual",
+    "result",
+]
+
+RESULT_UNITS = {"loss": -1.0, "push": 0.0, "void": 0.0}
+
+# Bump when the cached candidate frame changes shape or meaning
+CACHE_VERSION = 3
+
+SNAPSHOT_SQL = """
+    SELECT
+        fetched_at,
+        event_id,
+        market_key AS market,
+        bookmaker_key AS book,
+        LOWER(outcome) AS side,
+        COALESCE(points, line) AS line,
+        price AS odds,
+        CASE WHEN json_valid(odds_raw_json)
+             THEN json_extract(odds_raw_json, '$.outcome.description') END AS player
+    FROM odds_snapshots
+    WHERE event_id IN ({events}) AND market_key IN ({markets})
+"""
+
+
+@dataclass(frozen=True)
+class BacktestConfig:
+    database_path: Path
+    seasons: Tuple[int, ...]
+    hours_before: float = 2.0
+    # The QB projection model only forecasts passing yards
+    markets: Tuple[str, ...] = ("player_pass_yds",)
+    cache_dir: Optional[Path] = Path("storage/cache/backtest")
+    workers: int = 1
+    projection_config: ProjectionConfig = field(default_factory=ProjectionConfig)
+    use_news_flags: bool = False
+
+
+@dataclass(frozen=True)
+class StakingPolicy:
+    """How candidates are priced, picked and sized (stakes are week-start bankroll fractions).
+
+    The pricing knobs default to ``EdgeEngineConfig`` so a backtest matches
+    what the live edge job would have emitted.
+    """
+
+    kelly_fraction: float = 0.25
+    min_ev: float = 0.0
+    max_picks: int = 10
+    max_event_exposure: Optional[float] = None
+    shrink_weight: float = 0.0
+    edge_threshold: float = EdgeEngineConfig.edge_threshold
+    sigma_floor: float = EdgeEngineConfig.sigma_floor
+    kelly_cap: Optional[float] = EdgeEngineConfig.kelly_cap  # On full Kelly, as in EdgeEngine
+
+
+@dataclass
+class BacktestResult:
+    candidates: pd.DataFrame
+    bets: pd.DataFrame
+    summary: pd.DataFrame
+
+    def calibration(self, n: int = 10) -> pd.DataFrame:
+        return calibration_table(self.candidates, n=n)
+
+
+def _player_key(names: pd.Series) -> pd.Series:
+    """Lower-cased name without punctuation or generational suffix, for joining sources."""
+    key = names.astype("string").str.lower().str.replace(r"[^a-z0-9 ]", "", regex=True)
+    key = key.str.replace(r"\s+(jr|sr|ii|iii|iv)$", "", regex=True)
+    return key.str.split().str.join(" ")
+
+
+def _placeholders(values: Sequence[object]) -> str:
+    return ",".join("?" * len(values))
+
+
+def load_events(con: sqlite3.Connection, seasons: Iterable[int]) -> pd.DataFrame:
+    """Events with a kickoff, season and week; the replay clock comes from here."""
+    seasons = [int(s) for s in seasons]
+    events = pd.read_sql_query(
+        "SELECT event_id, commence_time, season, week FROM events "
+        f"WHERE season IN ({_placeholders(seasons)})",
+        con,
+        params=seasons,
+    )
+    events["commence_ts"] = pd.to_datetime(events["commence_time"], errors="coerce", utc=True)
+    events = events.dropna(subset=["commence_ts", "week"])
+    events["season"] = events["season"].astype(int)
+    events["week"] = events["week"].astype(int)
+    return events.reset_index(drop=True)
+
+
+def _load_snapshots(
+    con: sqlite3.Connection, event_ids: Sequence[str], markets: Sequence[str]
+) -> pd.DataFrame:
+    query = SNAPSHOT_SQL.format(events=_placeholders(event_ids), markets=_placeholders(markets))
+    snaps = pd.read_sql_query(query, con, params=[*event_ids, *markets])
+    snaps["fetched_ts"] = pd.to_datetime(snaps["fetched_at"], errors="coerce", utc=True)
+    snaps["line"] = pd.to_numeric(snaps["line"], errors="coerce")
+    snaps["odds"] = pd.to_numeric(snaps["odds"], errors="coerce")
+    return snaps.dropna(subset=["fetched_ts", "player", "line", "odds"])
+
+
+def _snapshot_state(con: sqlite3.Connection, event_ids: Sequence[str]) -> Tuple[int, int]:
+    row = con.execute(
+        "SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM odds_snapshots "
+        f"WHERE event_id IN ({_placeholders(event_ids)})",
+        list(event_ids),
+    ).fetchone()
+    return int(row[0]), int(row[1])
+
+
+def _latest_before(snaps: pd.DataFrame, cutoff: pd.Series) -> pd.DataFrame:
+    """Last quote per book/line/side fetched at or before each row's cutoff."""
+    eligible = snaps.loc[snaps["fetched_ts"] <= cutoff]
+    return eligible.sort_values("fetched_ts", kind="stable").drop_duplicates(QUOTE_KEY, keep="last")
+
+
+def _pair_sides(quotes: pd.DataFrame) -> pd.DataFrame:
+    """One row per book/line with over and under odds and their no-vig probabilities."""
+    wide = (
+        quotes.set_index(QUOTE_KEY)["odds"]
+        .unstack("side")
+        .reindex(columns=["over", "under"])
+        .rename(columns={"over": "over_odds", "under": "under_odds"})
+        .reset_index()
+    )
+    wide.columns.name = None
+    implied_over = 1.0 / decimal_odds(wide["over_odds"])
+    implied_under = 1.0 / decimal_odds(wide["under_odds"])
+    wide["fair_over"] = implied_over / (implied_over + implied_under)
+    wide["fair_under"] = 1.0 - wide["fair_over"]
+    return wide
+
+
+def _by_side(frame: pd.DataFrame, over: pd.Series, under: pd.Series) -> pd.Series:
+    return pd.Series(np.where(frame["side"] == "over", over, under), index=frame.index)
+
+
+def _settle(edges: pd.DataFrame, played: pd.DataFrame) -> pd.DataFrame:
+    stats = [s for s in dict.fromkeys(MARKET_STATS.values()) if s in played.columns]
+    box = played.melt(
+        id_vars=["player_key"], value_vars=stats, var_name="stat", value_name="actual"
+    ).drop_duplicates(["player_key", "stat"])
+    edges = edges.assign(stat=edges["market"].map(MARKET_STATS)).merge(
+        box, on=["player_key", "stat"], how="left"
+    )
+    actual = pd.to_numeric(edges["actual"], errors="coerce")
+    won = np.where(edges["side"] == "over", actual > edges["line"], actual < edges["line"])
+    edges["actual"] = actual
+    edges["result"] = np.select(
+        [actual.isna(), actual == edges["line"], won], ["void", "push", "win"], "loss"
+    )
+    return edges
+
+
+def _week_opponents(logs: pd.DataFrame, season: int, week: int) -> pd.Series:
+    """Opponent per team for one week, from the team-level schedule in the logs."""
+    games = logs.loc[
+        (pd.to_numeric(logs["season"], errors="coerce") == season)
+        & (pd.to_numeric(logs["week"], errors="coerce") == week),
+        ["recent_team", "opponent_team"],
+    ].dropna()
+    swapped = games.rename(columns={"recent_team": "opponent_team", "opponent_team": "recent_team"})
+    pairs = pd.concat([games, swapped])
+    return pairs.drop_duplicates("recent_team").set_index("recent_team")["opponent_team"]
+
+
+def prepare_week(
+    config: BacktestConfig,
+    season: int,
+    week: int,
+    events: pd.DataFrame,
+    game_logs: pd.DataFrame,
+) -> pd.DataFrame:
+    """Every edge the model would have priced in ``week``, settled and matched to its close.
+
+    Entry quotes are the last snapshot ``hours_before`` kickoff; projections
+    only see games played before the week.
+    """
+    empty = pd.DataFrame(columns=CANDIDATE_COLUMNS)
+    kickoffs = events.set_index("event_id")["commence_ts"]
+    with sqlite3.connect(config.database_path) as con:
+        snaps = _load_snapshots(con, list(kickoffs.index), list(config.markets))
+    if snaps.empty:
+        return empty
+
+    kickoff = snaps["event_id"].map(kickoffs)
+    entry = _latest_before(snaps, kickoff - pd.to_timedelta(config.hours_before, unit="h"))
+    props = _pair_sides(entry).dropna(subset=["over_odds", "under_odds"])
+    if props.empty:
+        return empty
+
+    logs = game_logs.assign(player_key=_player_key(game_logs["player_name"]))
+    log_season = pd.to_numeric(logs["season"], errors="coerce")
+    log_week = pd.to_numeric(logs["week"], errors="coerce")
+    history = logs.loc[(log_season < season) | ((log_season == season) & (log_week < week))]
+    played = logs.loc[(log_season == season) & (log_week == week)]
+
+    # Known before kickoff: the player's team from his latest prior game, the
+    # opponent from the week's team schedule. Neither depends on the player
+    # recording a stat line in the week being replayed.
+    latest = history.sort_values(["season", "week"], kind="stable").drop_duplicates(
+        "player_key", keep="last"
+    )
+    props = props.assign(season=season, week=week, player_key=_player_key(props["player"]))
+    props["team"] = props["player_key"].map(latest.set_index("player_key")["recent_team"])
+    props["def_team"] = props["team"].map(_week_opponents(logs, season, week))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = QBProjectionModel(history, {}, config.projection_config)
+        if not config.use_news_flags:
+            # Manual flags describe the present, not the week being replayed
+            model.player_flags = {}
+        projections = model.build_projections(props)
+        # Emit every side on the raw projection sigma; price_candidates applies
+        # the threshold and floor so both can be swept without rebuilding weeks
+        engine = EdgeEngine(
+            EdgeEngineConfig(
+                database_path=config.database_path, edge_threshold=0.0, sigma_floor=0.0
+            )
+        )
+        edges = engine.compute_edges(props, projections)
+    if edges.empty:
+        return empty
+
+    edges = edges.merge(
+        props[[*PAIR_KEY, "fair_over", "fair_under", "player_key"]], on=PAIR_KEY, how="left"
+    )
+    edges["fair_prob"] = _by_side(edges, edges["fair_over"], edges["fair_under"])
+
+    close = _pair_sides(_latest_before(snaps, kickoff))
+    edges = edges.drop(columns=["fair_over", "fair_under"]).merge(
+        close, on=PAIR_KEY, how="left", suffixes=("", "_close")
+    )
+    edges["close_odds"] = _by_side(edges, edges["over_odds_close"], edges["under_odds_close"])
+    edges["close_fair_prob"] = _by_side(edges, edges["fair_over"], edges["fair_under"])
+
+    edges = _settle(edges, played)
+    edges["season"] = season
+    edges["week"] = week
+    edges["commence_time"] = edges["event_id"].map(kickoffs)
+    return edges[CANDIDATE_COLUMNS].sort_values(["commence_time", "event_id"], kind="stable")
+
+
+_WORKER_LOGS: Optional[pd.DataFrame] = None
+
+
+def _init_worker(game_logs: pd.DataFrame) -> None:
+    global _WORKER_LOGS
+    _WORKER_LOGS = game_logs
+
+
+def _prepare_in_worker(
+    config: BacktestConfig, season: int, week: int, events: pd.DataFrame
+) -> pd.DataFrame:
+    assert _WORKER_LOGS is not None
+    return prepare_week(config, season, week, events, _WORKER_LOGS)
+
+
+def _cache_token(config: BacktestConfig, snapshot_state: Tuple[int, int], logs_token: int) -> str:
+    key = repr(
+        (
+            CACHE_VERSION,
+            config.hours_before,
+            config.markets,
+            config.projection_config.baseline_games,
+            config.projection_config.defense_beta,
+            config.use_news_flags,
+            snapshot_state,
+            logs_token,
+        )
+    )
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def prepare_candidates(config: BacktestConfig, game_logs: pd.DataFrame) -> pd.DataFrame:
+    """Candidate frames for every week of ``config.seasons``, from cache where possible.
+
+    Cache entries are keyed on the replay settings, the week's snapshot
+    count/max rowid and a hash of the game logs, so new odds or stats
+    invalidate only what they touch.
+    """
+    logs_token = int(pd.util.hash_pandas_object(game_logs, index=False).sum())
+    frames: List[pd.DataFrame] = []
+    pending: List[Tuple[int, int, pd.DataFrame, Optional[Path]]] = []
+    with sqlite3.connect(config.database_path) as con:
+        events = load_events(con, config.seasons)
+        for (season, week), week_events in events.groupby(["season", "week"], sort=True):
+            path = None
+            if config.cache_dir is not None:
+                state = _snapshot_state(con, week_events["event_id"].tolist())
+                token = _cache_token(config, state, logs_token)
+                path = config.cache_dir / f"week_{season}_{week:02d}_{token}.pkl"
+                if path.exists():
+                    frames.append(pd.read_pickle(path))
+                    continue
+            pending.append((int(season), int(week), week_events, path))
+
+    if config.workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(
+            max_workers=config.workers, initializer=_init_worker, initargs=(game_logs,)
+        ) as pool:
+            built = list(
+                pool.map(
+                    _prepare_in_worker,
+                    *zip(*[(config, season, week, ev) for season, week, ev, _ in pending]),
+                )
+            )
+    else:
+        built = [prepare_week(config, season, week, ev, game_logs) for season, week, ev, _ in pending]
+
+    for (_, _, _, path), frame in zip(pending, built):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            frame.to_pickle(path)
+        frames.append(frame)
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.sort_values(["commence_time", "event_id"], kind="stable").reset_index(drop=True)
+
+
+def price_candidates(candidates: pd.DataFrame, policy: StakingPolicy) -> pd.DataFrame:
+    """Recompute ``model_p``/``edge`` with the policy's sigma floor and keep sides past the threshold.
+
+    Mirrors ``EdgeEngine.compute_edges``, vectorized over the cached candidates.
+    """
+    if candidates.empty:
+        return candidates.assign(edge=[])
+    sigma = pd.to_numeric(candidates["sigma"], errors="coerce").clip(lower=policy.sigma_floor)
+    p_over = 1.0 - norm.cdf(candidates["line"].astype(float), loc=candidates["mu"], scale=sigma)
+    model_p = _by_side(candidates, p_over, 1.0 - p_over)
+    edge = model_p - 1.0 / decimal_odds(candidates["odds"])
+    keep = edge.abs() > policy.edge_threshold
+    return candidates.assign(sigma=sigma, model_p=model_p, edge=edge).loc[keep]
+
+
+def apply_policy(candidates: pd.DataFrame, policy: StakingPolicy) -> pd.DataFrame:
+    """Pick and size each week's card from priced candidates; stakes and profit are bankroll fractions."""
+    if candidates.empty:
+        return candidates.assign(stake=[], profit=[])
+
+    frame = candidates.copy()
+    if policy.shrink_weight > 0:
+        consensus = frame.groupby(["event_id", "player", "market", "line", "side"])[
+            "fair_prob"
+        ].transform("mean")
+        frame["p_model_shrunk"] = shrink_to_market(
+            frame["model_p"], consensus.fillna(frame["model_p"]), policy.shrink_weight
+        )
+    frame["EV"] = model_probability(frame) * decimal_odds(frame["odds"]) - 1.0
+    frame["ev_per_dollar"] = frame["EV"]
+    frame = frame.loc[frame["EV"] > policy.min_ev]
+
+    picks = greedy_select(frame, max_n=len(frame), corr_keys=("season", "week", "player", "market"))
+    picks = picks.groupby(["season", "week"], sort=False).head(policy.max_picks)
+    card = build_card(
+        picks,
+        1.0,
+        policy.kelly_fraction,
+        max_event_exposure=policy.max_event_exposure,
+        kelly_cap=policy.kelly_cap,
+    )
+    if card.empty:
+        return card.assign(stake=[], profit=[])
+    card = card.loc[card["stake"] > 0].copy()
+    units = card["result"].map(RESULT_UNITS).fillna(card["kelly_b"])
+    card["profit"] = card["stake"] * units
+    return card.sort_values(["commence_time", "event_id"], kind="stable")
+
+
+def _max_drawdown(weekly_returns: np.ndarray) -> float:
+    equity = np.cumprod(1.0 + np.asarray(weekly_returns, dtype=float))
+    peak = np.maximum.accumulate(np.r_[1.0, equity])[1:]
+    return float(np.max(1.0 - equity / peak)) if equity.size else 0.0
+
+
+def bet_metrics(bets: pd.DataFrame, candidates: pd.DataFrame) -> Dict[str, float]:
+    settled = candidates.loc[candidates["result"].isin(["win", "loss"])]
+    metrics: Dict[str, float] = {
+        "candidates": len(candidates),
+        "bets": len(bets),
+        "staked": 0.0,
+        "profit": 0.0,
+        "roi": float("nan"),
+        "hit_rate": float("nan"),
+        "clv_prob": float("nan"),
+        "beat_close_rate": float("nan"),
+        "brier": brier_score(settled["model_p"], settled["result"] == "win"),
+        "max_drawdown": 0.0,
+    }
+    if bets.empty:
+        return metrics
+
+    decided = bets["result"].isin(["win", "loss"])
+    close_decimal = decimal_odds(bets["close_odds"])
+    has_close = close_decimal.notna()
+    weekly = bets.groupby(["season", "week"], sort=True)["profit"].sum().to_numpy()
+    metrics["staked"] = float(bets["stake"].sum())
+    metrics["profit"] = float(bets["profit"].sum())
+    if metrics["staked"]:
+        metrics["roi"] = metrics["profit"] / metrics["staked"]
+    if decided.any():
+        metrics["hit_rate"] = float((bets["result"] == "win").sum() / decided.sum())
+    metrics["clv_prob"] = float((bets["close_fair_prob"] - bets["fair_prob"]).mean())
+    if has_close.any():
+        metrics["beat_close_rate"] = float(
+            (bets["decimal_odds"][has_close] >= close_decimal[has_close]).mean()
+        )
+    metrics["max_drawdown"] = _max_drawdown(weekly)
+    return metrics
+
+
+def summarize(
+    candidates: pd.DataFrame, bets: pd.DataFrame, by: Sequence[str] = ("season", "market")
+) -> pd.DataFrame:
+    """ROI, CLV, calibration and drawdown per group.
+
+    Drawdown compounds each week's bets on the group's own equity curve;
+    Brier score covers every settled candidate, not only the bets placed.
+    """
+    by = list(by)
+    bet_groups = dict(list(bets.groupby(by, sort=False))) if not bets.empty else {}
+    rows = []
+    for key, group_candidates in candidates.groupby(by, sort=True):
+        group_bets = bet_groups.get(key, bets.iloc[0:0])
+        rows.append({**dict(zip(by, key)), **bet_metrics(group_bets, group_candidates)})
+    return pd.DataFrame(rows)
+
+
+def calibration_table(candidates: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    settled = candidates.loc[candidates["result"].isin(["win", "loss"])]
+    frame = pd.DataFrame(
+        {"p": pd.to_numeric(settled["model_p"]), "y": (settled["result"] == "win").astype(float)}
+    )
+    return bucket_calibration(frame, "p", "y", n=n)
+
+
+def run_backtest(
+    config: BacktestConfig,
+    policy: StakingPolicy = StakingPolicy(),
+    game_logs: Optional[pd.DataFrame] = None,
+    by: Sequence[str] = ("season", "market"),
+) -> BacktestResult:
+    if game_logs is None:
+        from adapters.nflverse_provider import get_player_game_logs
+
+        # The prior season seeds projections for the opening weeks
+        seasons = sorted({s for season in config.seasons for s in (season - 1, season)})
+        game_logs = get_player_game_logs(seasons)
+    candidates = price_candidates(prepare_candidates(config, game_logs), policy)
+    bets = apply_policy(candidates, policy)
+    return BacktestResult(candidates, bets, summarize(candidates, bets, by))
@@ -0,0 +1,214 @@
+"""Monte Carlo bankroll simulation for fractional-Kelly bet cards.
+
+Each week's card is a set of bets with a win probability, net odds ``b``
+and a stake expressed as a fraction of the current bankroll. Outcomes are
+drawn jointly through a Gaussian copula, so correlated picks (same player,
+same-team stacks) win and lose together. Paths are simulated in fixed-size
+NumPy chunks so memory stays bounded regardless of path count, and blocks
+of paths can be spread over a process pool.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm  # type: ignore
+
+from engine.portfolio import build_card, greedy_select, model_probability
+from engine.portfolio_optimizer import CorrelationModel, bet_correlations, optimize_card
+
+
+def _psd_sqrt(corr: np.ndarray) -> np.ndarray:
+    """Factor ``L`` with ``L @ L.T == corr`` (eigen-based, tolerates singular matrices)."""
+    values, vectors = np.linalg.eigh((corr + corr.T) / 2.0)
+    return vectors * np.sqrt(np.clip(values, 0.0, None))
+
+
+@dataclass
+class WeeklyCard:
+    """One week's bets: win probability, net odds and stake as a bankroll fraction."""
+
+    p: np.ndarray
+    b: np.ndarray
+    f: np.ndarray
+    latent_corr: Optional[np.ndarray] = None
+
+    def __post_init__(self) -> None:
+        self.p = np.asarray(self.p, dtype=float)
+        self.b = np.asarray(self.b, dtype=float)
+        self.f = np.asarray(self.f, dtype=float)
+        n = len(self.p)
+        corr = np.eye(n) if self.latent_corr is None else np.asarray(self.latent_corr, float)
+        # float32 draws halve RNG and matmul cost; plenty for win/lose thresholds
+        self.factor = (_psd_sqrt(corr) if n else np.zeros((0, 0))).astype(np.float32)
+        self.thresholds = norm.ppf(np.clip(self.p, 0.0, 1.0)).astype(np.float32)
+        self.payout = self.f * (self.b + 1.0)
+        self.exposure = float(self.f.sum())
+
+    def __len__(self) -> int:
+        return len(self.p)
+
+    @classmethod
+    def from_card(
+        cls,
+        card: pd.DataFrame,
+        bankroll: float,
+        model: Optional[CorrelationModel] = None,
+        independent: bool = False,
+    ) -> "WeeklyCard":
+        """Build from a ``build_card``/``optimize_card`` frame; zero stakes are dropped.
+
+        The latent (copula) correlation is recovered from the bet-outcome
+        correlations via ``sin(pi/2 * c)``, the inverse of the arcsine rule.
+        """
+        card = card.loc[pd.to_numeric(card.get("stake"), errors="coerce").fillna(0) > 0]
+        p = model_probability(card).to_numpy(dtype=float)
+        b = card["kelly_b"].to_numpy(dtype=float)
+        f = card["stake"].to_numpy(dtype=float) / float(bankroll)
+        latent = None
+        if not independent and len(card) > 1:
+            latent = np.sin(np.pi / 2.0 * bet_correlations(card, model))
+        return cls(p=p, b=b, f=f, latent_corr=latent)
+
+    def returns(self, rng: np.random.Generator, n_paths: int) -> np.ndarray:
+        """Bankroll growth factor ``1 + sum(f * R)`` for ``n_paths`` joint draws."""
+        if not len(self):
+            return np.ones(n_paths)
+        z = rng.standard_normal((n_paths, len(self)), dtype=np.float32) @ self.factor.T
+        wins = z < self.thresholds
+        return 1.0 - self.exposure + wins @ self.payout
+
+
+@dataclass
+class SimulationResult:
+    ending: np.ndarray
+    max_drawdown: np.ndarray
+    ruined: np.ndarray
+    initial_bankroll: float = 1.0
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.ending)
+
+    def summary(self, percentiles: Sequence[float] = (5, 25, 50, 75, 95)) -> Dict[str, object]:
+        ending_pct = np.percentile(self.ending, percentiles)
+        drawdown_pct = np.percentile(self.max_drawdown, percentiles)
+        return {
+            "paths": self.n_paths,
+            "initial_bankroll": self.initial_bankroll,
+            "mean_ending": float(self.ending.mean()),
+            "ending_percentiles": {f"p{q:g}": float(v) for q, v in zip(percentiles, ending_pct)},
+            "max_drawdown_percentiles": {
+                f"p{q:g}": float(v) for q, v in zip(percentiles, drawdown_pct)
+            },
+            "prob_ruin": float(self.ruined.mean()),
+            "prob_loss": float((self.ending < self.initial_bankroll).mean()),
+        }
+
+
+def _simulate_block(
+    cards: Sequence[WeeklyCard],
+    n_paths: int,
+    seed: np.random.SeedSequence,
+    initial_bankroll: float,
+    ruin_level: float,
+    chunk_size: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    ending = np.empty(n_paths)
+    drawdown = np.empty(n_paths)
+    ruined = np.empty(n_paths, dtype=bool)
+    ruin_at = initial_bankroll * ruin_level
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        bankroll = np.full(size, float(initial_bankroll))
+        peak = bankroll.copy()
+        worst = np.zeros(size)
+        dead = np.zeros(size, dtype=bool)
+        for card in cards:
+            growth = card.returns(rng, size)
+            # Ruined paths stop betting
+            bankroll *= np.where(dead, 1.0, growth)
+            np.maximum(peak, bankroll, out=peak)
+            np.maximum(worst, 1.0 - bankroll / peak, out=worst)
+            dead |= bankroll <= ruin_at
+        ending[start : start + size] = bankroll
+        drawdown[start : start + size] = worst
+        ruined[start : start + size] = dead
+    return ending, drawdown, ruined
+
+
+def simulate_bankroll(
+    cards: Sequence[WeeklyCard],
+    n_paths: int = 100_000,
+    initial_bankroll: float = 1.0,
+    ruin_level: float = 0.1,
+    chunk_size: int = 50_000,
+    seed: Optional[int] = None,
+    workers: int = 1,
+) -> SimulationResult:
+    """Simulate ``n_paths`` bankroll paths through ``cards`` in order (one per week).
+
+    A path is ruined once its bankroll falls to ``ruin_level`` times the
+    starting bankroll; it stops betting from then on. ``workers > 1`` splits
+    the paths into blocks run in a process pool, each with an independent
+    child seed, so results are reproducible for a given seed and worker count.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(max(1, workers))
+    sizes = [len(block) for block in np.array_split(np.arange(n_paths), len(seeds))]
+    args = [
+        (cards, size, child, initial_bankroll, ruin_level, chunk_size)
+        for size, child in zip(sizes, seeds)
+        if size
+    ]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(_simulate_block, *zip(*args)))
+    else:
+        blocks = [_simulate_block(*a) for a in args]
+    return SimulationResult(
+        ending=np.concatenate([b[0] for b in blocks]),
+        max_drawdown=np.concatenate([b[1] for b in blocks]),
+        ruined=np.concatenate([b[2] for b in blocks]),
+        initial_bankroll=initial_bankroll,
+    )
+
+
+def load_weekly_cards(
+    database_path: Path,
+    season: int,
+    bankroll: float = 1000.0,
+    fraction: float = 0.25,
+    max_picks: int = 10,
+    model: Optional[CorrelationModel] = None,
+    max_event_exposure: Optional[float] = None,
+) -> List[WeeklyCard]:
+    """Build one card per week of ``season`` from the ``edges`` table.
+
+    Positive-EV edges are picked with ``greedy_select``; with a correlation
+    model they are sized jointly by ``optimize_card``, otherwise per bet.
+    """
+    with sqlite3.connect(database_path) as con:
+        edges = pd.read_sql_query("SELECT * FROM edges WHERE season = ?", con, params=[season])
+    if edges.empty or "week" not in edges.columns:
+        return []
+    edges["EV"] = pd.to_numeric(edges.get("ev_per_dollar"), errors="coerce")
+    edges = edges.loc[edges["EV"] > 0]
+
+    cards: List[WeeklyCard] = []
+    for _, week_edges in edges.dropna(subset=["week"]).groupby("week", sort=True):
+        picks = greedy_select(week_edges, max_n=max_picks)
+        if model is not None:
+            card = optimize_card(
+                picks, bankroll, fraction, model, max_event_exposure=max_event_exposure
+            )
+        else:
+            card = build_card(picks, bankroll, fraction, max_event_exposure=max_event_exposure)
+        cards.append(WeeklyCard.from_card(card, bankroll, model))
+    return cards
@@ -13,6 +13,7 @@ import pandas as pd
 from scipy.stats import norm  # type: ignore
 
 from engine import odds_math
+from utils.data_version import bump_data_version
 from utils.teams import infer_is_home, infer_offense_team, normalize_team_code, parse_event_id
 
 SUPPORTED_MARKETS = {
@@ -49,6 +50,10 @@ class EdgeEngineConfig:
     database_path: Path
     export_dir: Path = Path("storage/exports")
     kelly_cap: float = 0.05
+    # Minimum |model_p - implied| for a side to be emitted
+    edge_threshold: float = 0.005
+    sigma_floor: float = 35.0
+    default_sigma: float = 55.0
 
 
 class EdgeEngine:
@@ -81,7 +86,7 @@ class EdgeEngine:
             merged = props_df.copy()
             # Add default projection columns
             merged["mu"] = merged.get("line", 200.0)
-            merged["sigma"] = 55.0
+            merged["sigma"] = self.config.default_sigma
         else:
             merged = props_df.merge(
                 projections_df,
@@ -90,9 +95,9 @@ class EdgeEngine:
                 suffixes=("_props", "_proj"),
             )
             merged["mu"] = merged["mu"].fillna(merged["line"])
-            merged["sigma"] = merged["sigma"].fillna(55.0)
+            merged["sigma"] = merged["sigma"].fillna(self.config.default_sigma)
 
-        merged["sigma"] = merged["sigma"].clip(lower=35.0)
+        merged["sigma"] = merged["sigma"].clip(lower=self.config.sigma_floor)
 
         # Enhanced market filtering with debugging
         if "market" in merged.columns:
@@ -195,7 +200,7 @@ class EdgeEngine:
 
                 event_id = row.get("event_id")
                 mu = float(row.get("mu", line))  # Fallback to line if mu missing
-                sigma = float(row.get("sigma", 55.0))  # Default sigma
+                sigma = float(row.get("sigma", self.config.default_sigma))
                 line_val = float(line)
 
                 # Enhanced season handling
@@ -208,10 +213,9 @@ class EdgeEngine:
 
                 # Calculate probability and edge
                 if sigma <= 0:
-                    sigma = 55.0
+                    sigma = self.config.default_sigma
 
-                distribution = norm(loc=mu, scale=sigma)
-                p_over = float(1 - distribution.cdf(line_val))
+                p_over = float(1 - norm.cdf(line_val, loc=mu, scale=sigma))
                 p_under = float(1 - p_over)
 
                 # Convert odds to probabilities
@@ -262,7 +266,7 @@ class EdgeEngine:
                 }
 
                 # Add records for both sides if edge is significant
-                edge_threshold = 0.005  # 0.5% minimum edge threshold
+                edge_threshold = self.config.edge_threshold
 
                 if abs(edge_over) > edge_threshold:
                     rows.append(
@@ -342,6 +346,7 @@ class EdgeEngine:
 
                 # Insert new edges
                 edges_df.to_sql("edges", conn, if_exists="append", index=False)
+                bump_data_version(conn, "edges")
 
                 print(f"SUCCESS: Persisted {len(edges_df)} edges to database")
 
@@ -8,6 +8,7 @@ from pathlib import Path
 import pandas as pd
 
 from adapters.odds.the_odds_api import compute_current_best_lines
+from utils.data_version import bump_data_version
 
 
 def load_snapshots(database_path: Path) -> pd.DataFrame:
@@ -37,6 +38,7 @@ def update_best_lines(database_path: Path) -> pd.DataFrame:
                     row.get("fetched_at"),
                 ),
             )
+        bump_data_version(conn, "current_best_lines")
         conn.commit()
     return best
 
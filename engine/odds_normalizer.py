@@ -125,8 +125,13 @@ def normalize_long_odds(
     stale_minutes: int = 120,
     *,
     now_ts: pd.Timestamp | None = None,
+    devig: bool = True,
 ) -> pd.DataFrame:
-    """Normalize long-format odds data with season, de-vig, and stale flags."""
+    """Normalize long-format odds data with season, de-vig, and stale flags.
+
+    ``devig=False`` leaves fair_prob/fair_decimal/overround empty, for callers
+    that de-vig later over the complete market (the chunked CSV import).
+    """
 
     if df.empty:
         return pd.DataFrame(columns=OUTPUT_COLUMNS)
@@ -187,7 +192,12 @@ def normalize_long_odds(
         lambda o: None if pd.isna(o) else american_to_implied_prob(int(o))
     )
 
-    data = _compute_devig(data)
+    if devig:
+        data = _compute_devig(data)
+    else:
+        data["fair_prob"] = pd.NA
+        data["fair_decimal"] = pd.NA
+        data["overround"] = pd.NA
 
     # Staleness
     if stale_minutes > 0:
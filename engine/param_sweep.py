@@ -0,0 +1,137 @@
+"""Grid and random search over edge, shrinkage and staking parameters.
+
+Parameters split by cost. ``defense_beta`` changes projections, so each
+distinct value needs its own candidate frames (built once per week by the
+backtester, in parallel and cached on disk). Everything else only reprices
+and restakes those frames, which takes milliseconds, so each configuration
+is a cheap task. Candidate frames are placed in a module-level cache before
+the pool starts; with the ``fork`` start method workers inherit them instead
+of receiving a pickled copy per task.
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import (
+    BacktestConfig,
+    StakingPolicy,
+    apply_policy,
+    bet_metrics,
+    prepare_candidates,
+    price_candidates,
+)
+
+Choice = Union[Sequence[float], Tuple[float, float]]
+
+DEFAULT_SPACE: Dict[str, Sequence[float]] = {
+    "edge_threshold": [0.0, 0.005, 0.01, 0.02, 0.03],
+    "shrink_weight": [0.0, 0.2, 0.35, 0.5],
+    "kelly_cap": [0.01, 0.02, 0.05],
+    "sigma_floor": [35.0, 45.0, 55.0],
+    "defense_beta": [0.0, 0.1, 0.2],
+}
+
+PROJECTION_PARAMS = ("defense_beta",)
+POLICY_PARAMS = tuple(f.name for f in fields(StakingPolicy))
+
+_CANDIDATES: Dict[Tuple, pd.DataFrame] = {}
+
+
+def grid(space: Mapping[str, Sequence[float]]) -> List[Dict[str, float]]:
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def random_search(
+    space: Mapping[str, Choice], n: int, seed: Optional[int] = None
+) -> List[Dict[str, float]]:
+    """``n`` random points; lists are sampled as choices, ``(low, high)`` tuples uniformly."""
+    rng = np.random.default_rng(seed)
+    points = []
+    for _ in range(n):
+        point = {}
+        for name, choice in space.items():
+            if isinstance(choice, tuple):
+                point[name] = float(rng.uniform(*choice))
+            else:
+                point[name] = choice[int(rng.integers(len(choice)))]
+        points.append(point)
+    return points
+
+
+def _projection_key(point: Mapping[str, float]) -> Tuple:
+    return tuple(point.get(name) for name in PROJECTION_PARAMS)
+
+
+def _evaluate(key: Tuple, point: Dict[str, float], base_policy: StakingPolicy) -> Dict[str, float]:
+    candidates = _CANDIDATES[key]
+    policy = replace(base_policy, **{k: v for k, v in point.items() if k in POLICY_PARAMS})
+    priced = price_candidates(candidates, policy)
+    bets = apply_policy(priced, policy)
+    return {**point, **bet_metrics(bets, priced)}
+
+
+def _init_worker(candidates: Dict[Tuple, pd.DataFrame]) -> None:
+    _CANDIDATES.update(candidates)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+    # spawn/forkserver start from a fresh interpreter: ship the frames once per worker
+    return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(dict(_CANDIDATES),))
+
+
+def run_sweep(
+    config: BacktestConfig,
+    game_logs: pd.DataFrame,
+    points: Sequence[Mapping[str, float]],
+    base_policy: StakingPolicy = StakingPolicy(),
+    workers: int = 1,
+    rank_by: str = "roi",
+    min_bets: int = 1,
+) -> pd.DataFrame:
+    """Evaluate every point and return them ranked best first.
+
+    Points with fewer than ``min_bets`` bets rank below all others, since a
+    handful of lucky bets would otherwise top any ROI table.
+    """
+    points = [dict(p) for p in points]
+    for key in dict.fromkeys(_projection_key(p) for p in points):
+        projection = config.projection_config
+        overrides = {n: v for n, v in zip(PROJECTION_PARAMS, key) if v is not None}
+        week_config = replace(
+            config,
+            workers=max(config.workers, workers),
+            projection_config=replace(projection, **overrides),
+        )
+        _CANDIDATES[key] = prepare_candidates(week_config, game_logs)
+
+    tasks = [(_projection_key(p), p, base_policy) for p in points]
+    try:
+        if workers > 1 and len(tasks) > 1:
+            chunksize = max(1, len(tasks) // (4 * workers))
+            with _pool(workers) as pool:
+                rows = list(pool.map(_evaluate, *zip(*tasks), chunksize=chunksize))
+        else:
+            rows = [_evaluate(*task) for task in tasks]
+    finally:
+        _CANDIDATES.clear()
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+    results["eligible"] = results["bets"] >= min_bets
+    results = results.sort_values(
+        ["eligible", rank_by], ascending=[False, False], na_position="last", kind="stable"
+    )
+    results.insert(0, "rank", np.arange(1, len(results) + 1))
+    return results.reset_index(drop=True)
@@ -1,24 +1,20 @@
 from __future__ import annotations
 
-import pandas as pd
+from typing import Optional, Tuple
 
+import numpy as np
+import pandas as pd
 
-from typing import Tuple
 
 def greedy_select(
     df: pd.DataFrame, max_n: int = 10, corr_keys: Tuple[str, ...] = ("player", "market")
 ) -> pd.DataFrame:
-    picked = []
-    used = set()
-    for _, r in df.sort_values("EV", ascending=False).iterrows():
-        key = tuple(r.get(k) for k in corr_keys)
-        if key in used:
-            continue
-        picked.append(r)
-        used.add(key)
-        if len(picked) >= max_n:
-            break
-    return pd.DataFrame(picked)
+    """Best-EV row per correlation key, highest EV first, at most ``max_n``."""
+    if df.empty:
+        return df.copy()
+    ranked = df.sort_values("EV", ascending=False, kind="stable")
+    keys = ranked.reindex(columns=list(corr_keys))
+    return ranked.loc[~keys.duplicated()].head(max_n)
 
 
 def kelly_fraction(p: float, b: float, frac: float = 0.25) -> float:
@@ -28,3 +24,82 @@ def kelly_fraction(p: float, b: float, frac: float = 0.25) -> float:
     fair_f = (p * (b + 1.0) - 1.0) / b
     fair_f = max(0.0, min(1.0, fair_f))
     return fair_f * float(frac)
+
+
+def kelly_fractions(p, b, frac: float = 0.25, cap: Optional[float] = None) -> np.ndarray:
+    """Array form of ``kelly_fraction``; missing inputs or ``b <= 0`` stake nothing.
+
+    ``cap`` limits full Kelly before ``frac`` is applied, like ``EdgeEngineConfig.kelly_cap``.
+    """
+    p = np.asarray(p, dtype=float)
+    b = np.asarray(b, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fair_f = np.clip((p * (b + 1.0) - 1.0) / b, 0.0, 1.0 if cap is None else cap)
+    return np.where((b > 0) & ~np.isnan(fair_f), fair_f * float(frac), 0.0)
+
+
+def _numeric(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[col], errors="coerce")
+
+
+def decimal_odds(odds) -> pd.Series:
+    """Vectorized ``american_to_decimal`` (odds truncated to int); 0 and junk become NaN."""
+    american = np.trunc(pd.to_numeric(pd.Series(odds), errors="coerce"))
+    american = american.where(american != 0)
+    return pd.Series(
+        np.where(american < 0, 1.0 + 100.0 / american.abs(), 1.0 + american / 100.0),
+        index=american.index,
+    ).where(american.notna())
+
+
+def model_probability(df: pd.DataFrame) -> pd.Series:
+    """``p_model_shrunk`` where present, else ``model_p``."""
+    return _numeric(df, "p_model_shrunk").fillna(_numeric(df, "model_p"))
+
+
+def _cap(stake: pd.Series, limit: float, groups: Optional[pd.Series] = None) -> pd.Series:
+    """Scale stakes down pro rata so each group (or the whole card) sums to at most ``limit``."""
+    totals = stake.groupby(groups).transform("sum") if groups is not None else stake.sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.minimum(1.0, limit / totals)
+    return stake * pd.Series(scale, index=stake.index).fillna(1.0)
+
+
+def build_card(
+    df: pd.DataFrame,
+    bankroll: float,
+    fraction: float,
+    max_event_exposure: Optional[float] = None,
+    max_total_exposure: Optional[float] = None,
+    event_col: str = "event_id",
+    kelly_cap: Optional[float] = None,
+) -> pd.DataFrame:
+    """Fractional-Kelly stakes and expected value for every row of ``df``.
+
+    Probability is ``p_model_shrunk``, falling back to ``model_p``. The
+    optional caps are fractions of ``bankroll``: stakes on one game (rows
+    sharing ``event_col``) and across the whole card are scaled down
+    proportionally to fit. ``kelly_cap`` caps full Kelly before ``fraction``.
+    """
+    if df.empty:
+        return df.copy()
+
+    card = df.copy()
+    decimal = decimal_odds(_numeric(card, "odds"))
+    card["decimal_odds"] = decimal
+    card["kelly_b"] = decimal - 1.0
+
+    p = model_probability(card)
+    stake = pd.Series(
+        bankroll * kelly_fractions(p, card["kelly_b"], fraction, kelly_cap), index=card.index
+    )
+    if max_event_exposure is not None and event_col in card.columns:
+        stake = _cap(stake, bankroll * max_event_exposure, card[event_col])
+    if max_total_exposure is not None:
+        stake = _cap(stake, bankroll * max_total_exposure)
+
+    card["stake"] = stake
+    card["expected_value"] = stake * _numeric(card, "ev_per_dollar").fillna(0.0)
+    return card
@@ -0,0 +1,370 @@
+"""Correlation-aware fractional-Kelly allocation for bet cards.
+
+``greedy_select`` and ``build_card`` size every pick as if it were the only
+bet. Overs on one QB's yards and attempts, or a QB and his receivers, win and
+lose together, so sizing each at full fractional Kelly overbets the shared
+outcome. This module:
+
+* estimates stat correlations from historical game logs, for the same
+  player across markets and for teammates in the same game;
+* turns them into a bet-outcome correlation matrix (sign-flipped for
+  unders, Gaussian-copula arcsine mapping for over/under outcomes);
+* solves the fractional-Kelly allocation for all candidates at once as a
+  convex quadratic program (second-order expansion of expected log growth)
+  under per-game and total exposure caps.
+
+The solver is accelerated projected gradient with an exact projection onto
+the caps, so a few hundred candidates solve in well under a second.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine.portfolio import build_card, model_probability
+
+# Prop market -> game log stat column
+MARKET_STATS = {
+    "player_pass_yds": "passing_yards",
+    "player_pass_att": "attempts",
+    "player_pass_cmp": "completions",
+    "player_rush_yds": "rushing_yards",
+    "player_rush_att": "carries",
+    "player_rec_yds": "receiving_yards",
+    "player_receptions": "receptions",
+}
+
+DEFAULT_SAME_PLAYER = 0.5
+DEFAULT_SAME_TEAM = 0.1
+
+StatPair = Tuple[str, str]
+
+
+def _pair(a: str, b: str) -> StatPair:
+    return (a, b) if a <= b else (b, a)
+
+
+def _corr(x: np.ndarray, y: np.ndarray) -> float:
+    x = x - x.mean()
+    y = y - y.mean()
+    denom = np.sqrt((x * x).sum() * (y * y).sum())
+    return float((x * y).sum() / denom) if denom > 0 else 0.0
+
+
+@dataclass
+class CorrelationModel:
+    """Stat correlations by relationship, with priors for unseen pairs."""
+
+    same_player: Dict[StatPair, float] = field(default_factory=dict)
+    same_team: Dict[StatPair, float] = field(default_factory=dict)
+    player_teams: Dict[str, str] = field(default_factory=dict)
+    default_same_player: float = DEFAULT_SAME_PLAYER
+    default_same_team: float = DEFAULT_SAME_TEAM
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [
+            {"relation": relation, "stat_a": a, "stat_b": b, "rho": rho}
+            for relation, table in (("same_player", self.same_player), ("same_team", self.same_team))
+            for (a, b), rho in table.items()
+        ]
+        return pd.DataFrame(rows, columns=["relation", "stat_a", "stat_b", "rho"])
+
+    @classmethod
+    def from_frame(cls, frame: Optional[pd.DataFrame]) -> "CorrelationModel":
+        model = cls()
+        if frame is None or frame.empty:
+            return model
+        for row in frame.itertuples(index=False):
+            table = model.same_player if row.relation == "same_player" else model.same_team
+            table[_pair(row.stat_a, row.stat_b)] = float(row.rho)
+        return model
+
+
+def estimate_correlations(
+    game_logs: pd.DataFrame, min_samples: int = 50
+) -> CorrelationModel:
+    """Estimate same-player and same-team stat correlations from game logs.
+
+    Stats are demeaned per player first, so the estimates describe how a
+    player's good and bad games co-move rather than how volume differs
+    between players. Only players who actually record a stat count toward
+    it (a receiver's zero passing yards say nothing). Pairs with fewer than
+    ``min_samples`` observations are left to the model's priors.
+    """
+    model = CorrelationModel()
+    if game_logs is None or game_logs.empty:
+        return model
+
+    player_col = "player_name" if "player_name" in game_logs.columns else "player_id"
+    stats = [s for s in dict.fromkeys(MARKET_STATS.values()) if s in game_logs.columns]
+    logs = game_logs.dropna(subset=[player_col]).copy()
+    for stat in stats:
+        logs[stat] = pd.to_numeric(logs[stat], errors="coerce")
+    stats = [s for s in stats if logs[s].notna().any()]
+    if not stats:
+        return model
+
+    by_player = logs.groupby(player_col)
+    # Residual vs the player's own mean; NaN where the player never records the stat
+    for stat in stats:
+        mean = by_player[stat].transform("mean")
+        logs[f"{stat}__res"] = (logs[stat] - mean).where(mean > 0)
+
+    for a, b in itertools.combinations(stats, 2):
+        both = logs[[f"{a}__res", f"{b}__res"]].dropna()
+        if len(both) >= min_samples:
+            model.same_player[_pair(a, b)] = _corr(
+                both.iloc[:, 0].to_numpy(), both.iloc[:, 1].to_numpy()
+            )
+
+    if "recent_team" in logs.columns:
+        game_keys = [c for c in ("season", "week", "recent_team") if c in logs.columns]
+        active = logs.dropna(subset=["recent_team"])
+        latest = active.sort_values([c for c in ("season", "week") if c in active.columns])
+        model.player_teams = (
+            latest.drop_duplicates(player_col, keep="last")
+            .set_index(player_col)["recent_team"]
+            .astype(str)
+            .to_dict()
+        )
+        model.player_teams = {k: v for k, v in model.player_teams.items() if v.strip()}
+        res_cols = [f"{s}__res" for s in stats]
+        active = active.loc[active[res_cols].notna().any(axis=1), [*game_keys, player_col, *res_cols]]
+        pairs = active.merge(active, on=game_keys, suffixes=("_l", "_r"))
+        pairs = pairs.loc[pairs[f"{player_col}_l"] != pairs[f"{player_col}_r"]]
+        for a, b in itertools.combinations_with_replacement(stats, 2):
+            both = pairs[[f"{a}__res_l", f"{b}__res_r"]].dropna()
+            if len(both) >= min_samples:
+                model.same_team[_pair(a, b)] = _corr(
+                    both.iloc[:, 0].to_numpy(), both.iloc[:, 1].to_numpy()
+                )
+
+    return model
+
+
+def _column(df: pd.DataFrame, *names: str) -> pd.Series:
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series(pd.NA, index=df.index, dtype="object")
+
+
+def _nearest_correlation(matrix: np.ndarray) -> np.ndarray:
+    """Clip negative eigenvalues so pairwise estimates form a valid correlation matrix."""
+    values, vectors = np.linalg.eigh((matrix + matrix.T) / 2.0)
+    fixed = (vectors * np.clip(values, 0.0, None)) @ vectors.T
+    scale = np.sqrt(np.clip(np.diag(fixed), 1e-12, None))
+    fixed = fixed / np.outer(scale, scale)
+    np.fill_diagonal(fixed, 1.0)
+    return fixed
+
+
+def bet_correlations(
+    candidates: pd.DataFrame, model: Optional[CorrelationModel] = None
+) -> np.ndarray:
+    """Pairwise win/lose correlation of the candidate bets.
+
+    Bets on the same player and game use the same-player stat correlation
+    (1.0 for the same stat); teammates in the same game use the same-team
+    one; everything else is treated as independent.
+    """
+    model = model or CorrelationModel()
+    n = len(candidates)
+    if n == 0:
+        return np.zeros((0, 0))
+
+    player = _column(candidates, "player").astype(str).to_numpy()
+    event = _column(candidates, "event_id").astype(str).to_numpy()
+    team = _column(candidates, "team").astype("object")
+    team = team.where(team.notna(), _column(candidates, "player").map(model.player_teams))
+    team_known = team.notna().to_numpy()
+    team = team.astype(str).to_numpy()
+    side = _column(candidates, "odds_side", "side").astype(str).str.lower().to_numpy()
+    sign = np.where(side == "under", -1.0, 1.0)
+
+    stat_names = _column(candidates, "market").map(MARKET_STATS).fillna("").to_numpy()
+    stats, codes = np.unique(stat_names, return_inverse=True)
+    k = len(stats)
+    same_player = np.full((k, k), model.default_same_player)
+    same_team = np.full((k, k), model.default_same_team)
+    for i, j in itertools.product(range(k), repeat=2):
+        if stats[i] and stats[j]:
+            key = _pair(stats[i], stats[j])
+            same_player[i, j] = model.same_player.get(key, model.default_same_player)
+            same_team[i, j] = model.same_team.get(key, model.default_same_team)
+        if i == j and stats[i]:
+            same_player[i, j] = 1.0
+
+    same_game = event[:, None] == event[None, :]
+    is_same_player = same_game & (player[:, None] == player[None, :])
+    is_teammate = (
+        same_game
+        & ~is_same_player
+        & (team[:, None] == team[None, :])
+        & team_known[:, None]
+    )
+    rho = np.where(
+        is_same_player,
+        same_player[codes[:, None], codes[None, :]],
+        np.where(is_teammate, same_team[codes[:, None], codes[None, :]], 0.0),
+    )
+    # Correlation of two median-threshold indicators of bivariate normals
+    outcome = (2.0 / np.pi) * np.arcsin(np.clip(rho, -1.0, 1.0)) * np.outer(sign, sign)
+    np.fill_diagonal(outcome, 1.0)
+    return _nearest_correlation(outcome)
+
+
+def _project_caps(
+    x: np.ndarray, groups: np.ndarray, caps: np.ndarray, total_cap: float
+) -> np.ndarray:
+    """Euclidean projection onto {f >= 0, sum per group <= caps, sum <= total_cap}."""
+
+    order = np.lexsort((-x, groups))
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(x)])
+    rank = np.arange(len(x)) - np.repeat(starts, sizes) + 1
+    group_caps = caps[sorted_groups[starts]]
+
+    def per_group(shift: float) -> np.ndarray:
+        y = x - shift
+        ys = y[order]
+        cumulative = np.cumsum(ys)
+        cumulative -= np.repeat(np.r_[0.0, cumulative[starts[1:] - 1]], sizes)
+        with np.errstate(invalid="ignore"):
+            theta = (cumulative - np.repeat(group_caps, sizes)) / rank
+        count = np.add.reduceat((ys - theta > 0).astype(int), starts)
+        tau = np.where(
+            count > 0, theta[starts + np.maximum(count, 1) - 1], np.inf
+        )
+        tau = np.where(np.isfinite(group_caps), np.maximum(tau, 0.0), 0.0)
+        out = np.empty_like(y)
+        out[order] = np.maximum(ys - np.repeat(tau, sizes), 0.0)
+        return out
+
+    f = per_group(0.0)
+    if not np.isfinite(total_cap) or f.sum() <= total_cap:
+        return f
+    lo, hi = 0.0, max(float(x.max()), 0.0)
+    for _ in range(60):
+        mid = (lo + hi) / 2.0
+        if per_group(mid).sum() > total_cap:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo < 1e-12:
+            break
+    return per_group(hi)
+
+
+def solve_allocation(
+    mu: np.ndarray,
+    cov: np.ndarray,
+    fraction: float = 0.25,
+    groups: Optional[np.ndarray] = None,
+    group_cap: Optional[float] = None,
+    total_cap: Optional[float] = None,
+    max_iter: int = 2000,
+    tol: float = 1e-10,
+) -> np.ndarray:
+    """Maximize ``mu.f - f'Σf / (2 * fraction)`` subject to the caps.
+
+    Unconstrained, this is ``fraction`` times the mean-variance Kelly
+    solution ``Σ⁻¹ mu``. Returns bankroll fractions per bet.
+    """
+    n = len(mu)
+    if n == 0 or fraction <= 0:
+        return np.zeros(n)
+    groups = np.zeros(n, dtype=int) if groups is None else np.asarray(groups)
+    n_groups = int(groups.max()) + 1 if n else 0
+    caps = np.full(n_groups, np.inf if group_cap is None else float(group_cap))
+    total = np.inf if total_cap is None else float(total_cap)
+
+    hessian = cov / fraction
+    lipschitz = float(np.linalg.eigvalsh(hessian)[-1]) or 1.0
+    step = 1.0 / lipschitz
+
+    f = np.zeros(n)
+    y = f.copy()
+    t = 1.0
+    for _ in range(max_iter):
+        f_next = _project_caps(y - step * (hessian @ y - mu), groups, caps, total)
+        t_next = (1.0 + np.sqrt(1.0 + 4.0 * t * t)) / 2.0
+        y = f_next + ((t - 1.0) / t_next) * (f_next - f)
+        if np.max(np.abs(f_next - f)) < tol:
+            f = f_next
+            break
+        f, t = f_next, t_next
+    return f
+
+
+def optimize_card(
+    candidates: pd.DataFrame,
+    bankroll: float,
+    fraction: float = 0.25,
+    model: Optional[CorrelationModel] = None,
+    max_event_exposure: Optional[float] = None,
+    max_total_exposure: Optional[float] = None,
+    event_col: str = "event_id",
+) -> pd.DataFrame:
+    """Size every candidate jointly; returns ``build_card`` columns plus ``independent_stake``.
+
+    ``independent_stake`` is the per-bet fractional Kelly stake for
+    comparison. Candidates without a positive edge get a zero stake.
+    Exposure caps are fractions of ``bankroll``.
+    """
+    card = build_card(candidates, bankroll, fraction)
+    if card.empty:
+        return card.assign(independent_stake=pd.Series(dtype=float))
+    card = card.rename(columns={"stake": "independent_stake"})
+
+    b = card["kelly_b"].to_numpy(dtype=float)
+    p = model_probability(card).to_numpy(dtype=float)
+    usable = np.isfinite(b) & (b > 0) & np.isfinite(p) & (p * (b + 1.0) - 1.0 > 0)
+
+    stake = np.zeros(len(card))
+    if usable.any():
+        sub = card.loc[usable]
+        p_u, b_u = p[usable], b[usable]
+        mu = p_u * (b_u + 1.0) - 1.0
+        sd = np.sqrt(p_u * (1.0 - p_u)) * (b_u + 1.0)
+        cov = bet_correlations(sub, model) * np.outer(sd, sd)
+        groups = (
+            pd.factorize(sub[event_col].astype(str))[0]
+            if event_col in sub.columns
+            else np.arange(len(sub))
+        )
+        stake[usable] = bankroll * solve_allocation(
+            mu,
+            cov,
+            fraction=fraction,
+            groups=groups,
+            group_cap=max_event_exposure,
+            total_cap=max_total_exposure,
+        )
+
+    card["stake"] = stake
+    ev = pd.to_numeric(_column(card, "ev_per_dollar", "ev"), errors="coerce").fillna(0.0)
+    card["expected_value"] = card["stake"] * ev
+    return card
+
+
+def load_correlation_model(con, table: str = "market_correlations") -> CorrelationModel:
+    """Read estimates persisted by ``save_correlation_model``; priors only if absent."""
+    try:
+        frame = pd.read_sql_query(f"SELECT relation, stat_a, stat_b, rho FROM {table}", con)
+    except Exception:
+        frame = None
+    return CorrelationModel.from_frame(frame)
+
+
+def save_correlation_model(
+    con, model: CorrelationModel, table: str = "market_correlations"
+) -> None:
+    model.to_frame().to_sql(table, con, if_exists="replace", index=False)
+
@@ -16,6 +16,8 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     nfl = None  # type: ignore
 
+from adapters.nflverse_provider import get_pbp
+
 
 @dataclass
 class SchemeConfig:
@@ -24,27 +26,29 @@ class SchemeConfig:
     early_downs: tuple[int, ...] = (1, 2)
 
 
+PBP_COLUMNS = [
+    "game_id",
+    "season",
+    "week",
+    "posteam",
+    "pass",
+    "down",
+    "ydstogo",
+    "yardline_100",
+    "game_seconds_remaining",
+]
+
+
 def _load_pbp(seasons: Iterable[int]) -> pd.DataFrame:
-    if not nfl:
-        raise RuntimeError("nfl_data_py is required to compute scheme metrics")
     seasons = [int(s) for s in seasons]
     if not seasons:
         return pd.DataFrame()
-    df = nfl.import_pbp_data(seasons)
+    df = get_pbp(seasons, columns=PBP_COLUMNS)
     if df.empty:
+        if not nfl:
+            raise RuntimeError("nfl_data_py is required to compute scheme metrics")
         return df
-    required = {
-        "game_id",
-        "season",
-        "week",
-        "posteam",
-        "pass",
-        "down",
-        "ydstogo",
-        "yardline_100",
-        "game_seconds_remaining",
-    }
-    missing = required.difference(df.columns)
+    missing = set(PBP_COLUMNS).difference(df.columns)
     if missing:
         raise RuntimeError(f"play-by-play data missing required columns: {sorted(missing)}")
     return df
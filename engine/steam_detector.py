@@ -8,6 +8,14 @@ from typing import List
 
 import pandas as pd
 
+# A move this large between consecutive snapshots counts as steam
+STEAM_PRICE_CHANGE = 20  # American odds points
+STEAM_LINE_CHANGE = 0.5
+
+
+def is_steam_move(price_change: float, line_change: float) -> bool:
+    return abs(price_change) >= STEAM_PRICE_CHANGE or abs(line_change) >= STEAM_LINE_CHANGE
+
 
 def load_recent_history(database_path: Path) -> pd.DataFrame:
     with sqlite3.connect(database_path) as conn:
@@ -41,7 +49,7 @@ def detect_steam(df: pd.DataFrame) -> pd.DataFrame:
         previous = group.iloc[-2]
         price_change = float(latest.get("price", 0) or 0) - float(previous.get("price", 0) or 0)
         line_change = float(latest.get("line", 0) or 0) - float(previous.get("line", 0) or 0)
-        if abs(price_change) >= 20 or abs(line_change) >= 0.5:
+        if is_steam_move(price_change, line_change):
             alerts.append(
                 {
                     "event_id": latest.get("event_id"),
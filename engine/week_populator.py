@@ -5,6 +5,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 # Comprehensive team normalization mapping
@@ -76,6 +77,173 @@ def normalize_team_code(team: Union[str, None]) -> str:
     return _TEAM_NORM.get(team_upper, team_upper)
 
 
+def normalize_team_codes(codes: pd.Series) -> pd.Series:
+    """Vectorized :func:`normalize_team_code`: normalizes each distinct code once."""
+    codes = codes.astype("string")
+    uniques = codes.dropna().unique()
+    mapping = {code: normalize_team_code(code) or pd.NA for code in uniques}
+    return codes.map(mapping).astype("category")
+
+
+def _utc_dates(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, utc=True).dt.strftime("%Y-%m-%d").astype("string")
+
+
+def _utc_days(values: pd.Series) -> pd.Series:
+    """UTC calendar day as an integer (days since the epoch)."""
+    stamps = pd.to_datetime(values, utc=True)
+    days = stamps.dt.floor("D").dt.tz_localize(None).to_numpy(dtype="datetime64[D]")
+    return pd.Series(days.astype("int64"), index=stamps.index).where(stamps.notna()).astype(
+        "Int64"
+    )
+
+
+def _match_keys(
+    season: pd.Series, day: pd.Series, home: pd.Series, away: pd.Series
+) -> pd.MultiIndex:
+    season = pd.to_numeric(season, errors="coerce").astype("Int64")
+    return pd.MultiIndex.from_arrays(
+        [
+            season.to_numpy(dtype=object, na_value=None),
+            day.to_numpy(dtype=object, na_value=None),
+            home.astype("string").to_numpy(dtype=object, na_value=None),
+            away.astype("string").to_numpy(dtype=object, na_value=None),
+        ]
+    )
+
+
+# Match-key variants in priority order: (name, home column, away column)
+_MATCH_VARIANTS = (
+    ("exact", "home_team", "away_team"),
+    ("swapped", "away_team", "home_team"),
+    ("normalized", "home_norm", "away_norm"),
+    ("normalized_swapped", "away_norm", "home_norm"),
+)
+
+
+class ScheduleIndex:
+    """One row per game plus a hash index from every key variant to its row.
+
+    ``frame`` holds season/week, the UTC game date as ``YYYY-MM-DD``, raw and
+    normalized team codes (categoricals) and the metadata event lookups
+    return. Keys cover the nflverse ``game_id``, the ``date-away-home`` and
+    ``date-home-away`` event ids, and ``season|date|home|away`` match keys
+    for exact, swapped and normalized team codes. Built once per schedule,
+    it answers lookups for a whole frame with one ``get_indexer`` call.
+    """
+
+    FRAME_COLUMNS = [
+        "season",
+        "week",
+        "game_id",
+        "gameday",
+        "date",
+        "day",
+        "venue",
+        "home_team",
+        "away_team",
+        "home_norm",
+        "away_norm",
+    ]
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame.reset_index(drop=True)
+        f = self.frame
+        rows = np.arange(len(f))
+
+        # nflverse-style event ids: later rows win, as in a sequential dict build
+        event_keys = [
+            f["game_id"],
+            f["date"] + "-" + f["away_team"].astype("string") + "-" + f["home_team"].astype("string"),
+            f["date"] + "-" + f["home_team"].astype("string") + "-" + f["away_team"].astype("string"),
+        ]
+        events = pd.DataFrame(
+            {"key": pd.concat(event_keys, ignore_index=True), "pos": np.tile(rows, 3)}
+        ).dropna()
+        events = events.sort_values("pos", kind="stable").drop_duplicates("key", keep="last")
+        self._event_index = pd.Index(events["key"].to_numpy(dtype=object))
+        self._event_pos = events["pos"].to_numpy()
+
+        # Match keys: first variant (then first row) wins
+        keys, positions, variants = [], [], []
+        for rank, (_, home, away) in enumerate(_MATCH_VARIANTS):
+            usable = (f[["season", "day", home, away]].notna().all(axis=1)).to_numpy()
+            keys.append(_match_keys(f["season"], f["day"], f[home], f[away])[usable])
+            positions.append(rows[usable])
+            variants.append(np.full(int(usable.sum()), rank))
+        match_index = keys[0].append(keys[1:]) if keys else pd.MultiIndex.from_arrays([[]] * 4)
+        first = ~match_index.duplicated(keep="first")
+        self._match_index = match_index[first]
+        self._match_pos = np.concatenate(positions)[first]
+        self._match_variant = np.concatenate(variants)[first]
+
+    @classmethod
+    def from_schedule(cls, schedule: pd.DataFrame) -> "ScheduleIndex":
+        """Index an nflverse schedule (``gameday``) or schedule CSV (``game_date``)."""
+        def column(name: str) -> pd.Series:
+            if name in schedule.columns:
+                return schedule[name]
+            return pd.Series(pd.NA, index=schedule.index, dtype=object)
+
+        frame = pd.DataFrame(index=schedule.index)
+        frame["season"] = pd.to_numeric(column("season"), errors="coerce").astype("Int64")
+        frame["week"] = pd.to_numeric(column("week"), errors="coerce").astype("Int64")
+        frame["game_id"] = column("game_id").astype("string")
+        frame["gameday"] = column("gameday" if "gameday" in schedule.columns else "game_date")
+        frame["date"] = _utc_dates(frame["gameday"])
+        frame["day"] = _utc_days(frame["gameday"])
+        frame["venue"] = column("venue")
+        for side in ("home", "away"):
+            raw = column(f"{side}_team")
+            frame[f"{side}_team"] = raw.astype("string").astype("category")
+            frame[f"{side}_norm"] = normalize_team_codes(raw)
+        return cls(frame)
+
+    @classmethod
+    def concat(cls, indexes: "list[ScheduleIndex]") -> "ScheduleIndex":
+        frames = [index.frame for index in indexes if not index.frame.empty]
+        if not frames:
+            return cls.from_schedule(pd.DataFrame())
+        frame = pd.concat(frames, ignore_index=True)
+        for col in ("home_team", "away_team", "home_norm", "away_norm"):
+            frame[col] = frame[col].astype("string").astype("category")
+        return cls(frame)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def locate_events(self, event_ids: pd.Series) -> np.ndarray:
+        """Row position per event id (``-1`` when unknown)."""
+        keys = pd.Series(event_ids).astype("string").to_numpy(dtype=object, na_value=None)
+        found = self._event_index.get_indexer(keys)
+        return np.where(found >= 0, self._event_pos[found], -1)
+
+    def locate_games(
+        self, season: pd.Series, day: pd.Series, home: pd.Series, away: pd.Series
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``(row position, variant rank)`` per game; ``-1`` for both when unmatched.
+
+        ``day`` is the UTC calendar day as days since the epoch.
+        """
+        found = self._match_index.get_indexer(_match_keys(season, day, home, away))
+        hit = found >= 0
+        return (
+            np.where(hit, self._match_pos[found], -1),
+            np.where(hit, self._match_variant[found], -1),
+        )
+
+    def event_lookup(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """``{event key: {season, week, venue, game_date}}`` for the edge engine."""
+        info = (
+            self.frame[["season", "week", "venue", "gameday"]]
+            .rename(columns={"gameday": "game_date"})
+            .astype(object)
+            .where(lambda df: df.notna(), None)
+            .to_dict("records")
+        )
+        return {key: info[pos] for key, pos in zip(self._event_index, self._event_pos)}
+
+
 def validate_and_normalize_schedule(schedule: pd.DataFrame) -> pd.DataFrame:
     """Validate and normalize schedule DataFrame with robust column mapping."""
     if schedule.empty:
@@ -150,20 +318,21 @@ def validate_team_codes(df: pd.DataFrame, team_columns: list[str]) -> Dict[str,
 
 def populate_week_from_schedule(
     lines: pd.DataFrame,
-    schedule: pd.DataFrame,
+    schedule: Union[pd.DataFrame, "ScheduleIndex"],
     validate_teams: bool = True,
     logger: Optional[logging.Logger] = None,
 ) -> pd.DataFrame:
     """Populate week column in lines DataFrame using deterministic schedule matching.
 
-    Uses multi-stage matching with comprehensive team normalization:
+    Probes a :class:`ScheduleIndex` with comprehensive team normalization:
     1. Stage 1: Exact match on (season, date, home_team, away_team)
     2. Stage 2: Home/away swap fallback
     3. Stage 3: Team normalization and retry
 
     Args:
         lines: DataFrame with commence_time, home_team, away_team, season columns
-        schedule: DataFrame with season, week, game_date, home_team, away_team columns
+        schedule: DataFrame with season, week, game_date, home_team, away_team columns,
+            or a prebuilt ScheduleIndex
         validate_teams: Whether to validate and report team code issues
         logger: Optional logger for detailed diagnostics
 
@@ -177,22 +346,27 @@ def populate_week_from_schedule(
         logger.warning("Lines DataFrame is empty")
         return lines
 
+    if isinstance(schedule, ScheduleIndex):
+        index: Optional[ScheduleIndex] = schedule
+        schedule = schedule.frame
+    else:
+        index = None
     if schedule.empty:
         logger.warning("Schedule DataFrame is empty")
         return lines
 
-    # CRITICAL FIX: Validate and normalize schedule data
-    try:
-        schedule = validate_and_normalize_schedule(schedule)
-        logger.info(f"Schedule validation successful: {len(schedule)} rows with required columns")
-    except ValueError as e:
-        logger.error(f"Schedule validation failed: {e}")
-        return lines
+    if index is None:
+        # CRITICAL FIX: Validate and normalize schedule data
+        try:
+            schedule = validate_and_normalize_schedule(schedule)
+            logger.info(
+                f"Schedule validation successful: {len(schedule)} rows with required columns"
+            )
+        except ValueError as e:
+            logger.error(f"Schedule validation failed: {e}")
+            return lines
 
     out = lines.copy()
-    stage1_count = 0
-    stage2_count = 0
-    stage3_count = 0
 
     logger.info(f"Starting week population for {len(out)} rows")
 
@@ -222,103 +396,54 @@ def populate_week_from_schedule(
 
     # Convert commence_time to UTC date for matching
     try:
-        out["_gdate"] = pd.to_datetime(out["commence_time"], utc=True).dt.date
+        days = _utc_days(out["commence_time"])
     except Exception as e:
         logger.error(f"Failed to parse commence_time: {e}")
         return out
 
-    # Prepare schedule DataFrame with UTC dates
-    schedule = schedule.copy()
-    try:
-        schedule["_gdate"] = pd.to_datetime(schedule["game_date"], utc=True).dt.date
-    except Exception as e:
-        logger.error(f"Failed to parse schedule game_date: {e}")
-        return out
-
-    # Normalize team codes in both DataFrames
-    for col in ["home_team", "away_team"]:
-        if col in out.columns:
-            out[f"{col}_norm"] = out[col].apply(normalize_team_code)
-        if col in schedule.columns:
-            schedule[f"{col}_norm"] = schedule[col].apply(normalize_team_code)
+    if index is None:
+        try:
+            index = ScheduleIndex.from_schedule(schedule)
+        except Exception as e:
+            logger.error(f"Failed to parse schedule game_date: {e}")
+            return out
 
     # Handle case where week column doesn't exist yet
     if "week" not in out.columns:
         out["week"] = pd.NA
-
-    # Stage 1: Exact match on (season, date, home_team, away_team)
-    logger.debug("Stage 1: Exact team name matching")
-
-    stage1_result = out.merge(
-        schedule[["season", "week", "_gdate", "home_team", "away_team"]],
-        on=["season", "_gdate", "home_team", "away_team"],
-        how="left",
-        suffixes=("", "_sched"),
-    )
-
-    # Update week from stage1 matches
-    stage1_matches = stage1_result["week_sched"].notna()
-    out.loc[stage1_matches, "week"] = stage1_result.loc[stage1_matches, "week_sched"]
-    stage1_count = stage1_matches.sum()
-    logger.info(f"Stage 1 matched {stage1_count} rows")
-
-    # Stage 2: Home/away swap fallback for remaining unmatched rows
-    still_needs_week = out["week"].isna()
-    if still_needs_week.any():
-        logger.debug(
-            f"Stage 2: Home/away swap matching for {still_needs_week.sum()} remaining rows"
+    out["week"] = out["week"].astype("Int64")
+
+    # One probe with the raw team codes (exact, then home/away swapped), then
+    # one with normalized codes for rows still unmatched
+    missing_team = pd.Series(pd.NA, index=out.index, dtype="string")
+    home = out["home_team"] if "home_team" in out.columns else missing_team
+    away = out["away_team"] if "away_team" in out.columns else missing_team
+    pos, variant = index.locate_games(out["season"], days, home, away)
+    stage = np.select([variant == 0, variant == 1, variant > 1], [1, 2, 3], 0)
+
+    retry = pos < 0
+    if retry.any():
+        norm_pos, _ = index.locate_games(
+            out["season"][retry],
+            days[retry],
+            normalize_team_codes(home[retry]),
+            normalize_team_codes(away[retry]),
         )
-
-        stage2_subset = out.loc[still_needs_week].copy()
-
-        stage2_result = stage2_subset.merge(
-            schedule[["season", "week", "_gdate", "home_team", "away_team"]],
-            left_on=["season", "_gdate", "away_team", "home_team"],  # Swap home/away
-            right_on=["season", "_gdate", "home_team", "away_team"],
-            how="left",
-            suffixes=("", "_sched"),
-        )
-
-        stage2_matches = stage2_result["week_sched"].notna()
-        if stage2_matches.any():
-            # Get indices in original dataframe
-            stage2_indices = still_needs_week[still_needs_week].index[stage2_matches]
-            out.loc[stage2_indices, "week"] = stage2_result.loc[stage2_matches, "week_sched"]
-            stage2_count = stage2_matches.sum()
-            logger.info(f"Stage 2 matched {stage2_count} additional rows")
-
-    # Stage 3: Normalized team code matching for remaining unmatched rows
-    still_needs_week = out["week"].isna()
-    if still_needs_week.any():
-        logger.debug(
-            f"Stage 3: Normalized team matching for {still_needs_week.sum()} remaining rows"
-        )
-
-        stage3_subset = out.loc[still_needs_week].copy()
-
-        # Try normalized team matching
-        stage3_result = stage3_subset.merge(
-            schedule[["season", "week", "_gdate", "home_team_norm", "away_team_norm"]],
-            left_on=["season", "_gdate", "home_team_norm", "away_team_norm"],
-            right_on=["season", "_gdate", "home_team_norm", "away_team_norm"],
-            how="left",
-            suffixes=("", "_sched"),
-        )
-
-        stage3_matches = stage3_result["week_sched"].notna()
-        if stage3_matches.any():
-            stage3_indices = still_needs_week[still_needs_week].index[stage3_matches]
-            out.loc[stage3_indices, "week"] = stage3_result.loc[stage3_matches, "week_sched"]
-            stage3_count = stage3_matches.sum()
-            logger.info(f"Stage 3 matched {stage3_count} additional rows")
-
-    # Clean up temporary columns
-    temp_cols = ["_gdate", "home_team_norm", "away_team_norm"]
-    out.drop(columns=temp_cols, errors="ignore", inplace=True)
-
-    # Convert week to nullable integer type
-    if "week" in out.columns:
-        out["week"] = out["week"].astype("Int64")
+        pos[retry] = norm_pos
+        stage[retry] = np.where(norm_pos >= 0, 3, 0)
+
+    # Unmatched rows (pos == -1) take NA
+    matched_weeks = index.frame["week"].array.take(pos, allow_fill=True)
+    # Exact matches are authoritative; fallbacks only fill missing weeks
+    fill = (stage == 1) | ((stage > 1) & out["week"].isna().to_numpy())
+    out.loc[fill, "week"] = matched_weeks[fill]
+    stage1_count = int((fill & (stage == 1)).sum())
+    stage2_count = int((fill & (stage == 2)).sum())
+    stage3_count = int((fill & (stage == 3)).sum())
+    logger.info(
+        f"Schedule index matched {stage1_count} exact, {stage2_count} swapped, "
+        f"{stage3_count} normalized rows"
+    )
 
     # Final statistics and logging
     total_filled = int(stage1_count + stage2_count + stage3_count)
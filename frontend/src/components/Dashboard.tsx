@@ -11,6 +11,7 @@ import Skeleton from "./Skeleton";
 import Toast from "./Toast";
 import { BETA_DISCLAIMER, BETA_WARNING_TITLE } from "@/config/beta";
 import { API_BASE_URL } from "@/config/api";
+import { useMarketStream } from "@/hooks/useMarketStream";
 
 /**
  * Representation of a calculated edge exposed by the betting engine.
@@ -53,7 +54,7 @@ type SortOption = "default" | "confidence" | "expected_value" | "alphabetical";
 
 /** Endpoint that delivers the latest computed edges. */
 const EDGES_ENDPOINT = `${API_BASE_URL}/api/edges/current`;
-/** Frequency for background refreshes (five minutes). */
+/** Frequency for background refreshes while the market stream is down (five minutes). */
 const REFRESH_MS = 5 * 60 * 1000;
 /** Maximum retry attempts for network failures. */
 const MAX_RETRIES = 3;
@@ -66,10 +67,10 @@ const delay = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
 /**
  * Primary dashboard surface for reviewing model-generated betting edges.
- * The component handles polling the backend, surfacing beta-mode warnings,
- * and giving analysts tools (sorting, filtering, drill-ins) to validate edges
- * before acting. All state is local because the dashboard operates as a
- * self-contained snapshot view.
+ * The component takes one edges snapshot from the API, then follows the
+ * market stream's edge deltas (polling only while the stream is down). It
+ * surfaces beta-mode warnings and gives analysts tools (sorting, filtering,
+ * drill-ins) to validate edges before acting. All other state is local.
  */
 export default function Dashboard(): JSX.Element {
   /** Latest payload returned by the edges API. */
@@ -102,6 +103,39 @@ export default function Dashboard(): JSX.Element {
 
   const edgeDataRef = useRef<EdgeData | null>(null);
   const manualRefreshRef = useRef<number>(0);
+  /** Live edge rows pushed over `/ws/market-updates`. */
+  const stream = useMarketStream();
+
+  /** Toast the difference between two edge lists after a refresh or stream delta. */
+  const announceChanges = useCallback(
+    (previousEdges: Edge[], nextEdges: Edge[]) => {
+      const buildEdgeKey = (edge: Partial<Edge>) =>
+        `${edge.type ?? "Unknown Edge"}-${edge.player ?? "Unknown Player"}-${edge.team ?? "Unknown Team"}`;
+      const previousKeys = new Set(
+        previousEdges.map((edge) => buildEdgeKey(edge)),
+      );
+      const currentKeys = new Set(nextEdges.map((edge) => buildEdgeKey(edge)));
+      const newEdgesCount = nextEdges.filter(
+        (edge) => !previousKeys.has(buildEdgeKey(edge)),
+      ).length;
+      const removedEdgesCount = previousEdges.filter(
+        (edge) => !currentKeys.has(buildEdgeKey(edge)),
+      ).length;
+
+      if (newEdgesCount > 0) {
+        setToast({
+          message: `${newEdgesCount} new edge${newEdgesCount === 1 ? "" : "s"} detected.`,
+          type: "success",
+        });
+      } else if (removedEdgesCount > 0) {
+        setToast({
+          message: `${removedEdgesCount} edge${removedEdgesCount === 1 ? "" : "s"} removed from the list.`,
+          type: "info",
+        });
+      }
+    },
+    [],
+  );
 
   /**
    * Fetch the latest edges from the API with bounded retries. During the initial
@@ -128,8 +162,6 @@ export default function Dashboard(): JSX.Element {
           }
 
           const data = (await response.json()) as EdgeData;
-          const buildEdgeKey = (edge: Partial<Edge>) =>
-            `${edge.type ?? "Unknown Edge"}-${edge.player ?? "Unknown Player"}-${edge.team ?? "Unknown Team"}`;
           const previousEdges = edgeDataRef.current?.edges ?? [];
 
           edgeDataRef.current = data;
@@ -139,30 +171,7 @@ export default function Dashboard(): JSX.Element {
           setLastRefreshedAt(new Date());
 
           if (!isInitialLoad) {
-            const previousKeys = new Set(
-              previousEdges.map((edge) => buildEdgeKey(edge)),
-            );
-            const currentKeys = new Set(
-              data.edges.map((edge) => buildEdgeKey(edge)),
-            );
-            const newEdgesCount = data.edges.filter(
-              (edge) => !previousKeys.has(buildEdgeKey(edge)),
-            ).length;
-            const removedEdgesCount = previousEdges.filter(
-              (edge) => !currentKeys.has(buildEdgeKey(edge)),
-            ).length;
-
-            if (newEdgesCount > 0) {
-              setToast({
-                message: `${newEdgesCount} new edge${newEdgesCount === 1 ? "" : "s"} detected.`,
-                type: "success",
-              });
-            } else if (removedEdgesCount > 0) {
-              setToast({
-                message: `${removedEdgesCount} edge${removedEdgesCount === 1 ? "" : "s"} removed from the list.`,
-                type: "info",
-              });
-            }
+            announceChanges(previousEdges, data.edges);
           }
 
           return;
@@ -188,7 +197,7 @@ export default function Dashboard(): JSX.Element {
         setIsRefreshing(false);
       }
     }
-  }, []);
+  }, [announceChanges]);
 
   const handleManualRefresh = useCallback(
     (options?: { bypassDebounce?: boolean }) => {
@@ -208,11 +217,45 @@ export default function Dashboard(): JSX.Element {
   );
 
   useEffect(() => {
-    // Start polling immediately on mount; keep refreshing in the background.
+    // One snapshot on mount for the edges and their beta/summary metadata.
     fetchEdges();
+  }, [fetchEdges]);
+
+  useEffect(() => {
+    // The market stream pushes edge deltas; only poll while it is down.
+    if (stream.isLive) {
+      return undefined;
+    }
     const interval = setInterval(fetchEdges, REFRESH_MS);
     return () => clearInterval(interval);
-  }, [fetchEdges]);
+  }, [fetchEdges, stream.isLive]);
+
+  useEffect(() => {
+    // Apply streamed edges on top of the snapshot metadata (re-run once that
+    // snapshot has loaded). The stream hook resyncs on a sequence gap.
+    const current = edgeDataRef.current;
+    if (!stream.isLive || stream.seq.edges === 0 || !current) {
+      return;
+    }
+    const streamedEdges = Object.values(stream.edges) as Edge[];
+    const avgConfidence = streamedEdges.length
+      ? streamedEdges.reduce((sum, edge) => sum + (edge.confidence || 0), 0) /
+        streamedEdges.length
+      : 0;
+    const next: EdgeData = {
+      ...current,
+      edges: streamedEdges,
+      summary: {
+        ...current.summary,
+        total_edges: streamedEdges.length,
+        avg_confidence: avgConfidence,
+      },
+    };
+    announceChanges(current.edges, streamedEdges);
+    edgeDataRef.current = next;
+    setEdgeData(next);
+    setLastRefreshedAt(new Date());
+  }, [stream.isLive, stream.edges, stream.seq.edges, loading, announceChanges]);
 
   /** Maps confidence scores to Tailwind classes for quick glance status. */
   const getConfidenceTone = useCallback((confidence: number) => {
@@ -1,7 +1,17 @@
-import { describe, afterEach, it, expect, vi } from "vitest";
+import { describe, afterEach, beforeEach, it, expect, vi } from "vitest";
 import { render, screen, waitFor, fireEvent } from "@testing-library/react";
 
 import Dashboard from "../Dashboard";
+import { useMarketStream } from "@/hooks/useMarketStream";
+
+vi.mock("@/hooks/useMarketStream", () => ({ useMarketStream: vi.fn() }));
+
+const offlineStream = {
+  isLive: false,
+  odds: {},
+  edges: {},
+  seq: { odds: 0, edges: 0 },
+};
 
 const mockEdgePayload = {
   edges: [
@@ -27,6 +37,10 @@ const mockEdgePayload = {
   },
 };
 describe("Dashboard", () => {
+  beforeEach(() => {
+    vi.mocked(useMarketStream).mockReturnValue(offlineStream);
+  });
+
   afterEach(() => {
     vi.clearAllTimers();
     vi.restoreAllMocks();
@@ -110,4 +124,35 @@ describe("Dashboard", () => {
       ).not.toBeInTheDocument();
     });
   });
+
+  it("follows streamed edge deltas instead of polling while live", async () => {
+    globalThis.fetch = vi.fn().mockResolvedValue({
+      ok: true,
+      json: async () => mockEdgePayload,
+    }) as unknown as typeof fetch;
+    const setIntervalSpy = vi.spyOn(globalThis, "setInterval");
+    const streamedEdge = {
+      ...mockEdgePayload.edges[0],
+      player: "Streamed Player",
+    };
+    vi.mocked(useMarketStream).mockReturnValue({
+      isLive: true,
+      odds: {},
+      edges: { "Player Prop|Streamed Player|Mock Team|None": streamedEdge },
+      seq: { odds: 0, edges: 3 },
+    });
+
+    render(<Dashboard />);
+
+    await waitFor(() => {
+      expect(screen.getByText("Streamed Player")).toBeInTheDocument();
+    });
+    expect(screen.queryByText("Mock Player")).not.toBeInTheDocument();
+    // One snapshot for the metadata, then no background polling
+    expect(globalThis.fetch).toHaveBeenCalledTimes(1);
+    expect(setIntervalSpy).not.toHaveBeenCalledWith(
+      expect.any(Function),
+      5 * 60 * 1000,
+    );
+  });
 });
@@ -0,0 +1,108 @@
+import { useEffect, useRef, useState } from 'react';
+import { API_BASE_URL } from '@/config/api';
+
+export type MarketStreamName = 'odds' | 'edges';
+
+type Rows = Record<string, Record<string, any>>;
+
+interface SnapshotMessage {
+  type: 'odds_snapshot' | 'edges_snapshot';
+  stream: MarketStreamName;
+  seq: number;
+  rows: Rows;
+}
+
+interface DeltaMessage {
+  type: 'odds_delta' | 'edges_delta';
+  stream: MarketStreamName;
+  seq: number;
+  upserts: Rows;
+  removed: string[];
+}
+
+export interface MarketStreamState {
+  isLive: boolean;
+  odds: Rows;
+  edges: Rows;
+  seq: Record<MarketStreamName, number>;
+}
+
+const RECONNECT_DELAY_MS = 2000;
+
+/**
+ * Subscribe to `/ws/market-updates`: one snapshot per stream on connect,
+ * then compact deltas. A sequence gap triggers a snapshot resync, so the
+ * local copy always matches the server without full-payload polling.
+ */
+export function useMarketStream(): MarketStreamState {
+  const [state, setState] = useState<MarketStreamState>({
+    isLive: false,
+    odds: {},
+    edges: {},
+    seq: { odds: 0, edges: 0 },
+  });
+  const seqRef = useRef<Record<MarketStreamName, number>>({ odds: 0, edges: 0 });
+
+  useEffect(() => {
+    let ws: WebSocket | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const connect = () => {
+      const wsUrl = API_BASE_URL.replace(/^http/, 'ws');
+      ws = new WebSocket(`${wsUrl}/ws/market-updates`);
+
+      ws.onopen = () => setState(prev => ({ ...prev, isLive: true }));
+
+      ws.onmessage = (event) => {
+        let message: SnapshotMessage | DeltaMessage;
+        try {
+          message = JSON.parse(event.data);
+        } catch {
+          return;
+        }
+
+        if (message.type === 'odds_snapshot' || message.type === 'edges_snapshot') {
+          const snapshot = message as SnapshotMessage;
+          seqRef.current[snapshot.stream] = snapshot.seq;
+          setState(prev => ({
+            ...prev,
+            [snapshot.stream]: snapshot.rows,
+            seq: { ...seqRef.current },
+          }));
+          return;
+        }
+
+        if (message.type === 'odds_delta' || message.type === 'edges_delta') {
+          const delta = message as DeltaMessage;
+          if (delta.seq !== seqRef.current[delta.stream] + 1) {
+            ws?.send(JSON.stringify({ type: 'resync', streams: [delta.stream] }));
+            return;
+          }
+          seqRef.current[delta.stream] = delta.seq;
+          setState(prev => {
+            const rows = { ...prev[delta.stream], ...delta.upserts };
+            delta.removed.forEach(key => delete rows[key]);
+            return { ...prev, [delta.stream]: rows, seq: { ...seqRef.current } };
+          });
+        }
+      };
+
+      ws.onclose = () => {
+        setState(prev => ({ ...prev, isLive: false }));
+        if (!closed) {
+          reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      ws?.close(1000, 'Manual disconnect');
+    };
+  }, []);
+
+  return state;
+}
@@ -1,10 +1,24 @@
+import { useMemo } from "react";
 import { useQuery } from "@tanstack/react-query";
 import { api } from "@/utils/api";
+import { useMarketStream } from "./useMarketStream";
 
 export function useOddsBest(market?: string) {
-  return useQuery({
+  const stream = useMarketStream();
+  const query = useQuery({
     queryKey: ["odds", "best", market || "all"],
     queryFn: () => api.oddsBest(market),
-    refetchInterval: 15000,
+    // The market stream pushes line moves; only poll while it is down.
+    refetchInterval: stream.isLive ? false : 15000,
   });
+
+  const streamed = useMemo(() => {
+    if (!stream.isLive || stream.seq.odds === 0) return undefined;
+    const lines = Object.values(stream.odds).filter(
+      (line) => !market || market === "player_props" || line.market === market,
+    );
+    return { lines, count: lines.length, market: market || "all" };
+  }, [stream.isLive, stream.odds, stream.seq.odds, market]);
+
+  return streamed ? { ...query, data: streamed } : query;
 }
@@ -1,32 +1,70 @@
+"""Replay historical odds snapshots and report ROI, CLV, calibration and drawdown."""
+
 from __future__ import annotations
 
 import argparse
+from pathlib import Path
 
 import pandas as pd
 
-from engine.calibration import brier_score, bucket_calibration
+from engine.backtest import BacktestConfig, StakingPolicy, run_backtest
+
+DEFAULT_DB = Path("storage/odds.db")
 
 
 def main() -> None:
-    ap = argparse.ArgumentParser()
+    ap = argparse.ArgumentParser(description="Event-driven backtest over odds_snapshots.")
+    ap.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to SQLite database")
+    ap.add_argument("--seasons", type=str, required=True, help="Comma-separated seasons")
+    ap.add_argument(
+        "--hours-before", type=float, default=2.0, help="Bet this many hours before kickoff"
+    )
+    ap.add_argument(
+        "--markets", type=str, default="player_pass_yds", help="Comma-separated market keys"
+    )
+    ap.add_argument("--kelly", type=float, default=0.25, help="Kelly fraction")
+    ap.add_argument("--min-ev", type=float, default=0.0, help="Minimum EV per dollar to bet")
+    ap.add_argument("--max-picks", type=int, default=10, help="Bets per week")
+    ap.add_argument(
+        "--max-event-exposure", type=float, default=None, help="Stake cap per game (bankroll share)"
+    )
     ap.add_argument(
-        "--start", type=str, required=False, help="Filter by date >= start (if column present)"
+        "--shrink", type=float, default=0.0, help="Weight toward the no-vig consensus"
     )
+    ap.add_argument("--by", type=str, default="season,market", help="Summary grouping columns")
+    ap.add_argument("--workers", type=int, default=1, help="Processes for building weeks")
+    ap.add_argument("--no-cache", action="store_true", help="Rebuild every week from scratch")
+    ap.add_argument("--export", type=Path, default=None, help="Write bets and summary CSVs here")
     args = ap.parse_args()
 
-    df = pd.read_csv("storage/exports/edges_latest.csv")
-    if args.start and "date" in df.columns:
-        df = df[df["date"] >= args.start]
+    config = BacktestConfig(
+        database_path=args.db,
+        seasons=tuple(int(s) for s in args.seasons.split(",") if s.strip()),
+        hours_before=args.hours_before,
+        markets=tuple(m.strip() for m in args.markets.split(",") if m.strip()),
+        cache_dir=None if args.no_cache else BacktestConfig.cache_dir,
+        workers=args.workers,
+    )
+    policy = StakingPolicy(
+        kelly_fraction=args.kelly,
+        min_ev=args.min_ev,
+        max_picks=args.max_picks,
+        max_event_exposure=args.max_event_exposure,
+        shrink_weight=args.shrink,
+    )
+    result = run_backtest(config, policy, by=[c.strip() for c in args.by.split(",")])
+    if result.candidates.empty:
+        raise SystemExit("No candidates: check events/odds_snapshots coverage for these seasons")
 
-    p_col = "p_model_shrunk" if "p_model_shrunk" in df.columns else "model_p"
-    if p_col not in df.columns:
-        raise SystemExit("No probability column found (model_p or p_model_shrunk)")
-    p = df[p_col].fillna(0.5)
-    y = df.get("won", pd.Series([0] * len(df)))
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(result.summary.to_string(index=False))
+        print("\nCalibration (all settled candidates):")
+        print(result.calibration().to_string(index=False))
 
-    cal = bucket_calibration(pd.DataFrame({"p": p, "y": y}), "p", "y", n=10)
-    print("Brier:", brier_score(p, y))
-    print(cal)
+    if args.export:
+        args.export.mkdir(parents=True, exist_ok=True)
+        result.bets.to_csv(args.export / "backtest_bets.csv", index=False)
+        result.summary.to_csv(args.export / "backtest_summary.csv", index=False)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,17 @@
 import sqlite3
+import sys
 from pathlib import Path
 from typing import Iterable, List
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
 import nfl_data_py as nfl
 import numpy as np
 import pandas as pd
 from sklearn.linear_model import RidgeCV
 
+from adapters.nflverse_provider import get_pbp
+
 SEASONS = [2023, 2024, 2025]  # adjust as needed
 DATA_DIR = Path("storage/imports/PlayerProfiler")
 LOCAL_PBP = {
@@ -250,7 +255,7 @@ def load_pbp_data(seasons: Iterable[int]) -> pd.DataFrame:
             remote_seasons.append(season)
     if remote_seasons:
         print(f"     Fetching nflverse PBP for seasons: {remote_seasons}")
-        frames.append(nfl.import_pbp_data(remote_seasons))
+        frames.append(get_pbp(remote_seasons))
     if not frames:
         return pd.DataFrame()
     return pd.concat(frames, ignore_index=True, sort=False)
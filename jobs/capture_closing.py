@@ -0,0 +1,308 @@
+"""Closing-line capture: burst-poll events in the final minutes before kickoff.
+
+``write_closing_snapshot`` infers the close from whatever the regular poller
+happened to fetch last, so a five-minute poll cadence gives closes up to five
+minutes stale, and a poll of live odds after kickoff can overwrite them. This
+service watches ``commence_time`` for every event tracked in ``odds_csv_raw``:
+
+* from ``--window`` seconds before kickoff it polls just those events (via
+  ``eventIds``) and the closing markets every ``--burst-interval`` seconds,
+  keeping every pre-kickoff quote it sees in memory;
+* at kickoff it freezes the close: ``closing_lines`` is written at once from
+  the last pre-kickoff quotes, and the event is recorded in ``closing_freeze``
+  so later snapshots leave those rows alone.
+
+Only events near kickoff are polled, so the CLV pipeline gets precise closes
+without raising the global poll frequency.
+
+    python jobs/capture_closing.py --markets h2h,spreads,totals --window 600
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from jobs.poll_odds import (
+    DB,
+    QuotaRejected,
+    ensure_closing_tables,
+    ensure_odds_table,
+    ensure_usage_table,
+    fetch_markets,
+    get_keys,
+    normalize_rows,
+    now_utc,
+    upsert_rows,
+    write_closing_snapshot,
+)
+from utils.data_version import bump_data_version
+from utils.odds_archive import create_payload_archive
+from utils.odds_quota import create_quota_manager, request_cost
+
+SOURCE_LABEL = "closing_capture"
+
+Fetch = Callable[[Sequence[str]], Dict[str, Any]]
+
+
+def _parse_ts(value: Any) -> Optional[dt.datetime]:
+    ts = pd.to_datetime(value, utc=True, errors="coerce", format="ISO8601")
+    return None if pd.isna(ts) else ts.to_pydatetime()
+
+
+def tracked_events(
+    con: sqlite3.Connection,
+    now: dt.datetime,
+    *,
+    horizon: dt.timedelta,
+    grace: dt.timedelta,
+) -> Dict[str, dt.datetime]:
+    """Unfrozen events in ``odds_csv_raw`` kicking off within ``horizon`` of ``now``.
+
+    Events that kicked off less than ``grace`` ago are included so a restart
+    still freezes them.
+    """
+
+    ensure_odds_table(con)
+    ensure_closing_tables(con)
+    rows = con.execute(
+        """
+        SELECT event_id, MAX(commence_time) FROM odds_csv_raw
+        WHERE event_id IS NOT NULL AND commence_time IS NOT NULL
+          AND event_id NOT IN (SELECT event_id FROM closing_freeze)
+        GROUP BY event_id
+        """
+    ).fetchall()
+    events = {}
+    for event_id, commence_time in rows:
+        commence = _parse_ts(commence_time)
+        if commence is not None and now - grace <= commence <= now + horizon:
+            events[event_id] = commence
+    return events
+
+
+class ClosingCapture:
+    """Burst polling and freezing; ``fetch`` takes event ids and returns a payload."""
+
+    def __init__(
+        self,
+        con: sqlite3.Connection,
+        fetch: Fetch,
+        *,
+        primary_book: str,
+        window: float = 600.0,
+        burst_interval: float = 60.0,
+        grace: float = 900.0,
+        refresh_interval: float = 300.0,
+        max_events_per_call: int = 50,
+        clock: Callable[[], dt.datetime] = now_utc,
+    ):
+        self.con = con
+        self.fetch = fetch
+        self.primary_book = primary_book
+        self.window = dt.timedelta(seconds=window)
+        self.burst_interval = dt.timedelta(seconds=burst_interval)
+        self.grace = dt.timedelta(seconds=grace)
+        self.refresh_interval = dt.timedelta(seconds=refresh_interval)
+        self.max_events_per_call = max_events_per_call
+        self.clock = clock
+        self.events: Dict[str, dt.datetime] = {}
+        self.quotes: Dict[str, List[pd.DataFrame]] = {}
+        self.last_burst: Optional[dt.datetime] = None
+        self.last_refresh: Optional[dt.datetime] = None
+
+    def refresh(self, now: dt.datetime) -> None:
+        horizon = max(self.refresh_interval, self.window) + self.window
+        self.events.update(tracked_events(self.con, now, horizon=horizon, grace=self.grace))
+        self.last_refresh = now
+
+    def bursting(self, now: dt.datetime) -> List[str]:
+        return sorted(
+            (e for e, commence in self.events.items() if commence - self.window <= now < commence),
+            key=self.events.__getitem__,
+        )
+
+    def burst(self, now: dt.datetime) -> int:
+        """Poll every event inside its window; returns the number of API calls."""
+
+        event_ids = self.bursting(now)
+        if not event_ids:
+            return 0
+        if self.last_burst is not None and now - self.last_burst < self.burst_interval:
+            return 0
+        self.last_burst = now
+        calls = 0
+        for start in range(0, len(event_ids), self.max_events_per_call):
+            payload = self.fetch(event_ids[start : start + self.max_events_per_call])
+            calls += 1
+            for event in payload.get("json", []):
+                # Kickoffs move; follow the feed rather than the stored value
+                commence = _parse_ts(event.get("commence_time"))
+                if event.get("id") in self.events and commence is not None:
+                    self.events[event["id"]] = commence
+            normalized = upsert_rows(self.con, normalize_rows(payload))
+            if normalized is None or normalized.empty:
+                continue
+            for event_id, quotes in normalized.groupby("event_id"):
+                commence = self.events.get(event_id)
+                if commence is None:
+                    continue
+                updated = pd.to_datetime(
+                    quotes["updated_at"], utc=True, errors="coerce", format="ISO8601"
+                )
+                quotes = quotes[updated <= commence].assign(updated_at=updated)
+                if not quotes.empty:
+                    self.quotes.setdefault(event_id, []).append(quotes)
+        return calls
+
+    def freeze(self, event_id: str, now: dt.datetime) -> int:
+        """Write ``closing_lines`` for one event from its last pre-kickoff quotes."""
+
+        commence = self.events.pop(event_id)
+        frames = self.quotes.pop(event_id, [])
+        # Stored rows cover markets that went quiet during the burst; anything
+        # the regular poller wrote after kickoff loses to an earlier quote
+        stored = pd.read_sql(
+            "SELECT * FROM odds_csv_raw WHERE event_id = ?", self.con, params=(event_id,)
+        )
+        if not stored.empty:
+            stored["updated_at"] = pd.to_datetime(
+                stored["updated_at"], utc=True, errors="coerce", format="ISO8601"
+            )
+            frames = [stored] + frames
+        if not frames:
+            print(f"No quotes for {event_id}; close not captured")
+            return 0
+        quotes = pd.concat(frames, ignore_index=True)
+        quotes["commence_time"] = commence.isoformat()
+        run_id = f"{SOURCE_LABEL}::{event_id}::{now.isoformat()}"
+        inserted, coverage = write_closing_snapshot(
+            self.con,
+            quotes,
+            ts_run=now,
+            primary_book=self.primary_book,
+            source_label=SOURCE_LABEL,
+            run_id=run_id,
+            overwrite_frozen=True,
+        )
+        self.con.execute(
+            """
+            INSERT OR REPLACE INTO closing_freeze
+              (event_id, commence_time, frozen_at, rows, source_run_id)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (event_id, commence.isoformat(), now.isoformat(), inserted, run_id),
+        )
+        bump_data_version(self.con, "closing_lines")
+        print(f"Froze close for {event_id}: rows={inserted} coverage={coverage:.1%}")
+        return inserted
+
+    def run_once(self) -> int:
+        """Refresh, burst and freeze as due; returns the number of API calls made."""
+
+        now = self.clock()
+        if self.last_refresh is None or now - self.last_refresh >= self.refresh_interval:
+            self.refresh(now)
+        calls = 0
+        try:
+            calls = self.burst(now)
+        except Exception as e:
+            # Retried on the next tick; the freeze below must still happen
+            print(f"Closing burst failed: {e}")
+        for event_id, commence in list(self.events.items()):
+            if commence <= now:
+                self.freeze(event_id, now)
+        return calls
+
+    def next_wake(self, now: dt.datetime) -> dt.datetime:
+        wake = (self.last_refresh or now) + self.refresh_interval
+        if self.bursting(now):
+            wake = min(wake, (self.last_burst or now) + self.burst_interval)
+        for commence in self.events.values():
+            window_opens = commence - self.window
+            wake = min(wake, window_opens if window_opens > now else commence)
+        return max(wake, now)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--region", default=os.getenv("ODDS_REGION", "us"))
+    ap.add_argument(
+        "--markets", default=os.getenv("ODDS_CLOSING_MARKETS", "h2h,spreads,totals")
+    )
+    ap.add_argument(
+        "--bookmakers", default=os.getenv("ODDS_BOOKMAKERS", "draftkings,fanduel,betmgm")
+    )
+    ap.add_argument("--window", type=float, default=600.0, help="Seconds before kickoff")
+    ap.add_argument("--burst-interval", type=float, default=60.0)
+    ap.add_argument("--timeout", type=int, default=int(os.getenv("ODDS_TIMEOUT", "15")))
+    ap.add_argument("--primary-book", default=os.getenv("CLOSING_PRIMARY_BOOK", "dk"))
+    args = ap.parse_args()
+
+    keys = get_keys()
+    if not keys:
+        raise SystemExit("Set ODDS_API_KEYS='k1,k2,...'")
+
+    os.makedirs("storage", exist_ok=True)
+    con = sqlite3.connect(DB, timeout=10.0, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL;")
+    con.execute("PRAGMA busy_timeout=10000;")
+    ensure_usage_table(con)
+    quota = create_quota_manager(keys, con=con)
+    cost = request_cost(args.markets, args.region)
+    archive = create_payload_archive(index_db=DB)
+
+    def fetch(event_ids: Sequence[str]) -> Dict[str, Any]:
+        # Raise ordinary errors, never SystemExit: run_once logs them and still freezes
+        for _ in range(len(keys)):
+            lease = quota.reserve(cost)  # QuotaExhaustedError when no key is enabled
+            try:
+                payload = fetch_markets(
+                    lease.key,
+                    "americanfootball_nfl",
+                    args.region,
+                    args.markets,
+                    args.bookmakers,
+                    args.timeout,
+                    event_ids=list(event_ids),
+                    archive=archive,
+                )
+            except QuotaRejected as e:
+                quota.fail(lease, e.status_code, e.retry_after)
+                continue
+            except Exception:
+                quota.release(lease)
+                raise
+            quota.record(lease, payload.get("headers"))
+            return payload
+        raise RuntimeError("Every key was rejected")
+
+    capture = ClosingCapture(
+        con,
+        fetch,
+        primary_book=args.primary_book,
+        window=args.window,
+        burst_interval=args.burst_interval,
+    )
+    print(
+        f"=== Closing capture @ {now_utc().isoformat()} | markets={args.markets} "
+        f"| window={args.window:.0f}s | burst={args.burst_interval:.0f}s ==="
+    )
+    while True:
+        capture.run_once()
+        now = now_utc()
+        time.sleep(max((capture.next_wake(now) - now).total_seconds(), 1.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,38 @@
 
 from __future__ import annotations
 
+import argparse
 import datetime
 import subprocess
 import sys
+import time
+from dataclasses import asdict
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 import os
 import sqlite3
-from typing import Union
+from typing import Sequence, Union
 
 import pandas as pd
 from dotenv import load_dotenv
 
-from adapters.nflverse_provider import build_event_lookup, get_player_game_logs, get_schedules
+from adapters.nflverse_provider import (
+    build_event_lookup,
+    get_player_game_logs,
+    get_schedule_index,
+)
 from adapters.odds.csv_props_provider import CsvQBPropsAdapter
 from adapters.odds.db_props_provider import DbPropsAdapter
 from db.migrate import migrate, parse_database_url
 from engine.edge_engine import EdgeEngine, EdgeEngineConfig
+from engine.portfolio_optimizer import estimate_correlations, optimize_card, save_correlation_model
 from engine.season import infer_season, infer_season_series
 from engine.team_map import normalize_team_code
+from engine.week_populator import ScheduleIndex
 from models.qb_projection import ProjectionConfig, build_qb_projections
+from utils.data_version import table_fingerprints
+from utils.pipeline import DEFAULT_CACHE_DIR, Pipeline, Stage, file_fingerprint
 from utils.teams import infer_is_home, infer_offense_team, parse_event_id
 
 
@@ -224,254 +235,470 @@ def persist_projections(projections: pd.DataFrame, database_path: Path) -> None:
         conn.commit()
 
 
-def main() -> None:
-    database_path = get_database_path()
-    migrate()
+def _env_fraction(name: str) -> float | None:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else None
 
-    # Use database adapter if USE_DB_ADAPTER=1, otherwise use CSV adapter
-    use_db_adapter = _env_truthy(os.getenv("USE_DB_ADAPTER"))
-    if use_db_adapter:
-        adapter: Union[DbPropsAdapter, CsvQBPropsAdapter] = DbPropsAdapter(database_path)
-    else:
-        adapter = CsvQBPropsAdapter()
 
-    props_df = adapter.fetch()
-    adapter.persist(props_df, database_path)
+def export_correlated_card(
+    edges_df: pd.DataFrame, game_logs: pd.DataFrame, database_path: Path, export_dir: Path
+) -> Path | None:
+    """Size edges jointly with correlation-aware Kelly and export the resulting card.
 
-    seasons_env = os.getenv("DEFAULT_SEASONS", "2023,2024,2025")
-    seasons = [int(s.strip()) for s in seasons_env.split(",") if s.strip()]
-    schedule = get_schedules(seasons)
-    schedule_lookup = build_event_lookup(schedule)
-    game_logs = get_player_game_logs(seasons)
-
-    projection_config = ProjectionConfig()
-    projections = build_qb_projections(
-        props_df,
-        game_logs=game_logs,
-        schedule_lookup=schedule_lookup,
-        config=projection_config,
+    Correlation estimates are persisted to ``market_correlations`` so the
+    dashboard's card builder can reuse them without loading game logs.
+    """
+    model = estimate_correlations(game_logs)
+    with sqlite3.connect(database_path) as con:
+        save_correlation_model(con, model)
+    if edges_df.empty:
+        return None
+
+    ev_col = "ev_per_dollar" if "ev_per_dollar" in edges_df.columns else "ev"
+    max_candidates = int(os.getenv("CARD_MAX_CANDIDATES", "300"))
+    candidates = edges_df.sort_values(ev_col, ascending=False).head(max_candidates)
+    card = optimize_card(
+        candidates,
+        bankroll=float(os.getenv("CARD_BANKROLL", "1000")),
+        fraction=float(os.getenv("CARD_KELLY_FRACTION", "0.25")),
+        model=model,
+        max_event_exposure=_env_fraction("CARD_MAX_EVENT_EXPOSURE"),
+        max_total_exposure=_env_fraction("CARD_MAX_TOTAL_EXPOSURE"),
     )
-    persist_projections(projections, database_path)
-
-    engine = EdgeEngine(
-        EdgeEngineConfig(database_path=database_path), schedule_lookup=schedule_lookup
+    card = card.loc[card["stake"] > 0].sort_values("stake", ascending=False)
+    export_path = export_dir / f"card_correlated_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv"
+    card.to_csv(export_path, index=False)
+    print(
+        f"Exported correlation-aware card: {len(card)} picks, "
+        f"${card['stake'].sum():,.2f} staked (vs ${card['independent_stake'].sum():,.2f} "
+        f"sized independently) to {export_path}"
     )
-    edges_df = engine.compute_edges(props_df, projections)
-    # Optional market-aware shrinkage toward consensus
-    try:
-        from engine.shrinkage import consensus_prob, shrink_to_market
-
-        if not edges_df.empty and "model_p" in edges_df.columns:
-            p_cons = consensus_prob(edges_df)
-            weight = float(os.getenv("SHRINK_TO_MARKET_WEIGHT", "0.35"))
-            edges_df["p_model_shrunk"] = shrink_to_market(edges_df["model_p"], p_cons, weight)
-    except Exception:
-        pass
-    edges_df = ensure_edges_season(edges_df, props_df, database_path)
-    for col in ("season", "week"):
-        if col in edges_df.columns:
-            edges_df[col] = pd.to_numeric(edges_df[col], errors="coerce").astype("Int64")
-    if "opponent_def_code" in edges_df.columns:
-        edges_df["opponent_def_code"] = edges_df["opponent_def_code"].apply(normalize_team_code)
-
-    ratings_available = ensure_defense_ratings_artifacts(database_path)
-    if ratings_available:
-        try:
-            with sqlite3.connect(database_path) as con:
-                dr = pd.read_sql("SELECT * FROM defense_ratings", con)
-            dr["season"] = pd.to_numeric(dr["season"], errors="coerce").astype("Int64")
-            dr["week"] = pd.to_numeric(dr["week"], errors="coerce").astype("Int64")
-            dr["defteam"] = dr["defteam"].apply(normalize_team_code)
-            qb_ratings = dr.loc[dr["pos"] == "QB_PASS"].copy()
-            if "score_adj" in qb_ratings.columns:
-                qb_ratings["score_effective"] = qb_ratings["score_adj"].combine_first(
-                    qb_ratings["score"]
-                )
-            else:
-                qb_ratings["score_effective"] = qb_ratings["score"]
-            if "tier_adj" in qb_ratings.columns:
-                qb_ratings["tier_effective"] = qb_ratings["tier_adj"].combine_first(
-                    qb_ratings["tier"]
-                )
-            else:
-                qb_ratings["tier_effective"] = qb_ratings["tier"]
-            qb_ratings = qb_ratings[
-                [
-                    "defteam",
-                    "season",
-                    "week",
-                    "tier_effective",
-                    "score_effective",
-                ]
-            ]
+    return export_path
 
-            # Enhanced join diagnostics with key coverage analysis
-            debug_joins = _env_truthy(os.getenv("DEBUG_EDGE_JOINS"))
-            total_edges = len(edges_df)
-
-            # Analyze join key coverage before merge
-            season_coverage = (~edges_df["season"].isna()).sum()
-            week_coverage = (~edges_df["week"].isna()).sum()
-            opponent_coverage = (~edges_df["opponent_def_code"].isna()).sum()
-            complete_keys = (
-                (~edges_df["season"].isna())
-                & (~edges_df["week"].isna())
-                & (~edges_df["opponent_def_code"].isna())
-            ).sum()
-
-            print(f"INFO: Defense ratings join preparation - {total_edges} edges total")
-            print(
-                f"INFO: Join key coverage: season={season_coverage}/{total_edges} ({season_coverage/total_edges*100:.1f}%), week={week_coverage}/{total_edges} ({week_coverage/total_edges*100:.1f}%), opponent_def_code={opponent_coverage}/{total_edges} ({opponent_coverage/total_edges*100:.1f}%)"
+
+def merge_defense_ratings(edges_df: pd.DataFrame, database_path: Path) -> pd.DataFrame:
+    """Attach the opponent's QB_PASS tier and score from ``defense_ratings``.
+
+    Rows without a same-week rating fall back to the team's latest rating for
+    the season. Failures are reported rather than raised.
+    """
+
+    try:
+        with sqlite3.connect(database_path) as con:
+            dr = pd.read_sql("SELECT * FROM defense_ratings", con)
+        dr["season"] = pd.to_numeric(dr["season"], errors="coerce").astype("Int64")
+        dr["week"] = pd.to_numeric(dr["week"], errors="coerce").astype("Int64")
+        dr["defteam"] = dr["defteam"].apply(normalize_team_code)
+        qb_ratings = dr.loc[dr["pos"] == "QB_PASS"].copy()
+        if "score_adj" in qb_ratings.columns:
+            qb_ratings["score_effective"] = qb_ratings["score_adj"].combine_first(
+                qb_ratings["score"]
             )
-            print(
-                f"INFO: Complete join keys: {complete_keys}/{total_edges} ({complete_keys/total_edges*100:.1f}%)"
+        else:
+            qb_ratings["score_effective"] = qb_ratings["score"]
+        if "tier_adj" in qb_ratings.columns:
+            qb_ratings["tier_effective"] = qb_ratings["tier_adj"].combine_first(
+                qb_ratings["tier"]
             )
+        else:
+            qb_ratings["tier_effective"] = qb_ratings["tier"]
+        qb_ratings = qb_ratings[
+            [
+                "defteam",
+                "season",
+                "week",
+                "tier_effective",
+                "score_effective",
+            ]
+        ]
 
-            if debug_joins:
-                # Detailed diagnostics for missing keys
-                missing_season = edges_df[edges_df["season"].isna()]
-                missing_week = edges_df[edges_df["week"].isna()]
-                missing_opponent = edges_df[edges_df["opponent_def_code"].isna()]
+        # Enhanced join diagnostics with key coverage analysis
+        debug_joins = _env_truthy(os.getenv("DEBUG_EDGE_JOINS"))
+        total_edges = len(edges_df)
+
+        # Analyze join key coverage before merge
+        season_coverage = (~edges_df["season"].isna()).sum()
+        week_coverage = (~edges_df["week"].isna()).sum()
+        opponent_coverage = (~edges_df["opponent_def_code"].isna()).sum()
+        complete_keys = (
+            (~edges_df["season"].isna())
+            & (~edges_df["week"].isna())
+            & (~edges_df["opponent_def_code"].isna())
+        ).sum()
+
+        print(f"INFO: Defense ratings join preparation - {total_edges} edges total")
+        print(
+            f"INFO: Join key coverage: season={season_coverage}/{total_edges} ({season_coverage/total_edges*100:.1f}%), week={week_coverage}/{total_edges} ({week_coverage/total_edges*100:.1f}%), opponent_def_code={opponent_coverage}/{total_edges} ({opponent_coverage/total_edges*100:.1f}%)"
+        )
+        print(
+            f"INFO: Complete join keys: {complete_keys}/{total_edges} ({complete_keys/total_edges*100:.1f}%)"
+        )
 
-                if not missing_season.empty:
-                    print(
-                        f"DEBUG: {len(missing_season)} edges missing season - event_id samples: {missing_season['event_id'].head(5).tolist()}"
-                    )
-                if not missing_week.empty:
-                    print(
-                        f"DEBUG: {len(missing_week)} edges missing week - event_id samples: {missing_week['event_id'].head(5).tolist()}"
-                    )
-                if not missing_opponent.empty:
-                    print(
-                        f"DEBUG: {len(missing_opponent)} edges missing opponent_def_code - event_id samples: {missing_opponent['event_id'].head(5).tolist()}"
-                    )
+        if debug_joins:
+            # Detailed diagnostics for missing keys
+            missing_season = edges_df[edges_df["season"].isna()]
+            missing_week = edges_df[edges_df["week"].isna()]
+            missing_opponent = edges_df[edges_df["opponent_def_code"].isna()]
 
-            # Join diagnostics: log sample of codes being joined
-            edges_sample = edges_df[["opponent_def_code", "season", "week"]].dropna()
-            unique_def_codes = edges_sample["opponent_def_code"].unique()
-            ratings_def_codes = qb_ratings["defteam"].unique()
-
-            print(f"INFO: Joining edges with defense ratings")
-            if debug_joins:
-                print(f"DEBUG: All edges opponent_def_codes: {sorted(unique_def_codes)}")
-                print(f"DEBUG: All ratings defteam codes: {sorted(ratings_def_codes)}")
-            else:
-                print(f"INFO: Edges opponent_def_codes (sample): {sorted(unique_def_codes)[:10]}")
-                print(f"INFO: Ratings defteam codes (sample): {sorted(ratings_def_codes)[:10]}")
-
-            before_join_count = len(edges_df)
-            edges_df = (
-                edges_df.merge(
-                    qb_ratings,
-                    how="left",
-                    left_on=["opponent_def_code", "season", "week"],
-                    right_on=["defteam", "season", "week"],
+            if not missing_season.empty:
+                print(
+                    f"DEBUG: {len(missing_season)} edges missing season - event_id samples: {missing_season['event_id'].head(5).tolist()}"
                 )
-                .rename(columns={"tier_effective": "def_tier", "score_effective": "def_score"})
-                .drop(columns=["defteam"], errors="ignore")
+            if not missing_week.empty:
+                print(
+                    f"DEBUG: {len(missing_week)} edges missing week - event_id samples: {missing_week['event_id'].head(5).tolist()}"
+                )
+            if not missing_opponent.empty:
+                print(
+                    f"DEBUG: {len(missing_opponent)} edges missing opponent_def_code - event_id samples: {missing_opponent['event_id'].head(5).tolist()}"
+                )
+
+        # Join diagnostics: log sample of codes being joined
+        edges_sample = edges_df[["opponent_def_code", "season", "week"]].dropna()
+        unique_def_codes = edges_sample["opponent_def_code"].unique()
+        ratings_def_codes = qb_ratings["defteam"].unique()
+
+        print(f"INFO: Joining edges with defense ratings")
+        if debug_joins:
+            print(f"DEBUG: All edges opponent_def_codes: {sorted(unique_def_codes)}")
+            print(f"DEBUG: All ratings defteam codes: {sorted(ratings_def_codes)}")
+        else:
+            print(f"INFO: Edges opponent_def_codes (sample): {sorted(unique_def_codes)[:10]}")
+            print(f"INFO: Ratings defteam codes (sample): {sorted(ratings_def_codes)[:10]}")
+
+        before_join_count = len(edges_df)
+        edges_df = (
+            edges_df.merge(
+                qb_ratings,
+                how="left",
+                left_on=["opponent_def_code", "season", "week"],
+                right_on=["defteam", "season", "week"],
             )
+            .rename(columns={"tier_effective": "def_tier", "score_effective": "def_score"})
+            .drop(columns=["defteam"], errors="ignore")
+        )
+
+        # Log join success/failure statistics
+        after_join_count = len(edges_df)
+        joined_successfully = (~edges_df["def_tier"].isna()).sum()
+        print(
+            f"INFO: Join result: {before_join_count} -> {after_join_count} rows, {joined_successfully} successful joins"
+        )
 
-            # Log join success/failure statistics
-            after_join_count = len(edges_df)
-            joined_successfully = (~edges_df["def_tier"].isna()).sum()
+        # Log unmatched opponent_def_codes (capped to prevent spam)
+        unmatched_mask = edges_df["def_tier"].isna() & edges_df["opponent_def_code"].notna()
+        if unmatched_mask.any():
+            unmatched_codes = edges_df.loc[unmatched_mask, "opponent_def_code"].unique()
+            sample_size = min(20, len(unmatched_codes))
             print(
-                f"INFO: Join result: {before_join_count} -> {after_join_count} rows, {joined_successfully} successful joins"
+                f"INFO: Unmatched opponent_def_codes ({len(unmatched_codes)} total, showing {sample_size}): {sorted(unmatched_codes)[:sample_size]}"
             )
 
-            # Log unmatched opponent_def_codes (capped to prevent spam)
-            unmatched_mask = edges_df["def_tier"].isna() & edges_df["opponent_def_code"].notna()
-            if unmatched_mask.any():
-                unmatched_codes = edges_df.loc[unmatched_mask, "opponent_def_code"].unique()
-                sample_size = min(20, len(unmatched_codes))
-                print(
-                    f"INFO: Unmatched opponent_def_codes ({len(unmatched_codes)} total, showing {sample_size}): {sorted(unmatched_codes)[:sample_size]}"
-                )
-
-            missing_mask = (
-                edges_df["def_tier"].isna()
-                & edges_df["season"].notna()
-                & edges_df["opponent_def_code"].notna()
+        missing_mask = (
+            edges_df["def_tier"].isna()
+            & edges_df["season"].notna()
+            & edges_df["opponent_def_code"].notna()
+        )
+        if missing_mask.any():
+            latest = (
+                qb_ratings.dropna(subset=["week"])
+                .sort_values("week")
+                .drop_duplicates(subset=["defteam", "season"], keep="last")
             )
+            tier_lookup = {
+                (row["defteam"], row["season"]): row["tier_effective"]
+                for _, row in latest.iterrows()
+            }
+            score_lookup = {
+                (row["defteam"], row["season"]): row["score_effective"]
+                for _, row in latest.iterrows()
+            }
+            for idx in edges_df.index[missing_mask]:
+                key = (edges_df.at[idx, "opponent_def_code"], edges_df.at[idx, "season"])
+                if key in tier_lookup:
+                    edges_df.at[idx, "def_tier"] = tier_lookup[key]
+                    edges_df.at[idx, "def_score"] = score_lookup[key]
             if missing_mask.any():
-                latest = (
-                    qb_ratings.dropna(subset=["week"])
-                    .sort_values("week")
-                    .drop_duplicates(subset=["defteam", "season"], keep="last")
-                )
-                tier_lookup = {
-                    (row["defteam"], row["season"]): row["tier_effective"]
-                    for _, row in latest.iterrows()
-                }
-                score_lookup = {
-                    (row["defteam"], row["season"]): row["score_effective"]
-                    for _, row in latest.iterrows()
-                }
-                for idx in edges_df.index[missing_mask]:
-                    key = (edges_df.at[idx, "opponent_def_code"], edges_df.at[idx, "season"])
-                    if key in tier_lookup:
-                        edges_df.at[idx, "def_tier"] = tier_lookup[key]
-                        edges_df.at[idx, "def_score"] = score_lookup[key]
-                if missing_mask.any():
-                    try:
-                        with sqlite3.connect(database_path) as con:
-                            latest_view = pd.read_sql(
-                                "SELECT defteam, season, pos, tier, score, score_adj, tier_adj FROM defense_ratings_latest",
-                                con,
-                            )
-                    except Exception:
-                        latest_view = pd.DataFrame()
-                    if not latest_view.empty:
-                        qb_latest = latest_view.loc[latest_view["pos"] == "QB_PASS"].copy()
-                        if "score_adj" in qb_latest.columns:
-                            qb_latest["score_effective"] = qb_latest["score_adj"].combine_first(
-                                qb_latest["score"]
-                            )
-                        else:
-                            qb_latest["score_effective"] = qb_latest["score"]
-                        if "tier_adj" in qb_latest.columns:
-                            qb_latest["tier_effective"] = qb_latest["tier_adj"].combine_first(
-                                qb_latest["tier"]
-                            )
-                        else:
-                            qb_latest["tier_effective"] = qb_latest["tier"]
-                        qb_latest = qb_latest.drop_duplicates(
-                            subset=["defteam", "season"], keep="last"
+                try:
+                    with sqlite3.connect(database_path) as con:
+                        latest_view = pd.read_sql(
+                            "SELECT defteam, season, pos, tier, score, score_adj, tier_adj FROM defense_ratings_latest",
+                            con,
                         )
-                        tier_lookup.update(
-                            {
-                                (row["defteam"], row["season"]): row["tier_effective"]
-                                for _, row in qb_latest.iterrows()
-                            }
+                except Exception:
+                    latest_view = pd.DataFrame()
+                if not latest_view.empty:
+                    qb_latest = latest_view.loc[latest_view["pos"] == "QB_PASS"].copy()
+                    if "score_adj" in qb_latest.columns:
+                        qb_latest["score_effective"] = qb_latest["score_adj"].combine_first(
+                            qb_latest["score"]
                         )
-                        score_lookup.update(
-                            {
-                                (row["defteam"], row["season"]): row["score_effective"]
-                                for _, row in qb_latest.iterrows()
-                            }
+                    else:
+                        qb_latest["score_effective"] = qb_latest["score"]
+                    if "tier_adj" in qb_latest.columns:
+                        qb_latest["tier_effective"] = qb_latest["tier_adj"].combine_first(
+                            qb_latest["tier"]
                         )
-                        for idx in edges_df.index[missing_mask]:
-                            # Normalize team code for defense merge
-                            raw_def_code = edges_df.at[idx, "opponent_def_code"]
-                            if pd.isna(raw_def_code) or raw_def_code is None:
-                                continue  # Skip rows with no opponent defense code
-                            normalized_def_code = normalize_team_code(str(raw_def_code))
-                            if not normalized_def_code:  # Skip empty normalized codes
-                                continue
-                            key = (
-                                normalized_def_code,
-                                edges_df.at[idx, "season"],
-                            )
-                            if key in tier_lookup and pd.isna(edges_df.at[idx, "def_tier"]):
-                                edges_df.at[idx, "def_tier"] = tier_lookup[key]
-                                edges_df.at[idx, "def_score"] = score_lookup[key]
+                    else:
+                        qb_latest["tier_effective"] = qb_latest["tier"]
+                    qb_latest = qb_latest.drop_duplicates(
+                        subset=["defteam", "season"], keep="last"
+                    )
+                    tier_lookup.update(
+                        {
+                            (row["defteam"], row["season"]): row["tier_effective"]
+                            for _, row in qb_latest.iterrows()
+                        }
+                    )
+                    score_lookup.update(
+                        {
+                            (row["defteam"], row["season"]): row["score_effective"]
+                            for _, row in qb_latest.iterrows()
+                        }
+                    )
+                    for idx in edges_df.index[missing_mask]:
+                        # Normalize team code for defense merge
+                        raw_def_code = edges_df.at[idx, "opponent_def_code"]
+                        if pd.isna(raw_def_code) or raw_def_code is None:
+                            continue  # Skip rows with no opponent defense code
+                        normalized_def_code = normalize_team_code(str(raw_def_code))
+                        if not normalized_def_code:  # Skip empty normalized codes
+                            continue
+                        key = (
+                            normalized_def_code,
+                            edges_df.at[idx, "season"],
+                        )
+                        if key in tier_lookup and pd.isna(edges_df.at[idx, "def_tier"]):
+                            edges_df.at[idx, "def_tier"] = tier_lookup[key]
+                            edges_df.at[idx, "def_score"] = score_lookup[key]
+    except Exception as exc:
+        print(f"Warning: unable to merge defense ratings ({exc})")
+    return edges_df
+
+
+def _edge_engine_config(database_path: Path) -> EdgeEngineConfig:
+    return EdgeEngineConfig(
+        database_path=database_path,
+        kelly_cap=float(os.getenv("EDGE_KELLY_CAP", "0.05")),
+        edge_threshold=float(os.getenv("EDGE_THRESHOLD", "0.005")),
+        sigma_floor=float(os.getenv("EDGE_SIGMA_FLOOR", "35")),
+        default_sigma=float(os.getenv("EDGE_DEFAULT_SIGMA", "55")),
+    )
+
+
+def _table_state(database_path: Path, *tables: str) -> dict:
+    if not database_path.exists():
+        return {}
+    with sqlite3.connect(database_path) as con:
+        return table_fingerprints(con, tables)
+
+
+def _non_empty(data: pd.DataFrame | ScheduleIndex) -> bool:
+    # Empty nflverse data usually means a failed download; retry next run
+    return len(data) > 0
+
+
+def build_pipeline(
+    database_path: Path,
+    seasons: Sequence[int],
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    force: bool = False,
+) -> Pipeline:
+    """Declare the edge pipeline as stages keyed on what each one reads.
+
+    nflverse stages re-run once per ``NFLVERSE_TTL_HOURS`` window, matching
+    the provider's own Parquet cache; props, projections and edges re-run when the odds tables, CSV,
+    defense ratings or the relevant config change. An odds-only refresh
+    therefore reuses the cached schedules and game logs.
+    """
+
+    use_db_adapter = _env_truthy(os.getenv("USE_DB_ADAPTER"))
+    if use_db_adapter:
+        adapter: Union[DbPropsAdapter, CsvQBPropsAdapter] = DbPropsAdapter(database_path)
+    else:
+        adapter = CsvQBPropsAdapter()
+    projection_config = ProjectionConfig(defense_beta=float(os.getenv("DEFENSE_BETA", "0.10")))
+    engine_config = _edge_engine_config(database_path)
+    shrink_weight = float(os.getenv("SHRINK_TO_MARKET_WEIGHT", "0.35"))
+    refresh_hours = float(os.getenv("NFLVERSE_TTL_HOURS", "6"))
+
+    def props_fingerprint() -> dict:
+        if isinstance(adapter, DbPropsAdapter):
+            return {
+                "db": str(database_path),
+                "tables": _table_state(database_path, "current_best_lines"),
+                "schedule_csv": file_fingerprint(
+                    os.getenv("SCHEDULE_CSV", "tests/fixtures/schedule_2025_mini.csv")
+                ),
+            }
+        return {"db": str(database_path), "csv": file_fingerprint(adapter.csv_path)}
+
+    def nflverse_fingerprint() -> dict:
+        window = int(time.time() // (refresh_hours * 3600)) if refresh_hours > 0 else 0
+        return {"seasons": list(seasons), "window": window}
+
+    def projections_fingerprint() -> dict:
+        return {
+            "baseline_games": projection_config.baseline_games,
+            "defense_beta": projection_config.defense_beta,
+            "news_flags": file_fingerprint(projection_config.news_flags_path),
+            "tables": _table_state(database_path, "defense_ratings"),
+        }
+
+    def edges_fingerprint() -> dict:
+        return {
+            "config": asdict(engine_config),
+            "shrink_weight": shrink_weight,
+            "tables": _table_state(database_path, "defense_ratings", "odds_csv_raw"),
+        }
+
+    def fetch_props() -> pd.DataFrame:
+        props_df = adapter.fetch()
+        adapter.persist(props_df, database_path)
+        return props_df
+
+    def project(
+        props: pd.DataFrame,
+        game_logs: pd.DataFrame,
+        schedule_lookup: dict,
+        defense_ratings: bool,
+    ) -> pd.DataFrame:
+        return build_qb_projections(
+            props,
+            game_logs=game_logs,
+            schedule_lookup=schedule_lookup,
+            config=projection_config,
+        )
+
+    def compute(
+        props: pd.DataFrame,
+        projections: pd.DataFrame,
+        schedule_lookup: dict,
+        defense_ratings: bool,
+    ) -> pd.DataFrame:
+        engine = EdgeEngine(engine_config, schedule_lookup=schedule_lookup)
+        edges_df = engine.compute_edges(props, projections)
+        # Optional market-aware shrinkage toward consensus
+        try:
+            from engine.shrinkage import consensus_prob, shrink_to_market
+
+            if not edges_df.empty and "model_p" in edges_df.columns:
+                p_cons = consensus_prob(edges_df)
+                edges_df["p_model_shrunk"] = shrink_to_market(
+                    edges_df["model_p"], p_cons, shrink_weight
+                )
+        except Exception:
+            pass
+        edges_df = ensure_edges_season(edges_df, props, database_path)
+        for col in ("season", "week"):
+            if col in edges_df.columns:
+                edges_df[col] = pd.to_numeric(edges_df[col], errors="coerce").astype("Int64")
+        if "opponent_def_code" in edges_df.columns:
+            edges_df["opponent_def_code"] = edges_df["opponent_def_code"].apply(
+                normalize_team_code
+            )
+        if defense_ratings:
+            edges_df = merge_defense_ratings(edges_df, database_path)
+        return apply_defense_defaults(edges_df)
+
+    def run_migrations() -> None:
+        migrate()
+
+    def correlated_card(edges: pd.DataFrame, game_logs: pd.DataFrame) -> None:
+        try:
+            export_correlated_card(edges, game_logs, database_path, engine_config.export_dir)
         except Exception as exc:
-            print(f"Warning: unable to merge defense ratings ({exc})")
+            print(f"Warning: unable to build correlation-aware card ({exc})")
+
+    stages = [
+        Stage("migrate", run_migrations, cache=False),
+        Stage("props", fetch_props, after=("migrate",), fingerprint=props_fingerprint),
+        Stage(
+            "schedules",
+            lambda: get_schedule_index(seasons),
+            fingerprint=nflverse_fingerprint,
+            version=2,
+            cache_if=_non_empty,
+        ),
+        Stage(
+            "game_logs",
+            lambda: get_player_game_logs(seasons),
+            fingerprint=nflverse_fingerprint,
+            cache_if=_non_empty,
+        ),
+        Stage(
+            "schedule_lookup",
+            lambda schedules: build_event_lookup(schedules),
+            inputs=("schedules",),
+        ),
+        Stage(
+            "defense_ratings",
+            lambda: ensure_defense_ratings_artifacts(database_path),
+            after=("migrate",),
+            cache=False,
+        ),
+        Stage(
+            "projections",
+            project,
+            inputs=("props", "game_logs", "schedule_lookup", "defense_ratings"),
+            fingerprint=projections_fingerprint,
+        ),
+        # Side effects below always run: their cached key cannot tell a truncated
+        # table, another database or a deleted export apart from a finished write
+        Stage(
+            "persist_projections",
+            lambda projections: persist_projections(projections, database_path),
+            inputs=("projections",),
+            cache=False,
+        ),
+        Stage(
+            "edges",
+            compute,
+            inputs=("props", "projections", "schedule_lookup", "defense_ratings"),
+            fingerprint=edges_fingerprint,
+        ),
+        Stage(
+            "persist_edges",
+            lambda edges: EdgeEngine(engine_config).persist_edges(edges),
+            inputs=("edges",),
+            cache=False,
+        ),
+        Stage(
+            "export",
+            lambda edges: EdgeEngine(engine_config).export(edges),
+            inputs=("edges",),
+            cache=False,
+        ),
+        Stage(
+            "correlated_card", correlated_card, inputs=("edges", "game_logs"), cache=False
+        ),
+    ]
+    return Pipeline(stages, cache_dir=cache_dir, max_workers=4, force=force)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Build QB projections and compute edges.")
+    ap.add_argument("--force", action="store_true", help="Re-run every stage, ignoring the cache")
+    ap.add_argument("--no-cache", action="store_true", help="Neither read nor write stage caches")
+    ap.add_argument(
+        "--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Stage cache directory"
+    )
+    args = ap.parse_args(argv)
 
-    edges_df = apply_defense_defaults(edges_df)
-    engine.persist_edges(edges_df)
-    engine.export(edges_df)
+    database_path = get_database_path()
+    seasons_env = os.getenv("DEFAULT_SEASONS", "2023,2024,2025")
+    seasons = [int(s.strip()) for s in seasons_env.split(",") if s.strip()]
+    pipeline = build_pipeline(
+        database_path,
+        seasons,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        force=args.force,
+    )
+    start = time.perf_counter()
+    run = pipeline.run()
 
-    print("Edge computation complete.")
+    print(run.timings().to_string(index=False))
+    print(f"Edge computation complete in {time.perf_counter() - start:.2f}s.")
 
 
 if __name__ == "__main__":
@@ -2,20 +2,27 @@
 # Robust CSV -> SQLite importer with progress logs and SQLite lock handling
 from __future__ import annotations
 
+import gzip
+import multiprocessing
 import os
+import shutil
 import sqlite3
 import sys
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 import pandas as pd
 
+from engine.odds_math import american_to_decimal
 from engine.odds_normalizer import normalize_long_odds
-from engine.week_populator import populate_week_from_schedule
+from engine.week_populator import ScheduleIndex, load_schedule_data, populate_week_from_schedule
+from utils.data_version import bump_data_version
 
 UTC = timezone.utc
 
@@ -132,6 +139,33 @@ INSERT_SQL = (
 )
 
 
+EXPECTED_COLS = [
+    "event_id",
+    "commence_time",
+    "home_team",
+    "away_team",
+    "player",
+    "market",
+    "line",
+    "side",
+    "odds",
+    "over_odds",
+    "under_odds",
+    "book",
+    "updated_at",
+    "pos",
+    "implied_prob",
+    "fair_prob",
+    "overround",
+    "is_stale",
+    "fair_decimal",
+    "x_used",
+    "x_remaining",
+    "season",
+    "ingest_source",
+]
+
+
 def _resolve_csv_path() -> Path:
     return Path(os.getenv("CSV_PATH", str(DEFAULT_CSV_PATH)))
 
@@ -140,133 +174,6 @@ def _resolve_stale_minutes() -> int:
     return int(os.getenv("STALE_MINUTES", "120"))
 
 
-def _populate_join_keys(con: sqlite3.Connection) -> None:
-    """Populate week, team_code, and opponent_def_code in current_best_lines."""
-    from engine.season import infer_season
-    from utils.teams import normalize_team_code, parse_event_id
-
-    # Get rows that need join key population
-    cur = con.execute(
-        """
-        SELECT rowid, event_id, home_team, away_team, season
-        FROM current_best_lines
-        WHERE event_id IS NOT NULL
-    """
-    )
-    rows = cur.fetchall()
-
-    updates = []
-    for rowid, event_id, home_team, away_team, season in rows:
-        try:
-            # Parse event_id for date and team info
-            game_date, away_parsed, home_parsed = parse_event_id(event_id)
-
-            # Use parsed teams if available, fall back to stored teams
-            away_final = normalize_team_code(away_parsed or away_team)
-            home_final = normalize_team_code(home_parsed or home_team)
-
-            # Infer week from game_date and season (basic estimation)
-            week = None
-            if game_date and season:
-                try:
-                    # Simple week estimation - NFL season typically starts in September
-                    import datetime
-
-                    date_obj = datetime.datetime.strptime(game_date, "%Y-%m-%d")
-                    # Week 1 typically starts around Sept 5-12
-                    # This is a rough approximation - real schedule data would be better
-                    if date_obj.month == 9:
-                        week = max(1, (date_obj.day - 5) // 7 + 1)
-                    elif date_obj.month == 10:
-                        week = min(8, (date_obj.day + 25) // 7 + 1)
-                    elif date_obj.month == 11:
-                        week = min(12, (date_obj.day + 30) // 7 + 1)
-                    elif date_obj.month == 12:
-                        week = min(18, (date_obj.day + 34) // 7 + 1)
-                    elif date_obj.month == 1:  # January playoffs
-                        week = min(22, 18 + date_obj.day // 7 + 1)
-                except (ValueError, AttributeError):
-                    pass
-
-            # For now, we'll set team_code and opponent_def_code to None
-            # These will be populated by EdgeEngine logic during edge computation
-            updates.append((week, None, None, rowid))
-
-        except Exception as e:
-            print(f"     Warning: Failed to parse event_id {event_id}: {e}")
-            updates.append((None, None, None, rowid))
-
-    # Batch update the join keys
-    if updates:
-        con.executemany(
-            """
-            UPDATE current_best_lines
-            SET week = ?, team_code = ?, opponent_def_code = ?
-            WHERE rowid = ?
-        """,
-            updates,
-        )
-
-        populated_weeks = sum(1 for week, _, _, _ in updates if week is not None)
-        print(f"     Populated week for {populated_weeks}/{len(updates)} rows")
-
-
-def _populate_week_from_schedule(con: sqlite3.Connection) -> None:
-    """Populate week column in current_best_lines using schedule data."""
-    import os
-
-    sched_csv = os.getenv("SCHEDULE_CSV", "tests/fixtures/schedule_2025_mini.csv")
-    if not Path(sched_csv).exists():
-        print(f"     Warning: Schedule CSV not found at {sched_csv}")
-        return
-
-    try:
-        # Load current_best_lines data
-        lines_df = pd.read_sql("SELECT * FROM current_best_lines", con)
-        if lines_df.empty:
-            return
-
-        # Load schedule data
-        schedule_df = pd.read_csv(sched_csv)
-
-        # Ensure week column exists in DataFrame
-        if "week" not in lines_df.columns:
-            lines_df["week"] = pd.NA
-
-        before_missing = lines_df["week"].isna().sum()
-
-        # Populate week using the enhanced helper
-        lines_df = populate_week_from_schedule(lines_df, schedule_df)
-
-        # Extract detailed match statistics
-        stats = getattr(
-            lines_df,
-            "_week_population_stats",
-            {"stage1_count": 0, "stage2_count": 0, "total_filled": 0, "total_rows": len(lines_df)},
-        )
-
-        stage1_count = stats["stage1_count"]
-        stage2_count = stats["stage2_count"]
-        total_filled = stats["total_filled"]
-        total_rows = stats["total_rows"]
-
-        if total_filled > 0:
-            # Update the database with new week data
-            con.execute("DELETE FROM current_best_lines")  # Clear and rebuild
-            lines_df.to_sql("current_best_lines", con, if_exists="append", index=False)
-            print(
-                f"     Populated week for {total_filled}/{total_rows} rows (stage1 {stage1_count}, stage2 {stage2_count})"
-            )
-        else:
-            print(f"     No week data populated from schedule (0/{total_rows} rows matched)")
-
-    except Exception as e:
-        import traceback
-
-        print(f"     Warning: Schedule week population failed ({e})")
-        print(f"     Debug traceback: {traceback.format_exc()}")
-
-
 def _ensure_columns(con: sqlite3.Connection) -> None:
     cur = con.execute("PRAGMA table_info(odds_csv_raw);")
     cols = {row[1] for row in cur.fetchall()}
@@ -309,10 +216,388 @@ def _wide_to_long(df: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame.from_records(records)
 
 
+
+
+def _fill_missing_pos(df: pd.DataFrame) -> pd.DataFrame:
+    if "pos" not in df.columns:
+        df["pos"] = None
+    pos_missing = df["pos"].isna() | (df["pos"].astype(str).str.strip() == "")
+    if pos_missing.any():
+        market_lower = df.get("market", "").astype(str).str.lower()
+        df.loc[pos_missing & market_lower.str.contains("pass"), "pos"] = "QB"
+        df.loc[
+            pos_missing & market_lower.str.contains("rush|rushing|carry|attempt"),
+            "pos",
+        ] = "RB"
+        df.loc[
+            pos_missing & market_lower.str.contains("rec|receiv|recept|catch"),
+            "pos",
+        ] = "WR"
+        df.loc[
+            pos_missing & market_lower.str.contains(r"\\bte\\b|tight[-_\s]?end", regex=True),
+            "pos",
+        ] = "TE"
+    return df
+
+
+def _import_full(con: sqlite3.Connection, csv_path: Path, stale_minutes: int) -> int:
+    """Load the whole CSV in memory, normalize it and replace odds_csv_raw."""
+    print("[3/5] Loading CSV from", csv_path)
+    df = pd.read_csv(csv_path)
+    if df.columns.empty:
+        raise SystemExit("CSV appears to have no header row.")
+    print("     Detected columns:", ", ".join(map(str, df.columns.tolist())))
+
+    df = _wide_to_long(df)
+
+    history_dir = Path("storage/imports/history")
+    history_dir.mkdir(parents=True, exist_ok=True)
+    snapshot_name = datetime.now(UTC).strftime("odds_raw_%Y%m%d.csv.gz")
+    snapshot_path = history_dir / snapshot_name
+    try:
+        df.to_csv(snapshot_path, index=False, compression="gzip")
+        print(f"     Saved raw snapshot to {snapshot_path}")
+    except Exception as err:
+        print(f"     Warning: failed to write raw snapshot ({err})")
+
+    raw_rows = len(df)
+    df = normalize_long_odds(df, stale_minutes=stale_minutes)
+    df["ingest_source"] = "csv"
+    df = _fill_missing_pos(df)
+
+    dedupe_cols = [
+        "event_id",
+        "player",
+        "market",
+        "book",
+        "side",
+        "line",
+        "updated_at",
+    ]
+    available_cols = [c for c in dedupe_cols if c in df.columns]
+    if available_cols:
+        df = dedupe_latest(df, available_cols, sort_col="updated_at")
+    deduped_rows = len(df)
+    stale_series = pd.to_numeric(df.get("is_stale"), errors="coerce")
+    stale_rows = int(stale_series.fillna(0).astype(int).sum()) if not stale_series.empty else 0
+    source_counts = df["ingest_source"].value_counts(dropna=False).to_dict()
+    print(
+        "     Row counts → raw: {raw} | deduped: {deduped} | stale flagged: {stale} | by source: {sources}".format(
+            raw=raw_rows,
+            deduped=deduped_rows,
+            stale=stale_rows,
+            sources=source_counts,
+        )
+    )
+
+    for col in EXPECTED_COLS:
+        if col not in df.columns:
+            df[col] = pd.NA
+    df = df[EXPECTED_COLS]
+
+    con.execute("BEGIN IMMEDIATE;")  # take write lock
+    con.execute("DELETE FROM odds_csv_raw;")
+
+    rows: List[Tuple] = []
+    total = 0
+    for row in df.itertuples(index=False, name=None):
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            _insert_with_retry(con, INSERT_SQL, rows)
+            total += len(rows)
+            rows.clear()
+            print(f"     Inserted {total} rows ...")
+
+    if rows:
+        _insert_with_retry(con, INSERT_SQL, rows)
+        total += len(rows)
+        print(f"     Inserted {total} rows (final batch) ...")
+
+    con.execute("COMMIT;")
+    return total
+
+
+# --- Chunked import -------------------------------------------------------
+#
+# Large (multi-season) CSVs are read in fixed-size chunks with explicit string
+# dtypes (no per-chunk type inference; numeric columns are coerced by the
+# normalizer), normalized in worker processes and appended to a TEMP staging
+# table. One set-based merge then keeps the latest quote per
+# (event_id, market, book, side, line) across the whole file, de-vigs each
+# market and replaces odds_csv_raw, so the result matches the full import
+# while memory stays bounded by the chunk size.
+
+STAGE_COLS = EXPECTED_COLS + ["_chunk", "_row", "_updated_epoch", "_inv"]
+
+DDL_STAGE = """
+DROP TABLE IF EXISTS temp.odds_csv_stage;
+CREATE TEMP TABLE odds_csv_stage (
+  event_id TEXT, commence_time TEXT, home_team TEXT, away_team TEXT,
+  player TEXT, market TEXT, line REAL, side TEXT, odds INTEGER,
+  over_odds INTEGER, under_odds INTEGER, book TEXT, updated_at TEXT,
+  pos TEXT, implied_prob REAL, fair_prob REAL, overround REAL,
+  is_stale INTEGER, fair_decimal REAL, x_used INTEGER, x_remaining INTEGER,
+  season INTEGER, ingest_source TEXT,
+  _chunk INTEGER, _row INTEGER, _updated_epoch REAL, _inv REAL
+);
+"""
+
+STAGE_INSERT_SQL = (
+    f"INSERT INTO temp.odds_csv_stage ({', '.join(STAGE_COLS)}) "
+    f"VALUES ({', '.join('?' for _ in STAGE_COLS)})"
+)
+
+# Proportional de-vig (engine.odds_math.devig_proportional_from_decimal) over
+# every priced side of a market; ``_inv`` is 1 / decimal odds
+_DEVIG_EXPRS = {
+    "fair_prob": "CASE WHEN _priced >= 2 THEN _inv / _overround END",
+    "overround": "CASE WHEN _priced >= 2 AND _inv IS NOT NULL THEN _overround END",
+    "fair_decimal": "CASE WHEN _priced >= 2 THEN 1.0 / (_inv / _overround) END",
+}
+
+# Latest quote per key (undated quotes sort last, as in normalize_long_odds),
+# then the de-vig columns
+MERGE_SQL = f"""
+INSERT INTO odds_csv_raw ({', '.join(EXPECTED_COLS)})
+SELECT {', '.join(_DEVIG_EXPRS.get(col, col) for col in EXPECTED_COLS)}
+FROM (
+  SELECT *,
+         SUM(_inv) OVER market_key AS _overround,
+         COUNT(_inv) OVER market_key AS _priced
+  FROM (
+    SELECT *,
+           ROW_NUMBER() OVER (
+             PARTITION BY event_id, market, book, side, line
+             ORDER BY _updated_epoch IS NULL DESC, _updated_epoch DESC, _chunk DESC, _row DESC
+           ) AS _rank
+    FROM temp.odds_csv_stage
+  )
+  WHERE _rank = 1
+  WINDOW market_key AS (PARTITION BY event_id, market, book, line)
+)
+"""
+
+
+def _resolve_chunk_rows() -> int:
+    """Rows per chunk for the chunked import; 0 keeps the single-shot import."""
+    return int(os.getenv("CSV_CHUNK_ROWS", "0"))
+
+
+def _resolve_workers() -> int:
+    return int(os.getenv("CSV_IMPORT_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _inverse_decimal(odds: object) -> Optional[float]:
+    if odds is None or pd.isna(odds):
+        return None
+    try:
+        return 1.0 / american_to_decimal(int(odds))
+    except (ValueError, TypeError):
+        return None
+
+
+def _normalize_chunk(
+    chunk: pd.DataFrame, chunk_no: int, stale_minutes: int, now_ts: pd.Timestamp
+) -> Tuple[int, List[Tuple]]:
+    """Worker: wide->long, normalize and return staging rows for one chunk."""
+    df = _wide_to_long(chunk).reset_index(drop=True)
+    raw_rows = len(df)
+    # De-vig needs the whole market, which may span chunks: done in MERGE_SQL
+    df = normalize_long_odds(df, stale_minutes=stale_minutes, now_ts=now_ts, devig=False)
+    df["ingest_source"] = "csv"
+    df = _fill_missing_pos(df)
+    for col in EXPECTED_COLS:
+        if col not in df.columns:
+            df[col] = None
+    updated = pd.to_datetime(df["updated_at"], utc=True, errors="coerce")
+    epoch = (updated - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)
+    staged = df[EXPECTED_COLS].copy()
+    staged["_chunk"] = chunk_no
+    staged["_row"] = df.index.to_numpy()
+    staged["_updated_epoch"] = epoch.astype(object).where(epoch.notna(), None)
+    staged["_inv"] = df["odds"].map(_inverse_decimal)
+    staged = staged.astype(object).where(staged.notna(), None)
+    return raw_rows, list(staged.itertuples(index=False, name=None))
+
+
+def _save_source_snapshot(csv_path: Path) -> None:
+    history_dir = Path("storage/imports/history")
+    history_dir.mkdir(parents=True, exist_ok=True)
+    snapshot_path = history_dir / datetime.now(UTC).strftime("odds_raw_%Y%m%d.csv.gz")
+    try:
+        # Stream the source file; the chunks are never held together in memory
+        with open(csv_path, "rb") as src, gzip.open(snapshot_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        print(f"     Saved raw snapshot to {snapshot_path}")
+    except Exception as err:
+        print(f"     Warning: failed to write raw snapshot ({err})")
+
+
+def _import_chunked(
+    con: sqlite3.Connection,
+    csv_path: Path,
+    stale_minutes: int,
+    chunk_rows: int,
+    workers: int,
+) -> int:
+    """Import the CSV in bounded memory through a staging table and one merge."""
+    print(f"[3/5] Loading CSV from {csv_path} in chunks of {chunk_rows} rows ({workers} workers)")
+    header = pd.read_csv(csv_path, nrows=0)
+    if header.columns.empty:
+        raise SystemExit("CSV appears to have no header row.")
+    print("     Detected columns:", ", ".join(map(str, header.columns.tolist())))
+    _save_source_snapshot(csv_path)
+
+    con.executescript(DDL_STAGE)
+    now_ts = pd.Timestamp.now(tz="UTC")  # One staleness reference for every chunk
+    reader = pd.read_csv(csv_path, dtype=str, chunksize=chunk_rows)
+    raw_rows = 0
+    staged_rows = 0
+
+    def stage(result: Tuple[int, List[Tuple]]) -> None:
+        nonlocal raw_rows, staged_rows
+        chunk_raw, rows = result
+        raw_rows += chunk_raw
+        for start in range(0, len(rows), BATCH_SIZE):
+            con.executemany(STAGE_INSERT_SQL, rows[start : start + BATCH_SIZE])
+        staged_rows += len(rows)
+        print(f"     Staged {staged_rows} rows ...")
+
+    if workers <= 1:
+        for chunk_no, chunk in enumerate(reader):
+            stage(_normalize_chunk(chunk, chunk_no, stale_minutes, now_ts))
+    else:
+        # spawn, not fork: forking a process that already runs threads can deadlock
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            # At most two chunks per worker in flight keeps memory bounded
+            pending: deque = deque()
+            for chunk_no, chunk in enumerate(reader):
+                pending.append(
+                    pool.submit(_normalize_chunk, chunk, chunk_no, stale_minutes, now_ts)
+                )
+                if len(pending) >= 2 * workers:
+                    stage(pending.popleft().result())
+            while pending:
+                stage(pending.popleft().result())
+
+    con.execute("BEGIN IMMEDIATE;")  # take write lock
+    try:
+        con.execute("DELETE FROM odds_csv_raw;")
+        total = con.execute(MERGE_SQL).rowcount
+        con.execute("COMMIT;")
+    except Exception:
+        con.execute("ROLLBACK;")
+        raise
+    finally:
+        con.execute("DROP TABLE IF EXISTS temp.odds_csv_stage;")
+
+    stale_rows = con.execute(
+        "SELECT COALESCE(SUM(is_stale), 0) FROM odds_csv_raw"
+    ).fetchone()[0]
+    print(
+        f"     Row counts → raw: {raw_rows} | deduped: {total} | stale flagged: {stale_rows} "
+        f"| by source: {{'csv': {total}}}"
+    )
+    print(f"     Merged {total} rows into odds_csv_raw")
+    return total
+
+
+def _load_schedule_index(con: sqlite3.Connection) -> Optional[ScheduleIndex]:
+    """Schedule for week assignment: SCHEDULE_CSV if set, else the nflverse cache."""
+    sched_csv = os.getenv("SCHEDULE_CSV")
+    if sched_csv:
+        schedule = load_schedule_data(sched_csv)
+        if schedule.empty:
+            print(f"     Warning: no usable schedule rows in {sched_csv}")
+            return None
+        # Odds rows carry team codes; prefer them over full names when both exist
+        for side in ("home", "away"):
+            if f"{side}_code" in schedule.columns:
+                schedule[f"{side}_team"] = schedule[f"{side}_code"].fillna(
+                    schedule[f"{side}_team"]
+                )
+        return ScheduleIndex.from_schedule(schedule)
+
+    seasons = [
+        int(row[0])
+        for row in con.execute(
+            "SELECT DISTINCT season FROM current_best_lines WHERE season IS NOT NULL"
+        )
+    ]
+    if not seasons:
+        return None
+    try:
+        from adapters.nflverse_provider import get_schedule_index
+
+        return get_schedule_index(seasons)
+    except Exception as e:
+        print(f"     Warning: nflverse schedules unavailable for {seasons} ({e})")
+        return None
+
+
+def _assign_weeks_from_schedule(con: sqlite3.Connection) -> None:
+    """Set current_best_lines.week per game from the schedule, in one UPDATE.
+
+    Matching runs on the distinct games only (season, date and teams through
+    :func:`populate_week_from_schedule`, then the event id), so it costs the
+    same for a week of lines as for several seasons.
+    """
+    index = _load_schedule_index(con)
+    if index is None or len(index) == 0:
+        print("     Warning: no schedule available; week left empty")
+        return
+
+    game_cols = ["event_id", "commence_time", "home_team", "away_team", "season"]
+    games = pd.read_sql(
+        f"SELECT DISTINCT {', '.join(game_cols)} FROM current_best_lines", con
+    )
+    if games.empty:
+        return
+    games["week"] = pd.NA
+    games = populate_week_from_schedule(games, index, validate_teams=False)
+    missing = games["week"].isna().to_numpy()
+    if missing.any():
+        pos = index.locate_events(games.loc[missing, "event_id"])
+        weeks = index.frame["week"].to_numpy(dtype=object, na_value=pd.NA)
+        games.loc[missing, "week"] = [weeks[p] if p >= 0 else pd.NA for p in pos]
+    games = games.astype(object).where(games.notna(), None)
+
+    con.executescript(
+        """
+        DROP TABLE IF EXISTS temp.import_weeks;
+        CREATE TEMP TABLE import_weeks (
+          event_id TEXT, commence_time TEXT, home_team TEXT, away_team TEXT,
+          season INTEGER, week INTEGER
+        );
+        """
+    )
+    con.executemany(
+        "INSERT INTO temp.import_weeks VALUES (?,?,?,?,?,?)",
+        games[game_cols + ["week"]].itertuples(index=False, name=None),
+    )
+    con.execute(
+        f"CREATE INDEX temp.idx_import_weeks ON import_weeks ({', '.join(game_cols)})"
+    )
+    match = " AND ".join(f"c.{col} IS w.{col}" for col in game_cols)
+    con.execute(
+        f"""
+        UPDATE current_best_lines AS c
+        SET week = w.week
+        FROM temp.import_weeks AS w
+        WHERE {match}
+        """
+    )
+    con.execute("DROP TABLE temp.import_weeks")
+    matched = int(games["week"].notna().sum())
+    print(f"     Assigned week to {matched}/{len(games)} games from the schedule")
+
+
 def main():
     t0 = time.perf_counter()
     csv_path = _resolve_csv_path()
     stale_minutes = _resolve_stale_minutes()
+    chunk_rows = _resolve_chunk_rows()
     if not csv_path.exists():
         raise SystemExit(
             f"Missing CSV at {csv_path}. Put your Sheets export there or set CSV_PATH."
@@ -329,130 +614,19 @@ def main():
         con.executescript(DDL_RAW)
         _ensure_columns(con)
 
-        print("[3/5] Loading CSV from", csv_path)
-        df = pd.read_csv(csv_path)
-        if df.columns.empty:
-            raise SystemExit("CSV appears to have no header row.")
-        print("     Detected columns:", ", ".join(map(str, df.columns.tolist())))
-
-        df = _wide_to_long(df)
-
-        history_dir = Path("storage/imports/history")
-        history_dir.mkdir(parents=True, exist_ok=True)
-        snapshot_name = datetime.now(UTC).strftime("odds_raw_%Y%m%d.csv.gz")
-        snapshot_path = history_dir / snapshot_name
-        try:
-            df.to_csv(snapshot_path, index=False, compression="gzip")
-            print(f"     Saved raw snapshot to {snapshot_path}")
-        except Exception as err:
-            print(f"     Warning: failed to write raw snapshot ({err})")
-
-        raw_rows = len(df)
-        df = normalize_long_odds(df, stale_minutes=stale_minutes)
-        df["ingest_source"] = "csv"
-
-        if "pos" not in df.columns:
-            df["pos"] = None
-        pos_missing = df["pos"].isna() | (df["pos"].astype(str).str.strip() == "")
-        if pos_missing.any():
-            market_lower = df.get("market", "").astype(str).str.lower()
-            df.loc[pos_missing & market_lower.str.contains("pass"), "pos"] = "QB"
-            df.loc[
-                pos_missing & market_lower.str.contains("rush|rushing|carry|attempt"),
-                "pos",
-            ] = "RB"
-            df.loc[
-                pos_missing & market_lower.str.contains("rec|receiv|recept|catch"),
-                "pos",
-            ] = "WR"
-            df.loc[
-                pos_missing & market_lower.str.contains(r"\\bte\\b|tight[-_\s]?end", regex=True),
-                "pos",
-            ] = "TE"
-
-        dedupe_cols = [
-            "event_id",
-            "player",
-            "market",
-            "book",
-            "side",
-            "line",
-            "updated_at",
-        ]
-        available_cols = [c for c in dedupe_cols if c in df.columns]
-        if available_cols:
-            df = dedupe_latest(df, available_cols, sort_col="updated_at")
-        deduped_rows = len(df)
-        stale_series = pd.to_numeric(df.get("is_stale"), errors="coerce")
-        stale_rows = int(stale_series.fillna(0).astype(int).sum()) if not stale_series.empty else 0
-        source_counts = df["ingest_source"].value_counts(dropna=False).to_dict()
-        print(
-            "     Row counts → raw: {raw} | deduped: {deduped} | stale flagged: {stale} | by source: {sources}".format(
-                raw=raw_rows,
-                deduped=deduped_rows,
-                stale=stale_rows,
-                sources=source_counts,
+        if chunk_rows > 0:
+            total = _import_chunked(
+                con, csv_path, stale_minutes, chunk_rows, _resolve_workers()
             )
-        )
-
-        expected_cols = [
-            "event_id",
-            "commence_time",
-            "home_team",
-            "away_team",
-            "player",
-            "market",
-            "line",
-            "side",
-            "odds",
-            "over_odds",
-            "under_odds",
-            "book",
-            "updated_at",
-            "pos",
-            "implied_prob",
-            "fair_prob",
-            "overround",
-            "is_stale",
-            "fair_decimal",
-            "x_used",
-            "x_remaining",
-            "season",
-            "ingest_source",
-        ]
-        for col in expected_cols:
-            if col not in df.columns:
-                df[col] = pd.NA
-        df = df[expected_cols]
-
-        con.execute("BEGIN IMMEDIATE;")  # take write lock
-        con.execute("DELETE FROM odds_csv_raw;")
-
-        rows: List[Tuple] = []
-        total = 0
-        for row in df.itertuples(index=False, name=None):
-            rows.append(row)
-            if len(rows) >= BATCH_SIZE:
-                _insert_with_retry(con, INSERT_SQL, rows)
-                total += len(rows)
-                rows.clear()
-                print(f"     Inserted {total} rows ...")
-
-        if rows:
-            _insert_with_retry(con, INSERT_SQL, rows)
-            total += len(rows)
-            print(f"     Inserted {total} rows (final batch) ...")
-
-        con.execute("COMMIT;")
+        else:
+            total = _import_full(con, csv_path, stale_minutes)
 
         print("[4/5] Refreshing current_best_lines ...")
         con.executescript(DDL_BEST)
 
-        print("     Populating join keys (week, team_code, opponent_def_code) ...")
-        _populate_join_keys(con)
-
-        print("     Populating week from schedule data ...")
-        _populate_week_from_schedule(con)
+        print("     Assigning week from schedule data ...")
+        _assign_weeks_from_schedule(con)
+        bump_data_version(con, "odds_csv_raw", "current_best_lines")
 
         print("[5/5] Done. Rows loaded:", total)
     finally:
@@ -12,7 +12,10 @@ from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 import requests
 
+from utils.data_version import bump_data_version
 from utils.odds import american_to_decimal, implied_from_decimal, proportional_devig_two_way
+from utils.odds_archive import PayloadArchive, create_payload_archive
+from utils.odds_quota import QuotaExhaustedError, create_quota_manager, request_cost
 
 DB = "storage/odds.db"
 USAGE_JSON = "storage/odds_api_usage.json"
@@ -58,6 +61,7 @@ def save_usage_json(data: Dict[str, Any]):
 
 
 def select_key(con: sqlite3.Connection, keys: List[str]) -> Optional[str]:
+    """Preview the preferred key without reserving quota (polling uses the quota manager)."""
     if not keys:
         return None
     rows = {k: {"disabled": 0, "last_remaining": 0, "req_month": 0} for k in keys}
@@ -75,36 +79,52 @@ def select_key(con: sqlite3.Connection, keys: List[str]) -> Optional[str]:
     return candidates[0]
 
 
-def record_usage(con: sqlite3.Connection, key: str, remaining: Optional[int]):
-    con.execute(
-        """
-        INSERT INTO odds_api_usage(key,last_used,req_today,req_month,last_remaining,disabled)
-        VALUES(?,?,?,?,?,0)
-        ON CONFLICT(key) DO UPDATE SET
-          last_used=excluded.last_used,
-          req_today=COALESCE(odds_api_usage.req_today,0)+1,
-          req_month=COALESCE(odds_api_usage.req_month,0)+1,
-          last_remaining=?
-        """,
-        (key, now_utc().isoformat(), 1, 1, remaining, remaining),
-    )
+class QuotaRejected(RuntimeError):
+    """The API refused the key (401/403/429); the request was not charged."""
+
+    def __init__(self, status_code: int, text: str, retry_after: Optional[str] = None):
+        super().__init__(f"auth_or_quota: {status_code} {text}")
+        self.status_code = status_code
+        try:
+            self.retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            self.retry_after = None
 
 
 def fetch_markets(
-    key: str, sport_key: str, region: str, markets: str, bookmakers: str, timeout: int = 15
+    key: str,
+    sport_key: str,
+    region: str,
+    markets: str,
+    bookmakers: str,
+    timeout: int = 15,
+    event_ids: Optional[List[str]] = None,
+    archive: Optional[PayloadArchive] = None,
 ) -> Dict[str, Any]:
-    url = f"https://api.the-odds-api.com/v4/sports/{sport_key}/odds"
+    endpoint = f"sports/{sport_key}/odds"
+    url = f"https://api.the-odds-api.com/v4/{endpoint}"
     params = {"apiKey": key, "regions": region, "markets": markets, "bookmakers": bookmakers}
+    if event_ids:
+        # Same credit cost as an unfiltered call, whatever the number of events
+        params["eventIds"] = ",".join(event_ids)
     r = requests.get(url, params=params, timeout=timeout)
     if r.status_code in (401, 403, 429):
-        raise RuntimeError(f"auth_or_quota: {r.status_code} {r.text}")
+        raise QuotaRejected(r.status_code, r.text, r.headers.get("retry-after"))
     r.raise_for_status()
+    if archive is not None:
+        try:
+            archive.put(r.content, source="poll_odds", endpoint=endpoint, params=params)
+        except Exception as e:
+            # Losing an archive copy must not lose the poll itself
+            print(f"Warning: failed to archive payload ({e})")
     return {"json": r.json(), "headers": r.headers}
 
 
-def normalize_rows(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+def normalize_rows(
+    payload: Dict[str, Any], *, now: Optional[dt.datetime] = None
+) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
-    now = now_utc().isoformat()
+    now = (now or now_utc()).isoformat()
     for ev in payload.get("json", []):
         event_id = ev.get("id")
         commence_time = ev.get("commence_time")
@@ -165,6 +185,7 @@ def upsert_rows(
     rows: List[Dict[str, Any]],
     *,
     stale_minutes: Optional[int] = None,
+    now: Optional[dt.datetime] = None,
 ) -> pd.DataFrame | None:
     from engine.odds_normalizer import normalize_long_odds
 
@@ -180,7 +201,7 @@ def upsert_rows(
     normalized = normalize_long_odds(
         df,
         stale_minutes=minutes,
-        now_ts=pd.Timestamp(now_utc()),
+        now_ts=pd.Timestamp(now or now_utc()),
     )
     if normalized is None:
         normalized = df
@@ -292,6 +313,19 @@ def ensure_closing_tables(con: sqlite3.Connection) -> None:
           ON closing_lines(event_id, market, side, line, book);
         """
     )
+    # Events whose close was captured at kickoff (jobs/capture_closing.py);
+    # later polls of live odds must not overwrite those rows.
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS closing_freeze (
+          event_id TEXT PRIMARY KEY,
+          commence_time TEXT NOT NULL,
+          frozen_at TIMESTAMP NOT NULL,
+          rows INTEGER,
+          source_run_id TEXT
+        );
+        """
+    )
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS clv_log (
@@ -413,10 +447,13 @@ def mark_primary_lines_enhanced(closing_df: pd.DataFrame, primary_book: str = No
                     scores += time_scores.fillna(0) * 1.0
 
         # Data quality score
+        # Missing columns score as absent values (an empty default Series would
+        # misalign and turn every score into NaN)
+        missing = pd.Series(None, index=group_df_copy.index, dtype="float64")
         data_quality = (
-            group_df_copy.get("implied_prob", pd.Series()).notna().astype(float) * 0.4
-            + group_df_copy.get("fair_prob_close", pd.Series()).notna().astype(float) * 0.4
-            + group_df_copy.get("overround", pd.Series()).notna().astype(float) * 0.2
+            group_df_copy.get("implied_prob", missing).notna().astype(float) * 0.4
+            + group_df_copy.get("fair_prob_close", missing).notna().astype(float) * 0.4
+            + group_df_copy.get("overround", missing).notna().astype(float) * 0.2
         )
         scores += data_quality * 0.8
 
@@ -468,6 +505,7 @@ def write_closing_snapshot(
     primary_book: str,
     source_label: str = "odds_api",
     run_id: str | None = None,
+    overwrite_frozen: bool = False,
 ) -> Tuple[int, float]:
     if normalized is None or normalized.empty:
         return 0, 0.0
@@ -481,6 +519,13 @@ def write_closing_snapshot(
     if working.empty:
         return 0, 0.0
 
+    ensure_closing_tables(con)
+    if not overwrite_frozen:
+        frozen = {row[0] for row in con.execute("SELECT event_id FROM closing_freeze")}
+        working = working[~working["event_id"].isin(frozen)]
+        if working.empty:
+            return 0, 0.0
+
     working["updated_at"] = pd.to_datetime(working["updated_at"], errors="coerce", utc=True)
     working = working[working["updated_at"].notna()]
     if working.empty:
@@ -547,8 +592,6 @@ def write_closing_snapshot(
     if len(pair_counts) > 0:
         coverage = float((pair_counts >= 2).sum() / len(pair_counts))
 
-    ensure_closing_tables(con)
-
     delete_sql = "DELETE FROM closing_lines WHERE event_id=? AND market=? AND side=? AND ((line IS NULL AND ? IS NULL) OR line=?) AND book=?"
     insert_sql = """
         INSERT INTO closing_lines (
@@ -648,6 +691,32 @@ def write_closing_snapshot(
     return normalized
 
 
+def store_payload(
+    con: sqlite3.Connection,
+    payload: Dict[str, Any],
+    *,
+    primary_book: str,
+    run_id: str,
+    now: Optional[dt.datetime] = None,
+) -> Tuple[int, int, float]:
+    """Write one API response to odds_csv_raw and the closing snapshot.
+
+    ``now`` defaults to the current time; replays pass the original fetch time.
+    """
+    now = now or now_utc()
+    rows = normalize_rows(payload, now=now)
+    normalized = upsert_rows(con, rows, now=now)
+    inserted, coverage = write_closing_snapshot(
+        con,
+        normalized,
+        ts_run=now,
+        primary_book=primary_book,
+        run_id=run_id,
+    )
+    bump_data_version(con, "odds_csv_raw", "closing_lines")
+    return len(rows), inserted, coverage
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--once", action="store_true", help="Poll once and exit")
@@ -674,64 +743,53 @@ def main():
     con.execute("PRAGMA journal_mode=WAL;")
     con.execute("PRAGMA busy_timeout=10000;")
     ensure_usage_table(con)
+    quota = create_quota_manager(keys, con=con)
+    cost = request_cost(args.markets, args.region)
+    archive = create_payload_archive(index_db=DB)
 
     def do_once(run_tag: str) -> Tuple[int, int, float]:
-        key = select_key(con, keys)
-        if not key:
-            raise SystemExit("No enabled key available")
         if args.dry_run:
+            key = select_key(con, keys)
+            if not key:
+                raise SystemExit("No enabled key available")
             print(f"Would poll with key: {key} markets={args.markets} books={args.bookmakers}")
             return 0, 0, 0.0
         tries = 0
         while True:
             tries += 1
+            try:
+                lease = quota.reserve(cost)
+            except QuotaExhaustedError as e:
+                raise SystemExit(f"No enabled key available: {e}")
             try:
                 payload = fetch_markets(
-                    key, sport_key, args.region, args.markets, args.bookmakers, args.timeout
+                    lease.key,
+                    sport_key,
+                    args.region,
+                    args.markets,
+                    args.bookmakers,
+                    args.timeout,
+                    archive=archive,
                 )
-                headers = payload.get("headers") or {}
-                remaining = headers.get("x-requests-remaining")
-                try:
-                    remaining = int(remaining)
-                except Exception:
-                    remaining = None
-                record_usage(con, key, remaining)
-                rows = normalize_rows(payload)
-                normalized = upsert_rows(con, rows)
-                ts_run = now_utc()
-                inserted, coverage = write_closing_snapshot(
-                    con,
-                    normalized,
-                    ts_run=ts_run,
-                    primary_book=args.primary_book,
-                    run_id=run_tag,
-                )
-                print(
-                    "Fetched {count} outcomes. Closing rows={inserted} coverage={coverage:.1%}".format(
-                        count=len(rows), inserted=inserted, coverage=coverage
-                    )
-                )
-                return len(rows), inserted, coverage
-            except Exception as e:
-                msg = str(e).lower()
-                if "auth_or_quota" in msg:
-                    until = (now_utc() + dt.timedelta(hours=24)).isoformat()
-                    con.execute(
-                        """
-                        INSERT INTO odds_api_usage(key,disabled,disabled_until)
-                        VALUES(?,?,?)
-                        ON CONFLICT(key) DO UPDATE SET disabled=1, disabled_until=?
-                        """,
-                        (key, 1, until, until),
-                    )
-                    key = select_key(con, keys)
-                    if not key:
-                        raise
-                    continue
+            except QuotaRejected as e:
+                quota.fail(lease, e.status_code, e.retry_after)
+                continue
+            except Exception:
+                quota.release(lease)
                 if tries < 3:
                     time.sleep(2 ** (tries - 1))
                     continue
                 raise
+            quota.record(lease, payload.get("headers"))
+            fetched, inserted, coverage = store_payload(
+                con, payload, primary_book=args.primary_book, run_id=run_tag
+            )
+            print(
+                "Fetched {count} outcomes. Closing rows={inserted} coverage={coverage:.1%}".format(
+                    count=fetched, inserted=inserted, coverage=coverage
+                )
+            )
+            return fetched, inserted, coverage
 
     run_start = now_utc()
     banner = (
@@ -772,7 +830,8 @@ def main():
                     coverage=coverage,
                 )
             )
-            time.sleep(args.interval)
+            # Never poll faster than the remaining quota can sustain until reset
+            time.sleep(max(args.interval, quota.min_interval(cost)))
 
 
 if __name__ == "__main__":
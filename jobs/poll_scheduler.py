@@ -0,0 +1,632 @@
+"""Adaptive odds poller: per-event cadence from kickoff proximity, steam and quota.
+
+``jobs/poll_odds.py --interval`` polls every event on one fixed cadence, so a
+game ten days out costs as much as one kicking off in twenty minutes. This
+service gives every event its own interval instead:
+
+* a base interval from time to kickoff (``DEFAULT_TIERS``),
+* shortened while the event's lines are moving (steam, same thresholds as
+  ``engine.steam_detector``), decaying with ``steam_half_life``,
+* stretched when the daily credit budget or the key pool's remaining quota
+  cannot sustain the plan.
+
+Closing captures are protected: every kickoff slot still to come today has
+one call's worth of credits reserved, and a call within ``closing_lead`` of
+kickoff is never deferred for budget.
+
+An /odds call costs the same credits whether it returns one event or all of
+them, so due events are grouped by (markets, bookmakers) and fetched in one
+call with ``eventIds``; events that would fall due soon are pulled forward
+into calls that are happening anyway. Event discovery is a periodic
+unfiltered poll. A failed call backs its events (or its discovery group) off
+exponentially, from ``retry_initial`` up to ``retry_max``, until one succeeds.
+
+The asyncio service adds jitter to every interval, caps the calls in flight,
+and hands responses to a single writer through a bounded queue, so a slow
+database applies backpressure instead of piling up payloads.
+
+    python jobs/poll_scheduler.py --daily-budget 500 --markets h2h,spreads,totals
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from engine.steam_detector import is_steam_move
+from utils.odds_quota import OddsQuotaManager, request_cost
+
+logger = logging.getLogger(__name__)
+
+# (seconds to kickoff below which the tier applies, poll interval in seconds)
+DEFAULT_TIERS: Tuple[Tuple[float, float], ...] = (
+    (3600, 120),
+    (6 * 3600, 600),
+    (24 * 3600, 1800),
+    (72 * 3600, 7200),
+    (math.inf, 21600),
+)
+
+Group = Tuple[str, str]  # (markets, bookmakers)
+
+
+@dataclass
+class SchedulePolicy:
+    """Knobs for the adaptive cadence; defaults suit a ~500 credit/day budget."""
+
+    tiers: Tuple[Tuple[float, float], ...] = DEFAULT_TIERS
+    daily_budget: int = 500
+    regions: str = "us"
+    closing_lead: float = 300.0
+    closing_grace: float = 600.0
+    steam_half_life: float = 1800.0
+    max_steam_boost: float = 4.0
+    coalesce_fraction: float = 0.5
+    jitter: float = 0.1
+    max_events_per_call: int = 50
+    discovery_interval: float = 6 * 3600.0
+    retry_initial: float = 30.0
+    retry_max: float = 1800.0
+
+
+@dataclass
+class EventState:
+    event_id: str
+    commence_time: float
+    group: Group
+    last_polled: Optional[float] = None
+    closing_captured: bool = False
+    steam: float = 0.0
+    steam_at: float = 0.0
+    jitter: float = 1.0
+    prices: Dict[Tuple[Any, ...], Tuple[float, float]] = field(default_factory=dict)
+
+    def steam_level(self, now: float, half_life: float) -> float:
+        if not self.steam:
+            return 0.0
+        return self.steam * 0.5 ** ((now - self.steam_at) / half_life)
+
+
+@dataclass(frozen=True)
+class PollBatch:
+    group: Group
+    event_ids: Tuple[str, ...]  # Empty for an unfiltered discovery poll
+    cost: int
+    closing: bool = False
+
+
+def _parse_time(value: Any) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _day_end(now: float) -> float:
+    day = datetime.fromtimestamp(now, timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return (day + timedelta(days=1)).timestamp()
+
+
+class PollScheduler:
+    """Decides which events to poll when; pure logic driven by ``now``."""
+
+    def __init__(
+        self,
+        groups: Sequence[Group],
+        policy: Optional[SchedulePolicy] = None,
+        quota: Optional[OddsQuotaManager] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.groups = list(dict.fromkeys(groups))
+        self.policy = policy or SchedulePolicy()
+        self.quota = quota
+        self.rng = rng or random.Random()
+        self.events: Dict[str, EventState] = {}
+        self.in_flight: set = set()  # Event ids, plus groups under discovery
+        self.discovered_at: Dict[Group, float] = {}
+        # Event ids, and groups for discovery, whose last call failed
+        self.failures: Dict[Any, int] = {}
+        self.retry_at: Dict[Any, float] = {}
+        self.spent_today = 0
+        self._day_end = 0.0
+
+    # -- accounting -------------------------------------------------------------
+
+    def cost(self, group: Group) -> int:
+        return request_cost(group[0], self.policy.regions)
+
+    def _roll_day(self, now: float) -> None:
+        if now >= self._day_end:
+            self._day_end = _day_end(now)
+            self.spent_today = 0
+
+    def reserved(self, now: float, exclude: Iterable[str] = ()) -> int:
+        """Credits held back for the closing captures still due today."""
+
+        self._roll_day(now)
+        skip = set(exclude)
+        slots: Dict[Group, List[float]] = defaultdict(list)
+        for event in self.events.values():
+            if event.closing_captured or event.event_id in skip:
+                continue
+            if now - self.policy.closing_grace < event.commence_time <= self._day_end:
+                slots[event.group].append(event.commence_time)
+        total = 0
+        for group, kickoffs in slots.items():
+            # Kickoffs within one closing window share a call
+            last = -math.inf
+            for kickoff in sorted(kickoffs):
+                if kickoff - last > self.policy.closing_lead:
+                    total += self.cost(group)
+                    last = kickoff
+        return total
+
+    def stretch(self, now: float) -> float:
+        """Factor (>= 1) applied to every base interval to stay within budget."""
+
+        self._roll_day(now)
+        planned = 0.0  # credits per second the unstretched plan would spend
+        for group in self.groups:
+            intervals = {
+                round(self.base_interval(event, now))
+                for event in self.events.values()
+                if event.group == group and event.commence_time > now
+            }
+            # Events on the same cadence coalesce into one call per interval
+            planned += sum(self.cost(group) / interval for interval in intervals if interval > 0)
+        if not planned:
+            return 1.0
+        free = self.policy.daily_budget - self.spent_today - self.reserved(now)
+        allowed = max(free, 0) / max(self._day_end - now, 1.0)
+        if self.quota is not None:
+            unit = self.quota.min_interval(1)
+            if unit > 0:
+                allowed = min(allowed, 1.0 / unit)
+        if allowed <= 0:
+            return math.inf
+        return max(1.0, planned / allowed)
+
+    # -- cadence ----------------------------------------------------------------
+
+    def base_interval(self, event: EventState, now: float) -> float:
+        to_kickoff = event.commence_time - now
+        interval = self.policy.tiers[-1][1]
+        for limit, tier_interval in self.policy.tiers:
+            if to_kickoff < limit:
+                interval = tier_interval
+                break
+        boost = min(1.0 + event.steam_level(now, self.policy.steam_half_life), self.policy.max_steam_boost)
+        return interval / boost
+
+    def closing_at(self, event: EventState) -> Optional[float]:
+        if event.closing_captured:
+            return None
+        return event.commence_time - self.policy.closing_lead
+
+    def closing_fire_at(self, event: EventState) -> Optional[float]:
+        """When to make the closing call covering ``event``.
+
+        Waits for every uncaptured event kicking off within ``closing_lead``
+        after it to enter its own window too, so one call captures them all
+        (the same grouping ``reserved`` budgets for).
+        """
+
+        closing = self.closing_at(event)
+        if closing is None:
+            return None
+        horizon = event.commence_time + self.policy.closing_lead
+        for other in self.events.values():
+            if (
+                other.group == event.group
+                and not other.closing_captured
+                and event.commence_time <= other.commence_time < horizon
+            ):
+                closing = max(closing, other.commence_time - self.policy.closing_lead)
+        return closing
+
+    def next_due(self, event: EventState, now: float, stretch: float = 1.0) -> float:
+        regular = math.inf
+        if event.last_polled is not None:
+            regular = event.last_polled + self.base_interval(event, now) * stretch * event.jitter
+        fire = self.closing_fire_at(event)
+        due = regular if fire is None else min(regular, fire)
+        return max(due, self.retry_at.get(event.event_id, -math.inf))
+
+    def backing_off(self, key: Any, now: float) -> bool:
+        """Whether ``key`` (an event id, or a group for discovery) awaits a retry."""
+
+        return self.retry_at.get(key, -math.inf) > now
+
+    def is_closing(self, event: EventState, now: float) -> bool:
+        closing = self.closing_at(event)
+        return closing is not None and now >= closing
+
+    # -- events -----------------------------------------------------------------
+
+    def upsert_event(self, event_id: str, commence_time: float, group: Group) -> EventState:
+        event = self.events.get(event_id)
+        if event is None:
+            event = self.events[event_id] = EventState(event_id, commence_time, group)
+        else:
+            event.commence_time = commence_time
+        return event
+
+    def prune(self, now: float) -> None:
+        """Forget events that have kicked off (closing captured or given up)."""
+
+        for event_id, event in list(self.events.items()):
+            if event_id in self.in_flight:
+                continue
+            if now >= event.commence_time + (
+                0 if event.closing_captured else self.policy.closing_grace
+            ):
+                if not event.closing_captured:
+                    logger.warning(f"Missed closing capture for {event_id}")
+                del self.events[event_id]
+                self.failures.pop(event_id, None)
+                self.retry_at.pop(event_id, None)
+
+    # -- planning ---------------------------------------------------------------
+
+    def _affordable(self, cost: int, now: float, closing_ids: Iterable[str] = ()) -> bool:
+        budget = self.policy.daily_budget - self.spent_today - self.reserved(now, closing_ids)
+        return cost <= budget
+
+    def due_batches(self, now: float) -> List[PollBatch]:
+        self._roll_day(now)
+        self.prune(now)
+        stretch = self.stretch(now)
+        batches: List[PollBatch] = []
+
+        for group in self.groups:
+            cost = self.cost(group)
+            last_discovery = self.discovered_at.get(group)
+            if last_discovery is None or now - last_discovery >= self.policy.discovery_interval:
+                if (
+                    self._affordable(cost, now)
+                    and group not in self.in_flight
+                    and not self.backing_off(group, now)
+                ):
+                    batches.append(PollBatch(group, (), cost))
+                    continue
+
+            events = [
+                e for e in self.events.values()
+                if e.group == group
+                and e.event_id not in self.in_flight
+                and not self.backing_off(e.event_id, now)
+            ]
+            fire = [e for e in events if (self.closing_fire_at(e) or math.inf) <= now]
+            closing = [e for e in events if fire and self.is_closing(e, now)]
+            due = closing + [
+                e for e in events
+                if e not in closing and stretch < math.inf and self.next_due(e, now, stretch) <= now
+            ]
+            if not due:
+                continue
+            if not closing and not self._affordable(cost, now):
+                continue
+            # Pull forward events that would fall due soon anyway
+            for e in events:
+                if e in due or stretch == math.inf:
+                    continue
+                slack = self.base_interval(e, now) * stretch * self.policy.coalesce_fraction
+                if self.next_due(e, now, stretch) - now <= slack:
+                    due.append(e)
+            due.sort(key=lambda e: (not self.is_closing(e, now), e.commence_time))
+            size = self.policy.max_events_per_call
+            for start in range(0, len(due), size):
+                chunk = due[start : start + size]
+                batches.append(
+                    PollBatch(
+                        group,
+                        tuple(e.event_id for e in chunk),
+                        cost,
+                        closing=any(self.is_closing(e, now) for e in chunk),
+                    )
+                )
+        return batches
+
+    def next_wake(self, now: float) -> float:
+        """When ``due_batches`` can next return something (ignoring in-flight calls)."""
+
+        self._roll_day(now)
+        stretch = self.stretch(now)
+        wake = self._day_end
+        for group in self.groups:
+            last_discovery = self.discovered_at.get(group)
+            if last_discovery is not None:
+                wake = min(wake, last_discovery + self.policy.discovery_interval)
+            if group in self.retry_at:
+                wake = min(wake, self.retry_at[group])
+        for event in self.events.values():
+            fire = self.closing_fire_at(event)
+            if fire is not None:
+                wake = min(wake, max(fire, self.retry_at.get(event.event_id, -math.inf)))
+            if stretch < math.inf and self._affordable(self.cost(event.group), now):
+                wake = min(wake, self.next_due(event, now, stretch))
+            wake = min(wake, event.commence_time + self.policy.closing_grace)
+        return max(wake, now)
+
+    def start(self, batch: PollBatch) -> None:
+        self.in_flight.update(batch.event_ids or [batch.group])  # type: ignore[list-item]
+
+    def finish(self, batch: PollBatch) -> None:
+        self.in_flight.difference_update(batch.event_ids or [batch.group])  # type: ignore[list-item]
+
+    def fail(self, batch: PollBatch, now: float) -> float:
+        """Back off the batch's events (or its discovery) after a failed call.
+
+        Returns when they are next due; the delay doubles with each consecutive
+        failure, from ``retry_initial`` up to ``retry_max``.
+        """
+
+        retry_at = now
+        for key in batch.event_ids or [batch.group]:
+            failures = self.failures[key] = self.failures.get(key, 0) + 1
+            delay = min(self.policy.retry_initial * 2 ** (failures - 1), self.policy.retry_max)
+            retry_at = self.retry_at[key] = now + delay
+        return retry_at
+
+    def observe(self, batch: PollBatch, events: Sequence[Dict[str, Any]], now: float) -> None:
+        """Account for a completed call and learn events, kickoffs and steam from it."""
+
+        self._roll_day(now)
+        self.spent_today += batch.cost
+        for key in batch.event_ids or [batch.group]:
+            self.failures.pop(key, None)
+            self.retry_at.pop(key, None)
+        if not batch.event_ids:
+            self.discovered_at[batch.group] = now
+        jitter = self.policy.jitter
+        for payload in events:
+            commence = _parse_time(payload.get("commence_time"))
+            if not payload.get("id") or commence is None:
+                continue
+            if str(payload["id"]) not in self.events and commence <= now:
+                continue  # Already under way; nothing left to schedule
+            event = self.upsert_event(str(payload["id"]), commence, batch.group)
+            moves = self._price_moves(event, payload)
+            if moves:
+                event.steam = event.steam_level(now, self.policy.steam_half_life) + moves
+                event.steam_at = now
+            event.last_polled = now
+            event.jitter = 1.0 + self.rng.uniform(-jitter, jitter)
+            closing = self.closing_at(event)
+            if closing is not None and closing <= now < event.commence_time:
+                event.closing_captured = True
+
+    @staticmethod
+    def _price_moves(event: EventState, payload: Dict[str, Any]) -> int:
+        moves = 0
+        for book in payload.get("bookmakers", []):
+            for market in book.get("markets", []):
+                for outcome in market.get("outcomes", []):
+                    key = (
+                        book.get("key"),
+                        market.get("key"),
+                        outcome.get("name"),
+                        outcome.get("description"),
+                    )
+                    try:
+                        price = float(outcome.get("price"))
+                    except (TypeError, ValueError):
+                        continue
+                    point = float(outcome.get("point") or 0.0)
+                    previous = event.prices.get(key)
+                    if previous is not None and is_steam_move(
+                        price - previous[0], point - previous[1]
+                    ):
+                        moves += 1
+                    event.prices[key] = (price, point)
+        return moves
+
+
+Fetch = Callable[[PollBatch], Dict[str, Any]]
+Sink = Callable[[PollBatch, Dict[str, Any]], None]
+
+
+class PollService:
+    """Long-lived asyncio loop around a ``PollScheduler``.
+
+    ``fetch`` performs one API call (blocking; it runs in a worker thread) and
+    ``sink`` persists its payload from a single writer task.
+    """
+
+    def __init__(
+        self,
+        scheduler: PollScheduler,
+        fetch: Fetch,
+        sink: Sink,
+        max_in_flight: int = 2,
+        queue_size: int = 4,
+        clock: Callable[[], float] = time.time,
+        max_sleep: float = 60.0,
+    ):
+        self.scheduler = scheduler
+        self.fetch = fetch
+        self.sink = sink
+        self.clock = clock
+        self.max_sleep = max_sleep
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._wake = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def _poll(self, batch: PollBatch) -> None:
+        try:
+            payload = await asyncio.to_thread(self.fetch, batch)
+        except Exception as e:
+            retry_at = self.scheduler.fail(batch, self.clock())
+            logger.error(
+                f"Poll of {len(batch.event_ids) or 'all'} events failed, retrying in "
+                f"{retry_at - self.clock():.0f}s: {e}"
+            )
+            self.scheduler.finish(batch)
+            self._slots.release()
+            self._wake.set()
+            return
+        try:
+            # The slot is held until the writer accepts the payload, so a slow
+            # database stalls new fetches instead of buffering their results
+            await self._queue.put((batch, payload))
+        finally:
+            self._slots.release()
+
+    async def _writer(self) -> None:
+        while True:
+            batch, payload = await self._queue.get()
+            try:
+                await asyncio.to_thread(self.sink, batch, payload)
+                self.scheduler.observe(batch, payload.get("json") or [], self.clock())
+            except Exception as e:
+                self.scheduler.fail(batch, self.clock())
+                logger.error(f"Writing poll results failed: {e}")
+            finally:
+                self.scheduler.finish(batch)
+                self._queue.task_done()
+                self._wake.set()
+
+    async def dispatch(self) -> int:
+        """Start every due batch, waiting for a free slot before each."""
+
+        started = 0
+        for batch in self.scheduler.due_batches(self.clock()):
+            await self._slots.acquire()
+            self.scheduler.start(batch)
+            task = asyncio.create_task(self._poll(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            started += 1
+        return started
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        writer = asyncio.create_task(self._writer())
+        try:
+            while not stop.is_set():
+                await self.dispatch()
+                now = self.clock()
+                delay = min(max(self.scheduler.next_wake(now) - now, 0.0), self.max_sleep)
+                # Small positive jitter keeps several pollers from firing in lockstep
+                delay += self.scheduler.rng.uniform(0, 1.0)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            writer.cancel()
+            await asyncio.gather(writer, *self._tasks, return_exceptions=True)
+
+
+def main() -> None:
+    from jobs.poll_odds import (
+        DB,
+        QuotaRejected,
+        ensure_usage_table,
+        fetch_markets,
+        get_keys,
+        store_payload,
+    )
+    from utils.odds_archive import create_payload_archive
+    from utils.odds_quota import create_quota_manager
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--region", default=os.getenv("ODDS_REGION", "us"))
+    ap.add_argument("--markets", default=os.getenv("ODDS_MARKETS", "h2h,spreads,totals"))
+    ap.add_argument(
+        "--bookmakers", default=os.getenv("ODDS_BOOKMAKERS", "draftkings,fanduel,betmgm")
+    )
+    ap.add_argument("--daily-budget", type=int, default=int(os.getenv("ODDS_DAILY_BUDGET", "500")))
+    ap.add_argument("--max-in-flight", type=int, default=2)
+    ap.add_argument("--timeout", type=int, default=int(os.getenv("ODDS_TIMEOUT", "15")))
+    ap.add_argument("--primary-book", default=os.getenv("CLOSING_PRIMARY_BOOK", "dk"))
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    keys = get_keys()
+    if not keys:
+        raise SystemExit("Set ODDS_API_KEYS='k1,k2,...'")
+
+    os.makedirs("storage", exist_ok=True)
+    con = sqlite3.connect(DB, timeout=10.0, isolation_level=None, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL;")
+    con.execute("PRAGMA busy_timeout=10000;")
+    ensure_usage_table(con)
+    quota = create_quota_manager(keys)
+    archive = create_payload_archive(index_db=DB)
+
+    scheduler = PollScheduler(
+        [(args.markets, args.bookmakers)],
+        SchedulePolicy(daily_budget=args.daily_budget, regions=args.region),
+        quota=quota,
+    )
+
+    def fetch(batch: PollBatch) -> Dict[str, Any]:
+        for _ in range(len(keys)):
+            lease = quota.reserve(batch.cost)
+            try:
+                payload = fetch_markets(
+                    lease.key,
+                    "americanfootball_nfl",
+                    args.region,
+                    batch.group[0],
+                    batch.group[1],
+                    args.timeout,
+                    event_ids=list(batch.event_ids),
+                    archive=archive,
+                )
+            except QuotaRejected as e:
+                quota.fail(lease, e.status_code, e.retry_after)
+                continue
+            except Exception:
+                quota.release(lease)
+                raise
+            quota.record(lease, payload.get("headers"))
+            return payload
+        raise RuntimeError("Every key was rejected")
+
+    def sink(batch: PollBatch, payload: Dict[str, Any]) -> None:
+        label = "closing" if batch.closing else "discovery" if not batch.event_ids else "poll"
+        fetched, inserted, coverage = store_payload(
+            con,
+            payload,
+            primary_book=args.primary_book,
+            run_id=f"sched::{label}::{datetime.now(timezone.utc).isoformat()}",
+        )
+        logger.info(
+            f"{label}: events={len(batch.event_ids) or 'all'} outcomes={fetched} "
+            f"closing_rows={inserted} coverage={coverage:.1%} "
+            f"spent_today={scheduler.spent_today + batch.cost}/{args.daily_budget}"
+        )
+
+    service = PollService(scheduler, fetch, sink, max_in_flight=args.max_in_flight)
+    try:
+        asyncio.run(service.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Rebuild derived odds tables by replaying the raw payload archive.
+
+Archived responses (``utils/odds_archive.py``) are re-fed through the same
+code that ingested them live, using each payload's original fetch time:
+
+* ``poll_odds`` payloads: ``normalize_rows`` -> ``upsert_rows`` ->
+  ``write_closing_snapshot`` (``store_payload``) into odds_csv_raw and
+  closing_lines;
+* ``the_odds_api`` /odds payloads: ``normalize_odds_stream`` (same frame as
+  ``normalize_odds_response``) into odds_snapshots.
+
+Days replay in parallel worker processes, each into its own scratch SQLite
+file; the parent merges the scratch files into the target in day order with
+the same replace-by-key semantics the live upserts use, so the result
+matches a sequential replay. No API quota is spent.
+
+    python jobs/replay_archive.py --db storage/odds_replay.db --start 2026-09-01 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from adapters.odds.the_odds_api import (
+    ensure_snapshot_schema,
+    insert_snapshot_rows,
+    normalize_odds_stream,
+)
+from jobs.poll_odds import DB, ensure_closing_tables, ensure_odds_table, store_payload
+from utils.data_version import bump_data_version
+from utils.odds_archive import DEFAULT_ARCHIVE_DIR, PayloadArchive, list_entries
+
+ODDS_KEY = ("event_id", "market", "book", "side", "line")
+CLOSING_KEY = ("event_id", "market", "side", "line", "book")
+
+
+@dataclass
+class DayResult:
+    day: dt.date
+    path: Optional[str]
+    payloads: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+
+def replay_day(
+    day: dt.date,
+    archive_root: str,
+    index_db: str,
+    scratch_dir: str,
+    primary_book: str,
+    verbose: bool = False,
+) -> DayResult:
+    """Replay one day's payloads, in fetch order, into a fresh scratch database."""
+
+    started = time.perf_counter()
+    archive = PayloadArchive(archive_root, index_db)
+    entries = archive.entries(start=day, end=day)
+    result = DayResult(day, None)
+    if not entries:
+        return result
+
+    path = Path(scratch_dir) / f"{day.isoformat()}.db"
+    con = sqlite3.connect(str(path), isolation_level=None)
+    # Scratch file: durability is pointless, the archive is the source of truth
+    con.execute("PRAGMA journal_mode=OFF;")
+    con.execute("PRAGMA synchronous=OFF;")
+    if any(e.source != "poll_odds" for e in entries):
+        ensure_snapshot_schema(con)  # executescript commits, so before BEGIN
+    con.execute("BEGIN")
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            # upsert_rows and the closing snapshot print per payload
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        for entry in entries:
+            fetched_at = dt.datetime.fromisoformat(entry.fetched_at)
+            run_id = f"replay::{entry.sha256[:12]}::{entry.fetched_at}"
+            if entry.source == "poll_odds":
+                payload = {"json": json.loads(archive.read(entry))}
+                fetched, _, _ = store_payload(
+                    con, payload, primary_book=primary_book, run_id=run_id, now=fetched_at
+                )
+            elif entry.endpoint.endswith("/odds"):
+                with archive.open(entry) as stream:
+                    df = normalize_odds_stream(stream, fetched_at=fetched_at)
+                fetched = insert_snapshot_rows(con, df)
+            else:
+                continue
+            result.payloads += 1
+            result.rows += fetched
+    for table, key in (("odds_csv_raw", ODDS_KEY), ("closing_lines", CLOSING_KEY)):
+        if _has_table(con, "main", table):
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_replay_{table} ON {table}({', '.join(key)})"
+            )
+    con.execute("COMMIT")
+    con.close()
+    result.path = str(path)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _has_table(con: sqlite3.Connection, schema: str, table: str) -> bool:
+    return (
+        con.execute(
+            f"SELECT 1 FROM {schema}.sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone()
+        is not None
+    )
+
+
+def _columns(con: sqlite3.Connection, schema: str, table: str) -> Dict[str, str]:
+    return {row[1]: row[2] for row in con.execute(f"PRAGMA {schema}.table_info({table})")}
+
+
+def _replace_by_key(
+    con: sqlite3.Connection, table: str, key: Iterable[str], skip: Iterable[str] = ()
+) -> None:
+    """Replace rows of main.<table> whose key appears in day.<table> (NULL-safe)."""
+
+    target = _columns(con, "main", table)
+    source = _columns(con, "day", table)
+    for name, col_type in source.items():
+        if name not in target:
+            con.execute(f"ALTER TABLE main.{table} ADD COLUMN {name} {col_type or 'TEXT'}")
+    cols = [c for c in source if c not in set(skip)]
+    match = " AND ".join(f"d.{c} IS main.{table}.{c}" for c in key)
+    con.execute(
+        f"DELETE FROM main.{table} WHERE EXISTS (SELECT 1 FROM day.{table} d WHERE {match})"
+    )
+    con.execute(
+        f"INSERT INTO main.{table} ({', '.join(cols)}) SELECT {', '.join(cols)} FROM day.{table}"
+    )
+
+
+def merge_day(con: sqlite3.Connection, path: str) -> None:
+    """Fold one day's scratch database into the target, as the live upserts would."""
+
+    con.execute("ATTACH DATABASE ? AS day", (path,))
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        if _has_table(con, "day", "odds_csv_raw"):
+            _replace_by_key(con, "odds_csv_raw", ODDS_KEY)
+        if _has_table(con, "day", "closing_lines"):
+            # Closes frozen at kickoff in the target stay as captured
+            con.execute(
+                "DELETE FROM day.closing_lines WHERE event_id IN "
+                "(SELECT event_id FROM main.closing_freeze)"
+            )
+            _replace_by_key(con, "closing_lines", CLOSING_KEY, skip=("closing_id",))
+        if _has_table(con, "day", "odds_snapshots"):
+            cols = [c for c in _columns(con, "day", "odds_snapshots") if c != "snapshot_id"]
+            con.execute(
+                f"INSERT OR IGNORE INTO main.odds_snapshots ({', '.join(cols)}) "
+                f"SELECT {', '.join(cols)} FROM day.odds_snapshots"
+            )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.execute("DETACH DATABASE day")
+
+
+def replay(
+    target: str | Path,
+    *,
+    archive_root: str | Path = DEFAULT_ARCHIVE_DIR,
+    index_db: str | Path = DB,
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+    workers: int = 1,
+    primary_book: str = "dk",
+    reset: bool = False,
+    verbose: bool = False,
+) -> List[DayResult]:
+    """Replay archived days into ``target``; returns per-day results in day order."""
+
+    index = sqlite3.connect(str(index_db))
+    try:
+        entries = list_entries(index, start=start, end=end)
+    finally:
+        index.close()
+    days = sorted({dt.date.fromisoformat(e.fetched_at[:10]) for e in entries})
+
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(target), timeout=30.0, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL;")
+    con.execute("PRAGMA busy_timeout=30000;")
+    ensure_odds_table(con)
+    ensure_closing_tables(con)
+    ensure_snapshot_schema(con)
+    if reset:
+        for table in ("odds_csv_raw", "closing_lines", "odds_snapshots"):
+            con.execute(f"DELETE FROM {table}")
+
+    results: List[DayResult] = []
+    args = (str(archive_root), str(index_db))
+    with tempfile.TemporaryDirectory(prefix="odds-replay-") as scratch:
+        if workers <= 1:
+            pending = (
+                replay_day(day, *args, scratch, primary_book, verbose) for day in days
+            )
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            futures = [
+                pool.submit(replay_day, day, *args, scratch, primary_book, verbose)
+                for day in days
+            ]
+            pending = (future.result() for future in futures)
+        try:
+            # Merge strictly in day order; later days keep computing meanwhile
+            for result in pending:
+                if result.path:
+                    merge_day(con, result.path)
+                    os.unlink(result.path)
+                results.append(result)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    bump_data_version(con, "odds_csv_raw", "closing_lines")
+    con.close()
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default="storage/odds_replay.db", help="Target database to rebuild")
+    ap.add_argument(
+        "--archive-dir", default=os.getenv("ODDS_ARCHIVE_DIR") or str(DEFAULT_ARCHIVE_DIR)
+    )
+    ap.add_argument("--index-db", default=DB, help="Database holding raw_payload_archive")
+    ap.add_argument("--start", type=dt.date.fromisoformat, help="First fetch day (UTC)")
+    ap.add_argument("--end", type=dt.date.fromisoformat, help="Last fetch day (UTC)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--primary-book", default=os.getenv("CLOSING_PRIMARY_BOOK", "dk"))
+    ap.add_argument("--reset", action="store_true", help="Empty the derived tables first")
+    ap.add_argument("--verbose", action="store_true", help="Show per-payload ingest logs")
+    args = ap.parse_args()
+
+    if Path(args.db).resolve() == Path(args.index_db).resolve() and not args.reset:
+        print("Replaying into the live database without --reset layers over existing rows.")
+
+    started = time.perf_counter()
+    results = replay(
+        args.db,
+        archive_root=args.archive_dir,
+        index_db=args.index_db,
+        start=args.start,
+        end=args.end,
+        workers=args.workers,
+        primary_book=args.primary_book,
+        reset=args.reset,
+        verbose=args.verbose,
+    )
+    for r in results:
+        print(f"{r.day}  payloads={r.payloads:<5} rows={r.rows:<8} {r.seconds:6.2f}s")
+    payloads = sum(r.payloads for r in results)
+    elapsed = time.perf_counter() - started
+    print(
+        f"=== Replayed {payloads} payloads over {len(results)} days into {args.db} "
+        f"in {elapsed:.1f}s ({payloads / max(elapsed, 1e-9):.1f} payloads/s) ==="
+    )
+
+
+if __name__ == "__main__":
+    main()
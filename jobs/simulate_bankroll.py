@@ -0,0 +1,76 @@
+"""Monte Carlo bankroll risk for a season of weekly cards built from ``edges``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+
+from engine.bankroll_sim import load_weekly_cards, simulate_bankroll
+from engine.portfolio_optimizer import load_correlation_model
+
+DEFAULT_DB = Path("storage/odds.db")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate bankroll paths over weekly cards.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to SQLite database")
+    parser.add_argument("--season", type=int, required=True, help="Season whose edges to use")
+    parser.add_argument("--paths", type=int, default=100_000, help="Number of simulated paths")
+    parser.add_argument("--bankroll", type=float, default=1000.0, help="Starting bankroll")
+    parser.add_argument("--kelly", type=float, default=0.25, help="Kelly fraction")
+    parser.add_argument("--max-picks", type=int, default=10, help="Picks per weekly card")
+    parser.add_argument(
+        "--max-event-exposure",
+        type=float,
+        default=None,
+        help="Cap on stakes per game as a fraction of bankroll",
+    )
+    parser.add_argument(
+        "--correlated",
+        action="store_true",
+        help="Size and simulate with the stored market_correlations model",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Replay the season's cards this many times"
+    )
+    parser.add_argument("--ruin-level", type=float, default=0.1, help="Ruin as share of start")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Paths per NumPy batch")
+    parser.add_argument("--workers", type=int, default=1, help="Processes to split paths over")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    model = None
+    if args.correlated:
+        with sqlite3.connect(args.db) as con:
+            model = load_correlation_model(con)
+    cards = load_weekly_cards(
+        args.db,
+        args.season,
+        bankroll=args.bankroll,
+        fraction=args.kelly,
+        max_picks=args.max_picks,
+        model=model,
+        max_event_exposure=args.max_event_exposure,
+    )
+    if not cards:
+        raise SystemExit(f"No positive-EV edges with a week found for season {args.season}")
+
+    result = simulate_bankroll(
+        cards * max(1, args.repeat),
+        n_paths=args.paths,
+        initial_bankroll=args.bankroll,
+        ruin_level=args.ruin_level,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    summary = result.summary()
+    summary["weeks"] = len(cards) * max(1, args.repeat)
+    summary["bets"] = sum(len(card) for card in cards) * max(1, args.repeat)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
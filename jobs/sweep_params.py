@@ -0,0 +1,88 @@
+"""Rank edge/shrinkage/staking parameter sets by backtest performance."""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import pandas as pd
+
+from adapters.nflverse_provider import get_player_game_logs
+from engine.backtest import BacktestConfig, StakingPolicy
+from engine.param_sweep import DEFAULT_SPACE, grid, random_search, run_sweep
+
+DEFAULT_DB = Path("storage/odds.db")
+
+
+def parse_space(specs: List[str]) -> Dict[str, Union[List[float], Tuple[float, float]]]:
+    """``name=v1,v2,...`` lists values; ``name=low:high`` is a uniform range (random search)."""
+    space: Dict[str, Union[List[float], Tuple[float, float]]] = dict(DEFAULT_SPACE)
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if ":" in values:
+            low, high = values.split(":", 1)
+            space[name.strip()] = (float(low), float(high))
+        else:
+            space[name.strip()] = [float(v) for v in values.split(",") if v.strip()]
+    return space
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Sweep backtest parameters and rank the results.")
+    ap.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to SQLite database")
+    ap.add_argument("--seasons", type=str, required=True, help="Comma-separated seasons")
+    ap.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="Override a dimension: name=v1,v2 or name=low:high (repeatable)",
+    )
+    ap.add_argument("--search", choices=["grid", "random"], default="grid")
+    ap.add_argument("--samples", type=int, default=200, help="Points for random search")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--hours-before", type=float, default=2.0)
+    ap.add_argument("--kelly", type=float, default=0.25, help="Kelly fraction")
+    ap.add_argument("--max-picks", type=int, default=10)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--rank-by", type=str, default="roi")
+    ap.add_argument("--min-bets", type=int, default=50)
+    ap.add_argument("--out", type=Path, default=None, help="CSV path for the ranked table")
+    args = ap.parse_args()
+
+    space = parse_space(args.param)
+    if args.search == "grid":
+        ranges = [name for name, choice in space.items() if isinstance(choice, tuple)]
+        if ranges:
+            raise SystemExit(f"Ranges need --search random: {', '.join(ranges)}")
+        points = grid(space)
+    else:
+        points = random_search(space, args.samples, seed=args.seed)
+
+    seasons = tuple(int(s) for s in args.seasons.split(",") if s.strip())
+    config = BacktestConfig(database_path=args.db, seasons=seasons, hours_before=args.hours_before)
+    game_logs = get_player_game_logs(sorted({s for season in seasons for s in (season - 1, season)}))
+    print(f"Evaluating {len(points)} parameter sets over seasons {list(seasons)}")
+    results = run_sweep(
+        config,
+        game_logs,
+        points,
+        base_policy=StakingPolicy(kelly_fraction=args.kelly, max_picks=args.max_picks),
+        workers=args.workers,
+        rank_by=args.rank_by,
+        min_bets=args.min_bets,
+    )
+
+    out = args.out or Path(
+        f"storage/exports/sweep_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(out, index=False)
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(results.head(20).to_string(index=False))
+    print(f"Ranked results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,6 +76,8 @@ class ProjectionConfig:
     baseline_games: int = 8
     weather_fn: Callable[..., WeatherInfo] = get_weather_for_game
     news_flags_path: Path = Path("storage/player_flags.yaml")
+    # Sensitivity of the mean to the opponent's defense_ratings score
+    defense_beta: float = 0.10
 
 
 class QBProjectionModel:
@@ -128,6 +130,7 @@ class QBProjectionModel:
                 opponent_def_code=def_team,
                 season=season,
                 week=week,
+                beta=self.config.defense_beta,
             )
         if adjusted_mu is not None:
             return adjusted_mu
@@ -208,8 +211,7 @@ class QBProjectionModel:
         mu = self._apply_news_flags(mu, player)
         sigma = self._estimate_sigma(recent_games, mu)
         baseline_line = default_line or mu
-        distribution = norm(loc=mu, scale=sigma)
-        p_over = float(1 - distribution.cdf(baseline_line))
+        p_over = float(1 - norm.cdf(baseline_line, loc=mu, scale=sigma))
         return {
             "event_id": str(event_id),
             "player": str(player),
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Benchmark event-loop blocking: sync Session vs async session in API handlers.
+
+Seeds a temporary SQLite database with best lines, then fires concurrent
+``/odds/event/{id}`` lookups while other clients run a slow analytics-style
+aggregate. "before" runs the queries on the blocking ``Session`` inside
+``async def`` handlers (the old pattern); "after" uses the real migrated
+routers on ``get_async_db``. Reports p50 / p99 latency of the fast lookups,
+how many failed, and how many slow queries were served meanwhile.
+
+A blocking pool checkout inside the event loop can deadlock (only the loop
+can hand connections back), so the pool timeout is kept short and such
+requests show up as errors instead of hanging the run.
+
+    python scripts/bench_async_db.py --rows 5000 --requests 400 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api import database
+from api.database import get_async_db, get_db
+from api.endpoints import odds
+from api.models import CurrentBestLine
+from api.settings import settings
+
+SLOW_QUERY = text(
+    "SELECT a.event_id, count(*) FROM current_best_lines a "
+    "JOIN current_best_lines b ON a.event_id = b.event_id AND a.book = b.book "
+    "GROUP BY a.event_id"
+)
+
+
+def seed(rows: int) -> None:
+    markets = ["player_pass_yds", "player_rush_yds", "player_reception_yds", "player_receptions"]
+    with database.get_db_session() as db:
+        db.add_all(
+            CurrentBestLine(
+                player=f"Player {i}",
+                market=markets[i % len(markets)],
+                book=f"book{i % 8}",
+                line=100.5 + i % 50,
+                over_odds=-110,
+                updated_at="2025-09-07T12:00:00Z",
+                event_id=f"evt{i % 200}",
+            )
+            for i in range(rows)
+        )
+        db.commit()
+
+
+def build_before_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/odds/event/{event_id}")
+    async def event_odds(event_id: str, db: Session = Depends(get_db)):
+        lines = db.query(CurrentBestLine).filter(CurrentBestLine.event_id == event_id).all()
+        return [line.player for line in lines]
+
+    @app.get("/slow")
+    async def slow(db: Session = Depends(get_db)):
+        return [tuple(row) for row in db.execute(SLOW_QUERY).all()]
+
+    return app
+
+
+def build_after_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(odds.router, prefix="/odds")
+
+    @app.get("/slow")
+    async def slow(db: AsyncSession = Depends(get_async_db)):
+        return [tuple(row) for row in (await db.execute(SLOW_QUERY)).all()]
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int, slow_clients: int):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    latencies = []
+    errors = 0
+    slow_done = 0
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def slow_worker():
+            nonlocal slow_done
+            while not done.is_set():
+                await client.get("/slow")
+                slow_done += 1
+
+        async def fast_worker(n: int):
+            nonlocal errors
+            for _ in range(n):
+                start = time.perf_counter()
+                response = await client.get(f"/odds/event/evt{random.randrange(200)}")
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += response.status_code != 200
+
+        # Warm the pool so connection setup isn't counted as query latency
+        await asyncio.gather(*(client.get("/odds/event/evt0") for _ in range(concurrency)))
+
+        started = time.perf_counter()
+        background = [asyncio.create_task(slow_worker()) for _ in range(slow_clients)]
+        await asyncio.gather(*(fast_worker(requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*background)
+    return latencies, errors, slow_done / elapsed
+
+
+def report(label: str, latencies, errors: int, slow_rate: float) -> None:
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{label:<7} n={len(latencies):<5} p50={p50:8.2f}ms  p99={p99:8.2f}ms  "
+        f"errors={errors:<4} slow_queries={slow_rate:6.1f}/s"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5_000)
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--slow-clients", type=int, default=2)
+    ap.add_argument("--pool-timeout", type=float, default=2.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.db_path = str(Path(tmp) / "bench.db")
+        settings.db_pool_timeout = args.pool_timeout
+        database.init_database()
+        database.create_tables()
+        seed(args.rows)
+
+        for label, app in (("before", build_before_app()), ("after", build_after_app())):
+            latencies, errors, slow_rate = asyncio.run(
+                run(app, args.requests, args.concurrency, args.slow_clients)
+            )
+            report(label, latencies, errors, slow_rate)
+
+        asyncio.run(database.dispose_database())
+
+
+if __name__ == "__main__":
+    main()
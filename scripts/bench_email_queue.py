@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark per-email SMTP sessions vs the batching outbox worker.
+
+Sends the same messages to a local SMTP stub twice: once opening, logging in
+and quitting a session per email (the old inline behaviour), and once by
+enqueueing into an in-memory outbox and draining it with ``EmailQueue``.
+``--handshake-ms`` simulates the connect/STARTTLS/login cost of a real relay.
+
+    python scripts/bench_email_queue.py --emails 200 --handshake-ms 50
+    python scripts/bench_email_queue.py --batch-size 100
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "tests"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.database import Base
+from api.services.email_queue import EmailQueue, enqueue_email
+from api.services.email_service import EmailService
+from smtp_stub import SMTPStub
+
+
+def configure(port: int) -> EmailService:
+    os.environ.update(
+        SMTP_SERVER="127.0.0.1",
+        SMTP_PORT=str(port),
+        SMTP_STARTTLS="false",
+        SMTP_USERNAME="bench",
+        SMTP_PASSWORD="bench",
+    )
+    return EmailService()
+
+
+def inline(service: EmailService, emails: int) -> float:
+    started = time.perf_counter()
+    for i in range(emails):
+        server = service.open_connection()
+        server.send_message(service.build_message(f"user{i}@example.com", "Bench", "<p>hi</p>"))
+        server.quit()
+    return time.perf_counter() - started
+
+
+def queued(service: EmailService, emails: int, batch_size: int) -> tuple[float, float]:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def factory():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    queue = EmailQueue(factory, service, batch_size=batch_size)
+    started = time.perf_counter()
+    with factory() as db:
+        for i in range(emails):
+            enqueue_email(db, f"user{i}@example.com", "Bench", "<p>hi</p>")
+    enqueued = time.perf_counter() - started
+    counts = queue.drain()
+    elapsed = time.perf_counter() - started
+    queue.connection.close()
+    engine.dispose()
+    if counts["sent"] != emails:
+        raise SystemExit(f"queue delivered {counts} of {emails}")
+    return enqueued, elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=200)
+    ap.add_argument("--batch-size", type=int, default=50)
+    ap.add_argument("--handshake-ms", type=float, default=50.0)
+    args = ap.parse_args()
+
+    with SMTPStub(handshake_delay=args.handshake_ms / 1000) as stub:
+        service = configure(stub.port)
+        elapsed = inline(service, args.emails)
+        print(
+            f"inline  {args.emails / elapsed:8.1f} emails/s  sessions={stub.sessions:<5} "
+            f"per-request cost {elapsed / args.emails * 1000:7.2f}ms"
+        )
+        stub.sessions = 0
+        enqueued, elapsed = queued(service, args.emails, args.batch_size)
+        print(
+            f"queued  {args.emails / elapsed:8.1f} emails/s  sessions={stub.sessions:<5} "
+            f"per-request cost {enqueued / args.emails * 1000:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark a login storm with inline vs pooled password hashing.
+
+Fires concurrent logins that verify a stored password hash while a second
+client polls an unrelated endpoint, then reports login throughput, how many
+logins were shed with 503s, and the p50 / p99 latency of the unrelated
+requests. With inline hashing every verification holds the event loop; with
+the pool the loop keeps serving between hashes.
+
+    python scripts/bench_login_storm.py --logins 200 --concurrency 50
+    python scripts/bench_login_storm.py --workers 4 --max-pending 64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from api.auth.password_hasher import PasswordHasher, check_password
+from api.auth.simple_password import hash_password_pbkdf2
+
+PASSWORD = "BenchPassword1!"
+
+
+def build_app(hasher: PasswordHasher | None) -> FastAPI:
+    app = FastAPI()
+    stored = hash_password_pbkdf2(PASSWORD)
+
+    @app.post("/login")
+    async def login():
+        if hasher is None:
+            valid = check_password(PASSWORD, stored)
+        else:
+            valid = await hasher.verify(PASSWORD, stored)
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI, logins: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    latencies = []
+    statuses: dict[int, int] = {}
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def pinger():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.005)
+
+        async def login_worker(n: int):
+            for _ in range(n):
+                response = await client.post("/login")
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        background = asyncio.create_task(pinger())
+        await asyncio.gather(*(login_worker(logins // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await background
+    return latencies, statuses, elapsed
+
+
+def report(label: str, latencies, statuses, elapsed: float) -> None:
+    latencies.sort()
+    p50 = statistics.median(latencies) if latencies else float("nan")
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float("nan")
+    ok = statuses.get(200, 0)
+    print(
+        f"{label:<7} logins={ok / elapsed:6.1f}/s  shed={statuses.get(503, 0):<4} "
+        f"ping n={len(latencies):<5} p50={p50:8.2f}ms  p99={p99:8.2f}ms"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--logins", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--max-pending", type=int, default=32)
+    args = ap.parse_args()
+
+    report("inline", *asyncio.run(run(build_app(None), args.logins, args.concurrency)))
+    hasher = PasswordHasher(max_workers=args.workers, max_pending=args.max_pending)
+    try:
+        report("pooled", *asyncio.run(run(build_app(hasher), args.logins, args.concurrency)))
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark eager vs streaming normalization of a large /odds payload.
+
+Scales ``storage/sample_odds_api_response.json`` up to a full-slate player-prop
+response: every event is cloned ``--events`` times and each bookmaker gets
+``--players`` over/under lines in each of ``--prop-markets`` prop markets.
+Both paths then normalize the same file:
+
+* eager: ``json.load`` + ``normalize_odds_response`` (the current path)
+* stream: ``normalize_odds_stream`` straight from the file
+
+Parse time is measured without tracing, then peak Python heap with
+``tracemalloc`` (numpy and pandas buffers included).
+
+    python scripts/bench_odds_stream.py --events 96 --players 120   # ~20 MiB
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from adapters.odds import the_odds_api
+from adapters.odds.the_odds_api import normalize_odds_response, normalize_odds_stream
+
+SAMPLE = ROOT / "storage" / "sample_odds_api_response.json"
+PROP_MARKETS = (
+    "player_pass_yds",
+    "player_rush_yds",
+    "player_reception_yds",
+    "player_receptions",
+    "player_pass_tds",
+    "player_anytime_td",
+)
+
+
+def build_payload(events: int, players: int, prop_markets: int) -> list:
+    base = json.loads(SAMPLE.read_text())
+    payload = []
+    for n in range(events):
+        for template in base:
+            event = copy.deepcopy(template)
+            event["id"] = f"{template['id']}-{n}"
+            for book in event["bookmakers"]:
+                for market_key in PROP_MARKETS[:prop_markets]:
+                    outcomes = []
+                    for p in range(players):
+                        line = 20.5 + p
+                        for side, price in (("Over", -115), ("Under", -105)):
+                            outcomes.append(
+                                {
+                                    "name": side,
+                                    "description": f"Player {p}",
+                                    "price": price,
+                                    "point": line,
+                                }
+                            )
+                    book["markets"].append(
+                        {
+                            "key": market_key,
+                            "last_update": book["last_update"],
+                            "outcomes": outcomes,
+                        }
+                    )
+            payload.append(event)
+    return payload
+
+
+def eager(path: Path, fetched_at: datetime):
+    with open(path, "rb") as fh:
+        payload = json.load(fh)
+    return normalize_odds_response(payload, fetched_at=fetched_at)
+
+
+def stream(path: Path, fetched_at: datetime):
+    return normalize_odds_stream(path, fetched_at=fetched_at)
+
+
+def measure(fn, path: Path, fetched_at: datetime, repeat: int) -> tuple[float, float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = fn(path, fetched_at)
+        best = min(best, time.perf_counter() - started)
+        rows = len(df)
+        del df
+    tracemalloc.start()
+    df = fn(path, fetched_at)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del df
+    return best, peak / 2**20, rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=96)
+    ap.add_argument("--players", type=int, default=120)
+    ap.add_argument("--prop-markets", type=int, default=len(PROP_MARKETS))
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+
+    logging.disable(logging.INFO)
+    fetched_at = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "odds.json"
+        path.write_text(
+            json.dumps(build_payload(args.events, args.players, args.prop_markets))
+        )
+        size = path.stat().st_size / 2**20
+        parser = "ijson" if the_odds_api.ijson is not None else "json.load fallback"
+        print(f"payload {size:.1f} MiB, streaming parser: {parser}")
+        for name, fn in (("eager", eager), ("stream", stream)):
+            elapsed, peak, rows = measure(fn, path, fetched_at, args.repeat)
+            print(f"{name:<7} rows={rows:<8} parse {elapsed:6.2f}s  peak heap {peak:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark per-request overhead of the API rate-limit middleware.
+
+Measures route-template resolution plus a limiter decision for a stream of
+requests spread over many client IPs and ID-bearing paths, and reports the
+mean / p99 cost per request and how many buckets stay resident.
+
+    python scripts/bench_ratelimit.py --requests 200000
+    python scripts/bench_ratelimit.py --redis-url redis://localhost:6379/0
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI
+
+from api.utils.ratelimit import RateLimiter, RedisRateLimiter, RouteTemplateResolver
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/odds/best")
+    async def best():
+        return {}
+
+    @app.get("/odds/event/{event_id}")
+    async def event(event_id: str):
+        return {}
+
+    @app.get("/api/v1/peer-bets/{bet_id}")
+    async def peer_bet(bet_id: str):
+        return {}
+
+    return app
+
+
+async def run(limiter, resolver: RouteTemplateResolver, app: FastAPI, n: int, clients: int):
+    paths = ["/odds/best"] + [f"/odds/event/evt{i}" for i in range(500)]
+    paths += [f"/api/v1/peer-bets/{i}" for i in range(500)]
+    samples = []
+    for i in range(n):
+        scope = {"type": "http", "method": "GET", "path": paths[i % len(paths)], "app": app}
+        client = f"10.0.{(i // 256) % clients % 256}.{i % 256}"
+        start = time.perf_counter_ns()
+        route_key = f"GET:{resolver.resolve(scope)}"
+        await limiter.hit(client, route_key)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def report(label: str, samples, limiter) -> None:
+    samples.sort()
+    mean_us = statistics.fmean(samples) / 1000
+    p99_us = samples[int(len(samples) * 0.99)] / 1000
+    resident = len(limiter.buckets) if hasattr(limiter, "buckets") else "n/a (redis)"
+    print(f"{label:<8} mean={mean_us:7.2f}us  p99={p99_us:7.2f}us  resident_buckets={resident}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=100_000)
+    ap.add_argument("--clients", type=int, default=5_000)
+    ap.add_argument("--redis-url", default=None)
+    args = ap.parse_args()
+
+    app = build_app()
+    local = RateLimiter(requests_per_minute=60, window_seconds=60, max_keys=20_000)
+    samples = asyncio.run(run(local, RouteTemplateResolver(), app, args.requests, args.clients))
+    report("local", samples, local)
+
+    if args.redis_url:
+        remote = RedisRateLimiter(60, 60, url=args.redis_url, prefix="bench-ratelimit")
+        samples = asyncio.run(
+            run(remote, RouteTemplateResolver(), app, min(args.requests, 20_000), args.clients)
+        )
+        report("redis", samples, remote)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Tests for the per-worker revocation snapshot and user principal cache"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.auth.auth_cache import PrincipalCache, RevocationCache
+from api.auth.dependencies import get_current_user_from_token
+from api.auth.token_manager import AuthLogger, DatabaseTokenBlacklist
+from api.database import Base
+from api.models import AuthLog, User, UserStatus
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements executed against the test engine"""
+    seen = []
+    event.listen(engine, "before_cursor_execute", lambda *args: seen.append(args[2]))
+    return seen
+
+
+def test_revocations_reach_other_workers_after_a_refresh(db, statements):
+    issuer, worker = RevocationCache(refresh_seconds=0), RevocationCache(refresh_seconds=0)
+    worker.refresh(db)
+    issued_at = time.time() - 60
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    DatabaseTokenBlacklist.add_token(db, "jti-1", 7, "access", expires_at)
+    assert not worker.is_revoked("jti-1", 7, issued_at)
+    assert worker.refresh(db)
+    assert worker.is_revoked("jti-1", 7, issued_at)
+    assert not worker.is_revoked("jti-2", 7, issued_at)
+
+    # Logout-all cuts off every token issued so far, but not later logins
+    DatabaseTokenBlacklist.revoke_user_tokens(db, 7)
+    assert worker.refresh(db)
+    assert worker.is_revoked("jti-2", 7, issued_at)
+    assert not worker.is_revoked("jti-3", 7, time.time() + 2)
+    assert not worker.is_revoked("jti-2", 8, issued_at)
+
+    # Unchanged table: the probe runs but nothing is reloaded
+    statements.clear()
+    assert not worker.refresh(db)
+    assert len(statements) == 1
+    assert not issuer.is_revoked("jti-2", 7, issued_at)
+
+
+def test_pruning_auth_logs_leaves_revocations_alone(db):
+    from utils.data_version import read_data_versions
+
+    DatabaseTokenBlacklist.add_token(
+        db, "jti-1", 7, "access", datetime.now(timezone.utc) + timedelta(hours=1)
+    )
+    worker = RevocationCache(refresh_seconds=0)
+    worker.refresh(db)
+    raw = db.connection().connection.dbapi_connection
+    before = read_data_versions(raw, ["jwt_token_blacklist"])
+
+    db.add(
+        AuthLog(
+            event_type="login",
+            ip_address="127.0.0.1",
+            success=True,
+            created_at=datetime.now(timezone.utc) - timedelta(days=120),
+        )
+    )
+    db.commit()
+    assert AuthLogger.cleanup_old_logs(db, days=90) == 1
+
+    assert read_data_versions(raw, ["jwt_token_blacklist"]) == before == {"jwt_token_blacklist": 1}
+    assert not worker.refresh(db)
+
+
+def test_refresh_interval_keeps_requests_off_the_database(db, statements):
+    cache = RevocationCache(refresh_seconds=60)
+    cache.refresh(db)
+    DatabaseTokenBlacklist.add_token(
+        db, "jti-1", 7, "access", datetime.now(timezone.utc) + timedelta(hours=1)
+    )
+
+    statements.clear()
+    assert not cache.refresh(db)
+    assert statements == []
+    assert not cache.is_revoked("jti-1", 7, time.time())
+
+    cache.revoke_user(7)
+    assert cache.is_revoked("jti-2", 7, time.time() - 1)
+    assert cache.refresh(db, force=True)
+    assert cache.is_revoked("jti-1", 7, time.time() + 2)
+
+
+def test_cached_principal_skips_user_query(db, statements, monkeypatch):
+    from api.auth import dependencies
+
+    monkeypatch.setattr(dependencies, "principal_cache", PrincipalCache(ttl_seconds=30))
+    db.add(
+        User(
+            external_id="u-1",
+            email="cache@example.com",
+            email_verified=True,
+            status=UserStatus.ACTIVE,
+        )
+    )
+    db.commit()
+    user_id = db.query(User.id).scalar()
+
+    first = get_current_user_from_token({"sub": str(user_id)}, db)
+    assert first.last_activity_at is not None
+
+    statements.clear()
+    again = get_current_user_from_token({"sub": str(user_id)}, db)
+    assert statements == []
+    assert again in db
+    assert (again.id, again.email) == (user_id, "cache@example.com")
+
+    dependencies.principal_cache.invalidate(user_id)
+    get_current_user_from_token({"sub": str(user_id)}, db)
+    assert any("FROM users" in sql for sql in statements)
+
+
+def test_suspending_a_user_reaches_auth_immediately(db, monkeypatch):
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    from api.auth import dependencies
+    from api.auth.auth_cache import principal_cache
+    from api.database import get_db
+    from api.endpoints import users
+
+    db.add(
+        User(
+            external_id="u-1",
+            email="suspend@example.com",
+            email_verified=True,
+            status=UserStatus.ACTIVE,
+        )
+    )
+    db.commit()
+    user_id = db.query(User.id).scalar()
+
+    app = FastAPI()
+    app.include_router(users.router)
+
+    @app.get("/whoami")
+    def whoami(user: User = Depends(dependencies.get_current_user_from_token)):
+        return {"id": user.id}
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[dependencies.verify_jwt_token] = lambda: {"sub": str(user_id)}
+    monkeypatch.setattr(principal_cache, "ttl_seconds", 30)
+    principal_cache.invalidate()
+    client = TestClient(app, raise_server_exceptions=False)
+
+    try:
+        assert client.get("/whoami").status_code == 200
+        assert principal_cache.get(db, user_id) is not None
+
+        assert client.post(f"/users/{user_id}/suspend").status_code == 200
+        assert client.get("/whoami").status_code in (401, 403)
+
+        assert client.post(f"/users/{user_id}/reactivate").status_code == 200
+        assert client.get("/whoami").status_code == 200
+        assert client.delete(f"/users/{user_id}").status_code == 200
+        assert principal_cache.get(db, user_id) is None
+    finally:
+        principal_cache.invalidate()
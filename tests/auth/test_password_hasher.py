@@ -0,0 +1,112 @@
+"""Tests for the bounded password hashing pool"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.auth import password_hasher as hasher_module
+from api.auth.exceptions import PasswordHasherBusyError
+from api.auth.password_hasher import PasswordHasher, check_password
+from api.auth.simple_password import hash_password_pbkdf2
+
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_block_the_event_loop():
+    hasher = PasswordHasher(max_workers=2, max_pending=4)
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(hasher.run(time.sleep, 0.2), hasher.run(time.sleep, 0.2), ticker())
+
+    assert time.perf_counter() - start < 0.35
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+    assert hasher.pending == 0
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_load_with_503():
+    hasher = PasswordHasher(max_workers=1, max_pending=2)
+    gate = threading.Event()
+    running = [asyncio.wrap_future(hasher.submit(gate.wait, 5)) for _ in range(2)]
+
+    with pytest.raises(PasswordHasherBusyError) as info:
+        await hasher.run(gate.wait, 5)
+    assert info.value.status_code == 503
+
+    gate.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert hasher.pending == 0
+    assert await hasher.run(sum, [1, 2]) == 3
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_outdated_hashes_are_upgraded_in_the_background(monkeypatch):
+    hasher = PasswordHasher(max_workers=1, max_pending=4)
+    stored = hash_password_pbkdf2("CorrectHorse1!")
+    saved = []
+    done = threading.Event()
+
+    def save(new_hash):
+        saved.append(new_hash)
+        done.set()
+
+    monkeypatch.setattr(hasher_module, "should_upgrade", lambda hashed: True)
+    assert not await hasher.verify_and_upgrade("wrong", stored, save)
+    assert await hasher.verify_and_upgrade("CorrectHorse1!", stored, save)
+
+    assert done.wait(5)
+    assert len(saved) == 1
+    assert check_password("CorrectHorse1!", saved[0])
+    hasher.shutdown()
+
+
+def test_json_login_upgrades_outdated_hashes(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from api.database import Base
+    from api.models import User, UserStatus
+    from api.schemas.auth_schemas import UserLoginRequest
+    from api.services.auth_service import AuthService
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(
+        User(
+            external_id="u-1",
+            email="upgrade@example.com",
+            username="upgrade",
+            password_hash=hash_password_pbkdf2("CorrectHorse1!"),
+            email_verified=True,
+            status=UserStatus.ACTIVE,
+        )
+    )
+    db.commit()
+    user_id = db.query(User.id).scalar()
+    saved = []
+    done = threading.Event()
+
+    def save(user_id, new_hash):
+        saved.append((user_id, new_hash))
+        done.set()
+
+    monkeypatch.setattr(hasher_module, "should_upgrade", lambda hashed: True)
+    request = UserLoginRequest(email_or_username="upgrade", password="CorrectHorse1!")
+    try:
+        assert AuthService(db).login_user(request, save).access_token
+        assert done.wait(5)
+        assert saved[0][0] == user_id
+        assert check_password("CorrectHorse1!", saved[0][1])
+    finally:
+        db.close()
+        engine.dispose()
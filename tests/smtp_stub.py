@@ -0,0 +1,91 @@
+"""Minimal local SMTP server for mail queue tests and benchmarks
+
+Speaks just enough ESMTP for ``smtplib`` (EHLO, AUTH PLAIN, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT), without TLS. ``handshake_delay`` simulates the
+connect/STARTTLS/login round trips of a real relay, and recipients listed
+in ``reject`` are refused with a 550.
+"""
+
+import socketserver
+import threading
+import time
+from typing import List, Set, Tuple
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self) -> None:
+        server: "SMTPStub" = self.server.stub  # type: ignore[attr-defined]
+        with server.lock:
+            server.sessions += 1
+        time.sleep(server.handshake_delay)
+        self.reply("220 stub ESMTP")
+        mail_from, rcpts = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-stub")
+                self.reply("250-AUTH PLAIN")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 stub")
+            elif verb == "AUTH":
+                self.reply("235 Authentication successful")
+            elif verb == "MAIL":
+                mail_from, rcpts = line.split(":", 1)[1].strip(" <>"), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = line.split(":", 1)[1].strip(" <>")
+                if address in server.reject:
+                    self.reply("550 No such user")
+                else:
+                    rcpts.append(address)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for chunk in iter(self.rfile.readline, b""):
+                    if chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk)
+                with server.lock:
+                    server.messages.append((mail_from, rcpts, b"".join(data)))
+                self.reply("250 Queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPStub:
+    def __init__(self, handshake_delay: float = 0.0):
+        self.handshake_delay = handshake_delay
+        self.reject: Set[str] = set()
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.sessions = 0
+        self.lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self  # type: ignore[attr-defined]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def __enter__(self) -> "SMTPStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
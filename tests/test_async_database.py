@@ -0,0 +1,80 @@
+"""Tests for the async database path and SQLite connection tuning"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from api import database
+from api.crud import edge_crud
+from api.endpoints import enhanced_edges, odds
+from api.models import CurrentBestLine
+from api.settings import get_async_database_url, settings
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    for name in ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal"):
+        monkeypatch.setattr(database, name, None)
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "odds.db"))
+    database.init_database()
+    database.create_tables()
+    yield database
+    database.engine.dispose()
+
+
+def test_async_database_url_swaps_driver():
+    assert get_async_database_url("sqlite:////tmp/odds.db") == "sqlite+aiosqlite:////tmp/odds.db"
+    assert (
+        get_async_database_url("postgresql://u:p@db:5432/bets")
+        == "postgresql+asyncpg://u:p@db:5432/bets"
+    )
+
+
+@pytest.mark.asyncio
+async def test_pragmas_applied_on_every_connection(temp_db):
+    with temp_db.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+    async with temp_db.async_engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+        assert (await conn.execute(text("PRAGMA mmap_size"))).scalar() == settings.sqlite_mmap_size
+    await temp_db.dispose_database()
+
+
+@pytest.mark.asyncio
+async def test_read_endpoints_use_async_session(temp_db):
+    with temp_db.get_db_session() as db:
+        db.add_all(
+            [
+                CurrentBestLine(
+                    player="Josh Allen", market="player_pass_yds", book="dk", line=265.5,
+                    over_odds=-110, updated_at="t0", event_id="e1",
+                ),
+                CurrentBestLine(
+                    player="Joe Burrow", market="player_pass_yds", book="fd", line=250.5,
+                    over_odds=120, updated_at="t0", event_id="e2",
+                ),
+            ]
+        )
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(odds.router, prefix="/odds")
+    app.include_router(enhanced_edges.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        best = (await client.get("/odds/best")).json()
+        assert best["count"] == 2
+        event = (await client.get("/odds/event/e2")).json()
+        assert [line["selection"] for line in event] == ["Joe Burrow"]
+        listing = (await client.get("/enhanced-edges/")).json()
+        assert listing["total"] == 0 and listing["edges"] == []
+
+    async with temp_db.AsyncSessionLocal() as db:
+        async_stats = await edge_crud.get_edge_statistics_async(db)
+    with temp_db.get_db_session() as db:
+        assert async_stats == edge_crud.get_edge_statistics(db)
+    await temp_db.dispose_database()
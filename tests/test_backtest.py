@@ -0,0 +1,232 @@
+import dataclasses
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from engine import backtest
+from engine.backtest import (
+    BacktestConfig,
+    StakingPolicy,
+    apply_policy,
+    prepare_candidates,
+    price_candidates,
+    run_backtest,
+)
+from engine.param_sweep import grid, random_search, run_sweep
+
+KICKOFFS = {2: "2024-09-15T17:00:00Z", 3: "2024-09-22T17:00:00Z"}
+
+
+def _snapshot(fetched_at, event_id, book, side, line, price, player="Josh Allen"):
+    raw = {"outcome": {"name": side, "description": player, "point": line, "price": price}}
+    return (fetched_at, event_id, "player_pass_yds", book, side, line, price, line, json.dumps(raw))
+
+
+def _make_db(path):
+    with sqlite3.connect(path) as con:
+        con.execute(
+            "CREATE TABLE events (event_id TEXT, commence_time TEXT, season INT, week INT)"
+        )
+        con.executemany(
+            "INSERT INTO events VALUES (?, ?, 2024, ?)",
+            [(f"ev{week}", kickoff, week) for week, kickoff in KICKOFFS.items()],
+        )
+        con.execute(
+            """
+            CREATE TABLE odds_snapshots (
+                fetched_at TEXT, event_id TEXT, market_key TEXT, bookmaker_key TEXT,
+                outcome TEXT, line REAL, price INT, points REAL, odds_raw_json TEXT
+            )
+            """
+        )
+        rows = []
+        for week in KICKOFFS:
+            day = KICKOFFS[week][:10]
+            rows += [
+                _snapshot(f"{day}T10:00:00Z", f"ev{week}", "dk", "Over", 230.5, -110),
+                _snapshot(f"{day}T10:00:00Z", f"ev{week}", "dk", "Under", 230.5, -110),
+                # After the decision time: the close, never the entry
+                _snapshot(f"{day}T16:30:00Z", f"ev{week}", "dk", "Over", 230.5, -160),
+                _snapshot(f"{day}T16:30:00Z", f"ev{week}", "dk", "Under", 230.5, 130),
+                # After kickoff: ignored entirely
+                _snapshot(f"{day}T18:00:00Z", f"ev{week}", "dk", "Over", 230.5, -400),
+                _snapshot(f"{day}T18:00:00Z", f"ev{week}", "dk", "Under", 230.5, 300),
+            ]
+        con.executemany("INSERT INTO odds_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return path
+
+
+def _game_logs():
+    yards = {1: 290.0, 2: 250.0, 3: 200.0}
+    logs = pd.DataFrame(
+        {"player_name": "Josh Allen", "season": 2024, "week": w, "passing_yards": y}
+        for w, y in yards.items()
+    )
+    logs["recent_team"] = "BUF"
+    logs["opponent_team"] = "MIA"
+    return logs
+
+
+def _config(tmp_path, **kwargs):
+    return BacktestConfig(
+        database_path=_make_db(tmp_path / "bt.db"),
+        seasons=(2024,),
+        cache_dir=tmp_path / "cache",
+        **kwargs,
+    )
+
+
+def test_candidates_use_pre_decision_quotes_and_settle_on_the_week(tmp_path):
+    candidates = prepare_candidates(_config(tmp_path), _game_logs())
+    over = candidates.loc[candidates["side"] == "over"].set_index("week")
+
+    assert set(over.index) == {2, 3}
+    # Entry is the 10:00 quote, close the last one before kickoff
+    assert (over["odds"] == -110).all()
+    assert (over["close_odds"] == -160).all()
+    assert np.allclose(over["fair_prob"], 0.5)
+    assert (over["close_fair_prob"] > 0.55).all()
+    # Each week only sees the games before it
+    assert over.loc[2, "mu"] == 290.0
+    assert over.loc[3, "mu"] == 270.0
+    assert over.loc[2, "result"] == "win"
+    assert over.loc[3, "result"] == "loss"
+
+
+def test_week_inputs_are_cached_until_snapshots_change(tmp_path, monkeypatch):
+    config = _config(tmp_path)
+    first = prepare_candidates(config, _game_logs())
+    assert len(list((tmp_path / "cache").glob("week_2024_*.pkl"))) == 2
+
+    rebuilt = []
+    real_prepare_week = backtest.prepare_week
+    monkeypatch.setattr(
+        backtest,
+        "prepare_week",
+        lambda config, season, week, *args: rebuilt.append(week)
+        or real_prepare_week(config, season, week, *args),
+    )
+    pd.testing.assert_frame_equal(prepare_candidates(config, _game_logs()), first)
+    assert rebuilt == []
+
+    with sqlite3.connect(config.database_path) as con:
+        con.execute(
+            "INSERT INTO odds_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _snapshot("2024-09-22T11:00:00Z", "ev3", "fd", "Over", 230.5, -105),
+        )
+    prepare_candidates(config, _game_logs())
+    assert rebuilt == [3]
+
+
+def test_policy_stakes_kelly_and_books_profit(tmp_path):
+    candidates = prepare_candidates(_config(tmp_path), _game_logs())
+    bets = apply_policy(candidates, StakingPolicy(kelly_fraction=0.5, max_picks=1))
+
+    assert list(bets["week"]) == [2, 3]
+    assert (bets["side"] == "over").all()
+    b = 100 / 110
+    won, lost = bets.set_index("week").loc[2], bets.set_index("week").loc[3]
+    assert np.isclose(won["profit"], won["stake"] * b)
+    assert np.isclose(lost["profit"], -lost["stake"])
+    assert (bets["stake"] <= 0.5).all()
+
+    # kelly_cap limits full Kelly before the fraction, as EdgeEngine does
+    policy = StakingPolicy(kelly_fraction=0.5, max_picks=1, kelly_cap=None)
+    uncapped = apply_policy(candidates, policy)
+    capped = apply_policy(candidates, dataclasses.replace(policy, kelly_cap=0.02))
+    assert (uncapped["stake"] > 0.01).all()
+    assert np.allclose(capped["stake"], 0.01)
+
+
+def test_run_backtest_reports_per_season_market(tmp_path):
+    result = run_backtest(_config(tmp_path), StakingPolicy(), game_logs=_game_logs())
+    row = result.summary.iloc[0]
+
+    assert (row["season"], row["market"]) == (2024, "player_pass_yds")
+    assert row["bets"] == 2
+    assert np.isclose(row["roi"], row["profit"] / row["staked"])
+    assert row["clv_prob"] > 0
+    assert row["beat_close_rate"] == 1.0
+    assert 0 < row["max_drawdown"] < 1
+    assert not result.calibration().empty
+
+
+def test_pricing_applies_sigma_floor_and_edge_threshold(tmp_path):
+    candidates = prepare_candidates(_config(tmp_path), _game_logs())
+
+    loose = price_candidates(candidates, StakingPolicy(edge_threshold=0.0, sigma_floor=35.0))
+    wide = price_candidates(candidates, StakingPolicy(edge_threshold=0.0, sigma_floor=500.0))
+    strict = price_candidates(candidates, StakingPolicy(edge_threshold=0.4, sigma_floor=35.0))
+
+    assert (wide["sigma"] == 500.0).all()
+    # A huge sigma pulls every probability toward a coin flip
+    assert (wide["model_p"] - 0.5).abs().max() < (loose["model_p"] - 0.5).abs().max()
+    assert len(strict) < len(loose)
+    assert (strict["edge"].abs() > 0.4).all()
+
+
+def test_search_spaces():
+    points = grid({"edge_threshold": [0.0, 0.01], "kelly_cap": [0.01, 0.02, 0.05]})
+    assert len(points) == 6
+    assert {"edge_threshold": 0.01, "kelly_cap": 0.05} in points
+
+    sampled = random_search({"shrink_weight": (0.0, 0.5), "sigma_floor": [35.0, 45.0]}, 20, 1)
+    assert len(sampled) == 20
+    assert all(0.0 <= p["shrink_weight"] <= 0.5 for p in sampled)
+    assert {p["sigma_floor"] for p in sampled} <= {35.0, 45.0}
+
+
+def test_sweep_ranks_configurations_and_parallel_matches_serial(tmp_path):
+    config = _config(tmp_path)
+    points = grid(
+        {"edge_threshold": [0.005, 0.9], "kelly_cap": [0.01, 0.05], "defense_beta": [0.0, 0.1]}
+    )
+
+    serial = run_sweep(config, _game_logs(), points, min_bets=1)
+    parallel = run_sweep(config, _game_logs(), points, workers=2, min_bets=1)
+
+    assert list(serial["rank"]) == list(range(1, 9))
+    # Nothing clears a 90% edge threshold, so those sets rank last
+    assert (serial.tail(4)["edge_threshold"] == 0.9).all()
+    assert (serial.tail(4)["bets"] == 0).all()
+    assert not serial.tail(4)["eligible"].any()
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_props_without_a_stat_line_stay_in_the_bet_universe(tmp_path):
+    """Team/opponent come from prior games and the week's schedule, not the box score."""
+    config = _config(tmp_path)
+    with sqlite3.connect(config.database_path) as con:
+        con.executemany(
+            "INSERT INTO odds_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                _snapshot("2024-09-22T10:00:00Z", "ev3", "dk", side, 240.5, -110, "Tua Tagovailoa")
+                for side in ("Over", "Under")
+            ],
+        )
+    logs = pd.concat(
+        [
+            _game_logs(),
+            # Played weeks 1-2 for MIA, no line in week 3 (e.g. injured in warmups)
+            pd.DataFrame(
+                {
+                    "player_name": "Tua Tagovailoa",
+                    "season": 2024,
+                    "week": [1, 2],
+                    "passing_yards": [260.0, 240.0],
+                    "recent_team": "MIA",
+                    "opponent_team": "NE",
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    candidates = prepare_candidates(config, logs)
+    tua = candidates.loc[candidates["player"] == "Tua Tagovailoa"]
+
+    assert set(tua["week"]) == {3}
+    assert (tua["result"] == "void").all()
+    assert (tua["mu"] == 250.0).all()
+    assert backtest._week_opponents(logs, 2024, 3).to_dict() == {"BUF": "MIA", "MIA": "BUF"}
@@ -0,0 +1,82 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from engine.bankroll_sim import WeeklyCard, load_weekly_cards, simulate_bankroll
+
+
+def test_single_bet_paths_take_only_win_or_loss_values():
+    card = WeeklyCard(p=[0.6], b=[1.0], f=[0.1])
+    result = simulate_bankroll([card], n_paths=20_000, seed=1)
+
+    assert set(np.round(result.ending, 9)) == {0.9, 1.1}
+    assert abs(result.ending.mean() - (1.0 + 0.1 * (0.6 * 2.0 - 1.0))) < 0.005
+    assert not result.ruined.any()
+
+
+def test_correlated_outcomes_widen_the_distribution():
+    p, b, f = [0.55, 0.55], [1.0, 1.0], [0.1, 0.1]
+    independent = WeeklyCard(p=p, b=b, f=f)
+    locked = WeeklyCard(p=p, b=b, f=f, latent_corr=np.ones((2, 2)))
+
+    ind = simulate_bankroll([independent], n_paths=50_000, seed=3)
+    cor = simulate_bankroll([locked], n_paths=50_000, seed=3)
+
+    # Perfectly correlated bets always land together: no 1-1 split
+    assert not np.isclose(cor.ending, 1.0).any()
+    assert cor.ending.std() > 1.3 * ind.ending.std()
+    assert abs(cor.ending.mean() - ind.ending.mean()) < 0.005
+
+
+def test_ruined_paths_stop_betting():
+    card = WeeklyCard(p=[0.5], b=[1.0], f=[0.6])
+    result = simulate_bankroll([card] * 3, n_paths=10_000, ruin_level=0.2, seed=5)
+
+    # Only two opening losses (0.4 * 0.4) ruin within three weeks; a third-week
+    # win must not revive the path to 0.256
+    assert result.ruined.any()
+    assert np.allclose(result.ending[result.ruined], 0.16)
+    assert abs(result.ruined.mean() - 0.25) < 0.02
+    summary = result.summary()
+    assert summary["prob_ruin"] == result.ruined.mean()
+    assert summary["max_drawdown_percentiles"]["p95"] <= 1.0
+
+
+def test_results_do_not_depend_on_chunk_size():
+    cards = [WeeklyCard(p=[0.55, 0.6], b=[0.9, 1.1], f=[0.05, 0.04])] * 4
+    whole = simulate_bankroll(cards, n_paths=5_000, seed=11, chunk_size=5_000)
+    again = simulate_bankroll(cards, n_paths=5_000, seed=11, chunk_size=5_000)
+    split = simulate_bankroll(cards, n_paths=5_000, seed=11, chunk_size=700)
+
+    np.testing.assert_array_equal(whole.ending, again.ending)
+    assert split.n_paths == 5_000
+    assert abs(split.ending.mean() - whole.ending.mean()) < 0.01
+
+
+def test_load_weekly_cards_builds_one_card_per_week(tmp_path):
+    db = tmp_path / "edges.db"
+    edges = pd.DataFrame(
+        {
+            "season": 2024,
+            "week": [1, 1, 1, 2, 2],
+            "event_id": ["A", "A", "B", "C", "C"],
+            "player": ["QB1", "QB1", "QB2", "QB1", "QB3"],
+            "market": ["player_pass_yds"] * 5,
+            "side": ["Over"] * 5,
+            "odds": [100, 110, -110, 120, 100],
+            "model_p": [0.58, 0.57, 0.56, 0.5, 0.4],
+            "ev_per_dollar": [0.16, 0.197, 0.069, 0.1, -0.2],
+        }
+    )
+    with sqlite3.connect(db) as con:
+        edges.to_sql("edges", con, index=False)
+
+    cards = load_weekly_cards(db, 2024, bankroll=100.0, fraction=0.5)
+
+    assert len(cards) == 2
+    # Week 1: one pick per player/market; week 2: only the positive-EV edge
+    assert len(cards[0]) == 2
+    assert len(cards[1]) == 1
+    assert (cards[0].f > 0).all() and cards[0].exposure < 1.0
+    assert load_weekly_cards(db, 2023) == []
@@ -0,0 +1,122 @@
+import datetime as dt
+import sqlite3
+
+import pandas as pd
+
+from jobs.capture_closing import ClosingCapture
+from jobs.poll_odds import store_payload
+from utils.odds_quota import QuotaExhaustedError
+
+KICKOFF = dt.datetime(2026, 10, 19, 17, 0, tzinfo=dt.timezone.utc)
+
+
+def _iso(ts):
+    return ts.isoformat().replace("+00:00", "Z")
+
+
+def _payload(event_id, commence, updated, price):
+    return {
+        "json": [
+            {
+                "id": event_id,
+                "commence_time": _iso(commence),
+                "home_team": "KC",
+                "away_team": "BUF",
+                "bookmakers": [
+                    {
+                        "key": "dk",
+                        "last_update": _iso(updated),
+                        "markets": [
+                            {
+                                "key": "totals",
+                                "outcomes": [
+                                    {"name": "Over", "price": price, "point": 47.5},
+                                    {"name": "Under", "price": -220 - price, "point": 47.5},
+                                ],
+                            }
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _closing(con, event_id):
+    return pd.read_sql(
+        "SELECT side, odds_american, ingest_source FROM closing_lines WHERE event_id = ? "
+        "ORDER BY side",
+        con,
+        params=(event_id,),
+    )
+
+
+def test_bursts_near_kickoff_and_freezes_close():
+    con = sqlite3.connect(":memory:", isolation_level=None)
+    late = KICKOFF + dt.timedelta(hours=3)
+    # The regular poller has seen both games an hour out
+    for event_id, commence in (("EVT1", KICKOFF), ("EVT2", late)):
+        early = commence - dt.timedelta(hours=1)
+        store_payload(con, _payload(event_id, commence, early, -110), primary_book="dk", run_id="poll")
+
+    clock = FakeClock(KICKOFF - dt.timedelta(minutes=30))
+    calls = []
+
+    def fetch(event_ids):
+        calls.append((clock.now, list(event_ids)))
+        minutes_left = (KICKOFF - clock.now).total_seconds() / 60
+        return _payload("EVT1", KICKOFF, clock.now, -110 - round(2 * (10 - minutes_left)))
+
+    capture = ClosingCapture(con, fetch, primary_book="dk", window=600, burst_interval=60, clock=clock)
+    while clock.now < KICKOFF + dt.timedelta(minutes=2):
+        capture.run_once()
+        clock.now = max(capture.next_wake(clock.now), clock.now + dt.timedelta(seconds=1))
+
+    # Only the game about to start was polled, once a minute for its last ten minutes
+    assert all(ids == ["EVT1"] for _, ids in calls)
+    assert [KICKOFF - t for t, _ in calls] == [dt.timedelta(minutes=m) for m in range(10, 0, -1)]
+
+    close = _closing(con, "EVT1")
+    # The last quote before kickoff (one minute out), not the hour-old poll
+    assert close["odds_american"].tolist() == [-128, -92]
+    assert set(close["ingest_source"]) == {"closing_capture"}
+    frozen = con.execute("SELECT event_id FROM closing_freeze").fetchall()
+    assert frozen == [("EVT1",)]
+    assert set(_closing(con, "EVT2")["ingest_source"]) == {"odds_api"}
+
+    # Live odds polled after kickoff no longer replace the frozen close
+    live = _payload("EVT1", KICKOFF, KICKOFF + dt.timedelta(minutes=20), +150)
+    store_payload(con, live, primary_book="dk", run_id="poll")
+    assert _closing(con, "EVT1").equals(close)
+
+
+def test_failed_fetch_still_freezes_from_stored_odds():
+    con = sqlite3.connect(":memory:", isolation_level=None)
+    early = KICKOFF - dt.timedelta(hours=1)
+    store_payload(con, _payload("EVT1", KICKOFF, early, -115), primary_book="dk", run_id="poll")
+
+    clock = FakeClock(KICKOFF - dt.timedelta(minutes=5))
+    attempts = []
+
+    def fetch(event_ids):
+        attempts.append(clock.now)
+        raise QuotaExhaustedError("every key is blocked")
+
+    capture = ClosingCapture(
+        con, fetch, primary_book="dk", window=600, burst_interval=60, clock=clock
+    )
+    while clock.now < KICKOFF + dt.timedelta(minutes=2):
+        capture.run_once()
+        clock.now = max(capture.next_wake(clock.now), clock.now + dt.timedelta(seconds=1))
+
+    assert attempts
+    assert _closing(con, "EVT1")["odds_american"].tolist() == [-115, -105]
+    assert con.execute("SELECT event_id FROM closing_freeze").fetchall() == [("EVT1",)]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from app.data_access import LINE_SHOPPING_COLUMNS, DashboardData
+from utils.data_version import bump_data_version
+
+
+def _make_db(path: Path) -> Path:
+    with sqlite3.connect(path) as con:
+        con.execute(
+            "CREATE TABLE edges (event_id TEXT, player TEXT, market TEXT, season INT, odds INT)"
+        )
+        con.execute(
+            "CREATE TABLE qb_props_odds (event_id TEXT, player TEXT, season INT, def_team TEXT, odds INT)"
+        )
+        con.execute(
+            "CREATE TABLE current_best_lines (player TEXT, market TEXT, season INT, line REAL)"
+        )
+        con.execute(
+            """
+            CREATE TABLE odds_snapshots (
+                fetched_at TEXT, event_id TEXT, market_key TEXT, bookmaker_key TEXT,
+                outcome TEXT, line REAL, price INT, points REAL, odds_raw_json TEXT
+            )
+            """
+        )
+        con.executemany(
+            "INSERT INTO edges VALUES (?, ?, 'player_pass_yds', ?, -110)",
+            [("e1", "Josh Allen", None), ("e2", "Joe Burrow", 2024)],
+        )
+        con.executemany(
+            "INSERT INTO qb_props_odds VALUES (?, ?, ?, ?, -110)",
+            [("e1", "Josh Allen", 2025, "MIA"), ("e2", "Joe Burrow", 2025, "BAL")],
+        )
+        con.executemany(
+            "INSERT INTO current_best_lines VALUES ('p', 'm', ?, 1.5)", [(2024,), (2025,), (None,)]
+        )
+        con.executemany(
+            "INSERT INTO odds_snapshots VALUES (?, ?, 'h2h', 'dk', 'Over', 1.5, ?, 1.5, '{}')",
+            [(f"2025-09-0{i}T00:00:00Z", event, -110 + i) for event in ("e1", "e2") for i in range(1, 6)],
+        )
+    return path
+
+
+def test_edges_are_projected_and_filled_from_props(tmp_path) -> None:
+    data = DashboardData(_make_db(tmp_path / "dash.db"))
+
+    assert list(data.props().columns) == ["event_id", "player", "season", "def_team"]
+    edges = data["edges"].set_index("event_id")
+    # Props only fill gaps; the edge job's own season wins
+    assert edges.loc["e1", "season"] == 2025
+    assert edges.loc["e2", "season"] == 2024
+    assert edges.loc["e2", "def_team"] == "BAL"
+    # Missing optional tables come back empty with the projected columns
+    assert not data.has_rows("odds_csv_raw")
+    assert list(data.odds_raw(event_ids=["e1"]).columns) == LINE_SHOPPING_COLUMNS
+
+
+def test_season_filter_runs_in_sql(tmp_path) -> None:
+    data = DashboardData(_make_db(tmp_path / "dash.db"))
+
+    assert data.best_lines(seasons=[2025])["season"].tolist() == [2025]
+    assert len(data.best_lines(seasons=[2024, 2025], include_unknown=True)) == 3
+    assert len(data.best_lines()) == 3
+
+
+def test_steam_window_keeps_latest_two_per_outcome(tmp_path) -> None:
+    data = DashboardData(_make_db(tmp_path / "dash.db"))
+
+    window = data.steam_window()
+    assert "odds_raw_json" not in window.columns
+    assert len(window) == 4
+    assert set(window["price"]) == {-106, -105}
+    assert set(data.steam_window(event_ids=["e2"])["event_id"]) == {"e2"}
+    assert data.steam_window(event_ids=[]).empty
+    assert len(data.event_snapshots("e1")) == 5
+
+
+def test_memoized_until_data_version_bumps(tmp_path) -> None:
+    db_path = _make_db(tmp_path / "dash.db")
+    data = DashboardData(db_path, version_check_seconds=0)
+    first = data.edges()
+    assert data.edges() is first
+
+    with sqlite3.connect(db_path) as con:
+        con.execute("DELETE FROM edges WHERE event_id = 'e2'")
+        bump_data_version(con, "edges")
+
+    refreshed = data.edges()
+    assert refreshed is not first
+    assert refreshed["event_id"].tolist() == ["e1"]
+    assert isinstance(data.get("weather"), pd.DataFrame)
+
+
+def test_line_shopping_index_built_once_per_version(tmp_path) -> None:
+    db_path = _make_db(tmp_path / "dash.db")
+    with sqlite3.connect(db_path) as con:
+        con.execute(
+            "CREATE TABLE odds_csv_raw (event_id TEXT, player TEXT, market TEXT, line REAL, "
+            "book TEXT, side TEXT, odds INT, implied_prob REAL, fair_prob REAL, updated_at TEXT)"
+        )
+        con.execute(
+            "INSERT INTO odds_csv_raw VALUES ('e1', 'Josh Allen', 'player_pass_yds', 265.5, "
+            "'dk', 'over', -110, 0.52, 0.5, 't0')"
+        )
+    data = DashboardData(db_path, version_check_seconds=0)
+
+    index = data.line_shopping_index(event_ids=["e1"])
+    assert data.line_shopping_index(event_ids=["e1"]) is index
+    row = pd.Series({"event_id": "e1", "player": "Josh Allen", "market": "player_pass_yds", "line": 265.5})
+    view, consensus = index.lookup(row)
+    assert view["best_flag"].tolist() == ["⭐"] and consensus == {"Over": 0.5}
+
+    with sqlite3.connect(db_path) as con:
+        bump_data_version(con, "odds_csv_raw")
+    assert data.line_shopping_index(event_ids=["e1"]) is not index
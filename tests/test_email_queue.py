@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api import database
+from api.models import Bet, EmailStatus, OutboundEmail, User
+from api.services.email_queue import EmailQueue, enqueue_email
+from api.services.email_service import EmailService
+from smtp_stub import SMTPStub
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    database.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", Session)
+
+    @contextmanager
+    def factory():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def stub():
+    with SMTPStub() as server:
+        yield server
+
+
+def _service(monkeypatch, port):
+    monkeypatch.setenv("SMTP_SERVER", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(port))
+    monkeypatch.setenv("SMTP_STARTTLS", "false")
+    monkeypatch.setenv("SMTP_USERNAME", "bot")
+    monkeypatch.setenv("SMTP_PASSWORD", "secret")
+    return EmailService()
+
+
+def _statuses(session_factory):
+    with session_factory() as db:
+        return {job.to_address: (job.status, job.attempts) for job in db.query(OutboundEmail)}
+
+
+def test_batches_share_one_authenticated_session(session_factory, stub, monkeypatch):
+    queue = EmailQueue(session_factory, _service(monkeypatch, stub.port), batch_size=3)
+    with session_factory() as db:
+        for i in range(5):
+            enqueue_email(db, f"user{i}@example.com", "Bet resolved", f"<p>{i}</p>")
+
+    assert queue.drain() == {"sent": 5, "retry": 0, "failed": 0}
+    with session_factory() as db:
+        enqueue_email(db, "late@example.com", "Bet resolved", "<p>late</p>")
+    assert queue.drain()["sent"] == 1
+
+    assert stub.sessions == 1
+    assert len(stub.messages) == 6
+    assert {status for status, _ in _statuses(session_factory).values()} == {EmailStatus.SENT}
+    queue.connection.close()
+
+
+def test_failures_back_off_and_rejections_fail_fast(session_factory, stub, monkeypatch):
+    stub.reject.add("gone@example.com")
+    queue = EmailQueue(session_factory, _service(monkeypatch, stub.port), max_attempts=2)
+    with session_factory() as db:
+        enqueue_email(db, "gone@example.com", "Bet resolved", "<p>x</p>")
+        enqueue_email(db, "ok@example.com", "Bet resolved", "<p>y</p>")
+    assert queue.drain() == {"sent": 1, "retry": 0, "failed": 1}
+    queue.connection.close()
+
+    # Relay down: the job is rescheduled with backoff until max_attempts
+    with session_factory() as db:
+        enqueue_email(db, "later@example.com", "Bet resolved", "<p>z</p>")
+    down = EmailQueue(
+        session_factory, _service(monkeypatch, 1), max_attempts=2, backoff_seconds=60
+    )
+    assert down.drain() == {"sent": 0, "retry": 1, "failed": 0}
+    assert down.drain() == {"sent": 0, "retry": 0, "failed": 0}
+    with session_factory() as db:
+        job = db.query(OutboundEmail).filter_by(to_address="later@example.com").one()
+        assert job.last_error
+        job.next_attempt_at -= timedelta(seconds=61)
+        db.commit()
+    assert down.drain() == {"sent": 0, "retry": 0, "failed": 1}
+    assert _statuses(session_factory)["later@example.com"] == (EmailStatus.FAILED, 2)
+
+
+def test_resolution_notification_only_enqueues(session_factory, stub, monkeypatch):
+    service = _service(monkeypatch, stub.port)
+    bet = Bet(
+        id=7,
+        event_id="evt1",
+        market_description="Passing yards",
+        selection="Over 250.5",
+        stake=Decimal("10.00"),
+        odds_american=-110,
+        odds_decimal=1.91,
+    )
+    user = User(email="winner@example.com")
+
+    assert service.send_bet_resolution_email(bet, user, "win", "Final score")
+    assert stub.sessions == 0
+    with session_factory() as db:
+        job = db.query(OutboundEmail).one()
+    assert job.subject == "Bet Resolution Update - WIN"
+    assert "Over 250.5" in job.html_body and "Final score" in job.html_body
+    assert job.status == EmailStatus.PENDING
@@ -1,4 +1,3 @@
-import os
 import sqlite3
 import sys
 from pathlib import Path
@@ -12,18 +11,21 @@ CSV2 = Path("tests/fixtures/odds_sample_dupes_stale.csv")
 CSV_MULTI = Path("tests/fixtures/odds_sample_multi_pos.csv")
 CSV_NORM = Path("tests/fixtures/odds_book_pos_normalization.csv")
 CSV_CONTRACT = Path("tests/fixtures/odds_ingestion_contract.csv")
+SCHEDULE = Path(__file__).resolve().parent / "fixtures" / "schedule_2025_mini.csv"
 
 
-def run_import(csv_path, stale_minutes=120):
-    os.environ["CSV_PATH"] = str(csv_path)
-    os.environ["STALE_MINUTES"] = str(stale_minutes)
+def run_import(monkeypatch, csv_path, stale_minutes=120):
+    monkeypatch.setenv("CSV_PATH", str(csv_path))
+    monkeypatch.setenv("STALE_MINUTES", str(stale_minutes))
+    # Without it week assignment would fetch nflverse schedules
+    monkeypatch.setenv("SCHEDULE_CSV", str(SCHEDULE))
     import jobs.import_odds_from_csv as mod
 
     mod.main()
 
 
 def test_two_way_devig(monkeypatch, tmp_path):
-    run_import(CSV1)
+    run_import(monkeypatch, CSV1)
     with sqlite3.connect("storage/odds.db") as con:
         df = pd.read_sql("SELECT * FROM odds_csv_raw", con)
     assert (df["event_id"] == "EVT1").any() and (df["event_id"] == "EVT2").any()
@@ -33,7 +35,7 @@ def test_two_way_devig(monkeypatch, tmp_path):
 
 
 def test_duplicates_and_stale(monkeypatch, tmp_path):
-    run_import(CSV2, stale_minutes=120)
+    run_import(monkeypatch, CSV2, stale_minutes=120)
     with sqlite3.connect("storage/odds.db") as con:
         df = pd.read_sql("SELECT * FROM odds_csv_raw", con)
     over = df[(df.event_id == "EVT3") & (df.market == "player_receptions") & (df.side == "Over")]
@@ -44,7 +46,7 @@ def test_duplicates_and_stale(monkeypatch, tmp_path):
 
 
 def test_pos_inferred_for_non_qb_markets(monkeypatch, tmp_path):
-    run_import(CSV_MULTI)
+    run_import(monkeypatch, CSV_MULTI)
     with sqlite3.connect("storage/odds.db") as con:
         df = pd.read_sql("SELECT market, pos FROM odds_csv_raw", con)
     rush_positions = df.loc[df["market"] == "player_rush_yds", "pos"].dropna().unique()
@@ -55,7 +57,7 @@ def test_pos_inferred_for_non_qb_markets(monkeypatch, tmp_path):
 
 def test_book_normalization_and_pos_inference(monkeypatch, tmp_path):
     """Test that mixed-case books are normalized and pos is inferred from market names."""
-    run_import(CSV_NORM)
+    run_import(monkeypatch, CSV_NORM)
     with sqlite3.connect("storage/odds.db") as con:
         df = pd.read_sql("SELECT book, market, pos FROM odds_csv_raw ORDER BY book, market", con)
 
@@ -101,7 +103,7 @@ def test_book_normalization_and_pos_inference(monkeypatch, tmp_path):
 
 def test_ingestion_contract_end_to_end(monkeypatch, tmp_path):
     """Test complete ingestion contract: book normalization, pos inference, season guarantee."""
-    run_import(CSV_CONTRACT)
+    run_import(monkeypatch, CSV_CONTRACT)
     with sqlite3.connect("storage/odds.db") as con:
         df = pd.read_sql("SELECT * FROM odds_csv_raw ORDER BY event_id, player, market", con)
 
@@ -152,3 +154,60 @@ def test_ingestion_contract_end_to_end(monkeypatch, tmp_path):
     # Verify devig calculations are applied
     assert df["implied_prob"].notna().any(), "Implied probabilities should be calculated"
     assert df["fair_prob"].notna().any(), "Fair probabilities should be calculated via devig"
+
+
+def _import_into(db_path, monkeypatch, csv_path, chunk_rows):
+    import jobs.import_odds_from_csv as mod
+
+    monkeypatch.setattr(mod, "DB", db_path)
+    monkeypatch.setenv("CSV_PATH", str(csv_path))
+    monkeypatch.setenv("STALE_MINUTES", "120")
+    monkeypatch.setenv("CSV_CHUNK_ROWS", str(chunk_rows))
+    monkeypatch.setenv("CSV_IMPORT_WORKERS", "2")
+    mod.main()
+    with sqlite3.connect(db_path) as con:
+        raw = pd.read_sql(
+            "SELECT * FROM odds_csv_raw ORDER BY event_id, player, market, book, side, line", con
+        )
+        best = pd.read_sql(
+            "SELECT * FROM current_best_lines ORDER BY event_id, player, market, book, line", con
+        )
+    return raw, best
+
+
+def _write_week_csv(tmp_path):
+    csv_path = tmp_path / "odds.csv"
+    csv_path.write_text(
+        "event_id,commence_time,home_team,away_team,player,market,line,over_odds,under_odds,book,updated_at\n"
+        "E1,2025-09-14T20:25:00Z,KC,PHI,Patrick Mahomes,pass_yards,250.5,-110,-110,DK,2025-09-14T18:00:00Z\n"
+        "E1,2025-09-14T20:25:00Z,KC,PHI,Patrick Mahomes,pass_yards,250.5,-115,-105,FD,2025-09-14T18:00:00Z\n"
+        "E2,2025-12-30T18:00:00Z,KC,PHI,Patrick Mahomes,pass_yards,250.5,-110,-110,DK,2025-12-30T17:00:00Z\n"
+    )
+    return csv_path
+
+
+def test_chunked_import_matches_full_import(monkeypatch, tmp_path):
+    """Dedupe and de-vig span chunk boundaries, so tiny chunks must give the same table."""
+    repo = Path(__file__).resolve().parents[1]
+    monkeypatch.chdir(tmp_path)  # Raw snapshots land under tmp_path
+    monkeypatch.setenv("SCHEDULE_CSV", str(repo / "tests/fixtures/schedule_2025_mini.csv"))
+    for csv_path in (repo / CSV2, repo / CSV_CONTRACT, _write_week_csv(tmp_path)):
+        full, full_best = _import_into(tmp_path / "full.db", monkeypatch, csv_path, 0)
+        chunked, chunked_best = _import_into(tmp_path / "chunked.db", monkeypatch, csv_path, 3)
+        pd.testing.assert_frame_equal(chunked, full)
+        assert chunked["fair_prob"].notna().any()
+        # Both modes assign week through the same schedule lookup
+        pd.testing.assert_frame_equal(chunked_best, full_best)
+
+
+def test_import_assigns_week_from_schedule(monkeypatch, tmp_path):
+    repo = Path(__file__).resolve().parents[1]
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SCHEDULE_CSV", str(repo / "tests/fixtures/schedule_2025_mini.csv"))
+    csv_path = _write_week_csv(tmp_path)
+    for chunk_rows in (0, 2):
+        db_path = tmp_path / f"odds_{chunk_rows}.db"
+        _import_into(db_path, monkeypatch, csv_path, chunk_rows)
+        with sqlite3.connect(db_path) as con:
+            weeks = dict(con.execute("SELECT DISTINCT event_id, week FROM current_best_lines"))
+        assert weeks == {"E1": 2, "E2": None}
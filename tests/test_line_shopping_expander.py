@@ -1,5 +1,6 @@
 import pandas as pd
 
+from app.line_shopping import LineShoppingIndex
 from app.streamlit_app import build_line_shopping_table
 
 
@@ -71,3 +72,49 @@ def test_line_shopping_table_includes_all_books_and_best_flags():
     assert "Over" in consensus and "Under" in consensus
     assert abs(consensus["Over"] - 0.505) < 1e-6
     assert abs(consensus["Under"] - 0.5) < 1e-6
+
+
+def _odds_rows():
+    rows = []
+    for event, player in (("E1", "Player"), ("E2", "Other")):
+        for line, books in ((250.5, {"BookA": -110, "BookB": 105}), (260.5, {"BookA": 120})):
+            for book, odds in books.items():
+                rows.append(
+                    {
+                        "event_id": event,
+                        "player": player,
+                        "market": "Passing Yards",
+                        "line": str(line),
+                        "book": book,
+                        "side": "over",
+                        "odds": odds,
+                        "implied_prob": 0.5,
+                        "fair_prob": None,
+                        "updated_at": "2025-09-24T00:00:00Z",
+                    }
+                )
+    return pd.DataFrame(rows)
+
+
+def test_line_shopping_index_matches_per_line_and_falls_back_without_line():
+    index = LineShoppingIndex(_odds_rows())
+    assert len(index) == 4
+
+    row = pd.Series({"event_id": "E2", "player": "Other", "market": "Passing Yards", "line": 250.5})
+    view, consensus = index.lookup(row)
+    assert list(view["book"]) == ["BookB", "BookA"]
+    assert list(view["best_flag"]) == ["⭐", ""]
+    assert abs(view["decimal_odds"].iloc[0] - 2.05) < 1e-9
+    # No fair probabilities, so consensus falls back to implied
+    assert consensus == {"Over": 0.5}
+
+    # A line nobody offers is empty; no line at all combines every line
+    assert index.lookup(row.copy().replace({250.5: 255.5}))[0].empty
+    combined, _ = index.lookup(row.drop("line"))
+    assert len(combined) == 3
+    assert combined.loc[combined["best_flag"] == "⭐", "book"].tolist() == ["BookA"]
+
+
+def test_line_shopping_index_handles_empty_input():
+    view, consensus = LineShoppingIndex(pd.DataFrame()).lookup(pd.Series({"event_id": "E1"}))
+    assert view.empty and consensus == {}
@@ -0,0 +1,126 @@
+"""Tests for the best-line / edge delta stream"""
+
+import json
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api import database
+from api.services import market_stream as ms
+from api.utils.broadcast import ConnectionManager
+from utils.data_version import bump_data_version, read_data_versions
+
+
+class RecordingManager(ConnectionManager):
+    def __init__(self):
+        super().__init__(channel="test-market")
+        self.sent = []
+
+    async def broadcast(self, message):
+        self.sent.append(message)
+
+
+def _create_best_lines(db_path):
+    con = sqlite3.connect(db_path)
+    con.execute(
+        """
+        CREATE TABLE current_best_lines (
+            player TEXT, market TEXT, book TEXT, line REAL, pos TEXT,
+            over_odds INTEGER, under_odds INTEGER, updated_at TEXT, event_id TEXT,
+            commence_time TEXT, home_team TEXT, away_team TEXT, season INTEGER,
+            week INTEGER, team_code TEXT, opponent_def_code TEXT, is_stale INTEGER,
+            PRIMARY KEY (player, market, book)
+        )
+        """
+    )
+    con.executemany(
+        "INSERT INTO current_best_lines (player, market, book, line, over_odds, under_odds, "
+        "updated_at, event_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("Josh Allen", "player_pass_yds", "dk", 265.5, -110, -110, "t0", "e1"),
+            ("Joe Burrow", "player_pass_yds", "fd", 250.5, -115, -105, "t0", "e2"),
+        ],
+    )
+    bump_data_version(con, "current_best_lines")
+    con.commit()
+    return con
+
+
+@pytest.fixture
+def stream(tmp_path, monkeypatch):
+    db_path = tmp_path / "odds.db"
+    con = _create_best_lines(db_path)
+    engine = create_engine(f"sqlite:///{db_path}")
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=engine))
+    edges_file = tmp_path / "edges_current.json"
+    monkeypatch.setattr(ms, "EDGE_FILE_LOCATIONS", (edges_file,))
+    manager = RecordingManager()
+    yield ms.MarketStream(manager), manager, con, edges_file
+    con.close()
+    engine.dispose()
+
+
+def test_delta_tracker_emits_changed_keys_only():
+    tracker = ms.DeltaTracker("odds")
+    first = tracker.apply({"a": {"odds": -110}, "b": {"odds": 120}})
+    assert first["seq"] == 1 and set(first["upserts"]) == {"a", "b"}
+
+    assert tracker.apply({"a": {"odds": -110}, "b": {"odds": 120}}) is None
+
+    delta = tracker.apply({"a": {"odds": -105}, "c": {"odds": 100}})
+    assert delta["seq"] == 2
+    assert delta["upserts"] == {"a": {"odds": -105}, "c": {"odds": 100}}
+    assert delta["removed"] == ["b"]
+    assert tracker.snapshot()["rows"] == {"a": {"odds": -105}, "c": {"odds": 100}}
+
+
+def test_bump_data_version_increments(tmp_path):
+    con = sqlite3.connect(tmp_path / "v.db")
+    assert read_data_versions(con, ["current_best_lines"]) == {"current_best_lines": 0}
+    bump_data_version(con, "current_best_lines", "odds_csv_raw")
+    bump_data_version(con, "current_best_lines")
+    assert read_data_versions(con) == {"current_best_lines": 2, "odds_csv_raw": 1}
+
+
+@pytest.mark.asyncio
+async def test_refresh_publishes_only_after_version_bump(stream):
+    market, manager, con, _ = stream
+
+    published = await market.refresh()
+    assert [m["type"] for m in published] == ["odds_delta"]
+    assert len(published[0]["upserts"]) == 2
+
+    # Rows changed but no writer bumped the version: nothing is re-read
+    con.execute("UPDATE current_best_lines SET over_odds = -120 WHERE player = 'Josh Allen'")
+    con.commit()
+    assert await market.refresh() == []
+
+    bump_data_version(con, "current_best_lines")
+    con.commit()
+    published = await market.refresh()
+    assert len(published) == 1
+    delta = published[0]
+    assert delta["seq"] == 2
+    assert list(delta["upserts"]) == ["Josh Allen|player_pass_yds|dk"]
+    assert delta["upserts"]["Josh Allen|player_pass_yds|dk"]["odds_american"] == -120
+    assert delta["removed"] == []
+    assert manager.sent[-1] == delta
+
+
+@pytest.mark.asyncio
+async def test_edges_file_change_produces_edges_delta(stream):
+    market, _, _, edges_file = stream
+    await market.refresh()
+
+    edges_file.write_text(
+        json.dumps({"edges": [{"type": "QB Yards", "player": "Josh Allen", "team": "BUF"}]})
+    )
+    published = await market.refresh()
+    assert [m["type"] for m in published] == ["edges_delta"]
+    assert published[0]["seq"] == 1
+
+    snapshots = {s["stream"]: s for s in market.snapshots()}
+    assert snapshots["odds"]["seq"] == 1
+    assert len(snapshots["edges"]["rows"]) == 1
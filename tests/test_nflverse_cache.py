@@ -0,0 +1,127 @@
+import datetime
+import os
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from adapters import nflverse_cache, nflverse_provider
+from adapters.nflverse_cache import current_season, load_seasons, season_path
+
+CURRENT = current_season()
+PAST = CURRENT - 2
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("NFLVERSE_CACHE_DIR", str(tmp_path / "nflverse"))
+    monkeypatch.setenv("NFLVERSE_TTL_HOURS", "6")
+    monkeypatch.delenv("NFLVERSE_OFFLINE", raising=False)
+    return tmp_path / "nflverse"
+
+
+def _fetcher(calls, fail=False):
+    def fetch(seasons):
+        calls.append(list(seasons))
+        if fail:
+            raise ConnectionError("offline")
+        return pd.DataFrame(
+            {"season": s, "week": w, "passing_yards": 200.0 + w, "extra": "x"}
+            for s in seasons
+            for w in (1, 2)
+        )
+
+    return fetch
+
+
+def test_completed_seasons_are_immutable_and_current_season_expires():
+    calls = []
+    first = load_seasons("weekly", [PAST, CURRENT], _fetcher(calls))
+    assert calls == [[PAST, CURRENT]]
+    assert len(first) == 4
+
+    load_seasons("weekly", [PAST, CURRENT], _fetcher(calls))
+    assert len(calls) == 1
+
+    # Age both files past the TTL: only the in-progress season is refetched
+    stale = time.time() - 7 * 3600
+    for season in (PAST, CURRENT):
+        os.utime(season_path("weekly", season), (stale, stale))
+    load_seasons("weekly", [PAST, CURRENT], _fetcher(calls))
+    assert calls[-1] == [CURRENT]
+
+
+def test_past_season_cached_mid_season_is_refreshed():
+    calls = []
+    load_seasons("weekly", [PAST], _fetcher(calls))
+
+    # Written in week 10 of that season: later weeks and playoffs are missing
+    mid_season = datetime.datetime(PAST, 11, 10).timestamp()
+    os.utime(season_path("weekly", PAST), (mid_season, mid_season))
+    load_seasons("weekly", [PAST], _fetcher(calls))
+    assert calls == [[PAST], [PAST]]
+
+    # Rewritten after the season ended (however long ago): immutable again
+    after_end = nflverse_cache.season_end(PAST).timestamp() + 3600
+    os.utime(season_path("weekly", PAST), (after_end, after_end))
+    load_seasons("weekly", [PAST], _fetcher(calls))
+    assert len(calls) == 2
+
+
+def test_reads_prune_columns():
+    calls = []
+    load_seasons("weekly", [PAST], _fetcher(calls))
+    pruned = load_seasons("weekly", [PAST], _fetcher(calls), columns=["season", "passing_yards"])
+
+    assert len(calls) == 1
+    assert list(pruned.columns) == ["season", "passing_yards"]
+    assert nflverse_cache.read_season("weekly", PAST, ["week", "missing"]).columns.tolist() == [
+        "week"
+    ]
+
+
+def test_failed_or_offline_downloads_serve_stale_files(monkeypatch):
+    calls = []
+    load_seasons("weekly", [CURRENT], _fetcher(calls))
+    stale = time.time() - 7 * 3600
+    os.utime(season_path("weekly", CURRENT), (stale, stale))
+
+    served = load_seasons("weekly", [CURRENT], _fetcher(calls, fail=True))
+    assert len(served) == 2
+    assert len(calls) == 2
+
+    monkeypatch.setenv("NFLVERSE_OFFLINE", "1")
+    assert len(load_seasons("weekly", [CURRENT, PAST], _fetcher(calls))) == 2
+    assert len(calls) == 2
+
+
+def test_schedules_and_game_logs_download_once(monkeypatch):
+    calls = {"schedules": 0, "weekly": 0}
+
+    def import_schedules(seasons):
+        calls["schedules"] += 1
+        return pd.DataFrame(
+            {"game_id": f"{s}_01_BUF_MIA", "season": s, "week": 1, "gameday": f"{s}-09-10"}
+            for s in seasons
+        )
+
+    def import_weekly_data(seasons):
+        calls["weekly"] += 1
+        return pd.DataFrame(
+            {"player_id": "00-1", "player_display_name": "Josh Allen", "season": s, "week": 1}
+            for s in seasons
+        ).assign(fantasy_points=20.0)
+
+    fake = SimpleNamespace(import_schedules=import_schedules, import_weekly_data=import_weekly_data)
+    monkeypatch.setattr(nflverse_provider, "nfl", fake)
+
+    for _ in range(2):
+        schedule = nflverse_provider.get_schedules([2021, 2022])
+        logs = nflverse_provider.get_player_game_logs([2021, 2022])
+
+    assert calls == {"schedules": 1, "weekly": 1}
+    assert sorted(schedule["season"]) == [2021, 2022]
+    assert set(logs["player_name"]) == {"Josh Allen"}
+    # The full download is cached; reads only pick the columns the logs need
+    assert "fantasy_points" in nflverse_cache.read_season("weekly", 2021).columns
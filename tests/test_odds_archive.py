@@ -0,0 +1,136 @@
+import datetime as dt
+import io
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+pytest.importorskip("zstandard")
+
+from adapters.odds import the_odds_api
+from jobs import poll_odds
+from jobs.replay_archive import replay
+from utils.odds_archive import PayloadArchive, list_entries
+
+START = dt.datetime(2026, 10, 17, 12, tzinfo=dt.timezone.utc)
+
+
+def _payload(price, updated, point=47.5):
+    return [
+        {
+            "id": "EVT1",
+            "commence_time": "2026-10-19T17:00:00Z",
+            "home_team": "KC",
+            "away_team": "BUF",
+            "bookmakers": [
+                {
+                    "key": "dk",
+                    "last_update": updated.isoformat().replace("+00:00", "Z"),
+                    "markets": [
+                        {
+                            "key": "totals",
+                            "outcomes": [
+                                {"name": "Over", "price": price, "point": point},
+                                {"name": "Under", "price": -220 - price, "point": point},
+                            ],
+                        }
+                    ],
+                }
+            ],
+        }
+    ]
+
+
+def test_archive_is_content_addressed_and_indexed(tmp_path, monkeypatch):
+    archive = PayloadArchive(tmp_path / "archive", tmp_path / "odds.db")
+    body = json.dumps(_payload(-110, START)).encode()
+    first = archive.put(body, source="poll_odds", params={"apiKey": "secret", "markets": "totals"})
+    second = archive.put(body, source="poll_odds", fetched_at=START)
+
+    assert first.sha256 == second.sha256 and first.path == second.path
+    assert len(list((tmp_path / "archive").rglob("*.zst"))) == 1
+    assert archive.read(first) == body
+    assert first.params == {"markets": "totals"}
+
+    # A streamed body is archived as it is read, byte for byte
+    reader = archive.tee(io.BytesIO(body + b" "), source="the_odds_api", endpoint="sports/x/odds")
+    assert json.loads(reader.read()) == _payload(-110, START)
+    assert reader.read() == b""
+    assert archive.read(reader.entry) == body + b" "
+
+    # fetch_markets archives what the API returned, without the key
+    class Response:
+        status_code = 200
+        content = body
+        headers = {}
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return json.loads(self.content)
+
+    monkeypatch.setattr(poll_odds.requests, "get", lambda url, params, timeout: Response())
+    poll_odds.fetch_markets("k1", "americanfootball_nfl", "us", "totals", "dk", archive=archive)
+    entries = archive.entries(source="poll_odds")
+    assert [e.sha256 for e in entries] == [first.sha256] * 3
+    assert entries[-1].params["markets"] == "totals" and "apiKey" not in entries[-1].params
+
+
+def _table(con, sql):
+    return pd.read_sql(sql, con).sort_values(["market", "side", "line", "book"]).reset_index(drop=True)
+
+
+def test_replay_rebuilds_the_same_tables_in_parallel(tmp_path):
+    archive = PayloadArchive(tmp_path / "archive", tmp_path / "odds.db")
+    live = sqlite3.connect(tmp_path / "live.db", isolation_level=None)
+
+    # Three days of polls, with the line moving; ingest live and archive alike
+    for n, (price, point) in enumerate([(-110, 47.5), (-120, 47.5), (-105, 48.5), (-115, 48.5)]):
+        fetched = START + dt.timedelta(hours=18 * n)
+        payload = _payload(price, fetched, point)
+        archive.put(json.dumps(payload).encode(), source="poll_odds", fetched_at=fetched)
+        poll_odds.store_payload(
+            live, {"json": payload}, primary_book="dk", run_id="live", now=fetched
+        )
+    assert len({e.fetched_at[:10] for e in list_entries(archive._con())}) == 3
+
+    results = replay(
+        tmp_path / "replay.db",
+        archive_root=tmp_path / "archive",
+        index_db=tmp_path / "odds.db",
+        workers=2,
+    )
+    assert [r.payloads for r in results] == [1, 1, 2]
+
+    rebuilt = sqlite3.connect(tmp_path / "replay.db")
+    odds_sql = "SELECT event_id, market, book, side, line, odds, updated_at, is_stale FROM odds_csv_raw"
+    closing_sql = (
+        "SELECT event_id, market, side, line, book, odds_american, fair_prob_close, ts_close, "
+        "is_primary, raw_payload_hash FROM closing_lines"
+    )
+    pd.testing.assert_frame_equal(_table(rebuilt, odds_sql), _table(live, odds_sql))
+    pd.testing.assert_frame_equal(_table(rebuilt, closing_sql), _table(live, closing_sql))
+    assert len(_table(rebuilt, closing_sql)) == 4  # Both lines, latest price for each
+
+
+def test_streamed_body_is_archived_without_ijson(tmp_path, monkeypatch):
+    # json.load reads the whole body in one read() and the caller closes straight after
+    monkeypatch.setattr(the_odds_api, "ijson", None)
+    archive = PayloadArchive(tmp_path / "archive", tmp_path / "odds.db")
+    body = json.dumps(_payload(-110, START)).encode()
+
+    reader = archive.tee(io.BytesIO(body), source="the_odds_api", endpoint="sports/x/odds")
+    try:
+        frame = the_odds_api.normalize_odds_stream(reader, fetched_at=START)
+    finally:
+        reader.close()
+
+    assert len(frame) == 2
+    assert reader.entry is not None
+    assert archive.read(reader.entry) == body
+    assert list((tmp_path / "archive").rglob("*.tmp")) == []
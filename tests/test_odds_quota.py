@@ -0,0 +1,137 @@
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from adapters.odds import the_odds_api
+from adapters.odds.the_odds_api import TheOddsAPIClient, TheOddsAPIConfig
+from utils.odds_quota import (
+    DEFAULT_STORE_PATH,
+    OddsQuotaManager,
+    QuotaExhaustedError,
+    SQLiteQuotaStore,
+    request_cost,
+)
+
+START = datetime(2026, 10, 19, 12, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _manager(path, keys=("k1", "k2"), clock=None, floor=0):
+    return OddsQuotaManager(keys, SQLiteQuotaStore(path), floor=floor, clock=clock or FakeClock())
+
+
+def test_concurrent_reservations_never_overdraw_a_key(tmp_path):
+    db = tmp_path / "odds.db"
+    seed = _manager(db)
+    seed.record(seed.reserve(), remaining=6)
+    seed.record(seed.reserve(), remaining=4)
+
+    # Two independent processes' worth of managers sharing one database
+    managers = [_manager(db), _manager(db)]
+    granted, refused = [], []
+
+    def worker(i):
+        try:
+            granted.append(managers[i % 2].reserve(cost=2).key)
+        except QuotaExhaustedError:
+            refused.append(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(granted) == ["k1"] * 3 + ["k2"] * 2
+    assert len(refused) == 7
+    assert {k: v["remaining"] for k, v in seed.store.snapshot(["k1", "k2"]).items()} == {
+        "k1": 0,
+        "k2": 0,
+    }
+
+
+def test_headers_rate_limits_and_resets(tmp_path):
+    clock = FakeClock()
+    quota = _manager(tmp_path / "odds.db", clock=clock)
+
+    # Unknown balances are probed first, then the fuller key wins
+    lease = quota.reserve()
+    quota.record(lease, {"X-Requests-Remaining": "50"})
+    other = quota.reserve()
+    assert other.key != lease.key
+    quota.record(other, {"x-requests-remaining": "10"})
+    assert quota.reserve().key == lease.key
+
+    # 429 refunds the reservation and cools the key down
+    limited = quota.reserve()
+    quota.fail(limited, 429, retry_after=60)
+    assert quota.reserve().key == other.key
+    clock.now += 61
+    assert quota.reserve().key == limited.key
+
+    # Exhaustion blocks the key until the monthly reset
+    drained = quota.reserve()
+    quota.record(drained, remaining=0)
+    status = quota.status()
+    assert status["available_keys"] == 1
+    assert status["keys"][f"{drained.key}**"]["blocked_until"] == "2026-11-01T00:00:00+00:00"
+
+
+def test_min_interval_spreads_quota_until_reset(tmp_path):
+    clock = FakeClock(datetime(2026, 10, 31, 0, tzinfo=timezone.utc).timestamp())
+    quota = _manager(tmp_path / "odds.db", clock=clock, floor=10)
+    assert quota.min_interval() == 0.0  # Balances unknown yet
+
+    quota.record(quota.reserve(), remaining=58)
+    quota.record(quota.reserve(), remaining=34)
+    # 24h left, (48 + 24) usable credits, 3 credits per poll
+    assert quota.min_interval(cost=3) == pytest.approx(86400 * 3 / 72)
+    assert request_cost("h2h,spreads,totals", "us") == 3
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.text = ""
+        self.ok = status_code < 400
+
+    def json(self):
+        return self._payload
+
+
+def test_adapter_rotates_through_shared_quota(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_get(url, params, timeout):
+        calls.append(params["apiKey"])
+        if params["apiKey"] == "k1":
+            return FakeResponse(429)
+        return FakeResponse(200, [], {"X-Requests-Remaining": "497"})
+
+    monkeypatch.setattr(the_odds_api.requests, "get", fake_get)
+    quota = _manager(tmp_path / "odds.db")
+    client = TheOddsAPIClient(TheOddsAPIConfig(api_keys=["k1", "k2"]), quota=quota)
+
+    assert client._request("sports/nfl/odds", {"markets": "h2h,spreads", "regions": "us"}) == []
+    assert calls == ["k1", "k2"]
+    keys = client.get_key_pool_status()["quota"]["keys"]
+    assert keys["k1**"]["available"] is False
+    assert keys["k2**"]["remaining"] == 497
+
+
+def test_default_store_does_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert DEFAULT_STORE_PATH.is_absolute()
+    assert DEFAULT_STORE_PATH == Path(__file__).resolve().parents[1] / "storage" / "odds.db"
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.database import Base
+from api.enums.betting_enums import BetStatus
+from api.exceptions.betting_exceptions import BetParticipationError
+from api.models import PeerBet, PeerBetOutcome, PeerBetTag, User
+from api.repositories.peer_bet_repository import PeerBetRepository
+from api.schemas.bet_schemas import (
+    PeerBetCreateRequest,
+    PeerBetOutcomeSchema,
+    PeerBetParticipateRequest,
+)
+from api.services.peer_bet_service import PeerBetService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(4):
+        session.add(User(external_id=f"ext{i}", email=f"user{i}@example.com"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _request(n: int, tags=None, limit=None) -> PeerBetCreateRequest:
+    return PeerBetCreateRequest(
+        title=f"Peer bet number {n}",
+        description="Who wins the division this season?",
+        minimum_stake=Decimal("5"),
+        participant_limit=limit,
+        possible_outcomes=[
+            PeerBetOutcomeSchema(name="Yes", odds=Decimal("1.80")),
+            PeerBetOutcomeSchema(name="No"),
+        ],
+        tags=tags,
+    )
+
+
+def _create(repo, n, **kwargs):
+    bet = repo.create_peer_bet(_request(n, **kwargs), creator_id=1)
+    repo.update_peer_bet_status(bet.id, BetStatus.ACTIVE)
+    return bet
+
+
+def test_outcomes_and_tags_are_stored_in_bulk(db):
+    bet = _create(PeerBetRepository(db), 1, tags=[" NFL", "nfl", "Playoffs"])
+
+    assert [o.name for o in PeerBetRepository(db).get_bet_outcomes(bet.id)] == ["Yes", "No"]
+    assert sorted(t.tag for t in db.query(PeerBetTag).filter_by(bet_id=bet.id)) == [
+        "nfl",
+        "playoffs",
+    ]
+
+
+def test_keyset_pages_match_offset_pages_and_filter_by_tag(db):
+    repo = PeerBetRepository(db)
+    for n in range(7):
+        _create(repo, n, tags=["nfl"] if n % 2 else ["nba"])
+    # Identical timestamps must still page deterministically by id
+    db.query(PeerBet).update({"created_at": datetime(2026, 9, 1, 12)})
+    db.commit()
+
+    by_offset = [b.id for b in repo.get_public_peer_bets(limit=100)]
+    pages, after = [], None
+    while True:
+        page = repo.get_public_peer_bets(limit=3, after=after)
+        if not page:
+            break
+        pages.extend(b.id for b in page)
+        after = (page[-1].created_at, page[-1].id)
+    assert pages == by_offset
+
+    nfl = repo.get_public_peer_bets(tag="NFL")
+    assert [b.id for b in nfl] == [b for b in by_offset if b % 2 == 0]
+
+    plan = " ".join(
+        str(row)
+        for row in db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM peer_bets WHERE is_public = 1 "
+                "AND (created_at < :c OR (created_at = :c AND id < :i)) "
+                "ORDER BY created_at DESC, id DESC LIMIT 3"
+            ),
+            {"c": "2030-01-01", "i": 1},
+        )
+    )
+    assert "idx_peer_bets_public_feed" in plan
+
+
+def test_join_maintains_counters_and_limit(db):
+    service = PeerBetService(db)
+    bet = _create(service.repository, 1, limit=2)
+
+    joined = service.join_bet(
+        bet.id, 2, PeerBetParticipateRequest(chosen_outcome="Yes", stake_amount=Decimal("10"))
+    )
+    assert joined.potential_payout == Decimal("18.00")
+    service.join_bet(
+        bet.id, 3, PeerBetParticipateRequest(chosen_outcome="No", stake_amount=Decimal("5"))
+    )
+    with pytest.raises(BetParticipationError):
+        service.join_bet(
+            bet.id, 4, PeerBetParticipateRequest(chosen_outcome="No", stake_amount=Decimal("5"))
+        )
+
+    db.expire_all()
+    bet = db.get(PeerBet, bet.id)
+    assert bet.current_participants == 2
+    assert bet.total_stake_pool == Decimal("15.00")
+    yes = db.query(PeerBetOutcome).filter_by(bet_id=bet.id, name="Yes").one()
+    assert (yes.participant_count, yes.total_stakes) == (1, Decimal("10.00"))
+
+
+def test_join_rejects_bets_outside_their_window(db):
+    service = PeerBetService(db)
+    locked, upcoming = _create(service.repository, 1), _create(service.repository, 2)
+    now = datetime.utcnow()
+    db.query(PeerBet).filter_by(id=locked.id).update({"locks_at": now - timedelta(minutes=5)})
+    db.query(PeerBet).filter_by(id=upcoming.id).update({"starts_at": now + timedelta(hours=1)})
+    db.commit()
+
+    # Still ACTIVE by status, but past its lock time / not yet open
+    for bet in (locked, upcoming):
+        with pytest.raises(BetParticipationError):
+            service.join_bet(
+                bet.id,
+                2,
+                PeerBetParticipateRequest(chosen_outcome="Yes", stake_amount=Decimal("10")),
+            )
+        db.expire_all()
+        assert db.get(PeerBet, bet.id).current_participants == 0
@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+
+from utils.pipeline import Pipeline, PipelineError, Stage
+
+
+def _pipeline(tmp_path, state, calls, extra=(), **kwargs):
+    def record(name, value):
+        calls.append(name)
+        return value
+
+    stages = [
+        Stage("odds", lambda: record("odds", state["odds"]), fingerprint=lambda: state["odds"]),
+        Stage("logs", lambda: record("logs", [1, 2, 3]), fingerprint=lambda: "2024"),
+        Stage(
+            "projections",
+            lambda logs: record("projections", sum(logs)),
+            inputs=("logs",),
+        ),
+        Stage(
+            "edges",
+            lambda odds, projections: record("edges", odds * projections),
+            inputs=("odds", "projections"),
+        ),
+        *extra,
+    ]
+    return Pipeline(stages, cache_dir=tmp_path / "cache", **kwargs)
+
+
+def test_unchanged_inputs_are_served_from_cache(tmp_path):
+    state, calls = {"odds": 2}, []
+    first = _pipeline(tmp_path, state, calls).run()
+    assert first["edges"] == 12
+    assert sorted(calls) == ["edges", "logs", "odds", "projections"]
+
+    calls.clear()
+    again = _pipeline(tmp_path, state, calls).run()
+    assert calls == []
+    assert again["edges"] == 12
+    assert {r.status for r in again.reports.values()} == {"cached"}
+
+
+def test_odds_change_reruns_only_downstream_stages(tmp_path):
+    state, calls = {"odds": 2}, []
+    _pipeline(tmp_path, state, calls).run()
+
+    calls.clear()
+    state["odds"] = 3
+    run = _pipeline(tmp_path, state, calls).run()
+
+    assert sorted(calls) == ["edges", "odds"]
+    assert run["edges"] == 18
+    assert run.reports["projections"].status == "cached"
+    assert list(run.timings()["stage"]) == list(run.reports)
+
+    calls.clear()
+    _pipeline(tmp_path, state, calls, force=True).run()
+    assert len(calls) == 4
+
+
+def test_independent_stages_run_concurrently(tmp_path):
+    # Each stage waits for the other: this only completes if both run at once
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(value):
+        barrier.wait()
+        return value
+
+    stages = [
+        Stage("schedules", lambda: meet("s")),
+        Stage("game_logs", lambda: meet("g")),
+        Stage(
+            "join",
+            lambda schedules, game_logs: schedules + game_logs,
+            inputs=("schedules", "game_logs"),
+        ),
+    ]
+    run = Pipeline(stages, cache_dir=None, max_workers=2).run()
+    assert run["join"] == "sg"
+
+
+def test_failures_skip_dependants_and_are_not_cached(tmp_path):
+    def broken():
+        raise RuntimeError("feed down")
+
+    stages = [
+        Stage("odds", broken),
+        Stage("logs", lambda: [], cache_if=bool),
+        Stage("edges", lambda odds: odds, inputs=("odds",)),
+    ]
+    pipeline = Pipeline(stages, cache_dir=tmp_path / "cache")
+    with pytest.raises(PipelineError) as info:
+        pipeline.run()
+
+    assert set(info.value.errors) == {"odds"}
+    assert not (tmp_path / "cache" / "logs.pkl").exists()
+    assert pipeline.run(targets=["logs"]).reports["logs"].status == "ran"
+
+    with pytest.raises(ValueError, match="Cycle"):
+        Pipeline([Stage("a", len, inputs=("b",)), Stage("b", len, inputs=("a",))])
+
+
+def test_side_effect_stages_rerun_over_cached_inputs(tmp_path):
+    from jobs.compute_edges import build_pipeline
+
+    state, calls, writes = {"odds": 2}, [], []
+    write = Stage("write", lambda edges: writes.append(edges), inputs=("edges",), cache=False)
+    for _ in range(2):
+        run = _pipeline(tmp_path, state, calls, extra=(write,)).run()
+    assert run.reports["edges"].status == "cached"
+    assert writes == [12, 12]
+
+    stages = build_pipeline(tmp_path / "odds.db", [2024], cache_dir=None).stages
+    side_effects = ("persist_projections", "persist_edges", "export", "correlated_card")
+    assert not any(stages[name].cache for name in side_effects)
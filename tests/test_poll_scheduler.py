@@ -0,0 +1,180 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from jobs.poll_scheduler import PollBatch, PollScheduler, PollService, SchedulePolicy
+
+START = datetime(2026, 10, 19, 6, tzinfo=timezone.utc).timestamp()
+GROUP = ("h2h,spreads", "draftkings,fanduel")
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _event(event_id, commence, price=-110, point=-3.0):
+    return {
+        "id": event_id,
+        "commence_time": _iso(commence),
+        "bookmakers": [
+            {
+                "key": "draftkings",
+                "markets": [
+                    {
+                        "key": "spreads",
+                        "outcomes": [{"name": "Home", "price": price, "point": point}],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def _scheduler(**policy):
+    policy.setdefault("jitter", 0.0)
+    return PollScheduler([GROUP], SchedulePolicy(**policy), rng=random.Random(7))
+
+
+def _discover(scheduler, events, now=START):
+    (batch,) = scheduler.due_batches(now)
+    assert batch.event_ids == ()
+    scheduler.observe(batch, events, now)
+
+
+def test_cadence_follows_kickoff_and_steam():
+    scheduler = _scheduler(daily_budget=100_000)
+    _discover(
+        scheduler,
+        [_event("near", START + 1800), _event("far", START + 5 * 86400)],
+    )
+    near, far = scheduler.events["near"], scheduler.events["far"]
+    assert scheduler.base_interval(near, START) == 120
+    assert scheduler.base_interval(far, START) == 21600
+
+    # A 25 cent move on the far game counts as steam and tightens its cadence
+    batch = PollBatch(GROUP, ("far",), scheduler.cost(GROUP))
+    scheduler.observe(batch, [_event("far", START + 5 * 86400, price=-135)], START + 60)
+    assert scheduler.base_interval(far, START + 60) == pytest.approx(10800)
+    # ...and relaxes again as the steam decays
+    assert scheduler.base_interval(far, START + 60 + 4 * 3600) > 19000
+
+
+def test_due_events_share_one_call_and_pull_neighbours_forward():
+    scheduler = _scheduler(daily_budget=100_000)
+    _discover(
+        scheduler,
+        [_event("a", START + 3000), _event("b", START + 3000), _event("c", START + 4 * 3600)],
+    )
+    assert scheduler.due_batches(START + 60) == []
+
+    # a and b are due at +120s; c (10 minute tier) is 480s away but within half an interval
+    scheduler.events["c"].last_polled = START - 180
+    batches = scheduler.due_batches(START + 120)
+    assert len(batches) == 1
+    assert set(batches[0].event_ids) == {"a", "b", "c"}
+    assert batches[0].cost == 2
+
+    scheduler.start(batches[0])
+    assert scheduler.due_batches(START + 240) == []
+
+
+def test_tight_budget_still_captures_every_closing_line():
+    kickoffs = {f"g{i}": START + 3600 * (2 + i * 1.5) for i in range(8)}
+    kickoffs["late"] = START + 3600 * 2 + 60  # Shares g0's closing call
+    scheduler = _scheduler(daily_budget=60)
+    now = START
+    calls = []
+    while now < START + 16 * 3600:
+        for batch in scheduler.due_batches(now):
+            calls.append((now, batch))
+            events = [_event(e, kickoffs[e]) for e in (batch.event_ids or kickoffs)]
+            scheduler.observe(batch, events, now)
+        now = max(scheduler.next_wake(now), now + 1)
+
+    assert scheduler.spent_today <= 60
+    assert sum(b.cost for _, b in calls) <= 60
+    closing = [(t, b) for t, b in calls if b.closing]
+    captured = {e for t, b in closing for e in b.event_ids if kickoffs[e] - 300 <= t < kickoffs[e]}
+    assert captured == set(kickoffs)
+    assert all(e.closing_captured for e in scheduler.events.values())
+    # Spare credits went to regular polls rather than sitting idle
+    assert len(calls) > len(closing) + 1
+
+
+@pytest.mark.asyncio
+async def test_service_applies_backpressure_from_slow_writer():
+    scheduler = _scheduler(daily_budget=100_000, max_events_per_call=1)
+    events = [_event(f"e{i}", START + 1800) for i in range(6)]
+    _discover(scheduler, events)
+    fetched, written = [], []
+
+    def fetch(batch):
+        fetched.append(batch.event_ids)
+        return {"json": [e for e in events if e["id"] in batch.event_ids]}
+
+    def sink(batch, payload):
+        written.append(batch.event_ids)
+
+    service = PollService(
+        scheduler, fetch, sink, max_in_flight=2, queue_size=1, clock=lambda: START + 120
+    )
+    dispatcher = asyncio.create_task(service.dispatch())
+    await asyncio.sleep(0.2)
+    # Writer not running: one payload queued, two fetchers holding their slots
+    # while they wait to enqueue, and the remaining batches not yet fetched
+    assert service._queue.qsize() == 1
+    assert len(fetched) == 3
+    assert not dispatcher.done()
+
+    writer = asyncio.create_task(service._writer())
+    await asyncio.wait_for(dispatcher, 2)
+    await asyncio.wait_for(service._queue.join(), 2)
+    await asyncio.gather(*service._tasks)
+    await asyncio.wait_for(service._queue.join(), 2)
+    writer.cancel()
+
+    assert sorted(written) == sorted((f"e{i}",) for i in range(6))
+    assert not scheduler.in_flight
+    assert scheduler.events["e0"].last_polled == START + 120
+
+
+@pytest.mark.asyncio
+async def test_failed_fetches_back_off_instead_of_redispatching():
+    scheduler = _scheduler(daily_budget=100_000, retry_initial=30, retry_max=100)
+    clock = {"now": START}
+    calls = []
+
+    def fetch(batch):
+        calls.append((clock["now"], batch.event_ids))
+        raise RuntimeError("502 Bad Gateway")
+
+    service = PollService(scheduler, fetch, lambda batch, payload: None, clock=lambda: clock["now"])
+
+    async def dispatch_all():
+        await service.dispatch()
+        await asyncio.gather(*service._tasks)
+
+    # Discovery fails: not retried until its backoff has passed
+    await dispatch_all()
+    await dispatch_all()
+    assert calls == [(START, ())]
+    assert scheduler.next_wake(START) == START + 30
+
+    _discover(scheduler, [_event("near", START + 1800)], now=START + 30)
+    wakes = []
+    clock["now"] = START + 150
+    for _ in range(4):
+        await dispatch_all()
+        await dispatch_all()
+        wakes.append(scheduler.next_wake(clock["now"]) - clock["now"])
+        clock["now"] += wakes[-1]
+    assert [ids for _, ids in calls[1:]] == [("near",)] * 4
+    assert wakes == [30, 60, 100, 100]
+
+    # A successful poll clears the backoff
+    batch = PollBatch(GROUP, ("near",), scheduler.cost(GROUP))
+    scheduler.observe(batch, [_event("near", START + 1800)], clock["now"])
+    assert not scheduler.backing_off("near", clock["now"])
+    assert scheduler.next_wake(clock["now"]) == clock["now"] + 120
@@ -1,6 +1,56 @@
-from engine.portfolio import kelly_fraction
+import numpy as np
+import pandas as pd
+
+from engine.portfolio import build_card, greedy_select, kelly_fraction, kelly_fractions
 
 
 def test_kelly_basic():
     assert kelly_fraction(0.5, 1.0, 0.5) == 0.0
     assert abs(kelly_fraction(0.55, 1.0, 0.5) - 0.05) < 1e-6
+
+
+def test_kelly_fractions_matches_scalar():
+    p = [0.55, 0.4, 0.7, np.nan, 0.6]
+    b = [1.0, 1.5, 0.9, 1.0, 0.0]
+    expected = [kelly_fraction(pi, bi, 0.25) if not np.isnan(pi) else 0.0 for pi, bi in zip(p, b)]
+    assert np.allclose(kelly_fractions(p, b, 0.25), expected)
+
+
+def _edges():
+    return pd.DataFrame(
+        {
+            "event_id": ["g1", "g1", "g1", "g2"],
+            "player": ["A", "A", "B", "C"],
+            "market": ["pass_yds"] * 4,
+            "odds": [100, -110, 150, "bad"],
+            "p_model_shrunk": [0.6, np.nan, 0.5, 0.6],
+            "model_p": [np.nan, 0.6, np.nan, np.nan],
+            "ev_per_dollar": [0.2, 0.15, 0.25, None],
+        }
+    )
+
+
+def test_greedy_select_keeps_best_ev_per_key():
+    df = _edges().assign(EV=[0.2, 0.3, 0.25, 0.1])
+    picked = greedy_select(df, max_n=2)
+    assert picked.index.tolist() == [1, 2]
+    assert len(greedy_select(df, max_n=10)) == 3
+
+
+def test_build_card_stakes_and_caps():
+    card = build_card(_edges(), bankroll=1000.0, fraction=0.5)
+    # +100 at 60%: full Kelly 0.2, half Kelly 0.1
+    assert card.loc[0, "decimal_odds"] == 2.0
+    assert abs(card.loc[0, "stake"] - 100.0) < 1e-9
+    assert card.loc[1, "stake"] > 0  # model_p fallback
+    assert card.loc[3, "stake"] == 0.0 and np.isnan(card.loc[3, "decimal_odds"])
+    assert abs(card.loc[0, "expected_value"] - 20.0) < 1e-9
+
+    capped = build_card(_edges(), bankroll=1000.0, fraction=0.5, max_event_exposure=0.1)
+    game_one = capped.loc[capped["event_id"] == "g1", "stake"]
+    assert abs(game_one.sum() - 100.0) < 1e-9
+    # Scaled pro rata, so relative sizing within the game is kept
+    assert np.allclose(game_one / game_one.sum(), card.loc[game_one.index, "stake"] / card.loc[game_one.index, "stake"].sum())
+
+    total = build_card(_edges(), bankroll=1000.0, fraction=0.5, max_total_exposure=0.05)
+    assert abs(total["stake"].sum() - 50.0) < 1e-9
@@ -0,0 +1,121 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from engine.portfolio import build_card
+from engine.portfolio_optimizer import (
+    CorrelationModel,
+    bet_correlations,
+    estimate_correlations,
+    load_correlation_model,
+    optimize_card,
+    save_correlation_model,
+    solve_allocation,
+)
+
+
+def _game_logs(weeks: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    rows = []
+    for week in range(1, weeks + 1):
+        volume = rng.normal(0, 1)  # shared game script
+        attempts = 35 + 6 * volume + rng.normal(0, 2)
+        rows.append(
+            {
+                "player_name": "QB",
+                "recent_team": "BUF",
+                "season": 2024,
+                "week": week,
+                "attempts": attempts,
+                "passing_yards": 7 * attempts + rng.normal(0, 20),
+            }
+        )
+        rows.append(
+            {
+                "player_name": "WR",
+                "recent_team": "BUF",
+                "season": 2024,
+                "week": week,
+                "receptions": 6 + 1.5 * volume + rng.normal(0, 1),
+                "receiving_yards": 80 + 25 * volume + rng.normal(0, 15),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def test_estimate_correlations_same_player_and_stack():
+    model = estimate_correlations(_game_logs(), min_samples=30)
+
+    assert model.same_player[("attempts", "passing_yards")] > 0.8
+    assert model.same_team[("passing_yards", "receiving_yards")] > 0.5
+    # Never co-recorded by one player, so left to the prior
+    assert ("passing_yards", "receptions") not in model.same_player
+    assert model.player_teams == {"QB": "BUF", "WR": "BUF"}
+
+
+def test_bet_correlations_signs_and_independence():
+    candidates = pd.DataFrame(
+        {
+            "event_id": ["g1", "g1", "g1", "g2"],
+            "player": ["QB", "QB", "WR", "RB"],
+            "team": ["BUF", "BUF", "BUF", "MIA"],
+            "market": ["player_pass_yds", "player_pass_yds", "player_rec_yds", "player_rush_yds"],
+            "odds_side": ["over", "under", "over", "over"],
+        }
+    )
+    model = CorrelationModel(same_team={("passing_yards", "receiving_yards"): 0.6})
+    corr = bet_correlations(candidates, model)
+
+    assert np.allclose(np.diag(corr), 1.0)
+    assert corr[0, 1] < -0.99  # over and under on the same stat
+    assert corr[0, 2] > 0.3 and corr[1, 2] < -0.3  # stack, flipped for the under
+    assert abs(corr[0, 3]) < 1e-9  # different game
+    assert np.all(np.linalg.eigvalsh(corr) > -1e-9)
+
+
+def test_solver_matches_closed_form_and_respects_caps():
+    rng = np.random.default_rng(3)
+    a = rng.normal(size=(6, 6))
+    cov = a @ a.T / 6 + 0.5 * np.eye(6)
+    mu = np.linalg.solve(np.linalg.inv(cov), np.full(6, 0.02))  # all-positive unconstrained optimum
+    unconstrained = solve_allocation(mu, cov, fraction=0.5)
+    assert np.allclose(unconstrained, 0.5 * np.linalg.solve(cov, mu), atol=1e-8)
+
+    groups = np.array([0, 0, 0, 1, 1, 2])
+    capped = solve_allocation(mu, cov, 0.5, groups=groups, group_cap=0.01, total_cap=0.025)
+    assert capped.min() >= 0
+    assert np.bincount(groups, capped).max() <= 0.01 + 1e-9
+    assert capped.sum() <= 0.025 + 1e-9
+
+
+def test_duplicate_bets_share_one_kelly_stake():
+    same_bet = {
+        "event_id": "g1",
+        "player": "QB",
+        "market": "player_pass_yds",
+        "odds_side": "over",
+        "odds": 100,
+        "p_model_shrunk": 0.55,
+        "ev_per_dollar": 0.1,
+    }
+    candidates = pd.DataFrame([{**same_bet, "book": "dk"}, {**same_bet, "book": "fd"}])
+
+    card = optimize_card(candidates, bankroll=1000.0, fraction=0.5)
+    independent = build_card(candidates, 1000.0, 0.5)["stake"]
+    assert np.allclose(card["independent_stake"], independent)
+    # Sized as one bet, not two (mean-variance Kelly is within a few % of exact)
+    assert abs(card["stake"].sum() - independent.iloc[0]) / independent.iloc[0] < 0.05
+
+    capped = optimize_card(candidates, 1000.0, 0.5, max_event_exposure=0.02)
+    assert capped["stake"].sum() <= 20.0 + 1e-6
+
+
+def test_correlation_model_round_trips_through_sqlite():
+    model = estimate_correlations(_game_logs(), min_samples=30)
+    with sqlite3.connect(":memory:") as con:
+        assert load_correlation_model(con).same_player == {}
+        save_correlation_model(con, model)
+        loaded = load_correlation_model(con)
+    assert loaded.same_player == model.same_player
+    assert loaded.same_team == model.same_team
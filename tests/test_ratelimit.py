@@ -0,0 +1,135 @@
+"""Tests for the API rate limiters and route-template keying"""
+
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from api.utils import ratelimit
+from api.utils.ratelimit import (
+    UNMATCHED_ROUTE,
+    RateLimiter,
+    RedisRateLimiter,
+    RouteTemplateResolver,
+    create_rate_limiter,
+)
+
+
+class FakeClock:
+    def __init__(self, start=1_000.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "time", fake.time)
+    return fake
+
+
+def test_bucket_denies_after_capacity_and_refills(clock):
+    limiter = RateLimiter(requests_per_minute=3, window_seconds=60)
+    assert [limiter.is_allowed("1.2.3.4", "GET:/odds/best") for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    denied = limiter.check("1.2.3.4", "GET:/odds/best")
+    assert not denied.allowed and denied.retry_after == pytest.approx(20.0)
+
+    clock.now += 20
+    assert limiter.is_allowed("1.2.3.4", "GET:/odds/best")
+
+
+def test_idle_buckets_expire_from_the_front(clock):
+    limiter = RateLimiter(requests_per_minute=10, window_seconds=60)
+    limiter.is_allowed("a", "GET:/x")
+    clock.now += 30
+    limiter.is_allowed("b", "GET:/x")
+    clock.now += 31
+    limiter.is_allowed("c", "GET:/x")
+    assert list(limiter.buckets) == ["b:GET:/x", "c:GET:/x"]
+
+
+def test_max_keys_evicts_least_recently_used(clock):
+    limiter = RateLimiter(requests_per_minute=10, window_seconds=60, max_keys=2)
+    limiter.is_allowed("a", "r")
+    limiter.is_allowed("b", "r")
+    limiter.is_allowed("a", "r")
+    limiter.is_allowed("c", "r")
+    assert list(limiter.buckets) == ["a:r", "c:r"]
+
+
+def test_route_resolver_collapses_path_parameters():
+    app = FastAPI()
+
+    @app.get("/odds/event/{event_id}")
+    async def event_odds(event_id: str):
+        return {}
+
+    resolver = RouteTemplateResolver(max_entries=2)
+
+    def scope(path, method="GET"):
+        return {"type": "http", "method": method, "path": path, "app": app}
+
+    assert resolver.resolve(scope("/odds/event/abc")) == "/odds/event/{event_id}"
+    assert resolver.resolve(scope("/odds/event/xyz")) == "/odds/event/{event_id}"
+    assert resolver.resolve(scope("/odds/event/abc", "POST")) == "/odds/event/{event_id}"
+    assert resolver.resolve(scope("/no/such/path")) == UNMATCHED_ROUTE
+    assert len(resolver._cache) == 2
+
+
+def test_route_resolver_sees_included_router_prefixes():
+    router = APIRouter()
+
+    @router.get("/event/{event_id}")
+    async def event_odds(event_id: str):
+        return {}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/odds")
+    scope = {"type": "http", "method": "GET", "path": "/odds/event/abc", "app": app}
+    assert RouteTemplateResolver().resolve(scope) == "/odds/event/{event_id}"
+
+
+@pytest.mark.asyncio
+async def test_redis_sliding_window_is_shared_between_limiters(clock):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    worker_a = RedisRateLimiter(3, 60, client=fakeredis.FakeAsyncRedis(server=server))
+    worker_b = RedisRateLimiter(3, 60, client=fakeredis.FakeAsyncRedis(server=server))
+
+    clock.now = 6_000.0  # start of a window
+    decisions = [
+        await worker_a.hit("ip", "GET:/odds/best"),
+        await worker_b.hit("ip", "GET:/odds/best"),
+        await worker_a.hit("ip", "GET:/odds/best"),
+        await worker_b.hit("ip", "GET:/odds/best"),
+    ]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert decisions[0].remaining == 2
+
+    # Halfway into the next window half of the previous count still applies
+    clock.now += 90
+    assert (await worker_a.hit("ip", "GET:/odds/best")).allowed
+    assert not (await worker_b.hit("ip", "GET:/odds/best")).allowed
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_fails_open():
+    class BrokenRedis:
+        def register_script(self, script):
+            async def run(**kwargs):
+                raise ConnectionError("down")
+
+            return run
+
+    limiter = RedisRateLimiter(5, 60, client=BrokenRedis())
+    assert (await limiter.hit("ip", "GET:/")).allowed
+
+
+def test_create_rate_limiter_defaults_to_local():
+    assert isinstance(create_rate_limiter(60, 60), RateLimiter)
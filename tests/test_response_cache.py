@@ -0,0 +1,134 @@
+"""Tests for the versioned GET response cache"""
+
+from typing import Annotated, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI, Query, Request
+from sqlalchemy import text
+
+from api import database
+from api.endpoints import odds
+from api.models import CurrentBestLine
+from api.settings import settings
+from api.utils.response_cache import (
+    LRUCacheTier,
+    RedisCacheTier,
+    ResponseCache,
+    cached_response,
+)
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_lru_tier_evicts_least_recently_used():
+    tier = LRUCacheTier(max_entries=2)
+    await tier.set("a", b"1")
+    await tier.set("b", b"2")
+    assert await tier.get("a") == b"1"
+    await tier.set("c", b"3")
+    assert await tier.get("b") is None
+    assert len(tier) == 2
+
+
+@pytest.mark.asyncio
+async def test_keyed_on_validated_params_and_version():
+    cache = ResponseCache(max_entries=16)
+    state = {"version": 1, "calls": 0}
+
+    async def version(arguments):
+        return state["version"]
+
+    app = FastAPI()
+
+    @app.get("/lines")
+    @cached_response(cache, version=version)
+    async def lines(request: Request, market: Annotated[Optional[str], Query()] = "all"):
+        state["calls"] += 1
+        return {"market": market, "calls": state["calls"]}
+
+    async with _client(app) as client:
+        first = await client.get("/lines")
+        assert first.headers["X-Cache"] == "MISS"
+        # Explicit default normalizes to the same entry
+        again = await client.get("/lines?market=all")
+        assert again.headers["X-Cache"] == "HIT" and again.json() == first.json()
+        assert (await client.get("/lines?market=pass")).headers["X-Cache"] == "MISS"
+
+        state["version"] = 2
+        bumped = await client.get("/lines")
+        assert bumped.headers["X-Cache"] == "MISS" and bumped.json()["calls"] == 3
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+    assert stats["routes"]["/lines"]["hit_rate"] == 0.25
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    worker_a = ResponseCache(redis_tier=RedisCacheTier(client=fakeredis.FakeAsyncRedis(server=server)))
+    worker_b = ResponseCache(redis_tier=RedisCacheTier(client=fakeredis.FakeAsyncRedis(server=server)))
+
+    await worker_a.set("k", b'{"x":1}')
+    assert await worker_b.get("k") == b'{"x":1}'
+    # Promoted into B's local tier
+    assert await worker_b.local.get("k") == b'{"x":1}'
+
+
+@pytest.fixture
+def odds_app(tmp_path, monkeypatch):
+    for name in ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal"):
+        monkeypatch.setattr(database, name, None)
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "odds.db"))
+    database.init_database()
+    database.create_tables()
+    with database.get_db_session() as db:
+        db.execute(text("CREATE TABLE data_versions (name TEXT PRIMARY KEY, version INTEGER)"))
+        db.execute(text("INSERT INTO data_versions VALUES ('current_best_lines', 1)"))
+        db.add(
+            CurrentBestLine(
+                player="Josh Allen", market="player_pass_yds", book="dk", line=265.5,
+                over_odds=-110, updated_at="t0", event_id="e1",
+            )
+        )
+        db.commit()
+    odds.response_cache.local.clear()
+    odds.response_cache.routes.clear()
+
+    app = FastAPI()
+    app.include_router(odds.router, prefix="/odds")
+    yield app
+    database.engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_best_odds_served_from_cache_until_version_bump(odds_app):
+    async with _client(odds_app) as client:
+        first = await client.get("/odds/best")
+        assert first.headers["X-Cache"] == "MISS" and first.json()["count"] == 1
+        assert (await client.get("/odds/best")).headers["X-Cache"] == "HIT"
+
+        with database.get_db_session() as db:
+            db.add(
+                CurrentBestLine(
+                    player="Joe Burrow", market="player_pass_yds", book="fd", line=250.5,
+                    over_odds=120, updated_at="t1", event_id="e2",
+                )
+            )
+            # Still cached: the poller hasn't published a new version yet
+            db.commit()
+            assert (await client.get("/odds/best")).json()["count"] == 1
+            db.execute(text("UPDATE data_versions SET version = 2"))
+            db.commit()
+
+        refreshed = await client.get("/odds/best")
+        assert refreshed.headers["X-Cache"] == "MISS" and refreshed.json()["count"] == 2
+
+        stats = (await client.get("/odds/cache-stats")).json()
+        assert stats["routes"]["/odds/best"] == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+    await database.dispose_database()
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from adapters import nflverse_provider
+from adapters.nflverse_cache import season_path
+from engine.week_populator import ScheduleIndex, populate_week_from_schedule
+
+SCHEDULE = pd.DataFrame(
+    {
+        "game_id": ["2024_01_BAL_KC", "2024_01_LA_DET", "2024_02_JAX_MIA"],
+        "season": [2024, 2024, 2024],
+        "week": [1, 1, 2],
+        "gameday": ["2024-09-05", "2024-09-08", "2024-09-15"],
+        "away_team": ["BAL", "LA", "JAX"],
+        "home_team": ["KC", "DET", "MIA"],
+        "venue": ["Arrowhead", "Ford Field", None],
+    }
+)
+
+
+def test_event_lookup_covers_game_ids_and_both_team_orders():
+    lookup = ScheduleIndex.from_schedule(SCHEDULE).event_lookup()
+
+    assert len(lookup) == 9
+    assert lookup["2024_01_BAL_KC"] == {
+        "season": 2024,
+        "week": 1,
+        "venue": "Arrowhead",
+        "game_date": "2024-09-05",
+    }
+    assert lookup["2024-09-08-LA-DET"] is lookup["2024-09-08-DET-LA"]
+    assert lookup["2024-09-15-MIA-JAX"]["venue"] is None
+
+
+def test_single_probe_matches_exact_swapped_and_normalized_rows():
+    lines = pd.DataFrame(
+        {
+            "commence_time": [
+                "2024-09-22T17:00:00Z",  # no game that day
+                "2024-09-15T17:00:00Z",  # normalized: JAC -> JAX
+                "2024-09-08T17:00:00Z",  # home/away swapped
+                "2024-09-08T17:00:00Z",  # swapped, but already has a week
+                "2024-09-05T20:00:00Z",  # exact
+            ],
+            "home_team": ["KC", "MIA", "LA", "LA", "KC"],
+            "away_team": ["BAL", "JAC", "DET", "DET", "BAL"],
+            "season": 2024,
+            "week": [pd.NA, pd.NA, pd.NA, 5, pd.NA],
+        }
+    )
+
+    result = populate_week_from_schedule(lines, ScheduleIndex.from_schedule(SCHEDULE))
+
+    assert result["week"].dtype == "Int64"
+    assert list(result["week"].fillna(-1)) == [-1, 2, 1, 5, 1]
+    stats = result._week_population_stats
+    assert (stats["stage1_count"], stats["stage2_count"], stats["stage3_count"]) == (1, 1, 1)
+
+
+def test_schedule_index_is_persisted_per_season(tmp_path, monkeypatch):
+    monkeypatch.setenv("NFLVERSE_CACHE_DIR", str(tmp_path))
+    downloads = []
+
+    def import_schedules(seasons):
+        downloads.append(seasons)
+        return SCHEDULE
+
+    monkeypatch.setattr(nflverse_provider, "nfl", SimpleNamespace(import_schedules=import_schedules))
+
+    first = nflverse_provider.get_schedule_index([2024])
+    assert season_path("schedule_index", 2024).exists()
+    again = nflverse_provider.get_schedule_index([2024])
+
+    assert downloads == [[2024]]
+    assert nflverse_provider.build_event_lookup(again) == first.event_lookup()
+    assert again.frame["home_norm"].dtype == "category"
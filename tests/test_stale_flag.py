@@ -1,4 +1,3 @@
-import os
 import sqlite3
 import sys
 from pathlib import Path
@@ -8,9 +7,10 @@ import pandas as pd
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 
-def test_stale_flag_column_exists():
-    os.environ["CSV_PATH"] = "tests/fixtures/odds_sample_two_way.csv"
-    os.environ["STALE_MINUTES"] = "120"
+def test_stale_flag_column_exists(monkeypatch):
+    monkeypatch.setenv("CSV_PATH", "tests/fixtures/odds_sample_two_way.csv")
+    monkeypatch.setenv("STALE_MINUTES", "120")
+    monkeypatch.setenv("SCHEDULE_CSV", "tests/fixtures/schedule_2025_mini.csv")
     import jobs.import_odds_from_csv as mod
 
     mod.main()
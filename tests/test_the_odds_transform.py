@@ -3,6 +3,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 from datetime import datetime, timezone
+import io
 import json
 from pathlib import Path
 
@@ -20,3 +21,43 @@ def test_normalize_sample_payload():
     first = df.iloc[0]
     assert first["event_id"] == "afc-east-showdown"
     assert first["market_key"] in {"h2h", "spreads", "totals"}
+
+
+def _prop_payload():
+    payload = json.loads(Path("storage/sample_odds_api_response.json").read_text())
+    book = payload[0]["bookmakers"][0]
+    book["markets"].append(
+        {
+            "key": "player_pass_yds",
+            "outcomes": [
+                {"name": "Over", "description": "Josh Allen", "price": -115, "point": 245.5},
+                {"name": "Over", "description": "Zach Wilson", "price": -110, "point": 245.5},
+                {"name": "Under", "description": "Zach Wilson", "price": -110},
+                {"name": "Under", "price": None},
+            ],
+        }
+    )
+    return payload
+
+
+def test_stream_matches_eager_normalization(monkeypatch):
+    from adapters.odds import the_odds_api
+    from adapters.odds.the_odds_api import normalize_odds_stream, outcome_raw_json
+    import pandas as pd
+
+    payload = _prop_payload()
+    fetched_at = datetime(2023, 9, 10, 12, 30, tzinfo=timezone.utc)
+    eager = normalize_odds_response(payload, fetched_at=fetched_at)
+    body = json.dumps(payload).encode()
+
+    frames = [normalize_odds_stream(io.BytesIO(body), fetched_at=fetched_at)]
+    monkeypatch.setattr(the_odds_api, "ijson", None)
+    frames.append(normalize_odds_stream(body, fetched_at=fetched_at))
+
+    for streamed in frames:
+        pd.testing.assert_frame_equal(
+            streamed.drop(columns="odds_raw_json"), eager.drop(columns="odds_raw_json")
+        )
+        # Raw JSON is held once per bookmaker block, yet persists per outcome as before
+        assert len(streamed["odds_raw_json"].cat.categories) == 2
+        assert list(outcome_raw_json(streamed)) == eager["odds_raw_json"].tolist()
@@ -0,0 +1,162 @@
+"""Tests for the WebSocket fan-out layer and pub/sub backends"""
+
+import asyncio
+import json
+
+import pytest
+
+from api.utils.broadcast import (
+    ConnectionManager,
+    InMemoryPubSub,
+    RedisPubSub,
+    Subscription,
+    create_pubsub_backend,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, block: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self._block = block
+
+    async def accept(self):
+        return None
+
+    async def send_text(self, text):
+        if self._block:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_once_and_reaches_every_socket(monkeypatch):
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for i, ws in enumerate(sockets):
+        await manager.connect(ws, f"user_{i}")
+
+    calls = []
+    real_dumps = json.dumps
+    monkeypatch.setattr(
+        "api.utils.broadcast.json.dumps", lambda obj, **kw: calls.append(obj) or real_dumps(obj)
+    )
+    await manager.broadcast({"type": "bet_resolved", "bet_id": "1"})
+    await _drain()
+
+    payload_dumps = [c for c in calls if c.get("type") == "bet_resolved" and "payload" not in c]
+    assert len(payload_dumps) == 1
+    assert all(ws.sent == [{"type": "bet_resolved", "bet_id": "1"}] for ws in sockets)
+
+
+@pytest.mark.asyncio
+async def test_personal_message_only_reaches_target_user():
+    manager = ConnectionManager()
+    alice, bob = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(alice, "alice")
+    await manager.connect(bob, "bob")
+
+    await manager.send_personal_message({"type": "bet_updated", "user_id": "alice"}, "alice")
+    await _drain()
+
+    assert len(alice.sent) == 1
+    assert bob.sent == []
+
+
+@pytest.mark.asyncio
+async def test_subscription_filters_by_event_and_type():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws, "anonymous")
+    manager.subscribe(ws, {"event_ids": ["game_1"], "types": "bet_resolved"})
+
+    await manager.broadcast({"type": "bet_resolved", "event_id": "game_2"})
+    await manager.broadcast({"type": "bet_disputed", "event_id": "game_1"})
+    await manager.broadcast({"type": "bet_resolved", "event_id": "game_1"})
+    await _drain()
+
+    assert len(ws.sent) == 1
+    assert ws.sent[0]["event_id"] == "game_1"
+
+
+def test_subscription_from_dict_accepts_scalars():
+    sub = Subscription.from_dict({"event_id": "e1", "user_ids": ["u1", "u2"]})
+    assert sub.to_dict() == {"event_ids": ["e1"], "user_ids": ["u1", "u2"], "types": []}
+    assert sub.matches({"event_id": "e1", "user_id": "u2"})
+    assert not sub.matches({"event_id": "e1", "user_id": "u3"})
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped_without_blocking_others():
+    manager = ConnectionManager(queue_size=2)
+    slow, fast = FakeWebSocket(block=True), FakeWebSocket()
+    await manager.connect(slow, "slow")
+    await manager.connect(fast, "fast")
+
+    for i in range(5):
+        await manager.broadcast({"type": "bet_updated", "seq": i})
+        await _drain()
+
+    assert [m["seq"] for m in fast.sent] == list(range(5))
+    assert not manager.is_connected(slow)
+    assert manager.get_user_connection_count("slow") == 0
+    assert manager.get_stats()["slow_consumers_dropped"] == 1
+    await _drain()
+    assert slow.closed_with == 1013
+
+
+@pytest.mark.asyncio
+async def test_relay_reaches_sockets_on_other_workers():
+    backend = InMemoryPubSub()
+    worker_a = ConnectionManager(backend=backend)
+    worker_b = ConnectionManager(backend=backend)
+    await worker_a.start(backend)
+    await worker_b.start(backend)
+
+    ws_b = FakeWebSocket()
+    await worker_b.connect(ws_b, "bob")
+    await worker_a.send_personal_message({"type": "bet_resolved", "user_id": "bob"}, "bob")
+    await _drain()
+
+    assert ws_b.sent == [{"type": "bet_resolved", "user_id": "bob"}]
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_relays_between_managers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    backend_a = RedisPubSub(client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    backend_b = RedisPubSub(client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    worker_a, worker_b = ConnectionManager(), ConnectionManager()
+    await worker_a.start(backend_a)
+    await worker_b.start(backend_b)
+
+    ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect(ws_a, "alice")
+    await worker_b.connect(ws_b, "bob")
+    await worker_a.broadcast({"type": "bet_resolved", "bet_id": "7"})
+
+    for _ in range(50):
+        if ws_a.sent and ws_b.sent:
+            break
+        await asyncio.sleep(0.05)
+
+    assert ws_a.sent == [{"type": "bet_resolved", "bet_id": "7"}]
+    assert ws_b.sent == [{"type": "bet_resolved", "bet_id": "7"}]
+    await backend_a.close()
+    await backend_b.close()
+
+
+def test_create_pubsub_backend_selects_by_url():
+    assert isinstance(create_pubsub_backend(None), InMemoryPubSub)
+    assert isinstance(create_pubsub_backend("memory://"), InMemoryPubSub)
+    with pytest.raises(ValueError):
+        create_pubsub_backend("kafka://broker")
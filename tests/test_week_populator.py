@@ -260,6 +260,32 @@ class TestWeekPopulator:
         assert result.iloc[0]["week"] == 1
         assert pd.isna(result.iloc[1]["week"])
 
+    def test_existing_week_column_stays_nullable_integer(self):
+        """Test that fallback matches fill a partial week column in place."""
+        lines = pd.DataFrame(
+            {
+                "commence_time": ["2025-09-07T20:00:00Z"] * 3,
+                "home_team": ["LV", "LV", "XX"],
+                "away_team": ["KC", "KC", "YY"],
+                "season": [2025] * 3,
+                "week": pd.array([pd.NA, 3, pd.NA], dtype="Int64"),
+            }
+        )
+        schedule = pd.DataFrame(
+            {
+                "season": [2025],
+                "week": [1],
+                "game_date": ["2025-09-07"],
+                "home_code": ["KC"],
+                "away_code": ["LV"],
+            }
+        )
+
+        result = populate_week_from_schedule(lines, schedule)
+        assert result["week"].dtype == "Int64"
+        assert result["week"].tolist()[:2] == [1, 3]
+        assert pd.isna(result.iloc[2]["week"])
+
     def test_all_team_normalizations(self):
         """Test all team code normalizations."""
         normalizations = {
@@ -0,0 +1,81 @@
+"""Monotonic per-table data versions shared by jobs, the API and the dashboard."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils.time import utc_now_iso
+
+DDL_DATA_VERSIONS = """
+CREATE TABLE IF NOT EXISTS data_versions (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0,
+  updated_at TEXT
+);
+"""
+
+
+def ensure_data_versions_table(con: sqlite3.Connection) -> None:
+    """Create the ``data_versions`` table if it does not exist."""
+
+    con.execute(DDL_DATA_VERSIONS)
+
+
+def bump_data_version(con: sqlite3.Connection, *names: str) -> None:
+    """Increment the version of each named dataset.
+
+    The bump joins the caller's open transaction (or autocommits), so writers
+    should call it alongside the write it describes. Readers compare versions
+    to decide whether cached copies or pushed deltas need refreshing.
+    """
+
+    if not names:
+        return
+    ensure_data_versions_table(con)
+    now = utc_now_iso()
+    con.executemany(
+        """
+        INSERT INTO data_versions(name, version, updated_at) VALUES(?, 1, ?)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        """,
+        [(name, now) for name in names],
+    )
+
+
+def read_data_versions(
+    con: sqlite3.Connection, names: Optional[Iterable[str]] = None
+) -> Dict[str, int]:
+    """Return ``{name: version}``; missing table or names read as version 0."""
+
+    try:
+        rows = con.execute("SELECT name, version FROM data_versions").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    versions = {str(name): int(version or 0) for name, version in rows}
+    if names is None:
+        return versions
+    return {name: versions.get(name, 0) for name in names}
+
+
+def table_fingerprints(
+    con: sqlite3.Connection, names: Iterable[str]
+) -> Dict[str, Optional[Tuple[int, int, int]]]:
+    """Return ``{name: (version, row count, max rowid)}``; ``None`` for missing tables.
+
+    Row count and ``MAX(rowid)`` catch writers that do not bump a version.
+    """
+
+    names = list(names)
+    versions = read_data_versions(con, names)
+    out: Dict[str, Optional[Tuple[int, int, int]]] = {}
+    for name in names:
+        try:
+            count, max_rowid = con.execute(
+                f'SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM "{name}"'
+            ).fetchone()
+        except sqlite3.OperationalError:
+            out[name] = None
+            continue
+        out[name] = (versions[name], int(count), int(max_rowid))
+    return out
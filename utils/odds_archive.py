@@ -0,0 +1,343 @@
+"""Content-addressed archive of raw Odds API responses.
+
+Every fetch's response body is stored byte-for-byte, zstd-compressed, under
+``<root>/<sha256[:2]>/<sha256>.json.zst`` (identical bodies share a file), and
+indexed in the ``raw_payload_archive`` table with its fetch time, content key,
+request parameters (never the API key) and sizes. ``jobs/replay_archive.py``
+re-feeds the archive through normalization to rebuild derived tables without
+spending quota.
+
+Writers: ``jobs/poll_odds.py::fetch_markets`` (and so the adaptive scheduler and
+closing capture) and ``TheOddsAPIClient``. Archiving is on when
+``ODDS_ARCHIVE_DIR`` is set to a directory (``create_payload_archive``) and
+the ``zstandard`` package is installed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Mapping, Optional
+
+try:  # Optional: archiving is disabled without it
+    import zstandard
+except ImportError:  # pragma: no cover - exercised when zstandard is absent
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = Path("storage/archive/odds")
+DEFAULT_INDEX_DB = Path("storage/odds.db")
+
+# Request parameters that must never reach the index
+SECRET_PARAMS = {"apiKey", "api_key", "apikey"}
+
+
+@dataclass(frozen=True)
+class ArchivedPayload:
+    archive_id: int
+    fetched_at: str
+    source: str
+    endpoint: str
+    params: Dict[str, Any]
+    sha256: str
+    raw_bytes: int
+    stored_bytes: int
+    path: str  # Relative to the archive root
+
+
+def ensure_archive_table(con: sqlite3.Connection) -> None:
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS raw_payload_archive (
+          archive_id INTEGER PRIMARY KEY AUTOINCREMENT,
+          fetched_at TEXT NOT NULL,
+          fetch_day TEXT NOT NULL,
+          source TEXT NOT NULL,
+          endpoint TEXT,
+          params TEXT,
+          sha256 TEXT NOT NULL,
+          raw_bytes INTEGER NOT NULL,
+          stored_bytes INTEGER NOT NULL,
+          path TEXT NOT NULL
+        );
+        """
+    )
+    con.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_raw_payload_archive_day
+          ON raw_payload_archive(fetch_day, fetched_at);
+        """
+    )
+
+
+def _clean_params(params: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    return {k: v for k, v in sorted((params or {}).items()) if k not in SECRET_PARAMS}
+
+
+class PayloadArchive:
+    """Compressed payload files plus their index table."""
+
+    def __init__(
+        self,
+        root: str | Path = DEFAULT_ARCHIVE_DIR,
+        index_db: str | Path = DEFAULT_INDEX_DB,
+        level: int = 10,
+    ) -> None:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for the payload archive")
+        self.root = Path(root)
+        self.index_db = Path(index_db)
+        self.level = level
+        self._local = threading.local()
+        ensure_archive_table(self._con())
+
+    def _con(self) -> sqlite3.Connection:
+        # One connection per thread: fetches run on worker threads in the scheduler
+        con = getattr(self._local, "con", None)
+        if con is None:
+            self.index_db.parent.mkdir(parents=True, exist_ok=True)
+            con = sqlite3.connect(str(self.index_db), timeout=10.0, isolation_level=None)
+            con.execute("PRAGMA busy_timeout=10000;")
+            self._local.con = con
+        return con
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.json.zst"
+
+    def put(
+        self,
+        body: bytes,
+        *,
+        source: str,
+        endpoint: str = "",
+        params: Optional[Mapping[str, Any]] = None,
+        fetched_at: Optional[datetime] = None,
+    ) -> ArchivedPayload:
+        """Archive one response body and index the fetch."""
+
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.path_for(digest)
+        if not path.exists():
+            compressed = zstandard.ZstdCompressor(level=self.level).compress(body)
+            self._write_atomic(path, compressed)
+        return self._index(digest, len(body), path, source, endpoint, params, fetched_at)
+
+    def tee(
+        self,
+        stream: BinaryIO,
+        *,
+        source: str,
+        endpoint: str = "",
+        params: Optional[Mapping[str, Any]] = None,
+        fetched_at: Optional[datetime] = None,
+    ) -> "_ArchivingReader":
+        """Wrap a response stream so the body is archived as it is consumed.
+
+        Only bodies read to the end are archived; memory stays bounded by the
+        compressor's window rather than the payload size.
+        """
+
+        return _ArchivingReader(self, stream, source, endpoint, params, fetched_at)
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+    def _index(
+        self,
+        digest: str,
+        raw_bytes: int,
+        path: Path,
+        source: str,
+        endpoint: str,
+        params: Optional[Mapping[str, Any]],
+        fetched_at: Optional[datetime],
+    ) -> ArchivedPayload:
+        fetched = (fetched_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        clean = _clean_params(params)
+        relative = path.relative_to(self.root).as_posix()
+        stored = path.stat().st_size
+        cur = self._con().execute(
+            """
+            INSERT INTO raw_payload_archive
+              (fetched_at, fetch_day, source, endpoint, params, sha256,
+               raw_bytes, stored_bytes, path)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                fetched.isoformat(),
+                fetched.date().isoformat(),
+                source,
+                endpoint,
+                json.dumps(clean, default=str),
+                digest,
+                raw_bytes,
+                stored,
+                relative,
+            ),
+        )
+        return ArchivedPayload(
+            cur.lastrowid,
+            fetched.isoformat(),
+            source,
+            endpoint,
+            clean,
+            digest,
+            raw_bytes,
+            stored,
+            relative,
+        )
+
+    def read(self, entry: ArchivedPayload | str) -> bytes:
+        """Decompressed body for an index entry or content key."""
+
+        digest = entry if isinstance(entry, str) else entry.sha256
+        with open(self.path_for(digest), "rb") as fh:
+            return zstandard.ZstdDecompressor().stream_reader(fh).read()
+
+    def open(self, entry: ArchivedPayload | str) -> BinaryIO:
+        """Decompressing stream over a body, for the streaming normalizer."""
+
+        digest = entry if isinstance(entry, str) else entry.sha256
+        return zstandard.ZstdDecompressor().stream_reader(open(self.path_for(digest), "rb"), closefd=True)
+
+    def entries(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        source: Optional[str] = None,
+    ) -> List[ArchivedPayload]:
+        """Index rows in fetch order, optionally limited to days and a source."""
+
+        return list_entries(self._con(), start=start, end=end, source=source)
+
+
+def list_entries(
+    con: sqlite3.Connection,
+    *,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    source: Optional[str] = None,
+) -> List[ArchivedPayload]:
+    ensure_archive_table(con)
+    sql = (
+        "SELECT archive_id, fetched_at, source, endpoint, params, sha256, raw_bytes, "
+        "stored_bytes, path FROM raw_payload_archive WHERE 1=1"
+    )
+    args: List[Any] = []
+    if start is not None:
+        sql += " AND fetch_day >= ?"
+        args.append(start.isoformat())
+    if end is not None:
+        sql += " AND fetch_day <= ?"
+        args.append(end.isoformat())
+    if source is not None:
+        sql += " AND source = ?"
+        args.append(source)
+    sql += " ORDER BY fetched_at, archive_id"
+    return [
+        ArchivedPayload(row[0], row[1], row[2], row[3], json.loads(row[4] or "{}"), *row[5:])
+        for row in con.execute(sql, args)
+    ]
+
+
+class _ArchivingReader(io.RawIOBase):
+    def __init__(
+        self,
+        archive: PayloadArchive,
+        stream: BinaryIO,
+        source: str,
+        endpoint: str,
+        params: Optional[Mapping[str, Any]],
+        fetched_at: Optional[datetime],
+    ) -> None:
+        super().__init__()
+        self.archive = archive
+        self.stream = stream
+        self.meta = (source, endpoint, params, fetched_at)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        archive.root.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=archive.root, suffix=".tmp")
+        self.sink = zstandard.ZstdCompressor(level=archive.level).stream_writer(
+            os.fdopen(fd, "wb"), closefd=True
+        )
+        self.entry: Optional[ArchivedPayload] = None
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0 or self._eof:
+            return b""
+        drain = size is None or size < 0
+        data = self.stream.read() if drain else self.stream.read(size)
+        if data:
+            self.digest.update(data)
+            self.size += len(data)
+            self.sink.write(data)
+        # read() with no size (json.load) consumes the whole body in one call
+        if drain or not data:
+            self._finish()
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def _finish(self) -> None:
+        self._eof = True
+        self.sink.close()
+        digest = self.digest.hexdigest()
+        path = self.archive.path_for(digest)
+        if path.exists():
+            os.unlink(self.tmp)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.tmp, path)
+        source, endpoint, params, fetched_at = self.meta
+        self.entry = self.archive._index(
+            digest, self.size, path, source, endpoint, params, fetched_at
+        )
+
+    def close(self) -> None:
+        if not self.closed:
+            if not self._eof:
+                # Partially consumed: nothing trustworthy to archive
+                self.sink.close()
+                os.unlink(self.tmp)
+            self.stream.close()
+        super().close()
+
+
+def create_payload_archive(
+    root: Optional[str | Path] = None, index_db: str | Path = DEFAULT_INDEX_DB
+) -> Optional[PayloadArchive]:
+    """Archive configured by ``ODDS_ARCHIVE_DIR``; None when disabled.
+
+    Set ``ODDS_ARCHIVE_DIR=storage/archive/odds`` (or any directory) to turn
+    archiving on; ``off`` or an empty value leaves it off.
+    """
+
+    root = root or os.getenv("ODDS_ARCHIVE_DIR", "")
+    if not root or str(root).lower() in {"0", "off", "false", "no"}:
+        return None
+    if zstandard is None:
+        logger.warning("ODDS_ARCHIVE_DIR is set but zstandard is not installed; not archiving")
+        return None
+    return PayloadArchive(root, index_db)
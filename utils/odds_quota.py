@@ -0,0 +1,504 @@
+"""Shared quota accounting and key rotation for The Odds API.
+
+Every client that calls The Odds API (``jobs/poll_odds.py``, the
+``TheOddsAPIClient`` adapter and the backend ``OddsAPIManager``) goes through
+one :class:`OddsQuotaManager`:
+
+1. ``reserve(cost)`` atomically picks the key with the most quota left and
+   deducts the request's cost *before* the request is sent, so concurrent
+   jobs never race each other onto the same nearly-empty key.
+2. ``record(lease, headers)`` replaces the estimate with the authoritative
+   ``x-requests-remaining`` header from the response.
+3. ``fail(lease, status)`` refunds requests the API did not charge and puts
+   keys that hit 401/403/429 on a cooldown.
+
+State lives in a pluggable store shared by all processes: SQLite by default
+(the existing ``odds_api_usage`` table in the project's ``storage/odds.db``
+whatever the working directory; reservations are a single
+``UPDATE ... RETURNING``) or Redis (one Lua script per operation). Select it
+with ``ODDS_QUOTA_STORE`` (``sqlite:///storage/odds.db`` or ``redis://...``).
+
+``min_interval(cost)`` is the shortest polling interval that keeps the
+remaining quota from running out before it resets.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+try:  # Optional: only needed for the Redis store
+    import redis
+except ImportError:  # pragma: no cover - exercised when redis is absent
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Resolved against the project root, not the CWD: the backend runs from backend/
+DEFAULT_STORE_PATH = Path(__file__).resolve().parents[1] / "storage" / "odds.db"
+DEFAULT_STORE_URL = f"sqlite:///{DEFAULT_STORE_PATH}"
+REMAINING_HEADER = "x-requests-remaining"
+
+# Cooldowns applied by ``fail``; quota exhaustion blocks until the period resets
+UNAUTHORIZED_COOLDOWN_SECONDS = 24 * 3600
+RATE_LIMIT_COOLDOWN_SECONDS = 15 * 60
+
+
+class QuotaExhaustedError(RuntimeError):
+    """Raised when no key has enough quota left for a request."""
+
+
+@dataclass(frozen=True)
+class QuotaLease:
+    """Quota reserved on ``key`` for one request of ``cost`` credits."""
+
+    key: str
+    cost: int
+    remaining: Optional[int] = None  # Estimate after the reservation
+
+
+def request_cost(markets: Optional[str], regions: Optional[str] = "us") -> int:
+    """Credits an /odds request costs: one per market per region."""
+
+    def count(value: Optional[str]) -> int:
+        return max(1, len([part for part in (value or "").split(",") if part.strip()]))
+
+    return count(markets) * count(regions)
+
+
+def parse_remaining(headers: Optional[Mapping[str, Any]]) -> Optional[int]:
+    """Read ``x-requests-remaining`` from any response headers mapping."""
+
+    if not headers:
+        return None
+    value = headers.get(REMAINING_HEADER)
+    if value is None:
+        value = headers.get(REMAINING_HEADER.title())
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def next_reset(now: datetime, period: str = "month") -> datetime:
+    """Start of the next quota period (UTC); The Odds API resets monthly."""
+
+    day = now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "day":
+        return day + timedelta(days=1)
+    if day.month == 12:
+        return day.replace(year=day.year + 1, month=1, day=1)
+    return day.replace(month=day.month + 1, day=1)
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+
+class SQLiteQuotaStore:
+    """Quota state in the ``odds_api_usage`` table of a SQLite database."""
+
+    def __init__(
+        self, path: str | Path = DEFAULT_STORE_PATH, con: Optional[sqlite3.Connection] = None
+    ):
+        if con is None:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            con = sqlite3.connect(
+                str(path), timeout=10.0, isolation_level=None, check_same_thread=False
+            )
+            con.execute("PRAGMA journal_mode=WAL;")
+            con.execute("PRAGMA busy_timeout=10000;")
+        self.con = con
+        self._lock = threading.Lock()
+        # Same schema jobs/poll_odds.py has always used
+        self.con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS odds_api_usage (
+              key TEXT PRIMARY KEY,
+              last_used TEXT,
+              req_today INT DEFAULT 0,
+              req_month INT DEFAULT 0,
+              last_remaining INT,
+              disabled INT DEFAULT 0,
+              disabled_until TEXT
+            );
+            """
+        )
+
+    def _execute(self, sql: str, params: Sequence[Any] | Mapping[str, Any] = ()) -> List[tuple]:
+        with self._lock:
+            rows = self.con.execute(sql, params).fetchall()
+            if self.con.in_transaction:
+                self.con.commit()
+            return rows
+
+    def register(self, keys: Sequence[str]) -> None:
+        with self._lock:
+            self.con.executemany(
+                "INSERT OR IGNORE INTO odds_api_usage(key, req_today, req_month, disabled) "
+                "VALUES(?, 0, 0, 0)",
+                [(key,) for key in keys],
+            )
+            if self.con.in_transaction:
+                self.con.commit()
+
+    def reserve(
+        self, keys: Sequence[str], cost: int, floor: int, now: float
+    ) -> Optional[tuple[str, Optional[int]]]:
+        placeholders = ",".join("?" * len(keys))
+        now_iso = _iso(now)
+        # A key whose cooldown expired comes back with unknown remaining quota;
+        # unknown keys sort first so their real balance is learned quickly.
+        rows = self._execute(
+            f"""
+            UPDATE odds_api_usage
+            SET last_remaining = CASE WHEN COALESCE(disabled, 0) = 1 THEN NULL
+                                      ELSE last_remaining - ? END,
+                disabled = 0,
+                disabled_until = NULL
+            WHERE key = (
+              SELECT key FROM odds_api_usage
+              WHERE key IN ({placeholders})
+                AND (
+                  (COALESCE(disabled, 0) = 0
+                   AND (last_remaining IS NULL OR last_remaining - ? >= ?))
+                  OR (disabled = 1 AND disabled_until IS NOT NULL AND disabled_until <= ?)
+                )
+              ORDER BY CASE WHEN COALESCE(disabled, 0) = 1 OR last_remaining IS NULL
+                            THEN 1 ELSE 0 END DESC,
+                       last_remaining DESC,
+                       COALESCE(req_month, 0),
+                       key
+              LIMIT 1
+            )
+            RETURNING key, last_remaining
+            """,
+            [cost, *keys, cost, floor, now_iso],
+        )
+        if not rows:
+            return None
+        key, remaining = rows[0]
+        return key, remaining
+
+    def refund(self, key: str, cost: int) -> None:
+        self._execute(
+            "UPDATE odds_api_usage SET last_remaining = last_remaining + ? WHERE key = ?",
+            (cost, key),
+        )
+
+    def record(self, key: str, remaining: Optional[int], now: float) -> None:
+        now_iso = _iso(now)
+        self._execute(
+            """
+            UPDATE odds_api_usage
+            SET req_today = CASE WHEN substr(COALESCE(last_used, ''), 1, 10) = substr(:now, 1, 10)
+                                 THEN COALESCE(req_today, 0) + 1 ELSE 1 END,
+                req_month = CASE WHEN substr(COALESCE(last_used, ''), 1, 7) = substr(:now, 1, 7)
+                                 THEN COALESCE(req_month, 0) + 1 ELSE 1 END,
+                last_remaining = COALESCE(:remaining, last_remaining),
+                last_used = :now
+            WHERE key = :key
+            """,
+            {"now": now_iso, "remaining": remaining, "key": key},
+        )
+
+    def block(self, key: str, until: float) -> None:
+        self._execute(
+            "UPDATE odds_api_usage SET disabled = 1, disabled_until = ? WHERE key = ?",
+            (_iso(until), key),
+        )
+
+    def snapshot(self, keys: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        placeholders = ",".join("?" * len(keys))
+        rows = self._execute(
+            "SELECT key, last_remaining, req_today, req_month, disabled, disabled_until, last_used "
+            f"FROM odds_api_usage WHERE key IN ({placeholders})",
+            list(keys),
+        )
+        snapshot = {}
+        for key, remaining, today, month, disabled, until, last_used in rows:
+            blocked_until = None
+            if disabled:
+                blocked_until = (
+                    datetime.fromisoformat(until).timestamp() if until else float("inf")
+                )
+            snapshot[key] = {
+                "remaining": remaining,
+                "requests_today": today or 0,
+                "requests_month": month or 0,
+                "blocked_until": blocked_until,
+                "last_used": last_used,
+            }
+        return snapshot
+
+
+RESERVE_LUA = """
+local cost = tonumber(ARGV[1])
+local floor = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local best, best_score, best_month, best_expired = nil, nil, nil, false
+for i, hkey in ipairs(KEYS) do
+  local f = redis.call('HMGET', hkey, 'remaining', 'blocked_until', 'req_month')
+  local remaining = tonumber(f[1])
+  local blocked = tonumber(f[2]) or 0
+  local month = tonumber(f[3]) or 0
+  local ok, expired = false, false
+  if blocked > 0 then
+    expired = blocked <= now
+    ok = expired
+    if expired then remaining = nil end
+  else
+    ok = remaining == nil or remaining - cost >= floor
+  end
+  if ok then
+    local score = remaining or 1e18
+    if best == nil or score > best_score or (score == best_score and month < best_month) then
+      best, best_score, best_month, best_expired = i, score, month, expired
+    end
+  end
+end
+if best == nil then return {0, false} end
+local hkey = KEYS[best]
+if best_expired then
+  redis.call('HDEL', hkey, 'remaining')
+  redis.call('HSET', hkey, 'blocked_until', 0)
+  return {best, false}
+end
+if redis.call('HEXISTS', hkey, 'remaining') == 1 then
+  return {best, redis.call('HINCRBY', hkey, 'remaining', -cost)}
+end
+return {best, false}
+"""
+
+RECORD_LUA = """
+local h = KEYS[1]
+if redis.call('HGET', h, 'day') == ARGV[2] then
+  redis.call('HINCRBY', h, 'req_today', 1)
+else
+  redis.call('HSET', h, 'req_today', 1, 'day', ARGV[2])
+end
+if redis.call('HGET', h, 'month') == ARGV[3] then
+  redis.call('HINCRBY', h, 'req_month', 1)
+else
+  redis.call('HSET', h, 'req_month', 1, 'month', ARGV[3])
+end
+if ARGV[1] ~= '' then redis.call('HSET', h, 'remaining', ARGV[1]) end
+redis.call('HSET', h, 'last_used', ARGV[4])
+return 1
+"""
+
+REFUND_LUA = """
+if redis.call('HEXISTS', KEYS[1], 'remaining') == 1 then
+  return redis.call('HINCRBY', KEYS[1], 'remaining', ARGV[1])
+end
+return false
+"""
+
+
+class RedisQuotaStore:
+    """Quota state in one Redis hash per key (hashed, so keys never leak)."""
+
+    def __init__(
+        self, url: str = "redis://localhost:6379/0", client: Any = None, prefix: str = "odds_quota"
+    ):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("redis is required for the Redis quota store")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+        self._reserve = client.register_script(RESERVE_LUA)
+        self._record = client.register_script(RECORD_LUA)
+        self._refund = client.register_script(REFUND_LUA)
+
+    def _hash(self, key: str) -> str:
+        return f"{self.prefix}:{hashlib.sha256(key.encode()).hexdigest()[:16]}"
+
+    def register(self, keys: Sequence[str]) -> None:
+        return None
+
+    def reserve(
+        self, keys: Sequence[str], cost: int, floor: int, now: float
+    ) -> Optional[tuple[str, Optional[int]]]:
+        index, remaining = self._reserve(
+            keys=[self._hash(key) for key in keys], args=[cost, floor, now]
+        )
+        if not int(index):
+            return None
+        return keys[int(index) - 1], int(remaining) if remaining is not None else None
+
+    def refund(self, key: str, cost: int) -> None:
+        self._refund(keys=[self._hash(key)], args=[cost])
+
+    def record(self, key: str, remaining: Optional[int], now: float) -> None:
+        now_iso = _iso(now)
+        self._record(
+            keys=[self._hash(key)],
+            args=["" if remaining is None else remaining, now_iso[:10], now_iso[:7], now_iso],
+        )
+
+    def block(self, key: str, until: float) -> None:
+        self.client.hset(self._hash(key), "blocked_until", until)
+
+    def snapshot(self, keys: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        snapshot = {}
+        for key in keys:
+            fields = self.client.hgetall(self._hash(key)) or {}
+            blocked = float(fields.get("blocked_until") or 0)
+            snapshot[key] = {
+                "remaining": int(fields["remaining"]) if "remaining" in fields else None,
+                "requests_today": int(fields.get("req_today") or 0),
+                "requests_month": int(fields.get("req_month") or 0),
+                "blocked_until": blocked or None,
+                "last_used": fields.get("last_used"),
+            }
+        return snapshot
+
+
+class OddsQuotaManager:
+    """Reserve-before-request quota accounting over a shared store."""
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        store: Any,
+        floor: int = 0,
+        period: str = "month",
+        clock=time.time,
+    ):
+        self.keys = list(dict.fromkeys(k for k in keys if k))
+        self.store = store
+        self.floor = floor
+        self.period = period
+        self._clock = clock
+        if self.keys:
+            self.store.register(self.keys)
+
+    def reserve(self, cost: int = 1) -> QuotaLease:
+        """Deduct ``cost`` from the best available key, or raise ``QuotaExhaustedError``."""
+
+        if not self.keys:
+            raise QuotaExhaustedError("No Odds API keys configured")
+        picked = self.store.reserve(self.keys, cost, self.floor, self._clock())
+        if picked is None:
+            raise QuotaExhaustedError(f"No Odds API key has {cost} request credits left")
+        key, remaining = picked
+        return QuotaLease(key=key, cost=cost, remaining=remaining)
+
+    def record(
+        self,
+        lease: QuotaLease,
+        headers: Optional[Mapping[str, Any]] = None,
+        remaining: Optional[int] = None,
+    ) -> None:
+        """Settle a completed request, learning the real balance from its headers."""
+
+        if remaining is None:
+            remaining = parse_remaining(headers)
+        now = self._clock()
+        self.store.record(lease.key, remaining, now)
+        if remaining is not None and remaining - lease.cost < self.floor:
+            self.store.block(lease.key, self._reset_at(now))
+            logger.warning(f"Odds API key {lease.key[:8]}** exhausted until quota reset")
+
+    def release(self, lease: QuotaLease) -> None:
+        """Refund a reservation whose request never reached (or was not charged by) the API."""
+
+        self.store.refund(lease.key, lease.cost)
+
+    def fail(
+        self, lease: QuotaLease, status_code: Optional[int], retry_after: Optional[float] = None
+    ) -> None:
+        """Refund an uncharged request and cool the key down for auth/quota errors."""
+
+        self.release(lease)
+        now = self._clock()
+        if status_code == 401:
+            until = now + UNAUTHORIZED_COOLDOWN_SECONDS
+        elif status_code == 403:
+            until = self._reset_at(now)
+        elif status_code == 429:
+            until = now + (retry_after or RATE_LIMIT_COOLDOWN_SECONDS)
+        else:
+            return
+        self.store.block(lease.key, until)
+        logger.warning(
+            f"Odds API key {lease.key[:8]}** blocked until {_iso(until)} (HTTP {status_code})"
+        )
+
+    def _reset_at(self, now: float) -> float:
+        return next_reset(datetime.fromtimestamp(now, timezone.utc), self.period).timestamp()
+
+    def min_interval(self, cost: int = 1) -> float:
+        """Shortest poll interval that makes the known quota last until it resets.
+
+        Returns 0 while any usable key's balance is still unknown.
+        """
+
+        now = self._clock()
+        budget = 0
+        for info in self.store.snapshot(self.keys).values():
+            blocked = info["blocked_until"]
+            if blocked is not None and blocked > now:
+                continue
+            if info["remaining"] is None:
+                return 0.0
+            budget += max(info["remaining"] - self.floor, 0)
+        until_reset = self._reset_at(now) - now
+        if budget < cost:
+            return until_reset
+        return until_reset * cost / budget
+
+    def status(self) -> Dict[str, Any]:
+        now = self._clock()
+        snapshot = self.store.snapshot(self.keys)
+        keys = {}
+        for key in self.keys:
+            info = snapshot.get(key, {})
+            blocked = info.get("blocked_until")
+            keys[f"{key[:8]}**"] = {
+                "available": not (blocked is not None and blocked > now),
+                "remaining": info.get("remaining"),
+                "requests_today": info.get("requests_today", 0),
+                "requests_month": info.get("requests_month", 0),
+                "blocked_until": _iso(blocked) if blocked and blocked != float("inf") else None,
+            }
+        return {
+            "keys_configured": len(self.keys),
+            "available_keys": sum(1 for info in keys.values() if info["available"]),
+            "requests_today": sum(info["requests_today"] for info in keys.values()),
+            "keys": keys,
+        }
+
+
+def create_quota_manager(
+    keys: Sequence[str],
+    url: Optional[str] = None,
+    con: Optional[sqlite3.Connection] = None,
+    floor: Optional[int] = None,
+) -> OddsQuotaManager:
+    """Manager over the store named by ``url`` / ``ODDS_QUOTA_STORE``.
+
+    ``con`` reuses an open SQLite connection when the store is SQLite.
+    """
+
+    url = url or os.getenv("ODDS_QUOTA_STORE")
+    if floor is None:
+        floor = int(os.getenv("ODDS_QUOTA_FLOOR", "0"))
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        store: Any = RedisQuotaStore(url)
+    elif con is not None and not url:
+        store = SQLiteQuotaStore(con=con)
+    else:
+        url = url or DEFAULT_STORE_URL
+        store = SQLiteQuotaStore(url.split("sqlite:///", 1)[-1])
+    return OddsQuotaManager(keys, store, floor=floor)
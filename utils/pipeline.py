@@ -0,0 +1,282 @@
+"""Tiny DAG runner with fingerprint-keyed stage caching.
+
+Each :class:`Stage` names the upstream stages it consumes and a
+``fingerprint`` callable describing everything else its output depends on
+(data versions, file hashes, config). A stage's cache key hashes its own
+fingerprint together with the keys of its inputs, so a change anywhere
+upstream invalidates exactly the stages downstream of it. Stages whose
+inputs are ready run concurrently on a thread pool; the numeric work
+(pandas, SQLite, network I/O) releases the GIL for most of its time.
+
+Cached outputs are pickled one file per stage (only the latest key is kept)
+and are loaded lazily, so a fully cached upstream stage costs nothing unless
+a downstream stage actually re-runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path("storage/cache/pipeline")
+
+
+class PipelineError(RuntimeError):
+    """Raised after a run in which one or more stages failed."""
+
+    def __init__(self, errors: Mapping[str, BaseException]) -> None:
+        self.errors = dict(errors)
+        detail = "; ".join(f"{name}: {exc!r}" for name, exc in self.errors.items())
+        super().__init__(f"Pipeline stages failed: {detail}")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A pipeline step.
+
+    ``run`` receives the outputs of ``inputs`` as keyword arguments; ``after``
+    names stages that must finish first without passing their output. Stages
+    with ``cache=False`` always execute (migrations, cheap side effects), but
+    still have a stable key so they do not invalidate their dependants;
+    ``cache_if`` can veto storing a particular output (e.g. an empty frame
+    returned after a failed download). Bump
+    ``version`` when the stage's code changes in a way that alters output.
+    """
+
+    name: str
+    run: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    fingerprint: Optional[Callable[[], Any]] = None
+    cache: bool = True
+    cache_if: Optional[Callable[[Any], bool]] = None
+    version: int = 1
+
+    @property
+    def depends_on(self) -> Tuple[str, ...]:
+        return self.inputs + self.after
+
+
+@dataclass
+class StageReport:
+    name: str
+    status: str  # "ran", "cached", "failed" or "skipped"
+    seconds: float = 0.0
+    key: str = ""
+
+
+@dataclass
+class PipelineRun:
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    reports: Dict[str, StageReport] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        """Output of ``name``, loading it from the cache on first access."""
+        value = self.outputs[name]
+        if isinstance(value, _Cached):
+            value = self.outputs[name] = value.load()
+        return value
+
+    def timings(self) -> pd.DataFrame:
+        """Per-stage status and wall time in execution order."""
+        return pd.DataFrame(
+            [
+                {"stage": r.name, "status": r.status, "seconds": round(r.seconds, 3)}
+                for r in self.reports.values()
+            ]
+        )
+
+
+def file_fingerprint(path: Path | str | None) -> Optional[str]:
+    """Content hash of a file, or ``None`` when it does not exist."""
+    if path is None:
+        return None
+    path = Path(path)
+    if not path.is_file():
+        return None
+    digest = hashlib.sha1()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stable(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class _Cached:
+    """Placeholder for an output still on disk."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def load(self) -> Any:
+        with self.path.open("rb") as fh:
+            return pickle.load(fh)
+
+
+class Pipeline:
+    def __init__(
+        self,
+        stages: Iterable[Stage],
+        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+        max_workers: int = 4,
+        force: bool = False,
+    ) -> None:
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            missing = [name for name in stage.depends_on if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {missing}")
+        self.order = self._topological_order()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_workers = max(1, max_workers)
+        self.force = force
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str, trail: Tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(trail + (name,))}")
+            state[name] = 1
+            for dep in self.stages[name].depends_on:
+                visit(dep, trail + (name,))
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    def _key(self, stage: Stage, keys: Mapping[str, str]) -> str:
+        fingerprint = stage.fingerprint() if stage.fingerprint is not None else None
+        payload = _stable(
+            [stage.name, stage.version, fingerprint, [keys[dep] for dep in stage.depends_on]]
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _paths(self, name: str) -> Tuple[Path, Path]:
+        assert self.cache_dir is not None
+        return self.cache_dir / f"{name}.pkl", self.cache_dir / f"{name}.key"
+
+    def _lookup(self, stage: Stage, key: str) -> Optional[_Cached]:
+        if self.force or not stage.cache or self.cache_dir is None:
+            return None
+        value_path, key_path = self._paths(stage.name)
+        try:
+            if key_path.read_text().strip() == key and value_path.exists():
+                return _Cached(value_path)
+        except OSError:
+            pass
+        return None
+
+    def _store(self, stage: Stage, key: str, value: Any) -> None:
+        if not stage.cache or self.cache_dir is None:
+            return
+        if stage.cache_if is not None and not stage.cache_if(value):
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        value_path, key_path = self._paths(stage.name)
+        tmp = value_path.with_suffix(f".tmp{os.getpid()}")
+        with tmp.open("wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, value_path)
+        key_path.write_text(key)
+
+    def _execute(self, stage: Stage, key: str, inputs: Dict[str, Any]) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        value = stage.run(**inputs)
+        self._store(stage, key, value)
+        return value, time.perf_counter() - start
+
+    def run(self, targets: Optional[Sequence[str]] = None) -> PipelineRun:
+        """Run ``targets`` (default: every stage) and whatever they depend on."""
+        wanted = self._closure(targets) if targets else set(self.order)
+        result = PipelineRun()
+        keys: Dict[str, str] = {}
+        errors: Dict[str, BaseException] = {}
+        pending = [name for name in self.order if name in wanted]
+        running: Dict[Future, Tuple[str, str]] = {}
+
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    if any(
+                        result.reports[dep].status in ("failed", "skipped")
+                        for dep in stage.depends_on
+                        if dep in result.reports
+                    ):
+                        pending.remove(name)
+                        result.reports[name] = StageReport(name, "skipped")
+                        continue
+                    if not all(dep in keys for dep in stage.depends_on):
+                        continue
+                    pending.remove(name)
+                    start = time.perf_counter()
+                    try:
+                        key = self._key(stage, keys)
+                        cached = self._lookup(stage, key)
+                        if cached is not None:
+                            keys[name] = key
+                            result.outputs[name] = cached
+                            result.reports[name] = StageReport(
+                                name, "cached", time.perf_counter() - start, key
+                            )
+                            continue
+                        inputs = {dep: result[dep] for dep in stage.inputs}
+                    except Exception as exc:
+                        errors[name] = exc
+                        result.reports[name] = StageReport(
+                            name, "failed", time.perf_counter() - start
+                        )
+                        continue
+                    running[pool.submit(self._execute, stage, key, inputs)] = (name, key)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key = running.pop(future)
+                    try:
+                        value, seconds = future.result()
+                    except Exception as exc:
+                        errors[name] = exc
+                        result.reports[name] = StageReport(name, "failed", key=key)
+                        continue
+                    keys[name] = key
+                    result.outputs[name] = value
+                    result.reports[name] = StageReport(name, "ran", seconds, key)
+
+        if errors:
+            raise PipelineError(errors)
+        return result
+
+    def _closure(self, targets: Sequence[str]) -> set:
+        needed: set = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.stages[name].depends_on)
+        return needed